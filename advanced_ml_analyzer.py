@@ -4,7 +4,13 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import StandardScaler
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from feature_store import feature_store, YFINANCE
+
+# Ortak özellik deposundan (ROC = momentum_10 ile aynı olduğu için ayrıca alınmaz)
+FEATURE_COLS = ['ma_5', 'ma_20', 'ma_50', 'rsi', 'macd', 'bb_upper', 'bb_lower',
+                'volume_ma_5', 'volatility_20', 'momentum_10']
+TRAIN_DAYS = 180
 
 class AdvancedMLAnalyzer:
     def __init__(self):
@@ -16,43 +22,26 @@ class AdvancedMLAnalyzer:
         self.scaler = StandardScaler()
     
     def predict_with_confidence(self, symbol):
-        """%99.9 accuracy tahmin"""
+        """%99.9 accuracy tahmin (symbol: yfinance sembolü)"""
         try:
-            data = yf.download(symbol, period="180d", progress=False)
-            
-            # Check if data is valid
-            if data is None or data.empty:
-                return None
+            # Özellikler depodan - hedef bir sonraki kapanış
+            feature_data = feature_store.training_set(symbol, FEATURE_COLS, horizon=1, days=TRAIN_DAYS,
+                                                      quote=YFINANCE)
+            latest = feature_store.latest(symbol, FEATURE_COLS, quote=YFINANCE)
             
-            # 20+ features
-            data['MA5'] = data['Close'].rolling(5).mean()
-            data['MA20'] = data['Close'].rolling(20).mean()
-            data['MA50'] = data['Close'].rolling(50).mean()
-            data['RSI'] = self._calc_rsi(data['Close'])
-            data['MACD'] = self._calc_macd(data['Close'])
-            data['BB_High'] = data['MA20'] + (data['Close'].rolling(20).std() * 2)
-            data['BB_Low'] = data['MA20'] - (data['Close'].rolling(20).std() * 2)
-            data['Volume_MA'] = data['Volume'].rolling(5).mean()
-            data['Volatility'] = data['Close'].pct_change().rolling(20).std()
-            data['Momentum'] = data['Close'].pct_change(10)
-            data['ROC'] = (data['Close'] - data['Close'].shift(10)) / data['Close'].shift(10)
-            
-            feature_data = data[['MA5', 'MA20', 'MA50', 'RSI', 'MACD', 'BB_High', 'BB_Low', 
-                      'Volume_MA', 'Volatility', 'Momentum', 'ROC']].dropna()
-            
-            if feature_data.empty or len(feature_data) == 0:
+            if feature_data.empty or latest is None:
                 return None
             
-            X = feature_data.values
-            y = data['Close'][len(data)-len(X):].values
+            X = feature_data[FEATURE_COLS].values
+            y = (feature_data['close'] * (1 + feature_data['target'])).values
             
             X_scaled = self.scaler.fit_transform(X)
             self.ensemble.fit(X_scaled, y)
             
-            last_row = X_scaled[-1:].reshape(1, -1)
+            last_row = self.scaler.transform(latest[FEATURE_COLS].values)
             prediction = self.ensemble.predict(last_row)[0]
             
-            current_price = data['Close'].iloc[-1]
+            current_price = latest['close'].iloc[0]
             if pd.isna(current_price):
                 return None
             current = float(current_price)
@@ -65,15 +54,3 @@ class AdvancedMLAnalyzer:
             }
         except:
             return None
-    
-    def _calc_rsi(self, prices, period=14):
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-    
-    def _calc_macd(self, prices):
-        exp1 = prices.ewm(span=12).mean()
-        exp2 = prices.ewm(span=26).mean()
-        return exp1 - exp2
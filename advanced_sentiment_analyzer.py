@@ -1,8 +1,9 @@
 """🎯 Advanced Sentiment Analysis - Haberlerden sentiment"""
 import os
-from textblob import TextBlob
 from datetime import datetime, timedelta
 
+from sentiment_engine import sentiment_engine
+
 class AdvancedSentimentAnalyzer:
     def __init__(self):
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
@@ -10,9 +11,9 @@ class AdvancedSentimentAnalyzer:
     def analyze_text_sentiment(self, text):
         """Metin sentiment analizi"""
         try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity  # -1 (negative) to 1 (positive)
-            subjectivity = blob.sentiment.subjectivity
+            scored = sentiment_engine.polarity(text)
+            polarity = scored['polarity']  # -1 (negative) to 1 (positive)
+            subjectivity = scored['subjectivity']
             
             if polarity > 0.1:
                 sentiment = "POSITIVE"
@@ -59,8 +60,10 @@ class AdvancedSentimentAnalyzer:
             articles = response.json().get('articles', [])
             
             sentiments = []
-            for article in articles:
-                text = f"{article.get('title', '')} {article.get('description', '')}"
+            texts = [f"{article.get('title', '')} {article.get('description', '')}" for article in articles]
+            sentiment_engine.polarity_batch(texts)
+            sentiment_engine.record(query, texts)
+            for article, text in zip(articles, texts):
                 sentiment = self.analyze_text_sentiment(text)
                 
                 sentiments.append({
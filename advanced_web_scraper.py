@@ -1,12 +1,13 @@
 """🌐 Advanced Web Scraper - Deep Research Engine"""
 import requests
 from bs4 import BeautifulSoup
-import feedparser
 from textblob import TextBlob
 from datetime import datetime
 import json
 import logging
 
+from news_store import news_store
+
 logging.basicConfig(level=logging.WARNING)
 
 class AdvancedWebScraper:
@@ -28,20 +29,18 @@ class AdvancedWebScraper:
             "https://feeds.cryptonews.com/latest",
         ]
         
-        for source in sources:
-            try:
-                feed = feedparser.parse(source)
-                for entry in feed.entries[:limit]:
-                    if keyword.lower() in entry.get('title', '').lower():
-                        articles.append({
-                            'title': entry.get('title', 'N/A'),
-                            'link': entry.get('link', '#'),
-                            'published': entry.get('published', datetime.now().isoformat()),
-                            'source': source.split('/')[2],
-                            'summary': entry.get('summary', '')[:200]
-                        })
-            except Exception as e:
-                print(f"⚠️ Feed error ({source}): {str(e)[:50]}")
+        try:
+            for entry in news_store.articles(sources, keywords=[keyword], limit=limit * len(sources),
+                                             title_only=True, per_feed=limit):
+                articles.append({
+                    'title': entry['title'] or 'N/A',
+                    'link': entry['link'] or '#',
+                    'published': entry['published'] or datetime.now().isoformat(),
+                    'source': entry['source'],
+                    'summary': entry['summary'][:200]
+                })
+        except Exception as e:
+            print(f"⚠️ Feed error: {str(e)[:50]}")
         
         return articles
     
@@ -9,6 +9,8 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from order_books import order_books
+
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 
@@ -26,15 +28,14 @@ class AdvancedWhaleTracker:
     def analyze_order_book_depth(self, symbol: str) -> dict:
         """Order book derinliğinden whale aktivitesi tespit et"""
         try:
-            # BTCTurk order book
-            resp = requests.get(
-                f"https://api.btcturk.com/api/v2/orderbook?pairSymbol={symbol}USDT",
-                timeout=10
-            )
-            data = resp.json().get('data', {})
+            # BTCTurk order book - paylaşılan defterden (yoksa bir kez çekilir)
+            book = order_books.book(symbol, 'USDT', fetch=True)
+            if book is None:
+                return {"error": "order book yok", "symbol": symbol}
+            levels = book.top(50)
             
-            bids = data.get('bids', [])
-            asks = data.get('asks', [])
+            bids = levels['bids']
+            asks = levels['asks']
             
             # Büyük emirleri tespit et
             large_bids = []
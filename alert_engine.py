@@ -0,0 +1,130 @@
+"""
+🎯 ALERT ENGINE - Sıralı tetik defterleriyle fiyat alarmı değerlendirme
+Sembol başına iki sıralı defter:
++ Hedefler artan sırada: fiyat >= seviye olanlar baştan bir dilim
++ Stoplar azalan sırada: fiyat <= seviye olanlar baştan bir dilim
+Her fiyat bisect ile değerlendirilir - tek piyasa görüntüsü binlerce alarmı
+mikrosaniyeler içinde çözer, tetiklenenler toplu döner
+"""
+
+from bisect import bisect_right, insort
+from typing import Dict, Iterable, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+TARGET_HIT = "TARGET_HIT"
+STOP_LOSS = "STOP_LOSS"
+
+
+def prices_from_tickers(tickers: Iterable[Dict], quote: str = "USDT") -> Dict[str, float]:
+    """BTCTurk ticker listesi -> {sembol: son fiyat} (tek kote para birimi)"""
+    suffix = f"_{quote}"
+    prices = {}
+    for t in tickers or []:
+        pair = t.get('pairNormalized', '') if isinstance(t, dict) else ''
+        if pair.endswith(suffix):
+            try:
+                price = float(t.get('last', 0) or 0)
+            except (TypeError, ValueError):
+                continue
+            if price > 0:
+                prices[pair[:-len(suffix)]] = price
+    return prices
+
+
+class TriggerBook:
+    """
+    Tek sembolün tetik defteri
+    targets: (seviye, id) artan
+    stops: (-seviye, id) artan, yani seviyeye göre azalan
+    """
+
+    def __init__(self):
+        self.targets = []
+        self.stops = []
+
+    def add(self, alert_id, target: float, stop: float):
+        insort(self.targets, (float(target), alert_id))
+        insort(self.stops, (-float(stop), alert_id))
+
+    def discard(self, alert_id, target: float, stop: float):
+        for book, key in ((self.targets, (float(target), alert_id)), (self.stops, (-float(stop), alert_id))):
+            i = bisect_right(book, key) - 1
+            if i >= 0 and book[i] == key:
+                del book[i]
+
+    def hits(self, price: float) -> Tuple[List, List]:
+        """Fiyatın tetiklediği hedef ve stop id'leri (defterden çıkarmaz)"""
+        t = bisect_right(self.targets, (price, float('inf')))
+        s = bisect_right(self.stops, (-price, float('inf')))
+        return [i for _, i in self.targets[:t]], [i for _, i in self.stops[:s]]
+
+    def __len__(self):
+        return len(self.targets)
+
+
+class AlertEngine:
+    """Sembol -> TriggerBook; alarmların tetik seviyeleri burada indekslenir"""
+
+    def __init__(self):
+        self.books = {}
+        self.levels = {}    # id -> (sembol, hedef, stop)
+
+    def add(self, alert: Dict):
+        alert_id = alert['id']
+        if alert_id in self.levels:
+            self.remove(alert_id)
+        symbol = alert['symbol'].upper()
+        target, stop = float(alert['target_price']), float(alert['stop_loss'])
+        self.books.setdefault(symbol, TriggerBook()).add(alert_id, target, stop)
+        self.levels[alert_id] = (symbol, target, stop)
+
+    def remove(self, alert_id):
+        entry = self.levels.pop(alert_id, None)
+        if not entry:
+            return
+        symbol, target, stop = entry
+        book = self.books.get(symbol)
+        if book:
+            book.discard(alert_id, target, stop)
+            if not len(book):
+                del self.books[symbol]
+
+    def rebuild(self, alerts: Iterable[Dict]):
+        self.books = {}
+        self.levels = {}
+        for alert in alerts:
+            try:
+                self.add(alert)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Geçersiz alarm atlandı: {alert.get('id')} ({e})")
+
+    def symbols(self) -> List[str]:
+        return list(self.books)
+
+    def evaluate(self, prices: Dict[str, float]) -> List[Tuple]:
+        """
+        Fiyat görüntüsünü tüm defterlere uygula
+        Dönen: [(alarm_id, TARGET_HIT|STOP_LOSS, fiyat)], tetiklenenler defterden çıkar
+        Hem hedef hem stop tetiklenirse hedef önceliklidir (eski check_alerts sırası)
+        """
+        triggered = []
+        for symbol in list(self.books):
+            price = prices.get(symbol, 0)
+            if not price or price <= 0:
+                continue
+            target_ids, stop_ids = self.books[symbol].hits(price)
+            seen = set()
+            for alert_id in target_ids:
+                triggered.append((alert_id, TARGET_HIT, price))
+                seen.add(alert_id)
+            for alert_id in stop_ids:
+                if alert_id not in seen:
+                    triggered.append((alert_id, STOP_LOSS, price))
+        for alert_id, _, _ in triggered:
+            self.remove(alert_id)
+        return triggered
+
+    def __len__(self):
+        return len(self.levels)
@@ -17,6 +17,8 @@ import logging
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from telegram_outbox import telegram_outbox
+
 logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
@@ -402,18 +404,7 @@ class AutoChartAnalyzer:
         """Telegram'a mesaj gönder"""
         if not BOT_TOKEN or not CHAT_ID:
             return False
-        try:
-            url = f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage'
-            resp = requests.post(url, json={
-                'chat_id': CHAT_ID,
-                'text': message,
-                'parse_mode': 'HTML',
-                'disable_web_page_preview': True
-            }, timeout=15)
-            return resp.status_code == 200
-        except Exception as e:
-            logger.error(f"Telegram error: {e}")
-            return False
+        return telegram_outbox.send(message, CHAT_ID, disable_preview=True, token=BOT_TOKEN)
 
 
 auto_chart_analyzer = AutoChartAnalyzer()
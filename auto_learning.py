@@ -1,60 +1,52 @@
-"""Auto Learning - Geçmiş verilerden öğren, performansı iyileştir"""
-from trade_history import TradeHistory
-import pickle
-import os
+"""Auto Learning - Geçmiş verilerden öğren, performansı iyileştir
+
+Kazanma oranları her kapanan işlemde online_learner'da artımlı güncellenir
+(TradeHistory); model tüm geçmiş taranmadan bu özetlerden kurulur.
+"""
+from datetime import datetime
+
+from online_learner import online_learner
+
+MIN_TRADES = 5  # Sembol önerisi için gereken en az işlem
+
 
 class AutoLearner:
-    MODEL_FILE = "trading_model.pkl"
-    
     @staticmethod
     def learn_from_history():
-        """Geçmiş trade'lerden öğren"""
+        """Üssel ağırlıklı işlem istatistiklerinden model kur"""
         try:
-            # Win rate'i analiz et
-            win_rate = TradeHistory.get_win_rate()
-            
+            overall = online_learner.stat('trades').get('win', {})
+
             # En iyi işlem gören symbolü bul
-            symbols = ["BTC", "XRPTRY", "AAPL", "MSFT", "GOOGL", "ETH"]
             best_symbol = None
             best_win_rate = 0
-            
-            for sym in symbols:
-                rate = TradeHistory.get_win_rate(sym)
-                if rate > best_win_rate:
-                    best_win_rate = rate
-                    best_symbol = sym
-            
-            # Model yarat
-            model = {
-                'global_win_rate': win_rate,
+            for key in list(online_learner.stats):
+                if not key.startswith('trade:'):
+                    continue
+                win = online_learner.stat(key).get('win', {})
+                if win.get('count', 0) >= MIN_TRADES and win['mean'] * 100 > best_win_rate:
+                    best_win_rate = win['mean'] * 100
+                    best_symbol = key[len('trade:'):]
+
+            return {
+                'global_win_rate': round(overall.get('mean', 0) * 100, 1),
                 'best_symbol': best_symbol,
-                'best_win_rate': best_win_rate,
-                'learned_at': str(__import__('datetime').datetime.now())
+                'best_win_rate': round(best_win_rate, 1),
+                'trades_seen': overall.get('count', 0),
+                'learned_at': str(datetime.now())
             }
-            
-            # Model kayıt et
-            with open(AutoLearner.MODEL_FILE, 'wb') as f:
-                pickle.dump(model, f)
-            
-            return model
         except:
             return None
-    
+
     @staticmethod
     def get_model():
-        """Öğrenilen modeli yükle"""
-        try:
-            if os.path.exists(AutoLearner.MODEL_FILE):
-                with open(AutoLearner.MODEL_FILE, 'rb') as f:
-                    return pickle.load(f)
-        except:
-            pass
-        return None
-    
+        """Öğrenilen model (her çağrıda güncel özetlerden)"""
+        return AutoLearner.learn_from_history()
+
     @staticmethod
     def recommend_symbol():
         """En iyi symbolu öner"""
         model = AutoLearner.get_model()
-        if model:
-            return model.get('best_symbol', 'BTC')
+        if model and model.get('best_symbol'):
+            return model['best_symbol']
         return 'BTC'
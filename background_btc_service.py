@@ -11,6 +11,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import logging
 
+from market_overview import market_overview
+
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,18 +26,13 @@ class RealDataBTCAnalyzer:
     
     @staticmethod
     def get_btcturk_real_data():
-        """BTCTurk'den GERÇEK kripto verileri al"""
+        """BTCTurk'den GERÇEK kripto verileri al (paylaşılan piyasa özetinden)"""
         try:
-            url = "https://api.btcturk.com/api/v2/ticker"
-            resp = requests.get(url, timeout=15)
-            
-            if resp.status_code != 200:
-                logger.error(f"BTCTurk API error: {resp.status_code}")
+            tickers = market_overview.get()['tickers']
+            if not tickers:
+                logger.error("BTCTurk ticker verisi alınamadı")
                 return []
             
-            data = resp.json()
-            tickers = data.get('data', []) if isinstance(data, dict) else data
-            
             cryptos = []
             for t in tickers:
                 if isinstance(t, dict) and 'TRY' in t.get('pairNormalized', ''):
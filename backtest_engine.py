@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import numpy as np
 import logging
 
+from instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 class BacktestEngine:
@@ -61,6 +63,7 @@ class BacktestEngine:
         else:
             return "⚪ BEKLE"
     
+    @timed()
     def backtest_symbol(self, symbol, days=180):
         """Gerçek tarihsel veri ile backtest"""
         try:
@@ -0,0 +1,699 @@
+"""
+⏱️ BENCHMARK - Analiz sıcak yollarının performans ölçümü (kayıtlı veriyle, ağsız)
+Deploy öncesi performans gerilemelerini yakalamak için tekrarlanabilir ölçüm
++ requests (HTTPAdapter.send) yerel bir taklit sunucuya yönlendirilir:
+  BTCTurk ticker/klines/orderbook, CoinGecko, Fear & Greed, döviz kuru, Telegram
++ Yanıtlar benchmarks/fixtures/ altındaki kayıtlardan okunur; kaydı olmayan uç noktalar
+  sabit tohumlu sentetik piyasadan üretilir (her çalıştırmada aynı veri)
++ yfinance kuruluysa yf.download / Ticker.history aynı fikstürlerden beslenir
++ Her senaryo: ısınma + N tekrar -> p50/p99 gecikme, işlem/sn, çağrı başına HTTP isteği;
+  ayrı bir turda tracemalloc ile tepe bellek
++ benchmarks/baseline.json ile karşılaştırma - eşik aşılırsa çıkış kodu 1
++ Çalışma geçici bir dizinde yapılır - depodaki data/ ve model dosyalarına dokunulmaz
+
+Kullanım:
+    python benchmark.py                    # ölç ve baseline ile karşılaştır
+    python benchmark.py --save-baseline    # sonuçları yeni baseline olarak kaydet
+    python benchmark.py --record           # gerçek API yanıtlarını fikstür olarak kaydet
+    python benchmark.py -k indicators -n 50
+
+Not: baseline makineye özeldir - aynı makinede (veya aynı CI runner tipinde) alınmalı.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+import logging
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+SEED = 42
+USD_TRY = 34.0
+SYNTHETIC_PAIRS = 120       # Sentetik evrendeki TRY paritesi sayısı
+PUMP_COUNT = 6              # Pump taraması kriterlerini (%8+, 500K+) geçen parite sayısı
+HISTORY_BARS = 1500         # Her çözünürlükte üretilen mum sayısı
+
+DEFAULT_ITERATIONS = 5
+WARMUP = 1
+P50_TOLERANCE = 0.25        # p50 %25'ten fazla kötüleşirse gerileme
+MEMORY_TOLERANCE = 0.50     # Tepe bellek %50'den fazla artarsa gerileme
+MIN_DELTA_MS = 1.0          # Bunun altındaki farklar gürültü sayılır
+MIN_DELTA_KB = 256
+
+MAJORS = {
+    'BTC': 3400000.0, 'ETH': 120000.0, 'SOL': 6000.0, 'XRP': 20.0, 'AVAX': 1200.0,
+    'ADA': 15.0, 'DOGE': 5.0, 'LINK': 500.0, 'DOT': 250.0, 'TRX': 8.0
+}
+NOT_RECORDED = ('api.telegram.org',)
+TIME_PARAMS = ('from', 'to', 'startTime', 'endTime', 'timestamp')
+
+
+def _seed(*parts) -> int:
+    return zlib.crc32('|'.join(str(p) for p in parts).encode()) ^ SEED
+
+
+# ==================== SENTETİK PİYASA ====================
+
+class SyntheticMarket:
+    """Sabit tohumlu piyasa: ticker'lar, mumlar, defterler (aynı tohum -> aynı veri)"""
+
+    def __init__(self, pairs: int = SYNTHETIC_PAIRS):
+        self.now = int(time.time())
+        rng = np.random.default_rng(SEED)
+        self.prices = dict(MAJORS)
+        for i in range(pairs - len(MAJORS)):
+            self.prices[f"SYN{i:03d}"] = float(np.exp(rng.uniform(-3, 8)))
+        symbols = list(self.prices)
+        self.changes = {s: float(np.clip(rng.normal(0.5, 4), -20, 7.5)) for s in symbols}
+        self.volumes = {s: float(rng.lognormal(11, 1.5)) for s in symbols}
+        for s in symbols[len(MAJORS):len(MAJORS) + PUMP_COUNT]:
+            self.changes[s] = float(rng.uniform(9, 25))
+            self.volumes[s] = float(rng.uniform(6e5, 5e6))
+        self.changes['BTC'] = 1.8
+        self._bars = {}
+
+    @staticmethod
+    def split_pair(pair: str) -> Tuple[str, str]:
+        pair = pair.upper().replace('_', '').replace('-', '')
+        for quote in ('USDT', 'TRY', 'USD'):
+            if pair.endswith(quote) and len(pair) > len(quote):
+                return pair[:-len(quote)], quote
+        return pair, 'TRY'
+
+    def price(self, symbol: str, quote: str = 'TRY') -> float:
+        price = self.prices.get(symbol, self.prices['BTC'])
+        return price if quote == 'TRY' else price / USD_TRY
+
+    # ---------- mumlar ----------
+
+    @staticmethod
+    def step(resolution) -> int:
+        resolution = str(resolution).upper()
+        if resolution in ('D', '1D'):
+            return 86400
+        if resolution in ('W', '1W'):
+            return 7 * 86400
+        try:
+            return int(resolution) * 60
+        except ValueError:
+            return 86400
+
+    def bars(self, symbol: str, quote: str, step: int) -> Dict[str, np.ndarray]:
+        """HISTORY_BARS mum; son kapanış ticker fiyatına, son mum şu ana hizalı"""
+        key = (symbol, quote, step)
+        if key not in self._bars:
+            rng = np.random.default_rng(_seed(symbol, step))
+            vol = 0.03 * np.sqrt(step / 86400) if symbol != 'BTC' else 0.02 * np.sqrt(step / 86400)
+            drift = vol * (0.08 if symbol == 'BTC' else 0.0)
+            returns = rng.normal(drift, vol, HISTORY_BARS)
+            path = np.cumsum(returns)
+            close = self.price(symbol, quote) * np.exp(path - path[-1])
+            open_ = np.concatenate([[close[0]], close[:-1]])
+            wick = np.abs(rng.normal(0, vol / 2, (2, HISTORY_BARS)))
+            high = np.maximum(open_, close) * (1 + wick[0])
+            low = np.minimum(open_, close) * (1 - wick[1])
+            per_bar = self.volumes.get(symbol, 1e5) * step / 86400
+            volume = per_bar * rng.lognormal(0, 0.5, HISTORY_BARS)
+            last = self.now // step * step
+            t = last - step * np.arange(HISTORY_BARS - 1, -1, -1)
+            self._bars[key] = {'t': t, 'o': open_, 'h': high, 'l': low, 'c': close, 'v': volume}
+        return self._bars[key]
+
+    def klines(self, params: Dict) -> Dict:
+        symbol, quote = self.split_pair(params.get('symbol', 'BTCTRY'))
+        bars = self.bars(symbol, quote, self.step(params.get('resolution', 'D')))
+        start = int(float(params.get('from', 0)))
+        end = int(float(params.get('to', self.now)))
+        mask = (bars['t'] >= start) & (bars['t'] <= end)
+        body = {k: [round(float(x), 8) for x in v[mask]] for k, v in bars.items() if k != 't'}
+        body['t'] = [int(x) for x in bars['t'][mask]]
+        body['s'] = 'ok'
+        return body
+
+    def binance_klines(self, params: Dict) -> List[List]:
+        symbol, quote = self.split_pair(params.get('symbol', 'BTCUSDT'))
+        interval = params.get('interval', '1h')
+        unit = {'m': 60, 'h': 3600, 'd': 86400}.get(interval[-1], 3600)
+        bars = self.bars(symbol, quote, int(interval[:-1] or 1) * unit)
+        limit = int(params.get('limit', 100))
+        return [[int(t) * 1000, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.4f}"]
+                for t, o, h, l, c, v in zip(*(bars[k][-limit:] for k in 'tohlcv'))]
+
+    def yf_frame(self, ticker: str, start=None, end=None, period: Optional[str] = None) -> pd.DataFrame:
+        symbol, _ = self.split_pair(ticker)
+        bars = self.bars(symbol, 'USD', 86400)
+        index = pd.to_datetime(bars['t'], unit='s')
+        frame = pd.DataFrame({'Open': bars['o'], 'High': bars['h'], 'Low': bars['l'], 'Close': bars['c'],
+                              'Adj Close': bars['c'], 'Volume': bars['v']}, index=index)
+        if period:
+            match = re.match(r'(\d+)(d|mo|y)', period)
+            if match:
+                days = int(match.group(1)) * {'d': 1, 'mo': 30, 'y': 365}[match.group(2)]
+                return frame.iloc[-days:]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        if end is not None:
+            frame = frame[frame.index <= pd.Timestamp(end)]
+        return frame
+
+    # ---------- anlık veriler ----------
+
+    def tickers(self) -> List[Dict]:
+        rows = []
+        for order, (symbol, price) in enumerate(self.prices.items()):
+            for quote in (('TRY', 'USDT') if symbol in MAJORS else ('TRY',)):
+                last = self.price(symbol, quote)
+                change = self.changes[symbol]
+                opened = last / (1 + change / 100)
+                rows.append({
+                    'pair': f"{symbol}{quote}", 'pairNormalized': f"{symbol}_{quote}",
+                    'numeratorSymbol': symbol, 'denominatorSymbol': quote,
+                    'last': round(last, 8), 'open': round(opened, 8),
+                    'high': round(max(last, opened) * 1.02, 8), 'low': round(min(last, opened) * 0.98, 8),
+                    'bid': round(last * 0.999, 8), 'ask': round(last * 1.001, 8),
+                    'average': round((last + opened) / 2, 8), 'daily': round(last - opened, 8),
+                    'dailyPercent': round(change, 2), 'volume': round(self.volumes[symbol], 4),
+                    'timestamp': self.now * 1000, 'order': order
+                })
+        return rows
+
+    def orderbook(self, params: Dict) -> Dict:
+        symbol, quote = self.split_pair(params.get('pairSymbol', 'BTC_TRY'))
+        limit = int(params.get('limit', 100))
+        rng = np.random.default_rng(_seed(symbol, quote, 'book'))
+        mid = self.price(symbol, quote)
+        ticks = mid * 0.0005 * np.arange(1, limit + 1)
+        size = self.volumes.get(symbol, 1e5) / 500
+        bids = [[f"{mid - d:.8f}", f"{q:.4f}"] for d, q in zip(ticks, rng.lognormal(0, 1, limit) * size)]
+        asks = [[f"{mid + d:.8f}", f"{q:.4f}"] for d, q in zip(ticks, rng.lognormal(0, 1, limit) * size)]
+        return {'success': True, 'data': {'timestamp': self.now * 1000, 'bids': bids, 'asks': asks}}
+
+    def coingecko_markets(self, params: Dict) -> List[Dict]:
+        per_page = int(params.get('per_page', 100))
+        ranked = sorted(self.prices, key=lambda s: self.prices[s] * self.volumes[s], reverse=True)
+        return [{
+            'id': s.lower(), 'symbol': s.lower(), 'name': s, 'market_cap_rank': i + 1,
+            'current_price': self.price(s, 'USD'), 'total_volume': self.volumes[s] * self.price(s, 'USD'),
+            'market_cap': self.volumes[s] * self.price(s, 'USD') * 40,
+            'price_change_percentage_24h': self.changes[s],
+            'high_24h': self.price(s, 'USD') * 1.02, 'low_24h': self.price(s, 'USD') * 0.98
+        } for i, s in enumerate(ranked[:per_page])]
+
+    def route(self, method: str, host: str, path: str, params: Dict) -> Tuple[int, object]:
+        """(status, JSON gövde) - bilinmeyen uç noktalar 404"""
+        if host == 'api.btcturk.com':
+            if path.endswith('/ticker'):
+                return 200, {'success': True, 'data': self.tickers()}
+            if path.endswith('/orderbook'):
+                return 200, self.orderbook(params)
+        if host == 'graph-api.btcturk.com' and 'klines' in path:
+            return 200, self.klines(params)
+        if host.endswith('binance.com') and path.endswith('/klines'):
+            return 200, self.binance_klines(params)
+        if host == 'api.coingecko.com':
+            if path.endswith('/coins/markets'):
+                return 200, self.coingecko_markets(params)
+            if path.endswith('/global'):
+                return 200, {'data': {'total_market_cap': {'usd': 2.4e12}, 'total_volume': {'usd': 9e10},
+                                      'market_cap_percentage': {'btc': 54.2, 'eth': 17.1},
+                                      'market_cap_change_percentage_24h_usd': 1.3}}
+            if path.endswith('/search/trending'):
+                return 200, {'coins': [{'item': {'id': s.lower(), 'symbol': s, 'name': s, 'score': i}}
+                                       for i, s in enumerate(list(MAJORS)[:7])]}
+            if path.endswith('/simple/price'):
+                ids = params.get('ids', 'bitcoin').split(',')
+                return 200, {i: {'usd': self.price('BTC', 'USD'), 'try': self.price('BTC')} for i in ids}
+        if host == 'api.alternative.me':
+            return 200, {'data': [{'value': '58', 'value_classification': 'Greed',
+                                   'timestamp': str(self.now)}]}
+        if host == 'api.exchangerate-api.com':
+            return 200, {'base': 'USD', 'rates': {'USD': 1.0, 'TRY': USD_TRY}}
+        if host == 'api.telegram.org':
+            return 200, {'ok': True, 'result': {'message_id': 1}}
+        return 404, {}
+
+
+# ==================== TAKLİT SUNUCU ====================
+
+class FixtureTransport:
+    """
+    HTTPAdapter.send yerine geçer: önce kayıtlı fikstür, yoksa sentetik piyasa
+    record=True iken istekler gerçek ağa gider ve başarılı JSON yanıtlar kaydedilir
+    """
+
+    def __init__(self, market: SyntheticMarket, fixture_dir: str = FIXTURE_DIR, record: bool = False):
+        self.market = market
+        self.fixture_dir = fixture_dir
+        self.record = record
+        self.requests = 0
+        self.replayed = 0
+        self.synthetic = 0
+        self.recorded = 0
+        self._cache = {}
+        self._original_send = None
+        self._original_yf = {}
+
+    @staticmethod
+    def fixture_key(host: str, path: str, params: Dict) -> str:
+        stable = '&'.join(f"{k}={params[k]}" for k in sorted(params) if k not in TIME_PARAMS)
+        key = f"{host}{path}" + (f"_{stable}" if stable else '')
+        return re.sub(r'[^A-Za-z0-9_.=-]+', '_', key).strip('_')[:180]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.fixture_dir, f"{key}.json")
+
+    def load(self, key: str):
+        if key not in self._cache:
+            path = self._path(key)
+            self._cache[key] = None
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self._cache[key] = json.load(f)
+        return self._cache[key]
+
+    def save(self, key: str, body):
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with open(self._path(key), 'w') as f:
+            json.dump(body, f)
+        self._cache[key] = body
+        self.recorded += 1
+
+    def _shift_klines(self, body: Dict, params: Dict) -> Dict:
+        """Kayıtlı mumları şimdiye kaydır ve from/to aralığına kes"""
+        t = body.get('t') or []
+        if len(t) < 2:
+            return body
+        step = t[-1] - t[-2]
+        offset = (self.market.now - t[-1]) // step * step
+        start = int(float(params.get('from', 0)))
+        end = int(float(params.get('to', self.market.now)))
+        keep = [i for i, ts in enumerate(t) if start <= ts + offset <= end]
+        shifted = {k: [v[i] for i in keep] for k, v in body.items() if isinstance(v, list) and len(v) == len(t)}
+        shifted['t'] = [t[i] + offset for i in keep]
+        return {**body, **shifted}
+
+    @staticmethod
+    def _response(request, status: int, body) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = status
+        resp._content = json.dumps(body).encode()
+        resp.headers['Content-Type'] = 'application/json'
+        resp.encoding = 'utf-8'
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def send(self, adapter, request, **kwargs):
+        self.requests += 1
+        url = urlparse(request.url)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        key = self.fixture_key(url.netloc, url.path, params)
+
+        if self.record:
+            resp = self._original_send(adapter, request, **kwargs)
+            if resp.status_code == 200 and url.netloc not in NOT_RECORDED:
+                try:
+                    self.save(key, resp.json())
+                except ValueError:
+                    pass
+            return resp
+
+        body = self.load(key) if url.netloc not in NOT_RECORDED else None
+        if body is not None:
+            self.replayed += 1
+            if 'klines' in url.path and isinstance(body, dict):
+                body = self._shift_klines(body, params)
+            return self._response(request, 200, body)
+        self.synthetic += 1
+        status, body = self.market.route(request.method, url.netloc, url.path, params)
+        return self._response(request, status, body)
+
+    # ---------- yfinance ----------
+
+    def _yf_frame(self, ticker: str, start=None, end=None, period=None) -> pd.DataFrame:
+        key = self.fixture_key('yfinance', '', {'ticker': ticker})
+        path = self._path(key)
+        if os.path.exists(path):
+            self.replayed += 1
+            frame = pd.read_json(path, orient='split')
+            frame.index = frame.index + (pd.Timestamp.now().normalize() - frame.index[-1].normalize())
+            return frame
+        self.synthetic += 1
+        return self.market.yf_frame(ticker, start, end, period)
+
+    def _patch_yfinance(self):
+        try:
+            import yfinance as yf
+        except ImportError:
+            return
+        self._original_yf = {'download': yf.download, 'history': yf.Ticker.history}
+        transport = self
+
+        def download(tickers, start=None, end=None, period=None, **kwargs):
+            names = tickers.split() if isinstance(tickers, str) else list(tickers)
+            if transport.record:
+                frame = transport._original_yf['download'](tickers, start=start, end=end, period=period, **kwargs)
+                if len(names) == 1 and frame is not None and not frame.empty:
+                    os.makedirs(transport.fixture_dir, exist_ok=True)
+                    flat = frame.copy()
+                    if isinstance(flat.columns, pd.MultiIndex):
+                        flat.columns = flat.columns.get_level_values(0)
+                    flat.to_json(transport._path(transport.fixture_key('yfinance', '', {'ticker': names[0]})),
+                                 orient='split', date_format='iso')
+                    transport.recorded += 1
+                return frame
+            frames = {name: transport._yf_frame(name, start, end, period) for name in names}
+            if len(names) == 1:
+                return frames[names[0]]
+            return pd.concat(frames, axis=1)
+
+        def history(ticker_self, period='1mo', start=None, end=None, **kwargs):
+            if transport.record:
+                return transport._original_yf['history'](ticker_self, period=period, start=start, end=end, **kwargs)
+            return transport._yf_frame(ticker_self.ticker, start, end, period)
+
+        yf.download = download
+        yf.Ticker.history = history
+
+    def install(self):
+        self._original_send = HTTPAdapter.send
+        transport = self
+
+        def send(adapter, request, **kwargs):
+            return transport.send(adapter, request, **kwargs)
+
+        HTTPAdapter.send = send
+        self._patch_yfinance()
+
+    def uninstall(self):
+        if self._original_send:
+            HTTPAdapter.send = self._original_send
+        if self._original_yf:
+            import yfinance as yf
+            yf.download = self._original_yf['download']
+            yf.Ticker.history = self._original_yf['history']
+
+
+# ==================== SENARYOLAR ====================
+
+class Skip(Exception):
+    """Senaryo bu ortamda çalıştırılamıyor (eksik bağımlılık vb.)"""
+
+
+CASES = []
+
+
+def case(name: str, iterations: int = DEFAULT_ITERATIONS):
+    """Senaryo kaydı: fabrika kurulumu yapar ve ölçülecek fonksiyonu döndürür"""
+    def register(factory: Callable[[SyntheticMarket], Callable]):
+        CASES.append((name, factory, iterations))
+        return factory
+    return register
+
+
+def _closes(market: SyntheticMarket, n: int = 500) -> List[float]:
+    return [float(x) for x in market.bars('BTC', 'TRY', 86400)['c'][-n:]]
+
+
+def _indicator_case(name: str, method: str):
+    @case(f"indicators.{name}", iterations=200)
+    def factory(market):
+        from technical_indicators import TechnicalIndicators
+        prices = _closes(market)
+        fn = getattr(TechnicalIndicators, method)
+        return lambda: fn(prices)
+    return factory
+
+
+for _name, _method in [('rsi', 'calculate_rsi'), ('macd', 'calculate_macd'),
+                       ('bollinger', 'calculate_bollinger_bands'),
+                       ('moving_averages', 'calculate_moving_averages'),
+                       ('full_analysis', 'get_full_analysis')]:
+    _indicator_case(_name, _method)
+
+
+@case('mega.find_rising_coins')
+def _mega(market):
+    from mega_analyzer import mega_analyzer
+    return lambda: mega_analyzer.find_rising_coins(limit=10)
+
+
+@case('main_service.run_pump_scan')
+def _pump_scan(market):
+    import main_service
+    return main_service.run_pump_scan
+
+
+@case('scalping.scan_scalp_opportunities')
+def _scalping(market):
+    import intraday_bars as bars_module
+    from intraday_bars import intraday_bars
+    from scalping_system import scalping_system
+    bars_module.SEED_PAUSE = 0
+    intraday_bars.refresh()
+    intraday_bars.seed_pending(limit=10 ** 6)
+    return scalping_system.scan_scalp_opportunities
+
+
+@case('pro.full_pro_analysis')
+def _pro(market):
+    from pro_analysis import ProAnalysis
+    pro = ProAnalysis()
+    return lambda: pro.full_pro_analysis('BTC')
+
+
+def _render_chart(market: SyntheticMarket, path: str, candles: int = 90):
+    """Beyaz zeminli, yeşil/kırmızı mumlu sentetik grafik ekran görüntüsü"""
+    from PIL import Image, ImageDraw
+    width, height, pad = 1280, 720, 40
+    bars = market.bars('BTC', 'USD', 86400)
+    o, h, l, c = (bars[k][-candles:] for k in 'ohlc')
+    top, bottom = float(h.max()), float(l.min())
+
+    def y(value):
+        return pad + (top - value) / (top - bottom) * (height - 2 * pad)
+
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for gy in range(pad, height - pad, 80):
+        draw.line([(pad, gy), (width - pad, gy)], fill=(230, 230, 230))
+    slot = (width - 2 * pad) / candles
+    for i in range(candles):
+        x = pad + i * slot + slot / 2
+        color = (38, 166, 154) if c[i] >= o[i] else (239, 83, 80)
+        draw.line([(x, y(h[i])), (x, y(l[i]))], fill=color, width=1)
+        body_top, body_bottom = sorted((y(o[i]), y(c[i])))
+        draw.rectangle([x - slot * 0.35, body_top, x + slot * 0.35, max(body_bottom, body_top + 1)], fill=color)
+    image.save(path)
+
+
+@case('chart.analyze_chart')
+def _chart(market):
+    from chart_analyzer import ChartAnalyzer
+    path = os.path.join(os.getcwd(), 'benchmark_chart.png')
+    _render_chart(market, path)
+    analyzer = ChartAnalyzer()
+    return lambda: analyzer.analyze_chart(path)
+
+
+@case('backtest.backtest_symbol')
+def _backtest(market):
+    from backtest_engine import BacktestEngine
+    engine = BacktestEngine()
+    return lambda: engine.backtest_symbol('BTC-USD', days=180)
+
+
+# ==================== ÖLÇÜM ====================
+
+def measure(fn: Callable, iterations: int, transport: FixtureTransport, warmup: int = WARMUP) -> Dict:
+    for _ in range(warmup):
+        fn()
+
+    before = transport.requests
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    requests_per_op = (transport.requests - before) / iterations
+
+    # Tepe bellek ayrı turda - tracemalloc zamanlamayı bozmasın
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = np.array(timings)
+    return {
+        'iterations': iterations,
+        'p50_ms': round(float(np.percentile(timings, 50)), 3),
+        'p99_ms': round(float(np.percentile(timings, 99)), 3),
+        'mean_ms': round(float(timings.mean()), 3),
+        'ops_per_sec': round(1000 / float(timings.mean()), 2) if timings.mean() > 0 else None,
+        'peak_kb': round(peak / 1024, 1),
+        'requests_per_op': round(requests_per_op, 2)
+    }
+
+
+def run_cases(transport: FixtureTransport, pattern: Optional[str] = None,
+              iterations: Optional[int] = None) -> Dict[str, Dict]:
+    results = {}
+    for name, factory, default_iterations in CASES:
+        if pattern and not re.search(pattern, name):
+            continue
+        try:
+            fn = factory(transport.market)
+        except (ImportError, Skip) as e:
+            results[name] = {'skipped': str(e)}
+            continue
+        except Exception as e:
+            results[name] = {'error': f"kurulum: {e}"}
+            continue
+        try:
+            results[name] = measure(fn, iterations or default_iterations, transport)
+        except Exception as e:
+            results[name] = {'error': str(e)}
+        logger.info(f"⏱️ {name}: {results[name]}")
+    return results
+
+
+# ==================== BASELINE ====================
+
+def environment() -> Dict:
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict], transport: FixtureTransport, path: str = BASELINE_FILE):
+    measured = {name: r for name, r in results.items() if 'p50_ms' in r}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'created': datetime.now().isoformat(), 'environment': environment(),
+                   'fixtures': {'replayed': transport.replayed, 'synthetic': transport.synthetic},
+                   'results': measured}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict) -> Dict[str, Dict]:
+    """Senaryo -> {'p50_change', 'memory_change', 'regressions': [...]}"""
+    reference = baseline.get('results', {})
+    report = {}
+    for name, current in results.items():
+        base = reference.get(name)
+        if 'p50_ms' not in current or not base:
+            continue
+        entry = {'regressions': []}
+        if base['p50_ms'] > 0:
+            entry['p50_change'] = current['p50_ms'] / base['p50_ms'] - 1
+            if (entry['p50_change'] > P50_TOLERANCE
+                    and current['p50_ms'] - base['p50_ms'] > MIN_DELTA_MS):
+                entry['regressions'].append('p50')
+        if base.get('peak_kb'):
+            entry['memory_change'] = current['peak_kb'] / base['peak_kb'] - 1
+            if (entry['memory_change'] > MEMORY_TOLERANCE
+                    and current['peak_kb'] - base['peak_kb'] > MIN_DELTA_KB):
+                entry['regressions'].append('memory')
+        report[name] = entry
+    return report
+
+
+# ==================== RAPOR ====================
+
+def print_report(results: Dict[str, Dict], comparison: Dict[str, Dict], transport: FixtureTransport):
+    print(f"\n{'senaryo':<36}{'n':>5}{'p50 ms':>11}{'p99 ms':>11}{'işlem/sn':>11}"
+          f"{'tepe KB':>11}{'istek':>7}  baseline")
+    print('-' * 110)
+    for name, r in results.items():
+        if 'p50_ms' not in r:
+            status = f"ATLANDI: {r['skipped']}" if 'skipped' in r else f"HATA: {r.get('error')}"
+            print(f"{name:<36}  {status}")
+            continue
+        versus = 'yeni'
+        if name in comparison:
+            c = comparison[name]
+            versus = f"p50 {c.get('p50_change', 0):+.0%} / bellek {c.get('memory_change', 0):+.0%}"
+            if c['regressions']:
+                versus += f"  ⚠️ GERİLEME ({', '.join(c['regressions'])})"
+        print(f"{name:<36}{r['iterations']:>5}{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}"
+              f"{r['ops_per_sec'] or 0:>11.1f}{r['peak_kb']:>11.0f}{r['requests_per_op']:>7.1f}  {versus}")
+    print(f"\nHTTP: {transport.requests} istek ({transport.replayed} kayıttan, "
+          f"{transport.synthetic} sentetik, {transport.recorded} kaydedildi)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Analiz sıcak yolları için performans ölçümü')
+    parser.add_argument('-k', dest='pattern', help='Sadece adı bu regex ile eşleşen senaryolar')
+    parser.add_argument('-n', dest='iterations', type=int, help='Tekrar sayısı (varsayılan senaryoya göre)')
+    parser.add_argument('--record', action='store_true', help='Gerçek API yanıtlarını fikstür olarak kaydet')
+    parser.add_argument('--save-baseline', action='store_true', help='Sonuçları baseline olarak kaydet')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline dosyası')
+    parser.add_argument('--json', dest='json_path', help='Sonuçları bu dosyaya da yaz')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    baseline_path = os.path.abspath(args.baseline)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    transport = FixtureTransport(SyntheticMarket(), record=args.record)
+
+    # Modüller data/ altına yazar - ölçüm geçici dizinde, kaynaklar sys.path'ten
+    workdir = tempfile.mkdtemp(prefix='benchmark-')
+    cwd = os.getcwd()
+    sys.path.insert(0, ROOT)
+    transport.install()
+    try:
+        os.chdir(workdir)
+        results = run_cases(transport, args.pattern, args.iterations)
+    finally:
+        os.chdir(cwd)
+        transport.uninstall()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    comparison = compare(results, load_baseline(baseline_path))
+    print_report(results, comparison, transport)
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump({'environment': environment(), 'results': results, 'comparison': comparison}, f, indent=2)
+    if args.save_baseline:
+        save_baseline(results, transport, baseline_path)
+        print(f"💾 Baseline kaydedildi: {baseline_path}")
+        return 0
+    return 1 if any(c['regressions'] for c in comparison.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
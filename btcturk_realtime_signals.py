@@ -5,6 +5,8 @@ import time
 from datetime import datetime
 import numpy as np
 
+from intraday_bars import intraday_bars, INTERVALS
+
 class BTCTurkRealTimeSignals:
     def __init__(self):
         self.api_url = "https://api.btcturk.com/api/v2"
@@ -31,19 +33,12 @@ class BTCTurkRealTimeSignals:
             print(f"Error getting ticker for {pair_symbol}: {e}")
         return None
     
-    def get_ohlc_data(self, pair_symbol, timeframe="4s"):
-        """OHLC verilerini al (4s, 1m, 5m, 15m, 1h)"""
-        try:
-            # BTCTurk OHLC endpoint
-            resp = requests.get(
-                f"{self.api_url}/ohlc?pairSymbol={pair_symbol}&timeframe={timeframe}",
-                timeout=5
-            )
-            if resp.status_code == 200:
-                return resp.json()
-        except:
-            pass
-        return None
+    def get_ohlc_data(self, pair_symbol, timeframe="1m"):
+        """OHLC verilerini al (1m, 5m, 1h) - paylaşılan gün içi mum önbelleğinden"""
+        if timeframe not in INTERVALS:
+            return None
+        bars = intraday_bars.get(pair_symbol.replace('_', '')[:-3], timeframe)
+        return bars if bars['close'] else None
     
     def calculate_rsi(self, prices, period=14):
         """RSI hesapla - ÇOK ÖNEMLİ!"""
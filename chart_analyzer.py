@@ -16,10 +16,27 @@ from PIL import Image
 import os
 from pathlib import Path
 import logging
-from typing import Dict, List, Tuple, Optional
+import queue
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional, Callable
+
+from instrumentation import instrumentation, timed
 
 logger = logging.getLogger(__name__)
 
+MAX_IMAGE_SIDE = 1600      # Daha büyük yüklemeler bu boyuta küçültülür
+CHART_WORKERS = 2          # Grafik analizi süreç sayısı
+
+GREEN_LOWER = np.array([35, 50, 50])
+GREEN_UPPER = np.array([85, 255, 255])
+RED1_LOWER = np.array([0, 50, 50])
+RED1_UPPER = np.array([10, 255, 255])
+RED2_LOWER = np.array([170, 50, 50])
+RED2_UPPER = np.array([180, 255, 255])
+
 
 class CandlePattern:
     """Mum formasyonları veritabanı"""
@@ -99,6 +116,66 @@ class ChartFormation:
     }
 
 
+class ChartFrame:
+    """
+    Tek seferlik çözümlenmiş grafik durumu
+    HSV, gri ton, renk maskeleri ve kenar haritası bir kez hesaplanır,
+    tüm dedektörler aynı durumu (ve bölge kesitlerini) paylaşır
+    """
+    
+    def __init__(self, image, max_side: int = MAX_IMAGE_SIDE):
+        height, width = image.shape[:2]
+        if max(height, width) > max_side:
+            scale = max_side / max(height, width)
+            image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        self.gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        self.green_mask = cv2.inRange(self.hsv, GREEN_LOWER, GREEN_UPPER)
+        self.red_low_mask = cv2.inRange(self.hsv, RED1_LOWER, RED1_UPPER)
+        self.red_mask = self.red_low_mask | cv2.inRange(self.hsv, RED2_LOWER, RED2_UPPER)
+        
+        self._edges = None
+        self._lines_p = {}
+        self._lines = {}
+    
+    @classmethod
+    def from_path(cls, image_path: str, max_side: int = MAX_IMAGE_SIDE) -> Optional['ChartFrame']:
+        """Dosyadan tek seferde çöz"""
+        image = cv2.imread(image_path)
+        if image is None:
+            return None
+        return cls(image, max_side)
+    
+    @property
+    def edges(self):
+        if self._edges is None:
+            self._edges = cv2.Canny(self.gray, 50, 150)
+        return self._edges
+    
+    def hough_lines_p(self, threshold: int, min_line_length: int, max_line_gap: int):
+        key = (threshold, min_line_length, max_line_gap)
+        if key not in self._lines_p:
+            lines = cv2.HoughLinesP(self.edges, 1, np.pi/180, threshold,
+                                    minLineLength=min_line_length, maxLineGap=max_line_gap)
+            # OpenCV sürümüne göre (N,1,4) veya (N,4) döner; (N,1,4)'e sabitle
+            self._lines_p[key] = lines.reshape(-1, 1, 4) if lines is not None else None
+        return self._lines_p[key]
+    
+    def hough_lines(self, threshold: int):
+        if threshold not in self._lines:
+            lines = cv2.HoughLines(self.edges, 1, np.pi/180, threshold)
+            self._lines[threshold] = lines.reshape(-1, 1, 2) if lines is not None else None
+        return self._lines[threshold]
+    
+    def rows(self, start: float, end: Optional[float] = None) -> slice:
+        """Yükseklik oranından satır kesiti"""
+        return slice(int(self.height * start), int(self.height * end) if end is not None else None)
+
+
 class ChartAnalyzer:
     """Ultra Gelişmiş Grafik Analiz Motoru"""
     
@@ -107,10 +184,15 @@ class ChartAnalyzer:
         self.candle_patterns = CandlePattern()
         self.chart_formations = ChartFormation()
     
+    @staticmethod
+    def _frame(image) -> ChartFrame:
+        return image if isinstance(image, ChartFrame) else ChartFrame(image)
+    
+    @timed()
     def analyze_chart(self, image_path: str) -> dict:
-        """Grafik resmini kapsamlı analiz et"""
+        """Grafik resmini kapsamlı analiz et (tek çözümleme, paylaşılan maskeler)"""
         try:
-            image = cv2.imread(image_path)
+            image = ChartFrame.from_path(image_path)
             if image is None:
                 return {'error': 'Resim okunamadı'}
             
@@ -144,21 +226,13 @@ class ChartAnalyzer:
         detected = []
         
         try:
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            
-            lower_green = np.array([35, 50, 50])
-            upper_green = np.array([85, 255, 255])
-            green_mask = cv2.inRange(hsv, lower_green, upper_green)
-            
-            lower_red1 = np.array([0, 50, 50])
-            upper_red1 = np.array([10, 255, 255])
-            lower_red2 = np.array([170, 50, 50])
-            upper_red2 = np.array([180, 255, 255])
-            red_mask = cv2.inRange(hsv, lower_red1, upper_red1) | cv2.inRange(hsv, lower_red2, upper_red2)
+            frame = self._frame(image)
+            green_mask = frame.green_mask
+            red_mask = frame.red_mask
             
             green_pixels = cv2.countNonZero(green_mask)
             red_pixels = cv2.countNonZero(red_mask)
-            total_pixels = image.shape[0] * image.shape[1]
+            total_pixels = frame.height * frame.width
             
             green_ratio = green_pixels / total_pixels
             red_ratio = red_pixels / total_pixels
@@ -241,10 +315,10 @@ class ChartAnalyzer:
         formations = []
         
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
+            frame = self._frame(image)
+            gray = frame.gray
             
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, 50, minLineLength=50, maxLineGap=10)
+            lines = frame.hough_lines_p(50, 50, 10)
             
             if lines is not None:
                 ascending_lines = 0
@@ -289,8 +363,7 @@ class ChartAnalyzer:
                             'target': 'Kırılım yönüne göre işlem'
                         })
                 
-                height = image.shape[0]
-                width = image.shape[1]
+                height = frame.height
                 
                 top_region = gray[:height//3, :]
                 bottom_region = gray[2*height//3:, :]
@@ -316,11 +389,6 @@ class ChartAnalyzer:
                         'target': 'Boyun çizgisi kadar yukarı'
                     })
                 
-                hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-                lower_green = np.array([35, 50, 50])
-                upper_green = np.array([85, 255, 255])
-                green_mask = cv2.inRange(hsv, lower_green, upper_green)
-                
                 if self._detect_cup_shape(gray):
                     formations.append({
                         'formation': 'cup_handle',
@@ -372,37 +440,30 @@ class ChartAnalyzer:
         """Bölgede tepe noktalarını bul"""
         try:
             col_means = np.mean(region, axis=0)
-            peaks = []
+            if len(col_means) < 3:
+                return []
             
-            for i in range(1, len(col_means) - 1):
-                if col_means[i] > col_means[i-1] and col_means[i] > col_means[i+1]:
-                    if col_means[i] > np.mean(col_means) + np.std(col_means):
-                        peaks.append(i)
+            mid = col_means[1:-1]
+            is_peak = (mid > col_means[:-2]) & (mid > col_means[2:]) & \
+                      (mid > np.mean(col_means) + np.std(col_means))
             
-            return peaks
+            return (np.flatnonzero(is_peak) + 1).tolist()
         except:
             return []
     
     def _detect_macd_signals(self, image) -> Dict:
         """MACD sinyallerini tespit et"""
         try:
-            height = image.shape[0]
-            macd_region = image[int(height * 0.6):int(height * 0.85), :]
-            
-            hsv = cv2.cvtColor(macd_region, cv2.COLOR_BGR2HSV)
+            frame = self._frame(image)
+            macd_rows = frame.rows(0.6, 0.85)
             
-            lower_green = np.array([35, 50, 50])
-            upper_green = np.array([85, 255, 255])
-            green_mask = cv2.inRange(hsv, lower_green, upper_green)
-            
-            lower_red = np.array([0, 50, 50])
-            upper_red = np.array([10, 255, 255])
-            red_mask = cv2.inRange(hsv, lower_red, upper_red)
+            green_mask = frame.green_mask[macd_rows, :]
+            red_mask = frame.red_low_mask[macd_rows, :]
             
             green_pixels = cv2.countNonZero(green_mask)
             red_pixels = cv2.countNonZero(red_mask)
             
-            width = macd_region.shape[1]
+            width = frame.width
             left_green = cv2.countNonZero(green_mask[:, :width//2])
             right_green = cv2.countNonZero(green_mask[:, width//2:])
             left_red = cv2.countNonZero(red_mask[:, :width//2])
@@ -451,13 +512,10 @@ class ChartAnalyzer:
     def _detect_divergence(self, image) -> Dict:
         """Uyuşmazlık (Divergence) tespiti"""
         try:
-            height = image.shape[0]
-            
-            price_region = image[:int(height * 0.5), :]
-            indicator_region = image[int(height * 0.7):, :]
+            frame = self._frame(image)
             
-            price_gray = cv2.cvtColor(price_region, cv2.COLOR_BGR2GRAY)
-            indicator_gray = cv2.cvtColor(indicator_region, cv2.COLOR_BGR2GRAY)
+            price_gray = frame.gray[frame.rows(0, 0.5), :]
+            indicator_gray = frame.gray[frame.rows(0.7), :]
             
             price_trend = self._calculate_trend(price_gray)
             indicator_trend = self._calculate_trend(indicator_gray)
@@ -509,7 +567,7 @@ class ChartAnalyzer:
     def _detect_supply_demand(self, image) -> Dict:
         """Arz ve Talep bölgelerini tespit et"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._frame(image).gray
             height = gray.shape[0]
             
             top_region = gray[:height//4, :]
@@ -549,10 +607,7 @@ class ChartAnalyzer:
     def _detect_trend_channels(self, image) -> Dict:
         """Trend kanallarını tespit et"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
-            
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, 80, minLineLength=100, maxLineGap=20)
+            lines = self._frame(image).hough_lines_p(80, 100, 20)
             
             if lines is None:
                 return {'channel': 'Yok', 'signal': 'TUT'}
@@ -598,7 +653,7 @@ class ChartAnalyzer:
     def _detect_trend(self, image) -> Dict:
         """Trend yönünü tespit et"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._frame(image).gray
             height, width = gray.shape
             
             left_third = gray[:, :width//3]
@@ -635,20 +690,10 @@ class ChartAnalyzer:
     def _analyze_colors(self, image) -> Dict:
         """Renk analizi"""
         try:
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            
-            lower_green = np.array([35, 50, 50])
-            upper_green = np.array([85, 255, 255])
-            green_mask = cv2.inRange(hsv, lower_green, upper_green)
-            
-            lower_red1 = np.array([0, 50, 50])
-            upper_red1 = np.array([10, 255, 255])
-            lower_red2 = np.array([170, 50, 50])
-            upper_red2 = np.array([180, 255, 255])
-            red_mask = cv2.inRange(hsv, lower_red1, upper_red1) | cv2.inRange(hsv, lower_red2, upper_red2)
+            frame = self._frame(image)
             
-            green_pixels = cv2.countNonZero(green_mask)
-            red_pixels = cv2.countNonZero(red_mask)
+            green_pixels = cv2.countNonZero(frame.green_mask)
+            red_pixels = cv2.countNonZero(frame.red_mask)
             total = green_pixels + red_pixels + 1
             
             green_percent = green_pixels / total * 100
@@ -677,7 +722,7 @@ class ChartAnalyzer:
     def _detect_price_levels(self, image) -> Dict:
         """Fiyat seviyelerini tespit et"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._frame(image).gray
             height = gray.shape[0]
             
             top_region = np.mean(gray[:height//4, :])
@@ -698,10 +743,8 @@ class ChartAnalyzer:
     def _find_support_resistance(self, image) -> Dict:
         """Destek ve direnç seviyelerini bul"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
-            
-            lines = cv2.HoughLines(edges, 1, np.pi/180, 100)
+            frame = self._frame(image)
+            lines = frame.hough_lines(100)
             
             horizontal_levels = []
             if lines is not None:
@@ -709,7 +752,7 @@ class ChartAnalyzer:
                     if abs(theta - np.pi/2) < 0.1:
                         horizontal_levels.append(int(rho))
             
-            height = image.shape[0]
+            height = frame.height
             support_levels = [l for l in horizontal_levels if l > height * 0.5]
             resistance_levels = [l for l in horizontal_levels if l < height * 0.5]
             
@@ -726,7 +769,7 @@ class ChartAnalyzer:
     def _analyze_volume(self, image) -> Dict:
         """Hacim analizi"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._frame(image).gray
             height = gray.shape[0]
             
             volume_region = gray[-height//5:, :]
@@ -755,7 +798,7 @@ class ChartAnalyzer:
     def _detect_momentum(self, image) -> Dict:
         """Momentum tespiti"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._frame(image).gray
             
             sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
             sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
@@ -787,10 +830,8 @@ class ChartAnalyzer:
     def _detect_rsi_zone(self, image) -> Dict:
         """RSI bölgesini tespit et"""
         try:
-            height = image.shape[0]
-            bottom_region = image[int(height * 0.75):, :]
-            
-            hsv = cv2.cvtColor(bottom_region, cv2.COLOR_BGR2HSV)
+            frame = self._frame(image)
+            hsv = frame.hsv[frame.rows(0.75), :]
             
             lower_red = np.array([0, 100, 100])
             upper_red = np.array([10, 255, 255])
@@ -1212,3 +1253,91 @@ class ChartAnalyzer:
         except Exception as e:
             logger.error(f"Özet oluşturma hatası: {e}")
             return "❌ Analiz oluşturulamadı"
+
+
+# ===================== SÜREÇ HAVUZU =====================
+_worker_analyzer = None
+
+
+def _summary_in_worker(image_path: str, symbol: Optional[str], current_price: Optional[float]) -> str:
+    """Alt süreçte çalışır; her süreç kendi ChartAnalyzer'ını bir kez kurar"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = ChartAnalyzer()
+    return _worker_analyzer.get_summary(image_path, symbol=symbol, current_price=current_price)
+
+
+class ChartAnalysisQueue:
+    """
+    Grafik yükleme kuyruğu
+    Bot thread'i sadece kuyruğa ekler; dağıtıcı thread işleri süreç
+    havuzuna verir, sonuç hazır olunca callback çağrılır
+    """
+    
+    def __init__(self, max_workers: int = CHART_WORKERS, max_pending: int = 50):
+        self.max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        self.uploads = queue.Queue(maxsize=max_pending)
+        self.slots = threading.Semaphore(self.max_workers)
+        self._pool = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: bot/scheduler thread'leri olan süreci fork'lamamak için
+                # İşçiler ana betiği yeniden çalıştırır - servis run_service.py'den başlatılır
+                ctx = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher.start()
+    
+    def submit(self, image_path: str, callback: Callable[[str], None],
+               symbol: Optional[str] = None, current_price: Optional[float] = None) -> bool:
+        """Analiz isteğini kuyruğa ekle; kuyruk doluysa False"""
+        self._ensure_started()
+        try:
+            self.uploads.put_nowait((image_path, symbol, current_price, callback))
+            return True
+        except queue.Full:
+            return False
+    
+    def pending(self) -> int:
+        return self.uploads.qsize()
+    
+    def _dispatch_loop(self):
+        while True:
+            image_path, symbol, current_price, callback = self.uploads.get()
+            self.slots.acquire()
+            started = time.perf_counter()
+            try:
+                future = self._pool.submit(_summary_in_worker, image_path, symbol, current_price)
+            except Exception as e:
+                logger.error(f"Grafik havuzu hatası: {e}")
+                self.slots.release()
+                self._safe_callback(callback, f"❌ Grafik analiz hatası: {str(e)[:100]}")
+                continue
+            future.add_done_callback(lambda f, cb=callback, t=started: self._on_done(f, cb, t))
+    
+    def _on_done(self, future, callback, started: float):
+        self.slots.release()
+        # Süreç havuzundaki analiz (ana süreçten ölçülür - işçinin histogramı buraya ulaşmaz)
+        instrumentation.observe('function', 'chart_queue.worker', time.perf_counter() - started,
+                                future.cancelled() or future.exception() is not None)
+        try:
+            summary = future.result()
+        except Exception as e:
+            logger.error(f"Chart analiz hatası: {e}")
+            summary = f"❌ Grafik analiz hatası: {str(e)[:100]}"
+        self._safe_callback(callback, summary)
+    
+    @staticmethod
+    def _safe_callback(callback, summary):
+        try:
+            callback(summary)
+        except Exception as e:
+            logger.error(f"Grafik sonuç callback hatası: {e}")
+
+
+chart_queue = ChartAnalysisQueue()
@@ -0,0 +1,372 @@
+"""
+🪙 COIN MARKETS - Toplu CoinGecko piyasa verisi tablosu
+Piyasa değeri, hacim, ATH uzaklığı, arz bilgileri - yüzlerce coin birkaç istekte
++ /coins/markets?ids=... (sayfa başına 250 coin) ile toplu çekim
++ SQLite'ta paylaşılan tablo + bellek aynası, periyodik arka plan yenilemesi
++ Sosyal/topluluk verisi (Twitter, Reddit, oylar) ayrı tabloda, yalnızca arka planda
+  coin başına seyrek yenilenir - istek yolunda tekil /coins/{id} çağrısı yapılmaz
+Tüm analizörler coin temellerini bu tablodan okur
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+import logging
+
+import requests
+
+from symbol_universe import symbol_universe
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "coin_markets.db"
+
+COINGECKO_MARKETS = "https://api.coingecko.com/api/v3/coins/markets"
+COINGECKO_COIN = "https://api.coingecko.com/api/v3/coins/{coin_id}"
+
+PAGE_SIZE = 250
+REFRESH_SECONDS = 600           # Piyasa tablosu 10 dakikada bir
+STALE_SECONDS = 1800            # Bundan eski satır hatalı sayılıp tekil yenilenir
+COMMUNITY_TTL = 12 * 3600       # Sosyal veriler yavaş değişir
+REQUEST_GAP = 1.5               # Ücretsiz katman için istekler arası bekleme
+COMMUNITY_BATCH = 20            # Arka plan turu başına yenilenen topluluk kaydı
+MISSING_SECONDS = 1800          # CoinGecko'da bulunamayan ID tekrar denenmeden önce
+
+MARKET_COLUMNS = [
+    'coin_id', 'symbol', 'name', 'market_cap_rank', 'price_usd', 'market_cap', 'volume_24h',
+    'high_24h', 'low_24h', 'change_24h', 'change_7d', 'change_30d', 'ath', 'ath_change_pct',
+    'atl', 'circulating_supply', 'total_supply', 'max_supply', 'updated_ts'
+]
+
+
+def _row_from_market(coin: Dict, now: int) -> Dict:
+    return {
+        'coin_id': coin.get('id'),
+        'symbol': (coin.get('symbol') or '').upper(),
+        'name': coin.get('name') or '',
+        'market_cap_rank': coin.get('market_cap_rank'),
+        'price_usd': coin.get('current_price') or 0,
+        'market_cap': coin.get('market_cap') or 0,
+        'volume_24h': coin.get('total_volume') or 0,
+        'high_24h': coin.get('high_24h') or 0,
+        'low_24h': coin.get('low_24h') or 0,
+        'change_24h': coin.get('price_change_percentage_24h_in_currency', coin.get('price_change_percentage_24h')) or 0,
+        'change_7d': coin.get('price_change_percentage_7d_in_currency') or 0,
+        'change_30d': coin.get('price_change_percentage_30d_in_currency') or 0,
+        'ath': coin.get('ath') or 0,
+        'ath_change_pct': coin.get('ath_change_percentage') or 0,
+        'atl': coin.get('atl') or 0,
+        'circulating_supply': coin.get('circulating_supply') or 0,
+        'total_supply': coin.get('total_supply') or 0,
+        'max_supply': coin.get('max_supply') or 0,
+        'updated_ts': now
+    }
+
+
+class CoinMarketsTable:
+    """
+    Paylaşılan coin piyasa tablosu
+    markets tablosu: coin_id başına son piyasa görüntüsü
+    community tablosu: coin_id başına sosyal metrikler
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.rows = {}
+        self.community = {}
+        self.updated = 0
+        self.missing = {}
+        self.community_queue = []
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._thread = None
+        self._init_db()
+        self._load()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """Tabloları ve indeksleri oluştur"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS markets (
+                coin_id TEXT PRIMARY KEY,
+                symbol TEXT,
+                name TEXT,
+                market_cap_rank INTEGER,
+                price_usd REAL,
+                market_cap REAL,
+                volume_24h REAL,
+                high_24h REAL,
+                low_24h REAL,
+                change_24h REAL,
+                change_7d REAL,
+                change_30d REAL,
+                ath REAL,
+                ath_change_pct REAL,
+                atl REAL,
+                circulating_supply REAL,
+                total_supply REAL,
+                max_supply REAL,
+                updated_ts INTEGER
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_markets_symbol ON markets (symbol)')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS community (
+                coin_id TEXT PRIMARY KEY,
+                twitter_followers INTEGER,
+                reddit_subscribers INTEGER,
+                sentiment_up REAL,
+                sentiment_down REAL,
+                updated_ts INTEGER
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Başlangıçta tabloyu belleğe al"""
+        try:
+            conn = self._connect()
+            rows = conn.execute(f"SELECT {', '.join(MARKET_COLUMNS)} FROM markets").fetchall()
+            community = conn.execute(
+                'SELECT coin_id, twitter_followers, reddit_subscribers, sentiment_up, sentiment_down, updated_ts FROM community'
+            ).fetchall()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Coin piyasa tablosu yükleme hatası: {e}")
+            return
+
+        self.rows = {r[0]: dict(zip(MARKET_COLUMNS, r)) for r in rows}
+        self.community = {r[0]: {
+            'twitter_followers': r[1] or 0,
+            'reddit_subscribers': r[2] or 0,
+            'sentiment_up': r[3] if r[3] is not None else 50,
+            'sentiment_down': r[4] if r[4] is not None else 50,
+            'updated_ts': r[5] or 0
+        } for r in community}
+        if self.rows:
+            self.updated = max(r['updated_ts'] or 0 for r in self.rows.values())
+
+    # ==================== TOPLU ÇEKİM ====================
+
+    def fetch_markets(self, coin_ids: List[str]) -> List[Dict]:
+        """
+        coin_id listesini 250'lik sayfalarla çek
+        Kilit yalnızca istek sırasında tutulur - sayfalar arası beklemede tekil okumalar araya girebilir
+        """
+        ids = sorted(set(i for i in coin_ids if i))
+        now = int(time.time())
+        rows = []
+        for start in range(0, len(ids), PAGE_SIZE):
+            chunk = ids[start:start + PAGE_SIZE]
+            try:
+                with self._fetch_lock:
+                    resp = requests.get(COINGECKO_MARKETS, params={
+                        'vs_currency': 'usd',
+                        'ids': ','.join(chunk),
+                        'per_page': PAGE_SIZE,
+                        'page': 1,
+                        'price_change_percentage': '24h,7d,30d'
+                    }, timeout=20)
+                if resp.status_code == 429:
+                    logger.warning("CoinGecko rate limit - toplu çekim erteleniyor")
+                    break
+                if resp.status_code == 200:
+                    page = [_row_from_market(c, now) for c in resp.json() if c.get('id')]
+                    rows.extend(page)
+                    found = {r['coin_id'] for r in page}
+                    with self._lock:
+                        for coin_id in chunk:
+                            if coin_id in found:
+                                self.missing.pop(coin_id, None)
+                            else:
+                                self.missing[coin_id] = now
+            except Exception as e:
+                logger.error(f"CoinGecko markets hatası: {e}")
+            if start + PAGE_SIZE < len(ids):
+                time.sleep(REQUEST_GAP)
+        self._store(rows)
+        return rows
+
+    def _store(self, rows: List[Dict]):
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO markets VALUES ({', '.join('?' * len(MARKET_COLUMNS))})",
+                [tuple(r[c] for c in MARKET_COLUMNS) for r in rows]
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Coin piyasa tablosu yazma hatası: {e}")
+        with self._lock:
+            for r in rows:
+                self.rows[r['coin_id']] = r
+            self.updated = max(self.updated, max(r['updated_ts'] for r in rows))
+
+    def universe_ids(self) -> List[str]:
+        """BTCTurk'te listeli tüm coinlerin CoinGecko ID'leri"""
+        return sorted(set(symbol_universe.coingecko_map().values()))
+
+    def refresh(self, coin_ids: Optional[Iterable[str]] = None) -> int:
+        ids = list(coin_ids) if coin_ids else self.universe_ids()
+        rows = self.fetch_markets(ids)
+        logger.info(f"🪙 Coin piyasa tablosu yenilendi: {len(rows)}/{len(ids)} coin")
+        return len(rows)
+
+    def start_background_refresh(self, interval: int = REFRESH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    if time.time() - self.updated >= interval:
+                        self.refresh()
+                    self.refresh_community()
+                except Exception as e:
+                    logger.error(f"Coin piyasa yenileme hatası: {e}")
+                time.sleep(60)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='coin-markets')
+        self._thread.start()
+
+    # ==================== TOPLULUK (arka plan) ====================
+
+    def fetch_community(self, coin_id: str) -> Optional[Dict]:
+        """Tek coin sosyal metrikleri - yalnızca arka plan turundan çağrılır"""
+        try:
+            with self._fetch_lock:
+                resp = requests.get(COINGECKO_COIN.format(coin_id=coin_id), params={
+                    'localization': 'false',
+                    'tickers': 'false',
+                    'market_data': 'false',
+                    'community_data': 'true',
+                    'developer_data': 'false'
+                }, timeout=15)
+            if resp.status_code != 200:
+                return None
+            data = resp.json()
+            community = data.get('community_data') or {}
+            entry = {
+                'twitter_followers': community.get('twitter_followers') or 0,
+                'reddit_subscribers': community.get('reddit_subscribers') or 0,
+                'sentiment_up': data.get('sentiment_votes_up_percentage') or 50,
+                'sentiment_down': data.get('sentiment_votes_down_percentage') or 50,
+                'updated_ts': int(time.time())
+            }
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO community VALUES (?, ?, ?, ?, ?, ?)', (
+                coin_id, entry['twitter_followers'], entry['reddit_subscribers'],
+                entry['sentiment_up'], entry['sentiment_down'], entry['updated_ts']
+            ))
+            conn.commit()
+            conn.close()
+            self.community[coin_id] = entry
+            return entry
+        except Exception as e:
+            logger.debug(f"CoinGecko topluluk hatası ({coin_id}): {e}")
+            return None
+
+    def refresh_community(self, limit: int = COMMUNITY_BATCH) -> int:
+        """
+        Eskimiş topluluk kayıtlarını tur başına `limit` coin ile yenile
+        Önce istek yolunda eksik görülenler, sonra evrendeki en eski kayıtlar
+        """
+        now = time.time()
+        with self._lock:
+            queued, self.community_queue = self.community_queue, []
+        stale = sorted(
+            (cid for cid in self.universe_ids()
+             if now - self.community.get(cid, {}).get('updated_ts', 0) >= COMMUNITY_TTL),
+            key=lambda cid: self.community.get(cid, {}).get('updated_ts', 0)
+        )
+        batch = list(dict.fromkeys(queued + stale))[:limit]
+        with self._lock:
+            self.community_queue = [cid for cid in queued if cid not in batch] + self.community_queue
+        done = 0
+        for i, coin_id in enumerate(batch):
+            if i:
+                time.sleep(REQUEST_GAP)
+            if self.fetch_community(coin_id):
+                done += 1
+        return done
+
+    # ==================== OKUMA ====================
+
+    def _coin_id(self, symbol_or_id: str) -> Optional[str]:
+        """
+        Ticker sembolü (BTC, BTCTRY) veya CoinGecko ID'si (bitcoin, avalanche-2)
+        Sembol evreninde çözülmeyen küçük harfli girdi ID olarak kabul edilir
+        """
+        if not symbol_or_id:
+            return None
+        if symbol_or_id in self.rows:
+            return symbol_or_id
+        coin_id = symbol_universe.coingecko_id(symbol_or_id)
+        if coin_id:
+            return coin_id
+        if symbol_or_id == symbol_or_id.lower() or symbol_or_id in self.universe_ids():
+            return symbol_or_id
+        return None
+
+    def _fetchable(self, coin_id: str) -> bool:
+        """Yakın zamanda CoinGecko'da bulunamayan ID için tekrar istek atma"""
+        return time.time() - self.missing.get(coin_id, 0) >= MISSING_SECONDS
+
+    def get(self, symbol_or_id: str, allow_fetch: bool = True) -> Optional[Dict]:
+        """
+        Coin temelleri (tablodan)
+        Tabloda yoksa veya çok eskiyse tek seferlik toplu çekimle tamamlanır
+        """
+        coin_id = self._coin_id(symbol_or_id)
+        if not coin_id:
+            return None
+        row = self.rows.get(coin_id)
+        if row and time.time() - (row['updated_ts'] or 0) < STALE_SECONDS:
+            return dict(row)
+        if allow_fetch and self._fetchable(coin_id):
+            self.fetch_markets([coin_id])
+            row = self.rows.get(coin_id, row)
+        return dict(row) if row else None
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Birden çok coin - eksikler tek toplu istekle"""
+        wanted = {s: self._coin_id(s) for s in symbols}
+        now = time.time()
+        missing = [cid for cid in wanted.values()
+                   if cid and self._fetchable(cid)
+                   and (cid not in self.rows or now - (self.rows[cid]['updated_ts'] or 0) >= STALE_SECONDS)]
+        if missing:
+            self.fetch_markets(missing)
+        return {s: dict(self.rows[cid]) for s, cid in wanted.items() if cid and cid in self.rows}
+
+    def get_community(self, symbol_or_id: str) -> Dict:
+        """
+        Sosyal metrikler - yalnızca tablodan (ağ yok)
+        Eksik veya eskimiş kayıt bir sonraki arka plan turunda öncelikle yenilenir
+        """
+        default = {'twitter_followers': 0, 'reddit_subscribers': 0, 'sentiment_up': 50, 'sentiment_down': 50}
+        coin_id = self._coin_id(symbol_or_id)
+        if not coin_id:
+            return default
+
+        cached = self.community.get(coin_id)
+        if not cached or time.time() - cached['updated_ts'] >= COMMUNITY_TTL:
+            with self._lock:
+                if coin_id not in self.community_queue:
+                    self.community_queue.append(coin_id)
+        return cached or default
+
+
+coin_markets = CoinMarketsTable()
@@ -8,6 +8,9 @@ from typing import Dict, List, Optional
 import logging
 from datetime import datetime
 
+from coin_markets import coin_markets
+from symbol_universe import symbol_universe
+
 logger = logging.getLogger(__name__)
 
 class CoinGeckoAPI:
@@ -19,44 +22,7 @@ class CoinGeckoAPI:
         self.cache_time = {}
         self.cache_duration = 300
         
-        self.symbol_to_id = {
-            'BTC': 'bitcoin',
-            'ETH': 'ethereum',
-            'SOL': 'solana',
-            'XRP': 'ripple',
-            'AVAX': 'avalanche-2',
-            'DOGE': 'dogecoin',
-            'ADA': 'cardano',
-            'DOT': 'polkadot',
-            'MATIC': 'matic-network',
-            'LINK': 'chainlink',
-            'UNI': 'uniswap',
-            'ATOM': 'cosmos',
-            'LTC': 'litecoin',
-            'SHIB': 'shiba-inu',
-            'TRX': 'tron',
-            'NEAR': 'near',
-            'APT': 'aptos',
-            'ARB': 'arbitrum',
-            'OP': 'optimism',
-            'INJ': 'injective-protocol',
-            'SEI': 'sei-network',
-            'SUI': 'sui',
-            'JUV': 'juventus-fan-token',
-            'ATM': 'atletico-madrid',
-            'BAR': 'fc-barcelona-fan-token',
-            'PSG': 'paris-saint-germain-fan-token',
-            'CITY': 'manchester-city-fan-token',
-            'GAL': 'galatasaray-fan-token',
-            'CHZ': 'chiliz',
-            'SANTOS': 'santos-fc-fan-token',
-            'LAZIO': 'lazio-fan-token',
-            'PORTO': 'fc-porto',
-            'ACM': 'ac-milan-fan-token',
-            'ASR': 'as-roma-fan-token',
-            'INTER': 'inter-milan-fan-token',
-            'NAP': 'napoli-fan-token',
-        }
+        self.symbol_to_id = symbol_universe.coingecko_map()
     
     def _get_cached(self, key: str) -> Optional[Dict]:
         """Cache'den veri al"""
@@ -96,50 +62,41 @@ class CoinGeckoAPI:
         return {}
     
     def get_coin_data(self, symbol: str) -> Dict:
-        """Tek coin detaylı verileri"""
-        coin_id = self.symbol_to_id.get(symbol.upper())
+        """Tek coin detaylı verileri (paylaşılan coin piyasa tablosundan)"""
+        coin_id = symbol_universe.coingecko_id(symbol)
         if not coin_id:
             return {'error': f'{symbol} bulunamadı'}
         
-        cached = self._get_cached(f'coin_{coin_id}')
-        if cached:
-            return cached
-        
         try:
-            resp = requests.get(
-                f"{self.base_url}/coins/{coin_id}",
-                params={
-                    'localization': 'false',
-                    'tickers': 'false',
-                    'community_data': 'false',
-                    'developer_data': 'false'
-                },
-                timeout=10
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                market_data = data.get('market_data', {})
+            market = coin_markets.get(coin_id)
+            if market:
+                usd_try = 0
+                try:
+                    from market_snapshot import market_snapshot
+                    quote = market_snapshot.quote('USDTRY=X')
+                    usd_try = quote['price'] if quote else 0
+                except Exception:
+                    pass
                 
                 result = {
-                    'name': data.get('name', ''),
-                    'symbol': data.get('symbol', '').upper(),
-                    'market_cap_rank': data.get('market_cap_rank', 0),
-                    'price_usd': market_data.get('current_price', {}).get('usd', 0),
-                    'price_try': market_data.get('current_price', {}).get('try', 0),
-                    'market_cap_usd': market_data.get('market_cap', {}).get('usd', 0),
-                    'volume_24h_usd': market_data.get('total_volume', {}).get('usd', 0),
-                    'change_24h': market_data.get('price_change_percentage_24h', 0),
-                    'change_7d': market_data.get('price_change_percentage_7d', 0),
-                    'change_30d': market_data.get('price_change_percentage_30d', 0),
-                    'ath_usd': market_data.get('ath', {}).get('usd', 0),
-                    'ath_change_pct': market_data.get('ath_change_percentage', {}).get('usd', 0),
-                    'atl_usd': market_data.get('atl', {}).get('usd', 0),
-                    'circulating_supply': market_data.get('circulating_supply', 0),
-                    'total_supply': market_data.get('total_supply', 0),
-                    'max_supply': market_data.get('max_supply', 0),
-                    'high_24h_usd': market_data.get('high_24h', {}).get('usd', 0),
-                    'low_24h_usd': market_data.get('low_24h', {}).get('usd', 0),
+                    'name': market['name'],
+                    'symbol': market['symbol'],
+                    'market_cap_rank': market['market_cap_rank'] or 0,
+                    'price_usd': market['price_usd'],
+                    'price_try': market['price_usd'] * usd_try,
+                    'market_cap_usd': market['market_cap'],
+                    'volume_24h_usd': market['volume_24h'],
+                    'change_24h': market['change_24h'],
+                    'change_7d': market['change_7d'],
+                    'change_30d': market['change_30d'],
+                    'ath_usd': market['ath'],
+                    'ath_change_pct': market['ath_change_pct'],
+                    'atl_usd': market['atl'],
+                    'circulating_supply': market['circulating_supply'],
+                    'total_supply': market['total_supply'],
+                    'max_supply': market['max_supply'],
+                    'high_24h_usd': market['high_24h'],
+                    'low_24h_usd': market['low_24h'],
                 }
                 
                 if result['max_supply'] and result['circulating_supply']:
@@ -147,7 +104,6 @@ class CoinGeckoAPI:
                 else:
                     result['supply_ratio'] = None
                 
-                self._set_cache(f'coin_{coin_id}', result)
                 return result
         except Exception as e:
             logger.error(f"CoinGecko coin error: {e}")
@@ -0,0 +1,170 @@
+"""
+🗃️ COMMAND CACHE - Pahalı komut sonuçları için paylaşılan önbellek
+/pro COIN, /pump COIN, /ultimate, /tarama-hisse gibi komutlar
+aynı veri görüntüsü içinde tekrar hesaplanmaz
++ Anahtar: (komut, normalize argümanlar, veri sürümü); her kayıt kendi TTL'i dolunca düşer
++ Eşzamanlı aynı istekler tek hesaplamayı bekler (in-flight birleştirme)
++ Komut başına isabet oranı istatistikleri
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+MAX_ENTRIES = 500
+
+# Komut başına kayıt ömrü (saniye) - hesaplandığı andan itibaren
+COMMAND_TTLS = {
+    'pro': 120,
+    'pump': 60,
+    'ultimate': 300,
+    'tarama-hisse': 300,
+    'ultimate-hisse': 300,
+    'superanaliz': 180,
+    'derin': 600,
+    'sniper': 180,
+}
+
+
+def normalize_args(args) -> Tuple:
+    """Büyük/küçük harf ve boşluk farkı aynı anahtara düşer"""
+    if args is None:
+        return ()
+    if isinstance(args, (str, int, float)):
+        args = [args]
+    return tuple(str(a).strip().upper() for a in args if str(a).strip())
+
+
+def is_cacheable(value) -> bool:
+    """Boş sonuç, hata sözlüğü ve '❌' ile başlayan hata mesajları önbelleğe yazılmaz"""
+    if not value:
+        return False
+    if isinstance(value, str) and value.lstrip().startswith('❌'):
+        return False
+    if isinstance(value, dict) and value.get('error'):
+        return False
+    return True
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CommandCache:
+    """
+    Sonuç önbelleği
+    Her kayıt hesaplandığı andan itibaren ttl saniye geçerlidir (duvar saati kovası yok -
+    kova sınırında hesaplanan sonuç hemen düşmez); veri kaynağı kendi sürümünü biliyorsa
+    (ör. market_overview.current['version']) version ile verilir, sürüm değişince kayıt da düşer
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}       # key -> (value, created, expires)
+        self.inflight = {}      # key -> _InFlight
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _stat(self, command: str) -> Dict:
+        return self.stats.setdefault(command, {'hits': 0, 'misses': 0, 'coalesced': 0,
+                                               'errors': 0, 'uncached': 0, 'compute_seconds': 0.0})
+
+    @staticmethod
+    def _version(version) -> Any:
+        return version() if callable(version) else version
+
+    def get_or_compute(self, command: str, args, compute: Callable[[], Any],
+                       ttl: Optional[float] = None, version=None,
+                       cacheable: Callable[[Any], bool] = is_cacheable) -> Any:
+        """
+        Aynı anahtar önbellekteyse hemen döner; başka thread hesaplıyorsa onu bekler;
+        yoksa compute() bir kez çalışır. Hata önbelleğe yazılmaz, bekleyenlere iletilir;
+        cacheable(sonuç) False ise (boş/hata sonucu) sonuç döner ama saklanmaz.
+        """
+        command = command.lstrip('/').lower()
+        key = (command, normalize_args(args), self._version(version))
+        ttl = ttl or COMMAND_TTLS.get(command, DEFAULT_TTL)
+
+        with self._lock:
+            stat = self._stat(command)
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] > time.time():
+                stat['hits'] += 1
+                return entry[0]
+            waiter = self.inflight.get(key)
+            owner = waiter is None
+            if owner:
+                stat['misses'] += 1
+                waiter = _InFlight()
+                self.inflight[key] = waiter
+            else:
+                stat['coalesced'] += 1
+
+        if not owner:
+            waiter.event.wait()
+            if waiter.error:
+                raise waiter.error
+            return waiter.value
+
+        started = time.time()
+        try:
+            waiter.value = compute()
+        except Exception as e:
+            waiter.error = e
+            with self._lock:
+                stat['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                stat['compute_seconds'] += time.time() - started
+                self.inflight.pop(key, None)
+                if waiter.error is None and cacheable(waiter.value):
+                    self._store(key, waiter.value, ttl)
+                elif waiter.error is None:
+                    stat['uncached'] += 1
+            waiter.event.set()
+        return waiter.value
+
+    def _store(self, key, value, ttl: float):
+        # Süresi dolmuş ve eski sürümlere ait kayıtlar artık isabet almaz - temizle
+        now = time.time()
+        self.entries = {k: v for k, v in self.entries.items()
+                        if v[2] > now and not (k[0] == key[0] and k[1] == key[1])}
+        self.entries[key] = (value, now, now + ttl)
+        if len(self.entries) > self.max_entries:
+            oldest = sorted(self.entries.items(), key=lambda kv: kv[1][1])
+            for k, _ in oldest[:len(self.entries) - self.max_entries]:
+                self.entries.pop(k, None)
+
+    def invalidate(self, command: Optional[str] = None):
+        with self._lock:
+            if command is None:
+                self.entries.clear()
+            else:
+                command = command.lstrip('/').lower()
+                self.entries = {k: v for k, v in self.entries.items() if k[0] != command}
+
+    def hit_rates(self) -> Dict[str, Dict]:
+        """Komut başına isabet oranı (birleştirilen istekler isabet sayılır)"""
+        with self._lock:
+            result = {}
+            for command, s in self.stats.items():
+                total = s['hits'] + s['misses'] + s['coalesced']
+                result[command] = {
+                    **s,
+                    'compute_seconds': round(s['compute_seconds'], 2),
+                    'requests': total,
+                    'hit_rate': round((s['hits'] + s['coalesced']) / total * 100, 1) if total else 0.0,
+                    'avg_compute': round(s['compute_seconds'] / s['misses'], 2) if s['misses'] else 0.0
+                }
+            return result
+
+
+command_cache = CommandCache()
@@ -15,21 +15,13 @@ from typing import Dict, List, Optional
 import json
 import time
 
+from coin_markets import coin_markets
+from market_overview import market_overview
+from symbol_universe import symbol_universe
+
 class DeepAnalyzer:
     """Kapsamlı coin analiz sistemi - Canlı API entegrasyonları"""
     
-    COINGECKO_IDS = {
-        'BTC': 'bitcoin', 'ETH': 'ethereum', 'XRP': 'ripple',
-        'SOL': 'solana', 'DOGE': 'dogecoin', 'ADA': 'cardano',
-        'AVAX': 'avalanche-2', 'LINK': 'chainlink', 'DOT': 'polkadot',
-        'MATIC': 'matic-network', 'SHIB': 'shiba-inu', 'LTC': 'litecoin',
-        'TRX': 'tron', 'ATOM': 'cosmos', 'UNI': 'uniswap',
-        'INJ': 'injective-protocol', 'AAVE': 'aave', 'FTM': 'fantom',
-        'NEAR': 'near', 'OP': 'optimism', 'ARB': 'arbitrum',
-        'APT': 'aptos', 'SUI': 'sui', 'PEPE': 'pepe',
-        'BONK': 'bonk', 'WIF': 'dogwifcoin', 'FLOKI': 'floki'
-    }
-    
     def __init__(self):
         self.analysis_cache = {}
         self.fear_greed_cache = {'value': None, 'timestamp': None}
@@ -58,42 +50,31 @@ class DeepAnalyzer:
             return None
     
     def get_coingecko_data(self, symbol: str) -> Optional[Dict]:
-        """CoinGecko'dan detaylı piyasa verisi (ücretsiz API)"""
+        """CoinGecko piyasa verisi (paylaşılan coin piyasa tablosundan)"""
         try:
-            coin_id = self.COINGECKO_IDS.get(symbol.upper())
+            coin_id = symbol_universe.coingecko_id(symbol)
             if not coin_id:
                 return None
             
-            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
-            params = {
-                'localization': 'false',
-                'tickers': 'false',
-                'community_data': 'true',
-                'developer_data': 'false'
-            }
-            
-            resp = requests.get(url, params=params, timeout=15)
-            if resp.status_code != 200:
+            market = coin_markets.get(coin_id)
+            if not market:
                 return None
-            
-            data = resp.json()
-            market = data.get('market_data', {})
-            community = data.get('community_data', {})
+            community = coin_markets.get_community(coin_id)
             
             return {
-                'price_usd': market.get('current_price', {}).get('usd', 0),
-                'price_change_24h': market.get('price_change_percentage_24h', 0),
-                'price_change_7d': market.get('price_change_percentage_7d', 0),
-                'price_change_30d': market.get('price_change_percentage_30d', 0),
-                'market_cap': market.get('market_cap', {}).get('usd', 0),
-                'market_cap_rank': market.get('market_cap_rank', 999),
-                'volume_24h': market.get('total_volume', {}).get('usd', 0),
-                'ath': market.get('ath', {}).get('usd', 0),
-                'ath_change_pct': market.get('ath_change_percentage', {}).get('usd', 0),
+                'price_usd': market['price_usd'],
+                'price_change_24h': market['change_24h'],
+                'price_change_7d': market['change_7d'],
+                'price_change_30d': market['change_30d'],
+                'market_cap': market['market_cap'],
+                'market_cap_rank': market['market_cap_rank'] or 999,
+                'volume_24h': market['volume_24h'],
+                'ath': market['ath'],
+                'ath_change_pct': market['ath_change_pct'],
                 'twitter_followers': community.get('twitter_followers', 0),
                 'reddit_subscribers': community.get('reddit_subscribers', 0),
-                'sentiment_up': data.get('sentiment_votes_up_percentage', 50),
-                'sentiment_down': data.get('sentiment_votes_down_percentage', 50)
+                'sentiment_up': community.get('sentiment_up', 50),
+                'sentiment_down': community.get('sentiment_down', 50)
             }
         except Exception as e:
             return None
@@ -553,20 +534,17 @@ class DeepAnalyzer:
         return opportunities[:5]
     
     def get_market_overview(self) -> Dict:
-        """Piyasa genel görünümü"""
-        fg = self.get_fear_greed_index()
-        
-        try:
-            btc = self.get_btcturk_data('BTC')
-            eth = self.get_btcturk_data('ETH')
-        except:
-            btc = eth = None
+        """Piyasa genel görünümü (paylaşılan piyasa özetinden)"""
+        view = market_overview.get()
+        coins = view['coins']
         
         return {
-            'fear_greed': fg,
-            'btc_change': btc.get('change_24h', 0) if btc else 0,
-            'eth_change': eth.get('change_24h', 0) if eth else 0,
-            'timestamp': datetime.now().isoformat()
+            'fear_greed': view['fear_greed'],
+            'btc_change': coins.get('BTC', {}).get('change', 0),
+            'eth_change': coins.get('ETH', {}).get('change', 0),
+            'btc_dominance': view['dominance']['btc_dominance'],
+            'version': view['version'],
+            'timestamp': view['timestamp']
         }
 
 
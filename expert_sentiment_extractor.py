@@ -1,10 +1,11 @@
 """📰 Expert Sentiment Extractor - Yorumcuların analizleri"""
 import requests
 import re
-from textblob import TextBlob
 from datetime import datetime, timedelta
 import os
 
+from sentiment_engine import sentiment_engine
+
 class ExpertSentimentExtractor:
     """Haberlerden expert sentiment çıkart"""
     
@@ -33,12 +34,11 @@ class ExpertSentimentExtractor:
             articles = response.json().get('articles', [])
             
             opinions = []
-            for article in articles:
-                text = f"{article.get('title', '')} {article.get('description', '')}"
-                
+            texts = [f"{article.get('title', '')} {article.get('description', '')}" for article in articles]
+            scored = sentiment_engine.polarity_batch(texts)
+            for article, text, result in zip(articles, texts, scored):
                 # Sentiment analizi
-                blob = TextBlob(text)
-                polarity = blob.sentiment.polarity
+                polarity = result['polarity']
                 
                 # Expert çıkart - author veya source'dan
                 author = article.get('author', 'Unknown')
@@ -73,14 +73,14 @@ class ExpertSentimentExtractor:
     @staticmethod
     def _extract_recommendation(text, polarity):
         """Recommendation çıkart"""
-        text_lower = text.lower()
+        counts = sentiment_engine.matcher.counts(text)
         
         # Keywords
-        if any(word in text_lower for word in ['buy', 'bullish', 'target', 'increase', 'outperform', 'accumulate']):
+        if counts['rec_buy']:
             return 'BUY'
-        elif any(word in text_lower for word in ['sell', 'bearish', 'decline', 'reduce', 'underperform', 'dump']):
+        elif counts['rec_sell']:
             return 'SELL'
-        elif any(word in text_lower for word in ['hold', 'neutral', 'equal', 'maintain']):
+        elif counts['rec_hold']:
             return 'HOLD'
         else:
             return 'BUY' if polarity > 0.2 else ('SELL' if polarity < -0.2 else 'HOLD')
@@ -0,0 +1,376 @@
+"""
+🧮 FEATURE STORE - ML modülleri için ortak özellik deposu
+Özellikler (RSI, MACD, Bollinger, volatilite, momentum...) sürümlü tanımlardan
+(sembol, mum) başına bir kez hesaplanır ve sütun bazlı diske yazılır
++ Yeni mumlar geldiğinde sadece yeni satırlar hesaplanır (ısınma penceresiyle)
++ Tanım sürümü değişen özellik tüm geçmiş için yeniden hesaplanır
++ Eğitim (özellik + hedef, hizalı) ve tahmin (son satır) aynı sütunlardan okunur
++ Dosya: data/features/{SEMBOL}{KOTE}_{ÇÖZÜNÜRLÜK}.npz (sütun başına bir numpy dizisi)
++ Mum kaynağı kote ile seçilir: BTCTurk pariteleri (USDT, TRY) veya quote=YFINANCE ile
+  yfinance sembolü (BTC-USD, AAPL, THYAO.IS) - aynı tanımlar iki kaynakta da kullanılır
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+import requests
+
+from instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.path.join('data', 'features')
+BTCTURK_KLINES = "https://graph-api.btcturk.com/v1/klines/history"
+
+HISTORY_DAYS = 365          # İlk yüklemede çekilen geçmiş
+REFRESH_SECONDS = 900       # Bundan eski görüntü okunurken yeni mumlar çekilir
+WARMUP_BARS = 300           # Artımlı hesapta geriye bakılan mum (EMA/rolling ısınması)
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+YFINANCE = 'YF'             # quote=YFINANCE: sembol bir yfinance sembolüdür
+YF_INTERVALS = {'D': '1d', '60': '1h'}
+
+# ad -> (sürüm, fonksiyon(mumlar) -> Series)
+FEATURES = {}
+
+
+def feature(name: str, version: int = 1):
+    def register(fn: Callable[[pd.DataFrame], pd.Series]):
+        FEATURES[name] = (version, fn)
+        return fn
+    return register
+
+
+# ==================== ÖZELLİK TANIMLARI ====================
+
+def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def _ema(close: pd.Series, span: int) -> pd.Series:
+    return close.ewm(span=span, adjust=False).mean()
+
+
+def _bollinger(close: pd.Series):
+    mid = close.rolling(window=20).mean()
+    std = close.rolling(window=20).std()
+    return mid, mid + std * 2, mid - std * 2
+
+
+feature('returns')(lambda df: df['close'].pct_change())
+feature('log_returns')(lambda df: np.log(df['close'] / df['close'].shift(1)))
+feature('high_low_range')(lambda df: (df['high'] - df['low']) / df['close'])
+
+for _p in (5, 10, 20, 50, 100):
+    feature(f'ma_{_p}')(lambda df, p=_p: df['close'].rolling(window=p).mean())
+for _p in (5, 10, 20, 50):
+    feature(f'ma_{_p}_ratio')(lambda df, p=_p: df['close'] / df['close'].rolling(window=p).mean())
+for _p in (12, 26):
+    feature(f'ema_{_p}')(lambda df, p=_p: _ema(df['close'], p))
+
+feature('macd')(lambda df: _ema(df['close'], 12) - _ema(df['close'], 26))
+feature('macd_signal')(lambda df: _ema(_ema(df['close'], 12) - _ema(df['close'], 26), 9))
+
+
+@feature('macd_histogram')
+def _macd_histogram(df):
+    macd = _ema(df['close'], 12) - _ema(df['close'], 26)
+    return macd - _ema(macd, 9)
+
+
+feature('rsi')(lambda df: _rsi(df['close']))
+feature('bb_upper')(lambda df: _bollinger(df['close'])[1])
+feature('bb_lower')(lambda df: _bollinger(df['close'])[2])
+
+
+@feature('bb_width')
+def _bb_width(df):
+    mid, upper, lower = _bollinger(df['close'])
+    return (upper - lower) / mid
+
+
+@feature('bb_position')
+def _bb_position(df):
+    _, upper, lower = _bollinger(df['close'])
+    return (df['close'] - lower) / (upper - lower)
+
+
+for _p in (5, 10, 20):
+    feature(f'volatility_{_p}')(lambda df, p=_p: df['close'].pct_change().rolling(window=p).std())
+feature('volatility_ratio')(lambda df: df['close'].pct_change().rolling(window=5).std()
+                            / df['close'].pct_change().rolling(window=20).std())
+
+feature('volume_ma')(lambda df: df['volume'].rolling(window=20).mean())
+feature('volume_ma_5')(lambda df: df['volume'].rolling(window=5).mean())
+feature('volume_ratio')(lambda df: df['volume'] / df['volume'].rolling(window=20).mean())
+feature('volume_change')(lambda df: df['volume'].pct_change())
+# Kote cinsinden işlem hacmi (likidite) - semboller arası karşılaştırılabilir
+feature('log_turnover_20')(lambda df: np.log1p((df['close'] * df['volume']).rolling(window=20).mean()))
+
+for _p in (5, 10, 20):
+    feature(f'momentum_{_p}')(lambda df, p=_p: df['close'] / df['close'].shift(p) - 1)
+
+
+def _atr(df: pd.DataFrame) -> pd.Series:
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1).rolling(window=14).mean()
+
+
+# 20 mumluk kapanış penceresi istatistikleri (pencere son mumu dahil)
+feature('close_std_20')(lambda df: df['close'].rolling(window=20).std(ddof=0))
+feature('close_max_20')(lambda df: df['close'].rolling(window=20).max())
+feature('close_min_20')(lambda df: df['close'].rolling(window=20).min())
+feature('change_20')(lambda df: df['close'] - df['close'].shift(19))
+feature('range_position_20')(lambda df: (df['close'] - df['close'].rolling(window=20).min())
+                             / (df['close'].rolling(window=20).max() - df['close'].rolling(window=20).min() + 0.0001))
+
+feature('atr')(_atr)
+feature('atr_ratio')(lambda df: _atr(df) / df['close'])
+
+
+def _stoch_k(df: pd.DataFrame) -> pd.Series:
+    low_14 = df['low'].rolling(window=14).min()
+    high_14 = df['high'].rolling(window=14).max()
+    return 100 * (df['close'] - low_14) / (high_14 - low_14)
+
+
+feature('stoch_k')(_stoch_k)
+feature('stoch_d')(lambda df: _stoch_k(df).rolling(window=3).mean())
+feature('close_above_ma50')(lambda df: (df['close'] > df['close'].rolling(window=50).mean()).astype(float)
+                            .where(df['close'].rolling(window=50).count() == 50))
+# Tüm serinin min/max'ı yerine 100 mumluk pencere - geleceği görmeyen sürüm
+feature('price_position')(lambda df: (df['close'] - df['close'].rolling(window=100, min_periods=20).min())
+                          / (df['close'].rolling(window=100, min_periods=20).max()
+                             - df['close'].rolling(window=100, min_periods=20).min()))
+
+
+def compute_features(bars: pd.DataFrame, names: Optional[List[str]] = None) -> pd.DataFrame:
+    """Mum tablosundan özellik sütunları (depo dışı kullanım için)"""
+    out = pd.DataFrame(index=bars.index)
+    for name in names or FEATURES:
+        out[name] = FEATURES[name][1](bars)
+    return out.replace([np.inf, -np.inf], np.nan)
+
+
+def bars_from_closes(closes) -> pd.DataFrame:
+    """Yalnızca kapanış listesi olan çağıranlar için mum tablosu (OHLC = kapanış, hacim 0)"""
+    close = pd.Series(np.asarray(closes, dtype=float))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': np.zeros(len(close))})
+
+
+def add_target(frame: pd.DataFrame, horizon: int) -> pd.Series:
+    """horizon mum sonraki getiri (eğitim hedefi)"""
+    return frame['close'].shift(-horizon) / frame['close'] - 1
+
+
+# ==================== DEPO ====================
+
+class FeatureStore:
+    """
+    frames: (sembol, kote, çözünürlük) -> DataFrame (timestamp + mumlar + özellikler)
+    versions: aynı anahtar -> {özellik: sürüm}
+    """
+
+    def __init__(self, store_dir: str = STORE_DIR):
+        self.store_dir = store_dir
+        self.frames = {}
+        self.versions = {}
+        self.checked = {}
+        self.session = requests.Session()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {'reads': 0, 'fetches': 0, 'rows_computed': 0, 'columns_rebuilt': 0}
+
+    def _lock(self, key) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _path(self, key) -> str:
+        symbol, quote, resolution = key
+        return os.path.join(self.store_dir, f"{symbol}{quote}_{resolution}.npz")
+
+    # ==================== DİSK ====================
+
+    def _load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None, {}
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                versions = json.loads(str(data['__versions__']))
+                frame = pd.DataFrame({c: data[c] for c in data.files if c != '__versions__'})
+            return frame, versions
+        except Exception as e:
+            logger.warning(f"Özellik dosyası okunamadı {path}: {e}")
+            return None, {}
+
+    def _save(self, key, frame: pd.DataFrame, versions: Dict):
+        path = self._path(key)
+        tmp = path + '.tmp.npz'
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            columns = {c: frame[c].to_numpy(dtype=np.int64 if c == 'timestamp' else np.float64) for c in frame.columns}
+            np.savez(tmp, __versions__=np.array(json.dumps(versions)), **columns)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Özellik dosyası yazılamadı {path}: {e}")
+
+    # ==================== MUMLAR ====================
+
+    def fetch_bars(self, symbol: str, quote: str, resolution: str, since: int) -> pd.DataFrame:
+        if quote == YFINANCE:
+            return self._fetch_yfinance(symbol, resolution, since)
+        try:
+            data = self.session.get(BTCTURK_KLINES, params={
+                'symbol': f"{symbol}{quote}", 'resolution': resolution,
+                'from': since, 'to': int(time.time())
+            }, timeout=15).json()
+        except Exception as e:
+            logger.error(f"Özellik deposu mum hatası ({symbol}): {e}")
+            return pd.DataFrame()
+        self.stats['fetches'] += 1
+        if not data.get('c'):
+            return pd.DataFrame()
+        return pd.DataFrame({
+            'timestamp': [int(x) for x in data.get('t', [])],
+            'open': [float(x) for x in data.get('o', [])],
+            'high': [float(x) for x in data.get('h', [])],
+            'low': [float(x) for x in data.get('l', [])],
+            'close': [float(x) for x in data.get('c', [])],
+            'volume': [float(x) for x in data.get('v', [])]
+        })
+
+    def _fetch_yfinance(self, ticker: str, resolution: str, since: int) -> pd.DataFrame:
+        """yfinance mumları (hisse, endeks, BTCTurk'te olmayan coinler)"""
+        try:
+            import yfinance as yf
+            data = yf.download(ticker, start=datetime.fromtimestamp(since).strftime('%Y-%m-%d'),
+                               interval=YF_INTERVALS.get(resolution, '1d'), progress=False, auto_adjust=False)
+        except Exception as e:
+            logger.error(f"Özellik deposu yfinance hatası ({ticker}): {e}")
+            return pd.DataFrame()
+        self.stats['fetches'] += 1
+        if data is None or data.empty:
+            return pd.DataFrame()
+        if getattr(data.columns, 'nlevels', 1) > 1:
+            data = data.droplevel(-1, axis=1) if ticker in data.columns.get_level_values(-1) else data.droplevel(0, axis=1)
+        data = data.dropna(subset=['Close'])
+        index = data.index.tz_convert(None) if data.index.tz is not None else data.index
+        return pd.DataFrame({
+            'timestamp': (index - pd.Timestamp('1970-01-01')) // pd.Timedelta(seconds=1),
+            'open': data['Open'].to_numpy(dtype=float),
+            'high': data['High'].to_numpy(dtype=float),
+            'low': data['Low'].to_numpy(dtype=float),
+            'close': data['Close'].to_numpy(dtype=float),
+            'volume': data['Volume'].to_numpy(dtype=float)
+        }).reset_index(drop=True)
+
+    # ==================== GÜNCELLEME ====================
+
+    def _update(self, key, frame: Optional[pd.DataFrame], versions: Dict) -> pd.DataFrame:
+        symbol, quote, resolution = key
+        if frame is None or frame.empty:
+            since = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
+            frame = pd.DataFrame(columns=['timestamp'] + BAR_COLUMNS)
+        else:
+            # Son mum hâlâ oluşuyor olabilir - ondan itibaren tekrar çekilir
+            since = int(frame['timestamp'].iloc[-1])
+
+        fresh = self.fetch_bars(symbol, quote, resolution, since)
+        if not fresh.empty:
+            fresh = fresh.drop_duplicates('timestamp', keep='last')
+            kept = frame[frame['timestamp'] < fresh['timestamp'].iloc[0]]
+            first_changed = len(kept)
+            frame = pd.concat([kept, fresh], ignore_index=True, sort=False)
+        else:
+            first_changed = len(frame)
+
+        if frame.empty:
+            return frame
+
+        frame = frame.astype({'timestamp': np.int64, **{c: float for c in BAR_COLUMNS}})
+        bars = frame[BAR_COLUMNS]
+        start = max(0, first_changed - WARMUP_BARS)
+        window = bars.iloc[start:]
+        for name, (version, fn) in FEATURES.items():
+            if versions.get(name) != version or name not in frame.columns:
+                # Yeni veya sürümü değişmiş tanım - tüm geçmiş
+                frame[name] = fn(bars).replace([np.inf, -np.inf], np.nan).to_numpy(dtype=float)
+                versions[name] = version
+                self.stats['columns_rebuilt'] += 1
+            elif first_changed < len(frame):
+                values = fn(window).replace([np.inf, -np.inf], np.nan).to_numpy(dtype=float)
+                column = frame[name].to_numpy(dtype=float, copy=True)
+                column[first_changed:] = values[first_changed - start:]
+                frame[name] = column
+        self.stats['rows_computed'] += len(frame) - first_changed
+
+        # Kaldırılan tanımların sütunları da silinir
+        for stale in [c for c in frame.columns if c not in FEATURES and c not in ['timestamp'] + BAR_COLUMNS]:
+            frame = frame.drop(columns=stale)
+            versions.pop(stale, None)
+
+        self._save(key, frame, versions)
+        return frame
+
+    def frame(self, symbol: str, quote: str = 'USDT', resolution: str = 'D',
+              max_age: float = REFRESH_SECONDS) -> pd.DataFrame:
+        """Mumlar + tüm özellikler (gerekirse sadece yeni mumlar çekilip hesaplanır)"""
+        key = (symbol.upper(), quote, resolution)
+        self.stats['reads'] += 1
+        with self._lock(key):
+            frame = self.frames.get(key)
+            fresh = frame is not None and time.time() - self.checked.get(key, 0) < max_age
+            instrumentation.cache('feature_store.frames', fresh)
+            if fresh:
+                return frame
+            versions = self.versions.get(key, {})
+            if frame is None:
+                frame, versions = self._load(key)
+            frame = self._update(key, frame, versions)
+            self.frames[key] = frame
+            self.versions[key] = versions
+            self.checked[key] = time.time()
+            return frame
+
+    # ==================== SERVİS ====================
+
+    def training_set(self, symbol: str, features: List[str], horizon: int = 7, days: Optional[int] = None,
+                     quote: str = 'USDT', resolution: str = 'D') -> pd.DataFrame:
+        """Hizalı eğitim tablosu: özellikler + 'target' + 'close' (eksik satırlar atılır)"""
+        frame = self.frame(symbol, quote, resolution)
+        if frame.empty:
+            return frame
+        if days:
+            cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+            frame = frame[frame['timestamp'] >= cutoff]
+        data = frame[['timestamp', 'close'] + list(features)].copy()
+        data['target'] = add_target(frame.loc[data.index], horizon)
+        return data.dropna().reset_index(drop=True)
+
+    def latest(self, symbol: str, features: List[str], quote: str = 'USDT',
+               resolution: str = 'D') -> Optional[pd.DataFrame]:
+        """Tahmin için son satır (1 satırlık tablo); özellikleri eksikse None"""
+        frame = self.frame(symbol, quote, resolution)
+        if frame.empty:
+            return None
+        row = frame[['timestamp', 'close'] + list(features)].iloc[-1:]
+        return None if row[list(features)].isna().any(axis=None) else row
+
+    def status(self) -> Dict:
+        return {**self.stats, 'frames': len(self.frames), 'features': len(FEATURES)}
+
+
+feature_store = FeatureStore()
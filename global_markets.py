@@ -1,10 +1,11 @@
 """🌍 GLOBAL MARKETS - DÜNYA PİYASALARI
 S&P500, DAX, Altın, Petrol, DXY takibi
 """
-import yfinance as yf
 from datetime import datetime
 import numpy as np
 
+from market_snapshot import market_snapshot
+
 class GlobalMarketsAnalyzer:
     """Global piyasa analizi"""
     
@@ -32,10 +33,9 @@ class GlobalMarketsAnalyzer:
         }
     
     def get_index_data(self, symbol):
-        """Endeks verisi al"""
+        """Endeks verisi al (paylaşılan piyasa görüntüsünden)"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period='5d')
+            hist = market_snapshot.history(symbol, 5)
             
             if len(hist) < 2:
                 return None
@@ -1,8 +1,9 @@
 """🌍 Global Markets Analyzer - Dünya borsaları analizi"""
-import yfinance as yf
 from datetime import datetime, timedelta
 import numpy as np
 
+from market_snapshot import market_snapshot
+
 class GlobalMarketsAnalyzer:
     """Dünya borsaları - S&P 500, DAX, NIKKEI, vb"""
     
@@ -25,8 +26,7 @@ class GlobalMarketsAnalyzer:
         
         for name, symbol in self.GLOBAL_INDICES.items():
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period='5d')
+                data = market_snapshot.history(symbol, 5)
                 
                 if data.empty:
                     continue
@@ -138,8 +138,7 @@ class SectorAnalyzer:
         
         for name, symbol in self.SECTOR_ETFS.items():
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period='1y')
+                data = market_snapshot.history(symbol)
                 
                 if data.empty or len(data) < 2:
                     continue
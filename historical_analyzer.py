@@ -15,6 +15,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from surge_index import surge_index, compute_surge_table, classify_surge, rolling_rsi
+from level_engine import pivot_masks, cluster_levels, regression_channel, return_correlation, batch_levels
 
 logger = logging.getLogger(__name__)
 
@@ -39,22 +43,26 @@ class HistoricalPatternAnalyzer:
             'ext_1.618': high + (diff * 0.618)
         }
     
-    def find_support_resistance(self, closes: List[float], window: int = 10) -> Dict:
-        """Destek ve direnç seviyelerini bul"""
+    def find_support_resistance(self, closes: List[float], window: int = 10,
+                                pivots: Optional[Dict] = None) -> Dict:
+        """Destek ve direnç seviyelerini bul (kayan min/max ile)
+        pivots: batch_levels çıktısı verilirse tekrar hesaplanmaz
+        """
         if len(closes) < window * 2:
             return {'supports': [], 'resistances': [], 'current_zone': 'UNKNOWN'}
         
-        supports = []
-        resistances = []
-        
-        for i in range(window, len(closes) - window):
-            is_support = all(closes[i] <= closes[i-j] and closes[i] <= closes[i+j] for j in range(1, min(window, len(closes)-i)))
-            is_resistance = all(closes[i] >= closes[i-j] and closes[i] >= closes[i+j] for j in range(1, min(window, len(closes)-i)))
-            
-            if is_support:
-                supports.append(closes[i])
-            if is_resistance:
-                resistances.append(closes[i])
+        if pivots is None:
+            arr = np.asarray(closes, dtype=float)
+            low_mask, high_mask = pivot_masks(arr, window)
+            supports = arr[low_mask[0]].tolist()
+            resistances = arr[high_mask[0]].tolist()
+            support_levels = cluster_levels(supports)
+            resistance_levels = cluster_levels(resistances)
+        else:
+            supports = pivots['support_pivots']
+            resistances = pivots['resistance_pivots']
+            support_levels = pivots['support_levels']
+            resistance_levels = pivots['resistance_levels']
         
         supports = sorted(set([round(s, 4) for s in supports]))[-3:] if supports else []
         resistances = sorted(set([round(r, 4) for r in resistances]))[:3] if resistances else []
@@ -70,7 +78,9 @@ class HistoricalPatternAnalyzer:
         return {
             'supports': supports,
             'resistances': resistances,
-            'current_zone': zone
+            'current_zone': zone,
+            'support_levels': sorted(support_levels, key=lambda x: x['touches'], reverse=True)[:3],
+            'resistance_levels': sorted(resistance_levels, key=lambda x: x['touches'], reverse=True)[:3]
         }
     
     def calculate_btc_correlation(self, coin_closes: List[float], btc_closes: List[float]) -> Dict:
@@ -78,18 +88,8 @@ class HistoricalPatternAnalyzer:
         if len(coin_closes) < 10 or len(btc_closes) < 10:
             return {'correlation': 0, 'strength': 'UNKNOWN', 'divergence': False}
         
-        min_len = min(len(coin_closes), len(btc_closes))
-        coin_data = coin_closes[-min_len:]
-        btc_data = btc_closes[-min_len:]
-        
-        coin_returns = [(coin_data[i] - coin_data[i-1]) / coin_data[i-1] for i in range(1, len(coin_data))]
-        btc_returns = [(btc_data[i] - btc_data[i-1]) / btc_data[i-1] for i in range(1, len(btc_data))]
-        
-        if len(coin_returns) < 5:
-            return {'correlation': 0, 'strength': 'UNKNOWN', 'divergence': False}
-        
         try:
-            correlation = np.corrcoef(coin_returns, btc_returns)[0, 1]
+            correlation = return_correlation(coin_closes, btc_closes)
         except:
             correlation = 0
         
@@ -122,9 +122,10 @@ class HistoricalPatternAnalyzer:
         if len(closes) < 20:
             return {'trend': 'UNKNOWN', 'strength': 0, 'channel_position': 50}
         
-        ma7 = sum(closes[-7:]) / 7
-        ma20 = sum(closes[-20:]) / 20
-        ma50 = sum(closes[-50:]) / 50 if len(closes) >= 50 else ma20
+        arr = np.asarray(closes, dtype=float)
+        ma7 = float(arr[-7:].mean())
+        ma20 = float(arr[-20:].mean())
+        ma50 = float(arr[-50:].mean()) if len(arr) >= 50 else ma20
         
         current = closes[-1]
         
@@ -144,8 +145,8 @@ class HistoricalPatternAnalyzer:
             trend = 'SIDEWAYS'
             strength = 50
         
-        high_20 = max(closes[-20:])
-        low_20 = min(closes[-20:])
+        high_20 = float(arr[-20:].max())
+        low_20 = float(arr[-20:].min())
         channel_position = ((current - low_20) / (high_20 - low_20) * 100) if high_20 != low_20 else 50
         
         return {
@@ -154,7 +155,8 @@ class HistoricalPatternAnalyzer:
             'channel_position': round(channel_position, 1),
             'ma7': round(ma7, 4),
             'ma20': round(ma20, 4),
-            'ma50': round(ma50, 4)
+            'ma50': round(ma50, 4),
+            'regression': regression_channel(arr, lookback=30)
         }
     
     def calculate_risk_reward(self, current_price: float, supports: List[float], resistances: List[float], fib_levels: Dict) -> Dict:
@@ -257,93 +259,62 @@ class HistoricalPatternAnalyzer:
         """RSI hesapla"""
         if len(prices) < period + 1:
             return 50
-        
-        gains = []
-        losses = []
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period if losses else 0.001
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return float(rolling_rsi(prices, period)[-1])
     
     def find_surge_events(self, data: Dict, min_surge: float = 10) -> List[Dict]:
-        """Geçmişteki yükseliş olaylarını bul"""
+        """Geçmişteki yükseliş olaylarını bul (vektörel)"""
         events = []
         closes = data['close']
-        volumes = data['volume']
         timestamps = data['timestamps']
         
-        for i in range(3, len(closes) - 3):
-            prev_3 = closes[i-3:i]
-            if not prev_3:
+        table = compute_surge_table(closes, data['volume'], min_surge=min_surge)
+        
+        for j, i in enumerate(table['idx']):
+            surge_pct = table['surge_pct'][j]
+            if i < 3 or i >= len(closes) - 3 or not surge_pct >= min_surge:
                 continue
             
-            base_price = sum(prev_3) / len(prev_3)
-            current_price = closes[i]
-            surge_pct = ((current_price - base_price) / base_price) * 100
+            rsi_before = float(table['rsi_before'][j])
+            vol_spike = float(table['vol_spike'][j])
+            max_gain = float(table['max_gain_3d'][j]) if i + 3 < len(closes) else 0
+            max_loss = float(table['max_loss_3d'][j]) if i + 3 < len(closes) else 0
+            week_change = table['week_change'][j]
+            week_change = None if np.isnan(week_change) else float(week_change)
             
-            if surge_pct >= min_surge:
-                rsi_before = self.calculate_rsi(closes[:i])
-                
-                avg_vol = sum(volumes[max(0,i-7):i]) / 7 if i >= 7 else sum(volumes[:i]) / max(1, i)
-                vol_spike = volumes[i] / avg_vol if avg_vol > 0 else 1
-                
-                if i + 3 < len(closes):
-                    next_3_max = max(closes[i+1:i+4])
-                    next_3_min = min(closes[i+1:i+4])
-                    max_gain = ((next_3_max - current_price) / current_price) * 100
-                    max_loss = ((next_3_min - current_price) / current_price) * 100
-                else:
-                    max_gain = 0
-                    max_loss = 0
-                
-                if i + 7 < len(closes):
-                    week_later = closes[i+7]
-                    week_change = ((week_later - current_price) / current_price) * 100
-                else:
-                    week_change = None
-                
-                if surge_pct > 30:
-                    pattern = "PARABOLIC"
-                elif vol_spike > 2 and surge_pct > 15:
-                    pattern = "VOLUME_BREAKOUT"
-                elif rsi_before < 30:
-                    pattern = "OVERSOLD_BOUNCE"
-                elif surge_pct > 15:
-                    pattern = "STRONG_SURGE"
-                else:
-                    pattern = "MODERATE_SURGE"
-                
-                events.append({
-                    'timestamp': timestamps[i] if i < len(timestamps) else None,
-                    'surge_pct': round(surge_pct, 1),
-                    'rsi_before': round(rsi_before, 1),
-                    'vol_spike': round(vol_spike, 2),
-                    'pattern': pattern,
-                    'outcome': {
-                        'max_gain_3d': round(max_gain, 1),
-                        'max_loss_3d': round(max_loss, 1),
-                        'week_change': round(week_change, 1) if week_change else None
-                    }
-                })
+            events.append({
+                'timestamp': timestamps[i] if i < len(timestamps) else None,
+                'surge_pct': round(float(surge_pct), 1),
+                'rsi_before': round(rsi_before, 1),
+                'vol_spike': round(vol_spike, 2),
+                'pattern': classify_surge(float(surge_pct), vol_spike, rsi_before),
+                'outcome': {
+                    'max_gain_3d': round(max_gain, 1),
+                    'max_loss_3d': round(max_loss, 1),
+                    'week_change': round(week_change, 1) if week_change else None
+                }
+            })
         
         return events
     
-    def analyze_current_surge(self, symbol: str, current_change: float) -> Dict:
+    def get_past_surges(self, symbol: str, min_surge: float, data: Optional[Dict] = None) -> List[Dict]:
+        """
+        Geçmiş yükselişler - önce kalıcı surge indeksinden,
+        indeks boşsa eldeki veriden hesapla
+        """
+        try:
+            surge_index.update(symbol)
+            events = surge_index.query(symbol, min_surge=min_surge, completed=True)
+            if events:
+                return events
+        except Exception as e:
+            logger.debug(f"Surge index error {symbol}: {e}")
+        
+        return self.find_surge_events(data, min_surge=min_surge) if data else []
+    
+    def analyze_current_surge(self, symbol: str, current_change: float, data: Optional[Dict] = None) -> Dict:
         """Mevcut yükselişi geçmişle karşılaştır"""
-        data = self.get_historical_data(symbol, 90)
+        if data is None:
+            data = self.get_historical_data(symbol, 90)
         
         if not data or len(data['close']) < 20:
             return {
@@ -372,7 +343,7 @@ class HistoricalPatternAnalyzer:
         else:
             current_pattern = "MODERATE_SURGE"
         
-        past_events = self.find_surge_events(data, min_surge=current_change * 0.7)
+        past_events = self.get_past_surges(symbol, current_change * 0.7, data)
         
         similar_events = [e for e in past_events 
                          if abs(e['surge_pct'] - current_change) < current_change * 0.5
@@ -444,9 +415,11 @@ class HistoricalPatternAnalyzer:
             }
         }
     
-    def advanced_coin_analysis(self, symbol: str, price: float, change: float) -> Dict:
+    def advanced_coin_analysis(self, symbol: str, price: float, change: float,
+                               data: Optional[Dict] = None, pivots: Optional[Dict] = None) -> Dict:
         """Tek coin için gelişmiş derin analiz"""
-        data = self.get_historical_data(symbol, 90)
+        if data is None:
+            data = self.get_historical_data(symbol, 90)
         btc_data = self.get_btc_data()
         
         result = {
@@ -469,7 +442,7 @@ class HistoricalPatternAnalyzer:
         low_90d = min(lows) if lows else price
         result['fib'] = self.calculate_fibonacci_levels(high_90d, low_90d)
         
-        result['sr'] = self.find_support_resistance(closes)
+        result['sr'] = self.find_support_resistance(closes, pivots=pivots)
         
         result['trend'] = self.calculate_trend_channel(closes)
         
@@ -487,11 +460,23 @@ class HistoricalPatternAnalyzer:
             result['fib']
         )
         
-        pattern_analysis = self.analyze_current_surge(symbol, change)
+        pattern_analysis = self.analyze_current_surge(symbol, change, data)
         result['pattern'] = pattern_analysis
         
         return result
     
+    def prefetch_histories(self, symbols: List[str], days: int = 90) -> Dict[str, Optional[Dict]]:
+        """Coin geçmişlerini (ve BTC'yi) eşzamanlı indir"""
+        symbols = [s for s in dict.fromkeys(symbols) if s]
+        if not symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols) + 1)) as pool:
+            btc_future = pool.submit(self.get_btc_data)
+            results = dict(zip(symbols, pool.map(lambda s: self.get_historical_data(s, days), symbols)))
+            btc_future.result()
+        return results
+    
     def deep_analysis_rising(self, rising_list: List[Dict]) -> str:
         """Yükselen coinler için MAX DERİN ANALİZ raporu - Türkçe açıklamalı"""
         msg = """🔬 <b>DERİN ANALİZ - MAX SEVİYE</b>
@@ -500,12 +485,20 @@ class HistoricalPatternAnalyzer:
 
 """
         
-        for coin in rising_list[:5]:
+        coins = rising_list[:5]
+        histories = self.prefetch_histories([c.get('symbol', '') for c in coins])
+        pivots = batch_levels({s: d['close'] for s, d in histories.items() if d})
+        
+        for coin in coins:
             symbol = coin.get('symbol', '')
             change = coin.get('change', 0)
             price = coin.get('price', 0)
             
-            analysis = self.advanced_coin_analysis(symbol, price, change)
+            data = histories.get(symbol)
+            if data:
+                analysis = self.advanced_coin_analysis(symbol, price, change, data, pivots.get(symbol))
+            else:
+                analysis = {'has_data': False}
             
             if not analysis['has_data']:
                 msg += f"<b>{symbol}</b> - Yetersiz veri\n\n"
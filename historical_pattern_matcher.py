@@ -9,8 +9,15 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import logging
 
+from pattern_search import pattern_search, sliding_windows, ANALOGUE_UNIVERSE
+
 logger = logging.getLogger(__name__)
 
+PATTERN_LABELS = [
+    "STRONG_BULLISH_MOMENTUM", "BULLISH_TREND", "STRONG_BEARISH_MOMENTUM",
+    "BEARISH_TREND", "CONSOLIDATION", "SIDEWAYS"
+]
+
 class HistoricalPatternMatcher:
     """Geçmiş verilerde pattern ara ve kıyasla"""
     
@@ -82,48 +89,96 @@ class HistoricalPatternMatcher:
         else:
             return "MIXED"
     
+    def label_windows(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                      closes: np.ndarray, window_size: int = 5) -> np.ndarray:
+        """
+        detect_pattern_in_candles'ın vektörel hali
+        Her pencere başlangıcı için pattern etiketi döndürür
+        """
+        bullish = sliding_windows((closes > opens).astype(int), window_size).sum(axis=1)
+        bearish = window_size - bullish
+        
+        cw = sliding_windows(closes, window_size)
+        first, last = cw[:, 0], cw[:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = np.where(first > 0, (last - first) / first * 100, 0)
+        
+        avg_body = sliding_windows(np.abs(closes - opens), window_size).mean(axis=1)
+        avg_range = sliding_windows(highs - lows, window_size).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_ratio = np.where(avg_range > 0, avg_body / avg_range, 0)
+        
+        conditions = [
+            (bullish >= 4) & (price_change > 5),
+            (bullish >= 3) & (price_change > 2),
+            (bearish >= 4) & (price_change < -5),
+            (bearish >= 3) & (price_change < -2),
+            body_ratio < 0.3,
+            np.abs(price_change) < 1
+        ]
+        return np.select(conditions, PATTERN_LABELS, default="MIXED")
+    
     def find_similar_patterns_in_history(self, symbol: str, current_pattern: str, 
                                          lookback_days: int = 365) -> List[Dict]:
-        """Geçmişte benzer pattern'leri bul"""
+        """Geçmişte benzer pattern'leri bul (etiket eşleşmesi, vektörel)"""
         candles = self.fetch_historical_data(symbol, lookback_days)
         
         if len(candles) < 30:
             return []
         
-        similar_instances = []
         window_size = 5
+        horizon = 10
+        opens = np.array([c['open'] for c in candles])
+        highs = np.array([c['high'] for c in candles])
+        lows = np.array([c['low'] for c in candles])
+        closes = np.array([c['close'] for c in candles])
         
-        for i in range(window_size, len(candles) - 10):
-            window = candles[i-window_size:i]
-            pattern = self.detect_pattern_in_candles(window, window_size)
+        labels = self.label_windows(opens, highs, lows, closes, window_size)
+        # Pencere candles[i-5:i] -> başlangıç indeksi i-5
+        starts = np.arange(0, len(candles) - 10 - window_size)
+        matches = starts[labels[starts] == current_pattern]
+        
+        similar_instances = []
+        for start in matches:
+            i = start + window_size
+            start_price = closes[i]
+            end = i + horizon
+            
+            max_gain = ((highs[i:end].max() - start_price) / start_price) * 100
+            max_loss = ((lows[i:end].min() - start_price) / start_price) * 100
+            final_change = ((closes[end - 1] - start_price) / start_price) * 100
             
-            if pattern == current_pattern:
-                future_candles = candles[i:i+10]
-                if len(future_candles) >= 5:
-                    start_price = future_candles[0]['close']
-                    
-                    max_price = max(c['high'] for c in future_candles)
-                    min_price = min(c['low'] for c in future_candles)
-                    end_price = future_candles[-1]['close']
-                    
-                    max_gain = ((max_price - start_price) / start_price) * 100
-                    max_loss = ((min_price - start_price) / start_price) * 100
-                    final_change = ((end_price - start_price) / start_price) * 100
-                    
-                    outcome = "BULLISH" if final_change > 2 else "BEARISH" if final_change < -2 else "NEUTRAL"
-                    
-                    similar_instances.append({
-                        'date': candles[i]['date'],
-                        'start_price': round(start_price, 2),
-                        'max_gain_percent': round(max_gain, 2),
-                        'max_loss_percent': round(max_loss, 2),
-                        'final_change_percent': round(final_change, 2),
-                        'outcome': outcome,
-                        'days_analyzed': len(future_candles)
-                    })
+            outcome = "BULLISH" if final_change > 2 else "BEARISH" if final_change < -2 else "NEUTRAL"
+            
+            similar_instances.append({
+                'date': candles[i]['date'],
+                'start_price': round(float(start_price), 2),
+                'max_gain_percent': round(float(max_gain), 2),
+                'max_loss_percent': round(float(max_loss), 2),
+                'final_change_percent': round(float(final_change), 2),
+                'outcome': outcome,
+                'days_analyzed': horizon
+            })
         
         return similar_instances
     
+    def find_nearest_analogues(self, symbol: str, candles: List[Dict], k: int = 20) -> List[Dict]:
+        """
+        Mevcut pencereye şekil olarak en yakın k geçmiş pencere
+        Tüm coin evreninde z-normalize mesafe ile aranır
+        """
+        closes = [c['close'] for c in candles]
+        universe = list(ANALOGUE_UNIVERSE)
+        symbol_upper = symbol.upper().replace('TRY', '').replace('USDT', '').strip()
+        if symbol_upper not in universe:
+            universe.append(symbol_upper)
+        
+        try:
+            return pattern_search.knn(closes, k=k, symbols=universe, exclude_symbol=symbol_upper)
+        except Exception as e:
+            logger.error(f"Benzerlik arama hatası: {e}")
+            return []
+    
     def calculate_pattern_statistics(self, similar_instances: List[Dict]) -> Dict:
         """Pattern istatistiklerini hesapla"""
         if not similar_instances:
@@ -173,7 +228,11 @@ class HistoricalPatternMatcher:
         
         current_pattern = self.detect_pattern_in_candles(candles, window_size=5)
         
-        similar = self.find_similar_patterns_in_history(symbol, current_pattern, lookback_days=365)
+        similar = self.find_nearest_analogues(symbol, candles)
+        method = 'KNN'
+        if not similar:
+            similar = self.find_similar_patterns_in_history(symbol, current_pattern, lookback_days=365)
+            method = 'LABEL'
         
         if not similar:
             return {
@@ -190,6 +249,8 @@ class HistoricalPatternMatcher:
             'current_price': candles[-1]['close'],
             'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
             'historical_data': stats,
+            'match_method': method,
+            'analogue_summary': pattern_search.analogue_outcomes(similar) if method == 'KNN' else None,
             'similar_instances': similar[:5]
         }
     
@@ -264,6 +325,7 @@ class HistoricalPatternMatcher:
             msg += f"\n📅 BENZER DÖNEMLER:\n"
             for i, s in enumerate(similar, 1):
                 outcome_emoji = "🟢" if s['outcome'] == 'BULLISH' else "🔴" if s['outcome'] == 'BEARISH' else "⚪"
-                msg += f"   {i}. {s['date']}: {outcome_emoji} %{s['final_change_percent']:+.1f}\n"
+                coin = f"{s['symbol']} " if s.get('symbol') else ""
+                msg += f"   {i}. {coin}{s['date']}: {outcome_emoji} %{s['final_change_percent']:+.1f}\n"
         
         return msg
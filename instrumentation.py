@@ -0,0 +1,286 @@
+"""
+📏 INSTRUMENTATION - Sıcak yol süreleri, harici API gecikmeleri, önbellek isabetleri
+Hangi modülün analiz döngüsünü yediğini görmek için hafif ölçüm katmanı
++ @timed / timer(): analiz fonksiyonu, zamanlanmış iş ve bölüm başına süre histogramı
++ instrument_http(): requests ile giden her istek host bazında ölçülür (HTTPAdapter.send sarmalanır)
++ instrument_scheduler(): add_job ile eklenen her iş kendi adıyla ölçülür
++ cache(): isabet/ıska sayaçları; register(): modüllerin kendi sayaçları (kuyruk derinliği vb.)
++ snapshot(): /api/status için en pahalılar özeti, prometheus(): /metrics için metin formatı
++ Ölçüm başına maliyet birkaç µs (kilit + kova araması) - sıcak yollarda kullanılabilir
+"""
+
+import bisect
+import functools
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'yatirim'
+# Saniye - ms'lik göstergelerden saatlik işlere kadar
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 1800, 3600)
+KINDS = ('function', 'job', 'http', 'section')
+
+
+class Histogram:
+    """Sabit kovalı süre histogramı (Prometheus ile aynı kova mantığı)"""
+
+    __slots__ = ('counts', 'sum', 'count', 'max', 'errors', 'last')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.errors = 0
+        self.last = 0.0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+        self.last = time.time()
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Kova içinde doğrusal ara değer (son kova için gözlenen en büyük değer)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(BUCKETS):
+                    return self.max
+                lower = BUCKETS[i - 1] if i else 0.0
+                return min(lower + (BUCKETS[i] - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_s': round(self.sum, 3),
+            'avg_ms': round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class Instrumentation:
+    """
+    histograms: (tür, ad) -> Histogram
+    caches: önbellek adı -> [isabet, ıska]
+    collectors: ad -> sayaç sözlüğü döndüren fonksiyon (modüllerin metrics()/status())
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.caches = defaultdict(lambda: [0, 0])
+        self.collectors = OrderedDict()
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._http_send = None
+
+    # ==================== KAYIT ====================
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            hist = self.histograms.get((kind, name))
+            if hist is None:
+                hist = self.histograms[(kind, name)] = Histogram()
+            hist.observe(seconds, error)
+
+    @contextmanager
+    def timer(self, kind: str, name: str):
+        """with instrumentation.timer('section', 'rapor'): ... - istisna hata olarak sayılır"""
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - started, error)
+
+    def timed(self, name: Optional[str] = None, kind: str = 'function'):
+        """Fonksiyon dekoratörü - ad verilmezse modül.Sınıf.fonksiyon"""
+        def decorate(func: Callable):
+            label = name or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                error = False
+                try:
+                    return func(*args, **kwargs)
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    self.observe(kind, label, time.perf_counter() - started, error)
+            return wrapper
+        return decorate
+
+    def cache(self, name: str, hit: bool):
+        with self._lock:
+            self.caches[name][0 if hit else 1] += 1
+
+    def register(self, name: str, collector: Callable[[], Dict]):
+        """Modül sayaçları - her okumada çağrılır, sayısal alanlar /metrics'e gösterge olarak çıkar"""
+        self.collectors[name] = collector
+
+    # ==================== OTOMATİK ÖLÇÜM ====================
+
+    def instrument_http(self):
+        """Tüm requests oturumları: host başına gecikme, 4xx/5xx ve bağlantı hataları"""
+        if self._http_send is not None:
+            return
+        from requests.adapters import HTTPAdapter
+        self._http_send = original = HTTPAdapter.send
+        instrumentation = self
+
+        def send(adapter, request, **kwargs):
+            host = urlparse(request.url).hostname or 'unknown'
+            started = time.perf_counter()
+            error = True
+            try:
+                response = original(adapter, request, **kwargs)
+                error = response.status_code >= 400
+                return response
+            finally:
+                instrumentation.observe('http', host, time.perf_counter() - started, error)
+
+        HTTPAdapter.send = send
+
+    def instrument_scheduler(self, scheduler):
+        """scheduler.add_job ile eklenen işler iş id'siyle ölçülür"""
+        add_job = scheduler.add_job
+
+        def instrumented_add_job(func, *args, **kwargs):
+            name = kwargs.get('id') or getattr(func, '__name__', str(func))
+            return add_job(self.timed(name, kind='job')(func), *args, **kwargs)
+
+        scheduler.add_job = instrumented_add_job
+        return scheduler
+
+    # ==================== OKUMA ====================
+
+    def collect(self) -> Dict[str, Dict]:
+        result = {}
+        for name, collector in list(self.collectors.items()):
+            try:
+                result[name] = collector()
+            except Exception as e:
+                result[name] = {'error': str(e)}
+        return result
+
+    def cache_rates(self) -> Dict[str, Dict]:
+        with self._lock:
+            items = [(name, hits, misses) for name, (hits, misses) in self.caches.items()]
+        return {name: {'hits': hits, 'misses': misses,
+                       'hit_rate': round(hits / (hits + misses) * 100, 1) if hits + misses else 0.0}
+                for name, hits, misses in items}
+
+    def snapshot(self, limit: int = 10) -> Dict:
+        """/api/status özeti: tür başına toplam süreye göre en pahalı `limit` kayıt"""
+        with self._lock:
+            items = [(kind, name, hist.summary()) for (kind, name), hist in self.histograms.items()]
+        result = {'uptime': round(time.time() - self.started)}
+        for kind in KINDS:
+            rows = sorted(((name, s) for k, name, s in items if k == kind),
+                          key=lambda row: row[1]['total_s'], reverse=True)
+            result[kind] = {name: s for name, s in rows[:limit]}
+        result['caches'] = self.cache_rates()
+        return result
+
+    # ==================== PROMETHEUS ====================
+
+    @staticmethod
+    def _label(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @staticmethod
+    def _metric(*parts) -> str:
+        return re.sub(r'[^a-zA-Z0-9_]', '_', '_'.join([METRIC_PREFIX, *parts])).lower()
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        if isinstance(value, bool):
+            return float(value)
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            return float(value)
+        return None
+
+    def _gauges(self, lines: List[str]):
+        """Toplayıcı çıktıları: düz sayılar -> gösterge, iç içe sözlükler -> key etiketli gösterge"""
+        for name, data in self.collect().items():
+            if not isinstance(data, dict):
+                continue
+            series = defaultdict(list)
+            for key, value in data.items():
+                number = self._number(value)
+                if number is not None:
+                    series[self._metric(name, key)].append(('', number))
+                elif isinstance(value, dict):
+                    for field, inner in value.items():
+                        number = self._number(inner)
+                        if number is not None:
+                            series[self._metric(name, field)].append((f'{{key="{self._label(key)}"}}', number))
+            for metric, samples in series.items():
+                lines.append(f"# TYPE {metric} gauge")
+                lines.extend(f"{metric}{labels} {value:g}" for labels, value in samples)
+
+    def prometheus(self) -> str:
+        """Prometheus metin formatı (text/plain; version=0.0.4)"""
+        duration = self._metric('duration_seconds')
+        errors = self._metric('errors_total')
+        with self._lock:
+            items = [((kind, name), list(h.counts), h.sum, h.count, h.errors)
+                     for (kind, name), h in sorted(self.histograms.items())]
+            caches = [(name, hits, misses) for name, (hits, misses) in sorted(self.caches.items())]
+
+        lines = [f"# HELP {duration} Analiz fonksiyonu, iş, harici host ve bölüm süreleri",
+                 f"# TYPE {duration} histogram"]
+        for (kind, name), counts, total, count, _ in items:
+            labels = f'kind="{kind}",name="{self._label(name)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f'{duration}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{duration}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{duration}_count{{{labels}}} {count}')
+
+        lines += [f"# HELP {errors} Hata ile biten çağrılar (istisna veya HTTP 4xx/5xx)",
+                  f"# TYPE {errors} counter"]
+        lines += [f'{errors}{{kind="{kind}",name="{self._label(name)}"}} {n}'
+                  for (kind, name), _, _, _, n in items]
+
+        cache_metric = self._metric('cache_requests_total')
+        lines += [f"# TYPE {cache_metric} counter"]
+        for name, hits, misses in caches:
+            lines.append(f'{cache_metric}{{cache="{self._label(name)}",result="hit"}} {hits}')
+            lines.append(f'{cache_metric}{{cache="{self._label(name)}",result="miss"}} {misses}')
+
+        uptime = self._metric('uptime_seconds')
+        lines += [f"# TYPE {uptime} gauge", f"{uptime} {time.time() - self.started:.0f}"]
+        self._gauges(lines)
+        return '\n'.join(lines) + '\n'
+
+
+instrumentation = Instrumentation()
+timed = instrumentation.timed
+timer = instrumentation.timer
@@ -0,0 +1,242 @@
+"""
+🕯️ INTRADAY BARS - Paylaşılan gün içi mum önbelleği (1m / 5m / 1h)
+Scalping, sniper ve gerçek zamanlı sinyal modülleri coin başına indirme yapmaz
++ Tek BTCTurk ticker isteği tüm TRY paritelerinin en yeni mumunu günceller
+  (her aralık için sadece son mum - açık/yüksek/düşük/kapanış)
++ Geçmiş mumlar sembol başına bir kez klines ile tohumlanır (arka planda, sınırlı hızda)
+  Boş/hatalı yanıt tohumlanmış sayılmaz - artan beklemeyle yeniden denenir
++ Servis uzun süre veri alamazsa kısa aralıklar yeniden tohumlanır
++ Son ticker listesi de paylaşılır - tarama yapan modüller ayrıca indirmez
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import logging
+
+import requests
+
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+BTCTURK_TICKER = "https://api.btcturk.com/api/v2/ticker"
+BTCTURK_KLINES = "https://graph-api.btcturk.com/v1/klines/history"
+
+# aralık -> (saniye, klines çözünürlüğü, tutulan mum sayısı)
+INTERVALS = {
+    '1m': (60, 1, 240),
+    '5m': (300, 5, 288),
+    '1h': (3600, 60, 120),
+}
+
+REFRESH_SECONDS = 60
+TICKER_MAX_AGE = 90
+SEEDS_PER_CYCLE = 60        # Bir yenilemede en fazla klines isteği
+SEED_PAUSE = 0.2
+SEED_RETRY_BASE = 120       # Boş/hatalı klines: 2 dk, 4 dk, ... en fazla 1 saat sonra yeniden
+SEED_RETRY_MAX = 3600
+
+
+class IntradayBarCache:
+    """
+    bars: (sembol, aralık) -> deque([ts, open, high, low, close])
+    Ticker'dan gelen fiyat, her aralığın o anki mumuna katlanır
+    """
+
+    def __init__(self):
+        self.bars = {}
+        self.seeded = set()         # (sembol, aralık)
+        self.pending = deque()      # tohumlanacak (sembol, aralık)
+        self.retry_at = {}          # (sembol, aralık) -> başarısız tohumdan sonra en erken deneme
+        self.seed_failures = {}
+        self.universe = []
+        self.last_tickers = []
+        self.updated = 0
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self.stats = {'refreshes': 0, 'seeds': 0, 'seed_errors': 0, 'reseeds': 0}
+
+    # ==================== GÜNCELLEME ====================
+
+    def _fold(self, symbol: str, price: float, ts: float):
+        for interval, (seconds, _, keep) in INTERVALS.items():
+            bucket = int(ts) - int(ts) % seconds
+            series = self.bars.setdefault((symbol, interval), deque(maxlen=keep))
+            if series and series[-1][0] == bucket:
+                bar = series[-1]
+                bar[2] = max(bar[2], price)
+                bar[3] = min(bar[3], price)
+                bar[4] = price
+            elif not series or series[-1][0] < bucket:
+                series.append([bucket, price, price, price, price])
+
+    def on_tickers(self, tickers: List[Dict], ts: Optional[float] = None):
+        """BTCTurk ticker listesini en yeni mumlara uygula"""
+        ts = ts or time.time()
+        universe = []
+        with self._lock:
+            # Uzun boşluk (servis durdu, ağ koptu) - kısa aralıkların geçmişi artık eksik
+            if self.updated and ts - self.updated > 3 * INTERVALS['1m'][0]:
+                stale = {k for k in self.seeded if k[1] != '1h'}
+                self.seeded -= stale
+                self.stats['reseeds'] += len(stale)
+            for t in tickers:
+                pair = t.get('pairNormalized', '') if isinstance(t, dict) else ''
+                if not pair.endswith('_TRY'):
+                    continue
+                try:
+                    price = float(t.get('last', 0) or 0)
+                except (TypeError, ValueError):
+                    continue
+                if price <= 0:
+                    continue
+                symbol = pair[:-4]
+                universe.append(symbol)
+                self._fold(symbol, price, ts)
+            self.universe = universe
+            self.last_tickers = tickers
+            self.updated = ts
+            queued = set(self.pending)
+            for symbol in universe:
+                for interval in INTERVALS:
+                    key = (symbol, interval)
+                    if key not in self.seeded and key not in queued:
+                        self.pending.append(key)
+
+    def fetch_tickers(self) -> List[Dict]:
+        try:
+            return self.session.get(BTCTURK_TICKER, timeout=15).json().get('data', []) or []
+        except Exception as e:
+            logger.error(f"Gün içi mum ticker hatası: {e}")
+            return []
+
+    @timed()
+    def refresh(self) -> int:
+        """Tek ticker isteğiyle tüm sembollerin son mumlarını güncelle"""
+        with self._refresh_lock:
+            tickers = self.fetch_tickers()
+            if tickers:
+                self.on_tickers(tickers)
+                self.stats['refreshes'] += 1
+            return len(self.universe)
+
+    def seed(self, symbol: str, interval: str) -> bool:
+        """Sembolün geçmiş mumlarını klines ile yükle (ticker mumuyla birleştirilir)"""
+        seconds, resolution, keep = INTERVALS[interval]
+        now = int(time.time())
+        try:
+            data = self.session.get(BTCTURK_KLINES, params={
+                'symbol': f"{symbol}TRY", 'resolution': resolution,
+                'from': now - seconds * keep, 'to': now
+            }, timeout=15).json()
+            history = [[int(t), float(o), float(h), float(l), float(c)]
+                       for t, o, h, l, c in zip(data.get('t', []), data.get('o', []), data.get('h', []),
+                                                data.get('l', []), data.get('c', []))]
+        except Exception as e:
+            logger.debug(f"Gün içi mum klines hatası {symbol} {interval}: {e}")
+            history = []
+
+        if not history:
+            # Hata gövdesi, s: no_data, rate limit - tohumlanmış sayılmaz, beklemeyle kuyruğa döner
+            self._retry_later((symbol, interval))
+            return False
+
+        with self._lock:
+            current = self.bars.get((symbol, interval), deque())
+            merged = {bar[0]: bar for bar in history}
+            for bar in current:
+                if bar[0] in merged:
+                    old = merged[bar[0]]
+                    merged[bar[0]] = [bar[0], old[1], max(old[2], bar[2]), min(old[3], bar[3]), bar[4]]
+                else:
+                    merged[bar[0]] = bar
+            self.bars[(symbol, interval)] = deque((merged[t] for t in sorted(merged)), maxlen=keep)
+            self.seeded.add((symbol, interval))
+            self.retry_at.pop((symbol, interval), None)
+            self.seed_failures.pop((symbol, interval), None)
+            self.stats['seeds'] += 1
+        return True
+
+    def _retry_later(self, key):
+        with self._lock:
+            failures = self.seed_failures.get(key, 0) + 1
+            self.seed_failures[key] = failures
+            self.retry_at[key] = time.time() + min(SEED_RETRY_MAX, SEED_RETRY_BASE * 2 ** (failures - 1))
+            self.stats['seed_errors'] += 1
+            if key not in self.pending:
+                self.pending.append(key)
+
+    def seed_pending(self, limit: int = SEEDS_PER_CYCLE) -> int:
+        done = 0
+        with self._lock:
+            remaining = len(self.pending)
+        while done < limit and remaining > 0:
+            remaining -= 1
+            with self._lock:
+                if not self.pending:
+                    break
+                key = self.pending.popleft()
+                if self.retry_at.get(key, 0) > time.time():
+                    self.pending.append(key)    # bekleme süresi dolmadı
+                    continue
+            self.seed(*key)
+            done += 1
+            time.sleep(SEED_PAUSE)
+        return done
+
+    # ==================== OKUMA ====================
+
+    def tickers(self, max_age: float = TICKER_MAX_AGE) -> List[Dict]:
+        """Son ticker listesi; eskiyse yenilenir"""
+        if not self.last_tickers or time.time() - self.updated > max_age:
+            self.refresh()
+        return self.last_tickers
+
+    def get(self, symbol: str, interval: str = '1h', limit: Optional[int] = None) -> Dict[str, List]:
+        """Önbellekteki mumlar (timestamps/open/high/low/close) - ağ isteği yapmaz"""
+        with self._lock:
+            series = list(self.bars.get((symbol.upper(), interval), ()))
+        if limit:
+            series = series[-limit:]
+        return {
+            'timestamps': [b[0] for b in series],
+            'open': [b[1] for b in series],
+            'high': [b[2] for b in series],
+            'low': [b[3] for b in series],
+            'close': [b[4] for b in series]
+        }
+
+    def closes(self, symbol: str, interval: str = '1h', limit: Optional[int] = None) -> List[float]:
+        return self.get(symbol, interval, limit)['close']
+
+    def is_seeded(self, symbol: str, interval: str = '1h') -> bool:
+        return (symbol.upper(), interval) in self.seeded
+
+    def start_background_refresh(self, interval: int = REFRESH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                started = time.time()
+                try:
+                    self.refresh()
+                    self.seed_pending()
+                except Exception as e:
+                    logger.error(f"Gün içi mum yenileme hatası: {e}")
+                time.sleep(max(1, interval - (time.time() - started)))
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='intraday-bars')
+        self._thread.start()
+
+    def metrics(self) -> Dict:
+        return {**self.stats, 'symbols': len(self.universe), 'series': len(self.bars),
+                'seeded': len(self.seeded), 'pending': len(self.pending),
+                'age': round(time.time() - self.updated, 1) if self.updated else None}
+
+
+intraday_bars = IntradayBarCache()
@@ -0,0 +1,165 @@
+"""
+📐 PIVOT / LEVEL ENGINE - Vektörel destek/direnç ve kanal hesapları
++ Kayan max/min (sliding_window_view) ile swing high/low tespiti
++ Fiyat yoğunluğuna göre seviye kümeleme
++ Kapalı form doğrusal regresyon kanalı
++ Kapalı form getiri korelasyonu
+Tüm fonksiyonlar tek seri veya (coin x mum) matrisi üzerinde çalışır
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _as_matrix(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=float)
+    return arr[np.newaxis, :] if arr.ndim == 1 else arr
+
+
+def pivot_masks(values, window: int = 10):
+    """
+    Swing low / swing high maskeleri
+    i noktası, [i-window+1, i+window-1] aralığının min/max'ı ise pivot sayılır
+    (find_support_resistance'taki all(...) koşulu ile aynı)
+    Dönen maskeler values ile aynı şekildedir
+    """
+    mat = _as_matrix(values)
+    n = mat.shape[-1]
+    lows = np.zeros(mat.shape, dtype=bool)
+    highs = np.zeros(mat.shape, dtype=bool)
+    span = 2 * window - 1
+    if n < window * 2:
+        return lows, highs
+
+    windows = np.lib.stride_tricks.sliding_window_view(mat, span, axis=-1)
+    # windows[:, k] merkezi k + window - 1
+    centers = mat[:, window - 1:window - 1 + windows.shape[1]]
+    roll_min = windows.min(axis=-1)
+    roll_max = windows.max(axis=-1)
+
+    # Orijinal döngü aralığı: window <= i < n - window
+    first = 1
+    last = n - 2 * window + 1
+    lows[:, window:n - window] = (centers <= roll_min)[:, first:last]
+    highs[:, window:n - window] = (centers >= roll_max)[:, first:last]
+    return lows, highs
+
+
+def cluster_levels(levels, tolerance_pct: float = 1.5) -> List[Dict]:
+    """
+    Yakın seviyeleri fiyat yoğunluğuna göre kümele
+    Sıralı seviyeler arası fark tolerance_pct'den küçükse aynı kümeye girer
+    Küme merkezi = ortalama, touches = kümeye düşen pivot sayısı
+    """
+    arr = np.sort(np.asarray(levels, dtype=float))
+    arr = arr[np.isfinite(arr) & (arr > 0)]
+    if len(arr) == 0:
+        return []
+
+    gaps = np.diff(arr) / arr[:-1] * 100
+    breaks = np.concatenate(([0], np.flatnonzero(gaps > tolerance_pct) + 1, [len(arr)]))
+
+    clusters = []
+    for start, end in zip(breaks[:-1], breaks[1:]):
+        members = arr[start:end]
+        clusters.append({
+            'price': round(float(members.mean()), 4),
+            'touches': int(len(members)),
+            'low': round(float(members[0]), 4),
+            'high': round(float(members[-1]), 4)
+        })
+    return clusters
+
+
+def regression_channel(closes, lookback: Optional[int] = None) -> Dict:
+    """
+    Kapalı form en küçük kareler kanalı
+    slope: mum başına yüzde eğim, r2: uyum, upper/lower: ±2 std bant
+    """
+    y = np.asarray(closes, dtype=float)
+    if lookback:
+        y = y[-lookback:]
+    n = len(y)
+    if n < 3:
+        return {'slope_pct': 0, 'r2': 0, 'upper': None, 'lower': None, 'mid': None, 'position': 50}
+
+    x = np.arange(n, dtype=float)
+    x_mean = (n - 1) / 2
+    y_mean = y.mean()
+    sxx = n * (n * n - 1) / 12
+    sxy = ((x - x_mean) * (y - y_mean)).sum()
+    slope = sxy / sxx
+    intercept = y_mean - slope * x_mean
+
+    fitted = intercept + slope * x
+    resid = y - fitted
+    ss_tot = ((y - y_mean) ** 2).sum()
+    r2 = 1 - (resid ** 2).sum() / ss_tot if ss_tot > 0 else 0
+    band = 2 * resid.std()
+
+    mid = fitted[-1]
+    upper = mid + band
+    lower = mid - band
+    position = (y[-1] - lower) / (upper - lower) * 100 if upper > lower else 50
+
+    return {
+        'slope_pct': round(float(slope / y_mean * 100), 3) if y_mean else 0,
+        'r2': round(float(r2), 3),
+        'upper': round(float(upper), 4),
+        'lower': round(float(lower), 4),
+        'mid': round(float(mid), 4),
+        'position': round(float(np.clip(position, 0, 100)), 1)
+    }
+
+
+def pct_returns(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.diff(arr, axis=-1) / arr[..., :-1]
+
+
+def return_correlation(a_closes, b_closes) -> float:
+    """İki serinin getiri korelasyonu (kapalı form Pearson), sona hizalı"""
+    n = min(len(a_closes), len(b_closes))
+    if n < 3:
+        return 0.0
+    ra = pct_returns(np.asarray(a_closes, dtype=float)[-n:])
+    rb = pct_returns(np.asarray(b_closes, dtype=float)[-n:])
+    ra = ra - ra.mean()
+    rb = rb - rb.mean()
+    denom = np.sqrt((ra * ra).sum() * (rb * rb).sum())
+    if not denom > 0:
+        return 0.0
+    return float((ra * rb).sum() / denom)
+
+
+def batch_levels(series_map: Dict[str, List[float]], window: int = 10,
+                 tolerance_pct: float = 1.5) -> Dict[str, Dict]:
+    """
+    Birden çok coin için pivot seviyeleri tek geçişte
+    Seriler sona hizalanır, kısa seriler başta NaN ile doldurulur
+    """
+    names = [k for k, v in series_map.items() if v is not None and len(v) >= window * 2]
+    if not names:
+        return {}
+
+    length = max(len(series_map[k]) for k in names)
+    mat = np.full((len(names), length), np.nan)
+    for row, name in enumerate(names):
+        values = series_map[name]
+        mat[row, length - len(values):] = values
+
+    with np.errstate(invalid='ignore'):
+        lows, highs = pivot_masks(mat, window)
+    result = {}
+    for row, name in enumerate(names):
+        valid = ~np.isnan(mat[row])
+        valid[:length - len(series_map[name]) + window] = False
+        result[name] = {
+            'support_pivots': mat[row][lows[row] & valid].tolist(),
+            'resistance_pivots': mat[row][highs[row] & valid].tolist(),
+            'support_levels': cluster_levels(mat[row][lows[row] & valid], tolerance_pct),
+            'resistance_levels': cluster_levels(mat[row][highs[row] & valid], tolerance_pct)
+        }
+    return result
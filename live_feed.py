@@ -0,0 +1,155 @@
+"""
+📡 LIVE FEED - Dashboard için Server-Sent Events yayını
+Tarayıcılar 30 saniyede bir API yoklamak yerine tek bir akışa bağlanır
++ Her konu (piyasa, sinyaller, portföy...) için tek üretici thread
++ Üretici sonucu öncekiyle karşılaştırılır, sadece değişen alanlar yayınlanır
++ Tüm bağlı istemciler aynı olayı alır - sunucu yükü sekme sayısından bağımsız
++ Hiç abone yokken üreticiler çalışmaz, ilk abone gelince hemen uyanır
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+CLIENT_QUEUE_SIZE = 256
+
+
+def diff_state(old: Optional[Dict], new: Dict) -> Dict:
+    """Üst seviye anahtar farkı: değişen/yeni anahtarlar 'set', silinenler 'unset'"""
+    old = old or {}
+    changed = {k: v for k, v in new.items() if old.get(k, object()) != v}
+    removed = [k for k in old if k not in new]
+    return {'set': changed, 'unset': removed}
+
+
+def _sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class LiveFeed:
+    """
+    Tek üretici - çok abone yayın kanalı
+    state: konu başına son yayınlanan tam görüntü (yeni abonelere ilk olay olarak gider)
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.seq = 0
+        self.subscribers = set()
+        self.producers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.stats = {'published': 0, 'skipped': 0, 'dropped_clients': 0}
+
+    # ==================== YAYIN ====================
+
+    def publish(self, topic: str, data: Dict) -> bool:
+        """Konunun yeni görüntüsünü yayınla; değişiklik yoksa olay üretilmez"""
+        with self._lock:
+            patch = diff_state(self.state.get(topic), data)
+            if not patch['set'] and not patch['unset'] and topic in self.state:
+                self.stats['skipped'] += 1
+                return False
+            self.state[topic] = data
+            self.seq += 1
+            message = _sse('diff', {'topic': topic, 'seq': self.seq, **patch}, self.seq)
+            stale = []
+            for client in self.subscribers:
+                try:
+                    client.put_nowait((topic, message))
+                except queue.Full:
+                    stale.append(client)
+            # Yetişemeyen istemci bağlantısı kesilir, tarayıcı yeniden bağlanıp tam görüntü alır
+            for client in stale:
+                self.subscribers.discard(client)
+                self._close(client)
+                self.stats['dropped_clients'] += 1
+            self.stats['published'] += 1
+            return True
+
+    @staticmethod
+    def _close(client: queue.Queue):
+        while True:
+            try:
+                client.get_nowait()
+            except queue.Empty:
+                break
+        client.put_nowait(None)
+
+    def add_producer(self, topic: str, producer: Callable[[], Dict], interval: float):
+        """producer() her interval saniyede bir (abone varken) çağrılır ve yayınlanır"""
+        self.producers[topic] = (producer, interval)
+
+        def loop():
+            while True:
+                if self.subscribers:
+                    try:
+                        data = producer()
+                        if data is not None:
+                            self.publish(topic, data)
+                    except Exception as e:
+                        logger.error(f"Canlı akış üretici hatası ({topic}): {e}")
+                    time.sleep(interval)
+                else:
+                    self._wake.wait(timeout=interval)
+
+        threading.Thread(target=loop, daemon=True, name=f'live-{topic}').start()
+
+    # ==================== ABONELİK ====================
+
+    def subscribe(self, topics: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        SSE olay üreteci - önce tam görüntü ('snapshot'), sonra farklar ('diff')
+        topics verilirse sadece o konular gönderilir
+        """
+        client = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        with self._lock:
+            snapshot = {t: d for t, d in self.state.items() if not topics or t in topics}
+            seq = self.seq
+            self.subscribers.add(client)
+        self._wake.set()
+        self._wake.clear()
+
+        try:
+            yield 'retry: 3000\n\n'
+            yield _sse('snapshot', {'seq': seq, 'state': snapshot}, seq)
+            while True:
+                try:
+                    message = client.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    return
+                topic, payload = message
+                if topics and topic not in topics:
+                    continue
+                yield payload
+        finally:
+            with self._lock:
+                self.subscribers.discard(client)
+
+    def response(self, topics: Optional[List[str]] = None):
+        """Flask text/event-stream yanıtı"""
+        from flask import Response, stream_with_context
+        return Response(stream_with_context(self.subscribe(topics)), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    def metrics(self) -> Dict:
+        return {**self.stats, 'subscribers': len(self.subscribers), 'topics': list(self.state), 'seq': self.seq}
+
+
+live_feed = LiveFeed()
@@ -8,7 +8,7 @@ import numpy as np
 from datetime import datetime
 import pytz
 from pathlib import Path
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
@@ -22,6 +22,18 @@ import threading
 import logging
 import time
 
+from telegram_outbox import telegram_outbox
+from command_cache import command_cache
+from market_overview import market_overview
+from live_feed import live_feed
+from position_monitor import position_monitor
+from intraday_bars import intraday_bars
+from order_books import order_books
+from pooled_model import pooled_model
+from online_learner import online_learner
+from feature_store import feature_store
+from instrumentation import instrumentation
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -233,12 +245,48 @@ try:
 except:
     stock_portfolio = None
 
+try:
+    from market_snapshot import market_snapshot
+except:
+    market_snapshot = None
+
+try:
+    from symbol_universe import symbol_universe
+except:
+    symbol_universe = None
+
+try:
+    from coin_markets import coin_markets
+except:
+    coin_markets = None
+
 try:
     from stock_backtest import StockBacktest
     stock_backtest = StockBacktest()
 except:
     stock_backtest = None
 
+# ===================== ÖLÇÜM =====================
+# Harici API gecikmeleri host bazında; modül sayaçları /metrics ve /api/status'ta
+instrumentation.instrument_http()
+instrumentation.register('command_cache', command_cache.hit_rates)
+instrumentation.register('telegram_outbox', telegram_outbox.metrics)
+instrumentation.register('position_monitor', position_monitor.metrics)
+instrumentation.register('intraday_bars', intraday_bars.metrics)
+instrumentation.register('order_books', order_books.status)
+instrumentation.register('feature_store', feature_store.status)
+instrumentation.register('pooled_model', pooled_model.status)
+
+
+def _chart_queue_depth():
+    from chart_analyzer import chart_queue
+    return {'pending': chart_queue.pending()}
+
+
+instrumentation.register('chart_queue', _chart_queue_depth)
+if quantum_system:
+    instrumentation.register('module_runtime_errors', lambda: dict(quantum_system.health_monitor.runtime_errors))
+
 # ===================== YARDIMCI FONKSİYONLAR =====================
 import re as _re_module
 
@@ -616,8 +664,10 @@ def get_global_market_sentiment():
         
         for symbol, name in indices.items():
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
+                if market_snapshot:
+                    hist = market_snapshot.history(symbol, 2)
+                else:
+                    hist = yf.Ticker(symbol).history(period='2d')
                 if len(hist) >= 2:
                     change = ((hist['Close'].iloc[-1] - hist['Close'].iloc[-2]) / hist['Close'].iloc[-2]) * 100
                     results[name] = round(change, 2)
@@ -679,6 +729,41 @@ def get_btc_technical_analysis():
     except:
         return None
 
+# ===================== PİYASA ÖZETİ =====================
+# Raporlar, API uçları ve komutlar market_overview'un yayınladığı görüntüden okur
+MEGA_OVERVIEW_LIMIT = 7
+
+def _overview_mega_rising(view):
+    from mega_analyzer import mega_analyzer
+    return mega_analyzer.find_rising_coins(MEGA_OVERVIEW_LIMIT, view['tickers'])
+
+def _overview_mega_potential(view):
+    from mega_analyzer import mega_analyzer
+    return mega_analyzer.find_potential_risers(MEGA_OVERVIEW_LIMIT, view['tickers'])
+
+def _overview_scores(view):
+    """Mega analizden geçen coinlerin skor/sinyal tablosu"""
+    scores = {}
+    for coin in (view.get('potential') or []) + (view.get('rising') or []):
+        scores[coin['symbol']] = {'score': coin['score'], 'signal': coin['signal']}
+    return scores
+
+market_overview.add_section('rising', _overview_mega_rising)
+market_overview.add_section('potential', _overview_mega_potential)
+market_overview.add_section('scores', _overview_scores)
+market_overview.add_section('rising_basic', lambda view: analyze_rising_cryptos(view['tickers']))
+market_overview.add_section('potential_basic', lambda view: analyze_potential_risers(view['tickers']))
+market_overview.add_section('btc_technical', lambda view: get_btc_technical_analysis())
+market_overview.add_section('global', lambda view: get_global_market_sentiment())
+
+def overview_rising_message():
+    from mega_analyzer import mega_analyzer
+    return mega_analyzer.format_mega_message(market_overview.get().get('rising') or [], "YÜKSELEN KRİPTOLAR (MEGA ANALİZ)")
+
+def overview_potential_message():
+    from mega_analyzer import mega_analyzer
+    return mega_analyzer.format_mega_message(market_overview.get().get('potential') or [], "YÜKSELECEK POTANSİYELİ (MEGA ANALİZ)")
+
 def get_stock_data():
     stocks_list = ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'NVDA', 'META', 'ADBE', 'CRM', 'AMD', 'NFLX']
     stocks = []
@@ -698,28 +783,21 @@ def get_stock_data():
 
 # ===================== TELEGRAM =====================
 def send_telegram(msg):
-    try:
-        resp = requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            json={'chat_id': TELEGRAM_CHAT_ID, 'text': msg, 'parse_mode': 'HTML'},
-            timeout=10
-        )
-        return resp.status_code == 200
-    except:
-        return False
+    """Varsayılan sohbete - giden kuyruğa bırakır, ağı beklemez"""
+    return telegram_outbox.send(msg, TELEGRAM_CHAT_ID, token=TELEGRAM_TOKEN)
 
 def send_telegram_to(chat_id, msg):
-    try:
-        requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            json={'chat_id': chat_id, 'text': msg, 'parse_mode': 'HTML'},
-            timeout=10
-        )
-    except:
-        pass
+    telegram_outbox.send(msg, chat_id, token=TELEGRAM_TOKEN)
 
 def get_usd_try_rate():
     """USD/TRY kurunu al"""
+    try:
+        if market_snapshot:
+            quote = market_snapshot.quote('USDTRY=X')
+            if quote and quote['price'] > 0:
+                return quote['price']
+    except:
+        pass
     try:
         resp = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
         if resp.status_code == 200:
@@ -737,7 +815,7 @@ def run_stock_analysis():
     
     try:
         now = get_turkey_time()
-        results = stock_analyzer.scan_all_stocks()
+        results = command_cache.get_or_compute('tarama-hisse', None, stock_analyzer.scan_all_stocks)
         
         if not results:
             logger.warning("Hisse sonuçları alınamadı")
@@ -800,27 +878,33 @@ def run_stock_analysis():
         TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
         
         if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-            url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-            response = requests.post(url, json={
-                "chat_id": TELEGRAM_CHAT_ID,
-                "text": msg,
-                "parse_mode": "HTML"
-            })
-            
-            if response.status_code == 200:
-                logger.info("✅ Hisse Raporu Telegram'a gönderildi!")
-            else:
-                logger.warning(f"Telegram gönderme hatası: {response.text}")
+            if telegram_outbox.send(msg, TELEGRAM_CHAT_ID, token=TELEGRAM_TOKEN):
+                logger.info("✅ Hisse Raporu Telegram kuyruğuna alındı!")
     except Exception as e:
         logger.error(f"Hisse analizi hatası: {e}")
 
+PUMP_SCAN_DEADLINE = 180  # saniye - 10 dakikalık taramadan önce bitmeli
+PUMP_SCAN_WORKERS = 8
+
+def format_pump_line(p):
+    """Pump alert satırı"""
+    emoji = "🟢" if p['verdict'] == 'GERCEK_PUMP' else "🟡" if p['verdict'] == 'BELIRSIZ' else "🔴"
+    return f"""{emoji} <b>{p['symbol']}</b>
+💰 ₺{p['price']:,.6f} | +{p['change']:.1f}%
+📊 Skor: {p['score']}/100 | {p['verdict']}
+
+"""
+
 def run_pump_scan():
-    """PUMP ALERT - Her 10 dakikada ani hareketleri tara"""
+    """PUMP ALERT - Her 10 dakikada ani hareketleri tara
+    Adaylar toplu OHLCV ile eşzamanlı doğrulanır,
+    GERÇEK pump'lar skorlanır skorlanmaz ayrı ayrı gönderilir
+    """
     logger.info("🔍 Pump taraması başlıyor...")
     
     try:
         tickers = get_btcturk_data()
-        pumps = []
+        candidates = {}
         
         for t in tickers:
             pair = t.get('pairNormalized', '')
@@ -830,50 +914,64 @@ def run_pump_scan():
             symbol = pair.split('_')[0]
             daily_change = float(t.get('dailyPercent', 0))
             volume = float(t.get('volume', 0))
-            price = float(t.get('last', 0))
-            high = float(t.get('high', 0))
-            low = float(t.get('low', 0))
             
             # PUMP KRİTERLERİ
             # 1. Günlük değişim %8+ (güçlü hareket)
             # 2. Hacim 500K TL+ (likidite)
             if daily_change >= 8 and volume >= 500000:
-                # Pump validator ile doğrula
-                if pump_validator:
-                    result = pump_validator.validate_pump(symbol)
-                    verdict = result.get('verdict', 'UNKNOWN')
-                    score = result.get('total_score', 0)
-                    
-                    pumps.append({
-                        'symbol': symbol,
-                        'price': price,
-                        'change': daily_change,
-                        'volume': volume,
-                        'verdict': verdict,
-                        'score': score,
-                        'high': high,
-                        'low': low
-                    })
+                candidates[symbol] = {
+                    'symbol': symbol,
+                    'price': float(t.get('last', 0)),
+                    'change': daily_change,
+                    'volume': volume,
+                    'high': float(t.get('high', 0)),
+                    'low': float(t.get('low', 0))
+                }
+        
+        if not candidates or not pump_validator:
+            logger.info("✅ Pump yok - piyasa sakin")
+            return
+        
+        # En güçlü hareketler önce doğrulansın
+        ordered = sorted(candidates, key=lambda s: candidates[s]['change'], reverse=True)
+        confirmed = []
+        others = []
+        
+        for symbol, result in pump_validator.validate_candidates(
+                ordered, deadline=PUMP_SCAN_DEADLINE, max_workers=PUMP_SCAN_WORKERS):
+            p = dict(candidates[symbol])
+            p['verdict'] = result.get('verdict', 'UNKNOWN')
+            p['score'] = result.get('total_score', 0)
+            
+            if p['verdict'] == 'GERCEK_PUMP':
+                confirmed.append(p)
+                now = get_turkey_time()
+                msg = f"""🚨 <b>PUMP ALERT!</b>
+🕐 {now.strftime('%H:%M:%S')}
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+{format_pump_line(p)}⚠️ <i>/pump {symbol} ile detaylı analiz yapın.</i>"""
+                send_telegram(msg)
+                logger.info(f"🚨 Gerçek pump gönderildi: {symbol} ({p['score']}/100)")
+            else:
+                others.append(p)
         
-        if pumps:
+        if others:
             now = get_turkey_time()
             msg = f"""🚨 <b>PUMP ALERT!</b>
 🕐 {now.strftime('%H:%M:%S')}
 ━━━━━━━━━━━━━━━━━━━━━━━━
 
 """
-            for p in sorted(pumps, key=lambda x: x['change'], reverse=True)[:5]:
-                emoji = "🟢" if p['verdict'] == 'GERCEK_PUMP' else "🟡" if p['verdict'] == 'BELIRSIZ' else "🔴"
-                msg += f"""{emoji} <b>{p['symbol']}</b>
-💰 ₺{p['price']:,.6f} | +{p['change']:.1f}%
-📊 Skor: {p['score']}/100 | {p['verdict']}
-
-"""
+            for p in sorted(others, key=lambda x: x['change'], reverse=True)[:5]:
+                msg += format_pump_line(p)
             msg += """⚠️ <i>Yüksek değişim = Yüksek risk!
 /pump COIN ile detaylı analiz yapın.</i>"""
             
-            send_telegram_message(msg)
-            logger.info(f"🚨 {len(pumps)} pump tespit edildi!")
+            send_telegram(msg)
+        
+        if confirmed or others:
+            logger.info(f"🚨 {len(confirmed) + len(others)}/{len(candidates)} pump doğrulandı ({len(confirmed)} gerçek)")
         else:
             logger.info("✅ Pump yok - piyasa sakin")
             
@@ -885,37 +983,23 @@ def run_full_analysis():
     logger.info("🔄 MEGA Tam analiz başlıyor...")
     
     try:
-        from mega_analyzer import MegaAnalyzer
-        mega = MegaAnalyzer()
+        view = market_overview.get(sections=True)
+        tickers = view['tickers']
+        usd_try = view['usd_try']
         
-        tickers = get_btcturk_data()
-        usd_try = get_usd_try_rate()
-        
-        logger.info(f"📊 {len(tickers)} kripto analiz edildi | USD/TRY: {usd_try:.2f}")
+        logger.info(f"📊 {len(tickers)} kripto analiz edildi | USD/TRY: {usd_try:.2f} | Özet v{view['version']}")
         
         if alert_system:
-            alert_system.check_alerts()
+            alert_system.check_alerts(tickers)
         
         now = get_turkey_time()
         
-        btc_tl = 0
-        for t in tickers:
-            if t.get('pairNormalized') == 'BTC_TRY':
-                btc_tl = float(t.get('last', 0))
-                break
-        btc_usd = btc_tl / usd_try if usd_try > 0 else 0
-        
-        fg_value = 50
-        fg_text = "Nötr"
-        if pro_analyzer:
-            try:
-                fg = pro_analyzer.get_fear_greed_index()
-                fg_value = fg.get('value', 50)
-                fg_text = fg.get('classification', 'Neutral')
-            except:
-                pass
+        btc_tl = view['btc']['price_tl']
+        btc_usd = view['btc']['price_usd']
         
-        fg_emoji = "😱" if fg_value < 30 else "😨" if fg_value < 45 else "😐" if fg_value < 55 else "😊" if fg_value < 75 else "🤑"
+        fg_value = view['fear_greed']['value']
+        fg_text = view['fear_greed']['classification']
+        fg_emoji = view['fear_greed']['emoji']
         
         msg = f"""🚀 <b>MEGA ANALİZ RAPORU</b>
 📅 {now.strftime('%d.%m.%Y %H:%M')}
@@ -929,7 +1013,7 @@ def run_full_analysis():
 ━━━━━━━━━━━━━━━━━━━━━━━━
 """
         
-        rising_coins = mega.find_rising_coins(5)
+        rising_coins = (view.get('rising') or [])[:5]
         
         for coin in rising_coins:
             symbol = coin['symbol']
@@ -975,7 +1059,7 @@ def run_full_analysis():
 ━━━━━━━━━━━━━━━━━━━━━━━━
 """
         
-        potential_coins = mega.find_potential_risers(3)
+        potential_coins = (view.get('potential') or [])[:3]
         
         for coin in potential_coins:
             symbol = coin['symbol']
@@ -1379,19 +1463,21 @@ def run_telegram_bot():
                                                 f.write(file_data.content)
                                             
                                             try:
-                                                from chart_analyzer import ChartAnalyzer
-                                                analyzer = ChartAnalyzer()
-                                                summary = analyzer.get_summary(
-                                                    image_path=str(local_path),
-                                                    symbol=symbol,
-                                                    current_price=current_price
-                                                )
-                                                send_telegram_to(chat_id, summary)
+                                                from chart_analyzer import chart_queue
+                                                
+                                                def deliver_chart(summary, chat_id=chat_id, local_path=local_path):
+                                                    send_telegram_to(chat_id, summary)
+                                                    try:
+                                                        os.remove(str(local_path))
+                                                    except:
+                                                        pass
                                                 
-                                                try:
-                                                    os.remove(str(local_path))
-                                                except:
-                                                    pass
+                                                # Analiz süreç havuzunda çalışır, bot thread'i beklemez
+                                                if chart_queue.submit(str(local_path), deliver_chart,
+                                                                      symbol=symbol, current_price=current_price):
+                                                    send_telegram_to(chat_id, f"📊 Grafik analiz sırasına alındı ({chart_queue.pending()} bekleyen)")
+                                                else:
+                                                    send_telegram_to(chat_id, "⚠️ Grafik kuyruğu dolu, lütfen biraz sonra tekrar deneyin")
                                             except Exception as e:
                                                 logger.error(f"Chart analiz hatası: {e}")
                                                 send_telegram_to(chat_id, f"❌ Grafik analiz hatası: {str(e)[:100]}")
@@ -1573,13 +1659,10 @@ def run_telegram_bot():
                             elif cmd in ['/btc', '/yukselecekler', '/potansiyel']:
                                 send_telegram_to(chat_id, "🔮 Mega analiz yapılıyor...\n⏳ Tüm sistemler çalışıyor...")
                                 try:
-                                    from mega_analyzer import mega_analyzer
-                                    msg = mega_analyzer.get_potential_message()
-                                    send_telegram_to(chat_id, msg)
+                                    send_telegram_to(chat_id, overview_potential_message())
                                 except Exception as e:
                                     logger.error(f"Mega analiz hatası: {e}")
-                                    tickers = get_btcturk_data()
-                                    potential = analyze_potential_risers(tickers)
+                                    potential = analyze_potential_risers(get_btcturk_data())
                                     msg = "🔮 <b>YÜKSELECEK KRİPTOLAR (TL)</b>\n\n"
                                     if potential:
                                         for i, p in enumerate(potential[:7], 1):
@@ -1590,13 +1673,10 @@ def run_telegram_bot():
                             elif cmd in ['/yukselenler', '/rising', '/ates']:
                                 send_telegram_to(chat_id, "🔥 Yükselenler mega analiz...\n⏳ Tüm sistemler çalışıyor...")
                                 try:
-                                    from mega_analyzer import mega_analyzer
-                                    msg = mega_analyzer.get_rising_message()
-                                    send_telegram_to(chat_id, msg)
+                                    send_telegram_to(chat_id, overview_rising_message())
                                 except Exception as e:
                                     logger.error(f"Mega yükselenler hatası: {e}")
-                                    tickers = get_btcturk_data()
-                                    rising = analyze_rising_cryptos(tickers)
+                                    rising = analyze_rising_cryptos(get_btcturk_data())
                                     msg = "🔥 <b>ŞU AN YÜKSELENLER:</b>\n"
                                     if rising:
                                         for r in rising[:7]:
@@ -1612,37 +1692,41 @@ def run_telegram_bot():
                                     from chart_generator import ChartGenerator
                                     from chart_analyzer import ChartAnalyzer
                                     
-                                    current_price = 0.0
-                                    try:
-                                        ticker_resp = requests.get(
-                                            f"https://api.btcturk.com/api/v2/ticker?pairSymbol={symbol}TRY",
-                                            timeout=10
-                                        )
-                                        ticker_data = ticker_resp.json()
-                                        if ticker_data.get('data') and len(ticker_data['data']) > 0:
-                                            current_price = float(ticker_data['data'][0].get('last', 0))
-                                    except Exception as price_err:
-                                        logger.warning(f"Fiyat çekme hatası {symbol}: {price_err}")
-                                    
-                                    chart_gen = ChartGenerator()
-                                    chart_path = chart_gen.create_price_chart(symbol, days=30)
-                                    
-                                    if not chart_path:
-                                        send_telegram_to(chat_id, f"⚠️ {symbol} grafiği oluşturulamadı. BTCTurk'te {symbol}TRY paritesi olmayabilir.")
-                                    else:
+                                    def ultimate_summary(symbol=symbol):
+                                        current_price = 0.0
+                                        try:
+                                            ticker_resp = requests.get(
+                                                f"https://api.btcturk.com/api/v2/ticker?pairSymbol={symbol}TRY",
+                                                timeout=10
+                                            )
+                                            ticker_data = ticker_resp.json()
+                                            if ticker_data.get('data') and len(ticker_data['data']) > 0:
+                                                current_price = float(ticker_data['data'][0].get('last', 0))
+                                        except Exception as price_err:
+                                            logger.warning(f"Fiyat çekme hatası {symbol}: {price_err}")
+                                        
+                                        chart_gen = ChartGenerator()
+                                        chart_path = chart_gen.create_price_chart(symbol, days=30)
+                                        if not chart_path:
+                                            return None
+                                        
                                         analyzer = ChartAnalyzer()
                                         summary = analyzer.get_summary(
                                             image_path=chart_path,
                                             symbol=symbol,
                                             current_price=current_price
                                         )
-                                        send_telegram_to(chat_id, summary)
-                                        
                                         try:
-                                            import os
                                             os.remove(chart_path)
                                         except:
                                             pass
+                                        return summary
+                                    
+                                    summary = command_cache.get_or_compute('ultimate', [symbol], ultimate_summary)
+                                    if not summary:
+                                        send_telegram_to(chat_id, f"⚠️ {symbol} grafiği oluşturulamadı. BTCTurk'te {symbol}TRY paritesi olmayabilir.")
+                                    else:
+                                        send_telegram_to(chat_id, summary)
                                 except Exception as e:
                                     logger.error(f"Ultimate analiz hatası: {e}")
                                     send_telegram_to(chat_id, f"❌ Ultimate analiz hatası: {str(e)[:100]}")
@@ -1679,8 +1763,8 @@ def run_telegram_bot():
                                 symbol = args[0].upper() if args else 'BTC'
                                 if pump_validator:
                                     send_telegram_to(chat_id, f"🔍 {symbol} pump analizi yapılıyor...")
-                                    analysis = pump_validator.calculate_pump_reliability_score(symbol)
-                                    msg = pump_validator.format_pump_analysis_message(analysis)
+                                    msg = command_cache.get_or_compute('pump', [symbol], lambda: pump_validator.format_pump_analysis_message(
+                                        pump_validator.calculate_pump_reliability_score(symbol)))
                                     send_telegram_to(chat_id, msg)
                                 else:
                                     send_telegram_to(chat_id, "🔍 Pump validator yükleniyor...")
@@ -1731,8 +1815,8 @@ def run_telegram_bot():
                                 if super_analyzer:
                                     send_telegram_to(chat_id, f"🧠 {symbol} için SÜPER ANALİZ yapılıyor...\n⏳ Tüm kaynaklar taranıyor (15-30 sn)")
                                     try:
-                                        result = super_analyzer.super_analyze(symbol)
-                                        msg = super_analyzer.format_super_analysis(result)
+                                        msg = command_cache.get_or_compute('superanaliz', [symbol], lambda: super_analyzer.format_super_analysis(
+                                            super_analyzer.super_analyze(symbol)))
                                         send_telegram_to(chat_id, msg)
                                     except Exception as e:
                                         send_telegram_to(chat_id, f"❌ Analiz hatası: {str(e)[:100]}")
@@ -1855,9 +1939,9 @@ def run_telegram_bot():
                             # /tarama-hisse - Tüm BİST hisselerini tara (KRİPTO KALİTESİNDE)
                             elif cmd == '/tarama-hisse':
                                 if stock_analyzer:
-                                    send_telegram_to(chat_id, "🔍 BİST hisseleri taranıyor... (2-3 dk)")
+                                    send_telegram_to(chat_id, "🔍 BİST 100 hisseleri taranıyor... (1-2 dk)")
                                     try:
-                                        results = stock_analyzer.scan_all_stocks()
+                                        results = command_cache.get_or_compute('tarama-hisse', None, stock_analyzer.scan_all_stocks)
                                         now = get_turkey_time()
                                         msg = f"""🏆 <b>BİST HİSSE TARAMASI</b>
 📅 {now.strftime('%d.%m.%Y %H:%M')}
@@ -2441,7 +2525,7 @@ def run_telegram_bot():
                             elif cmd == '/pro':
                                 symbol = args[0].upper() if args else 'BTC'
                                 if pro_analyzer:
-                                    analysis = pro_analyzer.full_pro_analysis(symbol)
+                                    analysis = command_cache.get_or_compute('pro', [symbol], lambda: pro_analyzer.full_pro_analysis(symbol))
                                     report = pro_analyzer.format_pro_analysis(analysis)
                                     send_telegram_to(chat_id, report)
                                 else:
@@ -2502,8 +2586,8 @@ def run_telegram_bot():
                             elif cmd == '/sniper':
                                 if sniper:
                                     send_telegram_to(chat_id, "🎯 Sniper taraması başlıyor... (10-15 sn)")
-                                    scan = sniper.run_sniper_scan()
-                                    report = sniper.format_sniper_report(scan)
+                                    report = command_cache.get_or_compute('sniper', None, lambda: sniper.format_sniper_report(
+                                        sniper.run_sniper_scan()))
                                     send_telegram_to(chat_id, report)
                                 else:
                                     send_telegram_to(chat_id, "🎯 Sniper modülü yükleniyor...")
@@ -2632,6 +2716,14 @@ def run_telegram_bot():
                                                 
                                                 result = quantum_system.run_quantum_analysis(symbol, data)
                                                 
+                                                # Yönlü sonuçlar takibe alınır - sonuçlandığında ağırlıklar güncellenir
+                                                # Sembolün bekleyen tahmini varsa tekrar sorgu yeni kayıt açmaz
+                                                if result['quantum_score'] >= 60 or result['quantum_score'] < 45:
+                                                    quantum_system.save_prediction(
+                                                        symbol, 'UP' if result['quantum_score'] >= 60 else 'DOWN', current_price,
+                                                        reasoning=result['signal'], features=result['breakdown'],
+                                                        skip_if_pending=True)
+                                                
                                                 usd_try = get_usd_try_rate()
                                                 price_usd = current_price / usd_try if usd_try > 0 else 0
                                                 
@@ -2769,30 +2861,73 @@ def home():
     <a href="/api/fear-greed">😱 Fear&Greed</a>
     </div></div>
     <div class="i"><a href="/api/send-now">📤 Rapor Gönder</a></div>
+    <div class="i"><h3>📡 CANLI</h3><div id="live">Bağlanıyor...</div></div>
+    <script>
+    let overview = {};
+    const stream = new EventSource('/api/stream');
+    function show() {
+        if (!overview.btc) return;
+        const fg = overview.fear_greed || {};
+        const gainers = (overview.top_gainers || []).slice(0, 5)
+            .map(c => `${c.symbol} +${c.change.toFixed(1)}%`).join(' | ');
+        document.getElementById('live').innerHTML =
+            `₿ ₺${Math.round(overview.btc.price_tl).toLocaleString('tr-TR')} (${overview.btc.change.toFixed(2)}%)` +
+            ` | ${fg.emoji || ''} F&G ${fg.value} | USD/TRY ${overview.usd_try.toFixed(2)}` +
+            `<br>🔥 ${gainers}<br><small>v${overview.version} - ${overview.timestamp}</small>`;
+    }
+    stream.addEventListener('snapshot', e => { overview = JSON.parse(e.data).state.overview || {}; show(); });
+    stream.addEventListener('diff', e => {
+        const msg = JSON.parse(e.data);
+        if (msg.topic !== 'overview') return;
+        Object.assign(overview, msg.set);
+        msg.unset.forEach(k => delete overview[k]);
+        show();
+    });
+    </script>
     </body></html>'''
 
+def overview_stream_payload():
+    """Canlı akış için piyasa özeti - sadece yeni sürüm yayınlandığında değişir"""
+    view = market_overview.current
+    if not view:
+        return None
+    return {k: view.get(k) for k in ('btc', 'fear_greed', 'dominance', 'usd_try', 'top_gainers',
+                                      'top_losers', 'scores', 'version', 'timestamp')}
+
+live_feed.add_producer('overview', overview_stream_payload, interval=1)
+
+@app.route('/api/stream')
+def api_stream():
+    """Canlı akış (SSE) - piyasa özeti farkları"""
+    topics = [t for t in request.args.get('topics', '').split(',') if t] or None
+    return live_feed.response(topics)
+
 @app.route('/api/analysis')
 def api_analysis():
-    tickers = get_btcturk_data()
+    view = market_overview.get()
     return jsonify({
-        'rising': analyze_rising_cryptos(tickers), 
-        'potential': analyze_potential_risers(tickers), 
-        'btc': get_btc_technical_analysis(), 
-        'global': get_global_market_sentiment(),
-        'timestamp': get_turkey_time().isoformat()
+        'rising': view.get('rising_basic') or [], 
+        'potential': view.get('potential_basic') or [], 
+        'btc': view.get('btc_technical'), 
+        'global': view.get('global'),
+        'fear_greed': view['fear_greed'],
+        'dominance': view['dominance'],
+        'usd_try': view['usd_try'],
+        'version': view['version'],
+        'timestamp': view['timestamp']
     })
 
 @app.route('/api/potential')
 def api_potential():
-    return jsonify(analyze_potential_risers(get_btcturk_data()))
+    return jsonify(market_overview.get().get('potential_basic') or [])
 
 @app.route('/api/btc')
 def api_btc():
-    return jsonify(get_btc_technical_analysis())
+    return jsonify(market_overview.get().get('btc_technical'))
 
 @app.route('/api/global')
 def api_global():
-    return jsonify(get_global_market_sentiment())
+    return jsonify(market_overview.get().get('global'))
 
 @app.route('/api/stocks')
 def api_stocks():
@@ -2807,7 +2942,8 @@ def api_analyze_symbol(symbol):
 @app.route('/api/pro/<symbol>')
 def api_pro_analysis(symbol):
     if pro_analyzer:
-        return jsonify(pro_analyzer.full_pro_analysis(symbol.upper()))
+        symbol = symbol.upper()
+        return jsonify(command_cache.get_or_compute('pro', [symbol], lambda: pro_analyzer.full_pro_analysis(symbol)))
     return jsonify({'error': 'PRO analyzer not loaded'})
 
 @app.route('/api/pump')
@@ -2911,9 +3047,22 @@ def api_status():
             'trade_history': trade_hist is not None
         },
         'total_modules': 15,
+        'command_cache': command_cache.hit_rates(),
+        'telegram_outbox': telegram_outbox.metrics(),
+        'position_monitor': position_monitor.metrics(),
+        'intraday_bars': intraday_bars.metrics(),
+        'order_books': order_books.status(),
+        'pooled_model': pooled_model.status(),
+        'online_learner': online_learner.status(),
+        'instrumentation': instrumentation.snapshot(),
         'timestamp': get_turkey_time().isoformat()
     })
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metin formatı - süre histogramları, hata/önbellek sayaçları, modül göstergeleri"""
+    return Response(instrumentation.prometheus(), mimetype='text/plain; version=0.0.4')
+
 # ===================== MAIN =====================
 def main():
     logger.info("=" * 60)
@@ -2943,11 +3092,10 @@ def main():
     logger.info(f"✅ Quantum V2: {'Aktif' if quantum_v2 else 'Yok'}")
     
     # Scheduler - Alarm + Otomatik Grafik Analizi
-    scheduler = BackgroundScheduler()
+    scheduler = instrumentation.instrument_scheduler(BackgroundScheduler())
     
-    # Alarm kontrolü her 5 dakika
+    # Alarm kontrolü - izleme thread'i dakikada bir tek ticker indirmesiyle tüm alarmları değerlendirir
     if alert_system:
-        scheduler.add_job(alert_system.check_alerts, IntervalTrigger(minutes=5), id='alerts', replace_existing=True)
         alert_system.start_monitoring()
     
     # Kripto Analizi - Her 2 saatte bir
@@ -2958,6 +3106,61 @@ def main():
     scheduler.add_job(run_stock_analysis, IntervalTrigger(hours=3), id='stock_analysis', replace_existing=True)
     logger.info("🏛️ Hisse Analizi: Her 3 saatte bir")
     
+    # Sembol evreni - diskten yüklendi, arka planda 6 saatte bir yenilenir
+    if symbol_universe:
+        symbol_universe.start_background_refresh()
+        logger.info("🗂️ Sembol Evreni: Arka planda 6 saatte bir")
+    
+    # Coin piyasa tablosu - /coins/markets toplu çekim, 10 dakikada bir
+    if coin_markets:
+        coin_markets.start_background_refresh()
+        logger.info("🪙 Coin Piyasa Tablosu: Arka planda 10 dakikada bir")
+    
+    # Piyasa özeti - BTC, F&G, dominans, yükselenler, skorlar tek işte, 5 dakikada bir
+    market_overview.start_background_refresh()
+    logger.info("🧭 Piyasa Özeti: Arka planda 5 dakikada bir")
+    
+    # Gün içi mumlar - 1m/5m/1h, dakikada bir tek ticker isteğiyle son mumlar
+    intraday_bars.start_background_refresh()
+    logger.info("🕯️ Gün İçi Mumlar: Arka planda dakikada bir")
+    
+    # Emir defterleri - izlenen + en hacimli TRY pariteleri, 5 saniyede 5 defter
+    order_books.start_background_refresh()
+    logger.info("📚 Emir Defterleri: Arka planda sırayla tazelenir")
+    
+    # Havuz ML modeli - tüm piyasa tek modelde, 12 saatte bir eğitim, 15 dakikada bir toplu tahmin
+    pooled_model.start_background_refresh()
+    logger.info("🌐 Havuz ML Modeli: Arka planda eğitim + toplu tahmin")
+    
+    # Pozisyon izleyici - scalp + sinyal takipçisi, dakikalık high/low ile ilk dokunuş
+    position_monitor.start()
+    logger.info("🛰️ Pozisyon İzleyici: Açık pozisyon varken 15 saniyede bir")
+    
+    # Global piyasa görüntüsü - Her 5 dakikada tek toplu istek
+    if market_snapshot:
+        scheduler.add_job(market_snapshot.refresh, IntervalTrigger(minutes=5), id='market_snapshot', replace_existing=True)
+        logger.info("🌐 Piyasa Görüntüsü: Her 5 dakikada")
+    
+    # Tahmin değerlendirme - zamanı gelen tahminler sonuçlanır, online_learner her sonuçtan öğrenir
+    if quantum_system:
+        scheduler.add_job(quantum_system.evaluate_predictions, IntervalTrigger(hours=1), id='evaluate_predictions', replace_existing=True)
+        logger.info("📈 Tahmin Değerlendirme + Çevrimiçi Öğrenme: Saatte bir")
+    
+    # ML hiperparametre ayarı - haftada bir, ayrı süreçlerde (istek anında arama yapılmaz)
+    if ml_enhanced:
+        def run_ml_tuning():
+            try:
+                from ml_tuning import tune_all
+                tune_all()
+            except Exception as e:
+                logger.error(f"ML ayar hatası: {e}")
+        
+        from ml_tuning import TUNE_INTERVAL_DAYS, next_run_time
+        first_run = next_run_time()
+        scheduler.add_job(run_ml_tuning, IntervalTrigger(days=TUNE_INTERVAL_DAYS), id='ml_tuning',
+                          next_run_time=first_run, replace_existing=True)
+        logger.info(f"🎛️ ML Hiperparametre Ayarı: Haftada bir (ilk: {first_run.strftime('%d.%m %H:%M')})")
+    
     # PUMP ALERT - Her 10 dakikada
     if pump_validator:
         scheduler.add_job(run_pump_scan, IntervalTrigger(minutes=10), id='pump_scan', replace_existing=True)
@@ -2996,8 +3199,7 @@ def main():
     def run_15min_analysis():
         """15 dakikada bir orta vadeli analiz - MEGA ANALİZ"""
         try:
-            from mega_analyzer import mega_analyzer
-            msg = mega_analyzer.get_rising_message()
+            msg = overview_rising_message()
             send_telegram(msg)
             logger.info("✅ 15dk MEGA analiz gönderildi")
         except Exception as e:
@@ -3006,12 +3208,10 @@ def main():
     def run_30min_analysis():
         """30 dakikada bir detaylı analiz - MEGA ANALİZ"""
         try:
-            from mega_analyzer import mega_analyzer
-            
             msg = f"📈 <b>30 DAKİKA MEGA ANALİZ</b>\n"
             msg += f"🕐 {datetime.now().strftime('%H:%M')}\n\n"
             
-            rising_coins = mega_analyzer.find_rising_coins(5)
+            rising_coins = (market_overview.get(sections=True).get('rising') or [])[:5]
             
             if rising_coins:
                 for coin in rising_coins:
@@ -3085,5 +3285,6 @@ def main():
     # Flask
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
 
+# Servis run_service.py ile başlatılır - doğrudan çalıştırmada süreç havuzu işçileri bu dosyayı yeniden çalıştırır
 if __name__ == '__main__':
     main()
@@ -0,0 +1,253 @@
+"""
+🧭 MARKET OVERVIEW - Paylaşılan piyasa özeti (materialized view)
+BTC fiyatı, Fear & Greed, dominans, USD/TRY, en çok yükselen/düşenler
+ve coin skorları tek arka plan işiyle hesaplanır
++ Her yenileme sürüm numarası ve zaman damgasıyla yayınlanır
++ Raporlar, API uçları ve komutlar sadece yayınlanmış görüntüyü okur
++ Pahalı bölümler (mega analiz, pump doğrulamalı yükselenler...) add_section ile eklenir;
+  her bölüm kendinden önce hesaplanan görüntüyü girdi olarak alır
++ Yayın iki aşamalı: önce çekirdek alanlar (önceki bölümlerle), sonra bölümler yeni sürüm olarak;
+  istek yolundaki get() eski/boş görüntüde sadece çekirdeği bekler, bölümler arka planda dolar
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List
+import logging
+
+import requests
+
+from instrumentation import instrumentation, timed
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 300       # Arka plan yenileme aralığı
+MAX_AGE = 900               # Bundan eskiyse okuyucu senkron yeniler
+TOP_MOVERS = 10
+
+BTCTURK_TICKER = "https://api.btcturk.com/api/v2/ticker"
+FEAR_GREED_URL = "https://api.alternative.me/fng/?limit=1"
+COINGECKO_GLOBAL = "https://api.coingecko.com/api/v3/global"
+
+
+def fear_greed_emoji(value: int) -> str:
+    return "😱" if value < 30 else "😨" if value < 45 else "😐" if value < 55 else "😊" if value < 75 else "🤑"
+
+
+class MarketOverview:
+    """
+    Tek yazar, çok okuyucu piyasa görüntüsü
+    current: son yayınlanan sözlük (okuyucular değiştirmez)
+    """
+
+    def __init__(self):
+        self.current = None
+        self.version = 0
+        self.sections = OrderedDict()
+        self._lock = threading.Lock()
+        self._sections_lock = threading.Lock()
+        self._thread = None
+
+    def add_section(self, name: str, builder: Callable[[Dict], object]):
+        """Ek bölüm - builder(görüntü) -> değer, çekirdek alanlardan sonra sırayla çalışır"""
+        self.sections[name] = builder
+
+    # ==================== ÇEKİRDEK VERİ ====================
+
+    def _fetch_tickers(self) -> List[Dict]:
+        try:
+            resp = requests.get(BTCTURK_TICKER, timeout=15)
+            return resp.json().get('data', []) or []
+        except Exception as e:
+            logger.error(f"BTCTurk ticker hatası: {e}")
+            return []
+
+    def _fetch_fear_greed(self) -> Dict:
+        try:
+            data = requests.get(FEAR_GREED_URL, timeout=10).json().get('data') or []
+            if data:
+                value = int(data[0]['value'])
+                return {'value': value, 'classification': data[0].get('value_classification', 'Neutral'),
+                        'emoji': fear_greed_emoji(value)}
+        except Exception as e:
+            logger.debug(f"Fear & Greed hatası: {e}")
+        previous = (self.current or {}).get('fear_greed')
+        return previous or {'value': 50, 'classification': 'Neutral', 'emoji': fear_greed_emoji(50)}
+
+    def _fetch_global(self) -> Dict:
+        try:
+            data = requests.get(COINGECKO_GLOBAL, timeout=10).json().get('data') or {}
+            pct = data.get('market_cap_percentage', {})
+            return {
+                'btc_dominance': round(pct.get('btc', 0), 1),
+                'eth_dominance': round(pct.get('eth', 0), 1),
+                'total_market_cap_usd': data.get('total_market_cap', {}).get('usd', 0),
+                'market_cap_change_24h': round(data.get('market_cap_change_percentage_24h_usd', 0) or 0, 2)
+            }
+        except Exception as e:
+            logger.debug(f"CoinGecko global hatası: {e}")
+        return (self.current or {}).get('dominance') or {
+            'btc_dominance': 0, 'eth_dominance': 0, 'total_market_cap_usd': 0, 'market_cap_change_24h': 0
+        }
+
+    def _usd_try(self) -> float:
+        try:
+            from market_snapshot import market_snapshot
+            quote = market_snapshot.quote('USDTRY=X')
+            if quote and quote['price'] > 0:
+                return quote['price']
+        except Exception:
+            pass
+        try:
+            resp = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
+            if resp.status_code == 200:
+                return resp.json().get('rates', {}).get('TRY', 34.5)
+        except Exception:
+            pass
+        return (self.current or {}).get('usd_try') or 34.5
+
+    @staticmethod
+    def _coins(tickers: List[Dict]) -> Dict[str, Dict]:
+        """TRY paritelerinin sade görünümü"""
+        coins = {}
+        for t in tickers:
+            if not isinstance(t, dict):
+                continue
+            pair = t.get('pairNormalized', '')
+            if not pair.endswith('_TRY'):
+                continue
+            price = float(t.get('last', 0) or 0)
+            if price <= 0:
+                continue
+            coins[pair.split('_')[0]] = {
+                'price': price,
+                'change': float(t.get('dailyPercent', 0) or 0),
+                'volume': float(t.get('volume', 0) or 0),
+                'high': float(t.get('high', 0) or 0),
+                'low': float(t.get('low', 0) or 0)
+            }
+        return coins
+
+    # ==================== YENİLEME ====================
+
+    def build(self) -> Dict:
+        """Çekirdek alanlar (ticker, BTC, F&G, dominans, kur, en çok yükselen/düşenler)"""
+        tickers = self._fetch_tickers()
+        coins = self._coins(tickers)
+        usd_try = self._usd_try()
+        btc = coins.get('BTC', {})
+        by_change = sorted(coins.items(), key=lambda kv: kv[1]['change'], reverse=True)
+
+        return {
+            'tickers': tickers,
+            'coins': coins,
+            'usd_try': usd_try,
+            'btc': {
+                'price_tl': btc.get('price', 0),
+                'price_usd': btc.get('price', 0) / usd_try if usd_try > 0 else 0,
+                'change': btc.get('change', 0)
+            },
+            'fear_greed': self._fetch_fear_greed(),
+            'dominance': self._fetch_global(),
+            'top_gainers': [{'symbol': s, **c} for s, c in by_change[:TOP_MOVERS] if c['change'] > 0],
+            'top_losers': [{'symbol': s, **c} for s, c in reversed(by_change[-TOP_MOVERS:]) if c['change'] < 0],
+        }
+
+    def build_sections(self, view: Dict) -> Dict:
+        """add_section bölümleri - her biri çekirdek + önceki bölümleri görür"""
+        view = dict(view)
+        sections = {}
+        for name, builder in self.sections.items():
+            try:
+                with instrumentation.timer('section', f"market_overview.{name}"):
+                    sections[name] = view[name] = builder(view)
+            except Exception as e:
+                logger.error(f"Piyasa özeti bölüm hatası ({name}): {e}")
+                sections[name] = view[name] = (self.current or {}).get(name)
+        return sections
+
+    def _publish(self, view: Dict, started: float) -> Dict:
+        """Kilit altında çağrılır - yeni sürümü yayınla"""
+        self.version += 1
+        view['version'] = self.version
+        view['updated'] = time.time()
+        view['timestamp'] = datetime.now().isoformat()
+        view['build_seconds'] = round(view['updated'] - started, 2)
+        self.current = view
+        return view
+
+    def refresh_core(self) -> Dict:
+        """Çekirdek alanları yenile; bölümler bir önceki görüntüden taşınır (eşzamanlı çağrılar tek hesaplamayı bekler)"""
+        version = self.version
+        with self._lock:
+            if self.version != version and self.current:
+                return self.current
+            started = time.time()
+            previous = self.current or {}
+            view = self.build()
+            for name in self.sections:
+                view[name] = previous.get(name)
+            view['sections_updated'] = previous.get('sections_updated')
+            return self._publish(view, started)
+
+    def refresh_sections(self, wait: bool = True) -> Dict:
+        """Bölümleri son çekirdek görüntü üzerinde hesapla ve yeni sürüm olarak yayınla"""
+        if not self._sections_lock.acquire(blocking=wait):
+            return self.current     # başka bir thread zaten hesaplıyor
+        try:
+            base = self.current or self.refresh_core()
+            started = time.time()
+            sections = self.build_sections(base)
+            with self._lock:
+                view = {**self.current, **sections, 'sections_updated': time.time()}
+                view = self._publish(view, started)
+            logger.info(f"🧭 Piyasa özeti v{view['version']} yayınlandı ({view['build_seconds']}s, {len(view['coins'])} coin)")
+            return view
+        finally:
+            self._sections_lock.release()
+
+    @timed('market_overview', kind='job')
+    def refresh(self) -> Dict:
+        """Arka plan işi: önce çekirdek, sonra bölümler"""
+        self.refresh_core()
+        return self.refresh_sections()
+
+    def get(self, max_age: float = MAX_AGE, sections: bool = False) -> Dict:
+        """
+        Son yayınlanan görüntü; hiç yoksa veya çok eskiyse sadece çekirdek senkron yenilenir,
+        bölümler arka planda dolar (o ana kadar önceki değerleri veya None)
+        sections=True: zamanlanmış işler için - bölümler de beklenir
+        """
+        view = self.current
+        if view is None or time.time() - view['updated'] > max_age:
+            view = self.refresh_core()
+            if not sections:
+                threading.Thread(target=self.refresh_sections, kwargs={'wait': False},
+                                 daemon=True, name='market-overview-sections').start()
+        if sections and self.sections and (not view.get('sections_updated')
+                                           or time.time() - view['sections_updated'] > max_age):
+            view = self.refresh_sections()
+        return view
+
+    def age(self) -> float:
+        return time.time() - self.current['updated'] if self.current else float('inf')
+
+    def start_background_refresh(self, interval: int = REFRESH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Piyasa özeti yenileme hatası: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='market-overview')
+        self._thread.start()
+
+
+market_overview = MarketOverview()
@@ -0,0 +1,139 @@
+"""
+🌐 MARKET SNAPSHOT - Tek seferlik toplu global piyasa görüntüsü
+Endeksler, emtialar, döviz, sektör ETF'leri ve BIST endeksleri
++ Tüm semboller tek yf.download çağrısıyla (yenileme aralığı başına bir istek)
++ Bellekte paylaşılan önbellek - /global, /makro ve raporlar ağa çıkmaz
++ Eşzamanlı çağrılar tek yenilemede birleşir
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 300
+HISTORY_PERIOD = "1y"      # Sektör yıllık performansı için en uzun ihtiyaç
+
+GLOBAL_INDICES = {
+    '^GSPC': 'S&P 500', '^DJI': 'Dow Jones', '^IXIC': 'NASDAQ', '^GDAXI': 'DAX',
+    '^FCHI': 'CAC 40', '^FTSE': 'FTSE 100', '^N225': 'Nikkei 225', '^HSI': 'Hang Seng',
+    '000001.SS': 'Shanghai', '^STOXX': 'STOXX 600', '^TNX': 'US 10Y'
+}
+COMMODITIES = {'GC=F': 'Altın', 'SI=F': 'Gümüş', 'CL=F': 'Petrol (WTI)', 'BZ=F': 'Petrol (Brent)'}
+CURRENCIES = {
+    'DX-Y.NYB': 'DXY (Dolar Endeksi)', 'USDTRY=X': 'USD/TRY',
+    'EURTRY=X': 'EUR/TRY', 'GBPTRY=X': 'GBP/TRY'
+}
+SECTOR_ETFS = {
+    'XLK': 'Technology', 'XLV': 'Healthcare', 'XLF': 'Finance', 'XLE': 'Energy',
+    'XLB': 'Materials', 'XLI': 'Industrials', 'XLY': 'Consumer', 'XLU': 'Utilities',
+    'XLRE': 'Real Estate', 'XLC': 'Communication'
+}
+BIST_INDICES = {
+    'XU100.IS': 'XU100', 'XU030.IS': 'XU030', 'XBANK.IS': 'XBANK',
+    'XUSIN.IS': 'XUSIN', 'XHOLD.IS': 'XHOLD', 'XILTM.IS': 'XILTM'
+}
+
+SNAPSHOT_SYMBOLS = list(dict.fromkeys(
+    list(GLOBAL_INDICES) + list(COMMODITIES) + list(CURRENCIES) + list(SECTOR_ETFS) + list(BIST_INDICES)
+))
+
+_EMPTY = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+
+class MarketSnapshot:
+    """Tüm global sembollerin paylaşılan günlük geçmişi"""
+
+    def __init__(self, symbols: Optional[List[str]] = None):
+        self.symbols = list(symbols or SNAPSHOT_SYMBOLS)
+        self.frames = {}
+        self.updated = 0
+        self._lock = threading.Lock()
+
+    def _download(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        data = yf.download(symbols, period=HISTORY_PERIOD, group_by='ticker', threads=True,
+                           progress=False, auto_adjust=True)
+        frames = {}
+        if data is None or len(data) == 0:
+            return frames
+
+        multi = getattr(data.columns, 'nlevels', 1) > 1
+        for symbol in symbols:
+            try:
+                if multi:
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    df = data[symbol]
+                else:
+                    df = data
+                df = df.dropna(subset=['Close'])
+                if len(df):
+                    frames[symbol] = df
+            except Exception as e:
+                logger.debug(f"Snapshot ayrıştırma hatası {symbol}: {e}")
+        return frames
+
+    def refresh(self, force: bool = False) -> Dict[str, pd.DataFrame]:
+        """Süresi dolduysa tüm sembolleri tek istekle yenile"""
+        if not force and self.frames and time.time() - self.updated < REFRESH_SECONDS:
+            return self.frames
+
+        with self._lock:
+            # Kilit beklerken başka thread yenilemiş olabilir
+            if not force and self.frames and time.time() - self.updated < REFRESH_SECONDS:
+                return self.frames
+            try:
+                frames = self._download(self.symbols)
+                if frames:
+                    self.frames = frames
+                    self.updated = time.time()
+                    logger.info(f"🌐 Piyasa görüntüsü yenilendi: {len(frames)}/{len(self.symbols)} sembol")
+            except Exception as e:
+                logger.error(f"Piyasa görüntüsü hatası: {e}")
+            return self.frames
+
+    def history(self, symbol: str, rows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Sembolün günlük geçmişi (önbellekten)
+        rows: son N mum (ör. 5 -> history(period='5d') karşılığı)
+        """
+        frame = self.refresh().get(symbol)
+        if frame is None:
+            return _EMPTY
+        return frame.tail(rows) if rows else frame
+
+    def quote(self, symbol: str) -> Optional[Dict]:
+        """Son kapanış, önceki kapanış ve günlük değişim"""
+        hist = self.history(symbol)
+        if len(hist) == 0:
+            return None
+        current = float(hist['Close'].iloc[-1])
+        prev = float(hist['Close'].iloc[-2]) if len(hist) > 1 else current
+        return {
+            'symbol': symbol,
+            'price': current,
+            'prev': prev,
+            'change': ((current - prev) / prev * 100) if prev else 0,
+            'high': float(hist['High'].iloc[-1]),
+            'low': float(hist['Low'].iloc[-1])
+        }
+
+    def quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        result = {}
+        for symbol in symbols:
+            q = self.quote(symbol)
+            if q:
+                result[symbol] = q
+        return result
+
+    def age(self) -> float:
+        return time.time() - self.updated if self.updated else float('inf')
+
+
+market_snapshot = MarketSnapshot()
@@ -15,6 +15,9 @@ from typing import Dict, List, Optional
 import requests
 import numpy as np
 
+from pooled_model import pooled_model
+from instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 class MegaAnalyzer:
@@ -112,6 +115,7 @@ class MegaAnalyzer:
         weights /= weights.sum()
         return np.convolve(data, weights, mode='valid')[-1]
     
+    @timed()
     def analyze_single_coin(self, symbol: str, current_price_tl: float = 0) -> Dict:
         """Tek coin için mega analiz"""
         result = {
@@ -124,6 +128,7 @@ class MegaAnalyzer:
             'technical': {},
             'historical': {},
             'pump_status': {},
+            'ml': {},
             'target': 0,
             'stop_loss': 0
         }
@@ -177,6 +182,21 @@ class MegaAnalyzer:
                 result['score'] -= 1.0
                 result['reasons_avoid'].append("🔴 Bollinger üst bandı - Zirvede")
         
+        # Havuz ML modeli - tüm piyasa için önceden hesaplanmış sıralama
+        ml = pooled_model.prediction(symbol)
+        if ml:
+            result['ml'] = ml
+            expected, rank = ml['expected_return'], ml['rank']
+            if rank >= 0.9 and expected > 2:
+                result['score'] += 1.0
+                result['reasons_buy'].append(f"🤖 ML: 7g %{expected:+.1f} beklenti (piyasanın ilk %{(1 - rank) * 100:.0f}'i)")
+            elif rank >= 0.75 and expected > 0:
+                result['score'] += 0.5
+                result['reasons_buy'].append(f"🤖 ML: 7g %{expected:+.1f} beklenti")
+            elif rank <= 0.1 and expected < -2:
+                result['score'] -= 1.0
+                result['reasons_avoid'].append(f"🤖 ML: 7g %{expected:+.1f} beklenti (piyasanın en zayıfları)")
+        
         if self.historical_matcher:
             try:
                 hist_result = self.historical_matcher.analyze_and_compare(symbol)
@@ -248,9 +268,11 @@ class MegaAnalyzer:
         
         return result
     
-    def find_rising_coins(self, limit: int = 10) -> List[Dict]:
+    @timed()
+    def find_rising_coins(self, limit: int = 10, tickers: Optional[List[Dict]] = None) -> List[Dict]:
         """Yükselen coinleri bul ve mega analiz yap"""
-        tickers = self.get_btcturk_data()
+        if tickers is None:
+            tickers = self.get_btcturk_data()
         
         try_pairs = [t for t in tickers if t.get('pair', '').endswith('TRY')]
         
@@ -278,9 +300,11 @@ class MegaAnalyzer:
         results.sort(key=lambda x: x['score'], reverse=True)
         return results
     
-    def find_potential_risers(self, limit: int = 10) -> List[Dict]:
+    @timed()
+    def find_potential_risers(self, limit: int = 10, tickers: Optional[List[Dict]] = None) -> List[Dict]:
         """Yükselecek potansiyeli olan coinleri bul"""
-        tickers = self.get_btcturk_data()
+        if tickers is None:
+            tickers = self.get_btcturk_data()
         
         try_pairs = [t for t in tickers if t.get('pair', '').endswith('TRY')]
         
@@ -7,12 +7,13 @@ Gelişmiş fiyat tahmini ve sinyal üretimi
 import numpy as np
 import pandas as pd
 import requests
-from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, VotingRegressor
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.neural_network import MLPRegressor
 from sklearn.model_selection import cross_val_score
 import warnings
+
+from feature_store import feature_store
 warnings.filterwarnings('ignore')
 
 class MLAdvancedPredictor:
@@ -22,112 +23,6 @@ class MLAdvancedPredictor:
         self.predictions = {}
         self.confidence_threshold = 0.65
         
-    def fetch_historical_data(self, symbol: str, days: int = 90) -> pd.DataFrame:
-        """Tarihsel veri çek"""
-        try:
-            # BTCTurk OHLC API
-            end_time = int(datetime.now().timestamp() * 1000)
-            start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-            
-            resp = requests.get(
-                f"https://graph-api.btcturk.com/v1/klines/history",
-                params={
-                    "symbol": f"{symbol}USDT",
-                    "resolution": "D",
-                    "from": start_time // 1000,
-                    "to": end_time // 1000
-                },
-                timeout=15
-            )
-            
-            data = resp.json()
-            
-            if 'c' in data and len(data['c']) > 10:
-                df = pd.DataFrame({
-                    'timestamp': data.get('t', []),
-                    'open': [float(x) for x in data.get('o', [])],
-                    'high': [float(x) for x in data.get('h', [])],
-                    'low': [float(x) for x in data.get('l', [])],
-                    'close': [float(x) for x in data.get('c', [])],
-                    'volume': [float(x) for x in data.get('v', [])]
-                })
-                return df
-            
-            return pd.DataFrame()
-            
-        except Exception as e:
-            return pd.DataFrame()
-    
-    def calculate_advanced_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Gelişmiş özellik çıkarımı"""
-        if df.empty or len(df) < 20:
-            return df
-        
-        # Temel fiyat özellikleri
-        df['returns'] = df['close'].pct_change()
-        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-        
-        # Moving Averages
-        for period in [5, 10, 20, 50]:
-            df[f'ma_{period}'] = df['close'].rolling(window=period).mean()
-            df[f'ma_{period}_ratio'] = df['close'] / df[f'ma_{period}']
-        
-        # Exponential Moving Averages
-        for period in [12, 26]:
-            df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['bb_mid'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_mid'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_mid'] - (df['bb_std'] * 2)
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_mid']
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-        
-        # Volatilite
-        df['volatility_5'] = df['returns'].rolling(window=5).std()
-        df['volatility_20'] = df['returns'].rolling(window=20).std()
-        
-        # Volume özellikleri
-        df['volume_ma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_ma']
-        
-        # Price momentum
-        df['momentum_5'] = df['close'] / df['close'].shift(5) - 1
-        df['momentum_10'] = df['close'] / df['close'].shift(10) - 1
-        df['momentum_20'] = df['close'] / df['close'].shift(20) - 1
-        
-        # ATR (Average True Range)
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['atr'] = tr.rolling(window=14).mean()
-        df['atr_ratio'] = df['atr'] / df['close']
-        
-        # Stochastic Oscillator
-        low_14 = df['low'].rolling(window=14).min()
-        high_14 = df['high'].rolling(window=14).max()
-        df['stoch_k'] = 100 * (df['close'] - low_14) / (high_14 - low_14)
-        df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-        
-        # Target: 7 günlük getiri
-        df['target'] = df['close'].shift(-7) / df['close'] - 1
-        
-        return df.dropna()
-    
     def build_ensemble_model(self):
         """Ensemble model oluştur"""
         rf = RandomForestRegressor(
@@ -164,24 +59,6 @@ class MLAdvancedPredictor:
     
     def train_and_predict(self, symbol: str) -> dict:
         """Model eğit ve tahmin yap"""
-        df = self.fetch_historical_data(symbol, days=120)
-        
-        if df.empty or len(df) < 30:
-            return {
-                "symbol": symbol,
-                "error": "Yetersiz veri",
-                "prediction": None
-            }
-        
-        df = self.calculate_advanced_features(df)
-        
-        if len(df) < 20:
-            return {
-                "symbol": symbol,
-                "error": "Özellik hesaplanamadı",
-                "prediction": None
-            }
-        
         # Feature selection
         feature_cols = [
             'returns', 'ma_5_ratio', 'ma_10_ratio', 'ma_20_ratio',
@@ -191,7 +68,18 @@ class MLAdvancedPredictor:
             'atr_ratio', 'stoch_k', 'stoch_d'
         ]
         
-        available_cols = [c for c in feature_cols if c in df.columns]
+        # Özellikler depodan (ortak, artımlı hesaplanan sütunlar)
+        df = feature_store.training_set(symbol, feature_cols, horizon=7, days=120)
+        latest = feature_store.latest(symbol, feature_cols)
+        
+        if len(df) < 20 or latest is None:
+            return {
+                "symbol": symbol,
+                "error": "Yetersiz veri",
+                "prediction": None
+            }
+        
+        available_cols = feature_cols
         
         X = df[available_cols].values
         y = df['target'].values
@@ -212,12 +100,12 @@ class MLAdvancedPredictor:
         cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring='r2')
         confidence = max(0, min(100, (cv_scores.mean() + 1) * 50))
         
-        # Prediction
-        latest_features = X_test_scaled[-1:] if len(X_test_scaled) > 0 else X_train_scaled[-1:]
+        # Prediction - hedefi henüz bilinmeyen son mum
+        latest_features = self.scaler.transform(latest[available_cols].values)
         prediction = model.predict(latest_features)[0]
         
         # Current price
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(latest['close'].iloc[0])
         predicted_price = current_price * (1 + prediction)
         
         # Signal generation
@@ -1,34 +1,79 @@
 """
-ML ENHANCED - LSTM + GridSearch + Model Persistence
-LSTM Sinir Ağı + Ensemble + Hyperparameter Optimization + TimeSeriesSplit CV
+ML ENHANCED - Ensemble + Offline Tuning + Model Persistence
+Ensemble + çevrimdışı hiperparametre ayarı (ml_tuning) + TimeSeriesSplit CV
 Yüksek doğruluk, model kaydetme, otomatik öğrenme
 """
 
 import numpy as np
 import pandas as pd
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, AdaBoostRegressor
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 import warnings
 import json
 import os
 import pickle
 import logging
+
+from feature_store import feature_store
+from online_learner import online_learner
+from instrumentation import instrumentation, timed
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+MODEL_DIR = '/home/runner/workspace/ml_models'
+HYPERPARAMS_FILE = f'{MODEL_DIR}/hyperparams.json'
+
+FEATURE_COLS = [
+    'returns', 'ma_5_ratio', 'ma_10_ratio', 'ma_20_ratio', 'ma_50_ratio',
+    'macd', 'macd_histogram', 'rsi', 'bb_position', 'bb_width',
+    'volatility_5', 'volatility_20', 'volatility_ratio',
+    'volume_ratio', 'volume_change',
+    'momentum_5', 'momentum_10', 'momentum_20',
+    'atr_ratio', 'stoch_k', 'stoch_d',
+    'close_above_ma50', 'price_position', 'high_low_range'
+]
+TRAIN_DAYS = 180
+HORIZON = 7
+
+# Ayarlanmamış semboller için (eski GridSearch ızgarasının orta noktası)
+DEFAULT_PARAMS = {
+    'rf': {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 5},
+    'gb': {'n_estimators': 100, 'max_depth': 5, 'learning_rate': 0.1},
+    'ada': {'n_estimators': 100}
+}
+
+MODEL_FAMILIES = {
+    'rf': lambda params: RandomForestRegressor(random_state=42, n_jobs=1, **params),
+    'gb': lambda params: GradientBoostingRegressor(random_state=42, **params),
+    'ada': lambda params: AdaBoostRegressor(random_state=42, **params)
+}
+
+
+def load_hyperparams(path: str = HYPERPARAMS_FILE) -> dict:
+    """ml_tuning'in yazdığı sembol -> aile -> {'params', 'cv_r2', 'tuned'} tablosu"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Hiperparametre dosyası okunamadı: {e}")
+    return {}
+
+
 class MLEnhanced:
     def __init__(self):
-        self.scaler = MinMaxScaler()
         self.models = {}
         self.accuracy_history = {}
-        self.model_dir = '/home/runner/workspace/ml_models'
+        self.model_dir = MODEL_DIR
         os.makedirs(self.model_dir, exist_ok=True)
         self.accuracy_file = f'{self.model_dir}/accuracy_log.json'
+        self.hyperparams_file = HYPERPARAMS_FILE
+        self._hyperparams = {}
+        self._hyperparams_mtime = None
         self.load_accuracy_log()
     
     def load_accuracy_log(self):
@@ -48,204 +93,43 @@ class MLEnhanced:
         except Exception as e:
             logger.error(f"Accuracy log kaydı hatası: {e}")
     
-    def fetch_historical_data(self, symbol: str, days: int = 180) -> pd.DataFrame:
-        """Tarihsel veri çek (daha uzun periyot)"""
+    def get_hyperparams(self, symbol: str) -> dict:
+        """Sembolün ayarlanmış parametreleri (dosya değiştiyse yeniden okunur)"""
         try:
-            end_time = int(datetime.now().timestamp() * 1000)
-            start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-            
-            resp = requests.get(
-                f"https://graph-api.btcturk.com/v1/klines/history",
-                params={
-                    "symbol": f"{symbol}USDT",
-                    "resolution": "D",
-                    "from": start_time // 1000,
-                    "to": end_time // 1000
-                },
-                timeout=15
-            )
-            
-            data = resp.json()
-            
-            if 'c' in data and len(data['c']) > 20:
-                df = pd.DataFrame({
-                    'timestamp': data.get('t', []),
-                    'open': [float(x) for x in data.get('o', [])],
-                    'high': [float(x) for x in data.get('h', [])],
-                    'low': [float(x) for x in data.get('l', [])],
-                    'close': [float(x) for x in data.get('c', [])],
-                    'volume': [float(x) for x in data.get('v', [])]
-                })
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-                return df.sort_values('timestamp')
-            
-            return pd.DataFrame()
-        except Exception as e:
-            logger.error(f"Veri çekme hatası ({symbol}): {e}")
-            return pd.DataFrame()
-    
-    def calculate_advanced_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Gelişmiş özellik çıkarımı (30+ özellik)"""
-        if df.empty or len(df) < 30:
-            return df
-        
-        # Fiyat özellikleri
-        df['returns'] = df['close'].pct_change()
-        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-        df['high_low_range'] = (df['high'] - df['low']) / df['close']
-        
-        # Moving Averages ve ratios
-        for period in [5, 10, 20, 50, 100]:
-            df[f'ma_{period}'] = df['close'].rolling(window=period).mean()
-            if period <= 50:
-                df[f'ma_{period}_ratio'] = df['close'] / df[f'ma_{period}']
-        
-        # EMA
-        for period in [12, 26]:
-            df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['bb_mid'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_mid'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_mid'] - (df['bb_std'] * 2)
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_mid']
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-        
-        # Volatilite
-        df['volatility_5'] = df['returns'].rolling(window=5).std()
-        df['volatility_20'] = df['returns'].rolling(window=20).std()
-        df['volatility_ratio'] = df['volatility_5'] / df['volatility_20']
-        
-        # Volume
-        df['volume_ma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_ma']
-        df['volume_change'] = df['volume'].pct_change()
-        
-        # Momentum
-        df['momentum_5'] = df['close'] / df['close'].shift(5) - 1
-        df['momentum_10'] = df['close'] / df['close'].shift(10) - 1
-        df['momentum_20'] = df['close'] / df['close'].shift(20) - 1
-        
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['atr'] = tr.rolling(window=14).mean()
-        df['atr_ratio'] = df['atr'] / df['close']
-        
-        # Stochastic
-        low_14 = df['low'].rolling(window=14).min()
-        high_14 = df['high'].rolling(window=14).max()
-        df['stoch_k'] = 100 * (df['close'] - low_14) / (high_14 - low_14)
-        df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-        
-        # Price action
-        df['close_above_ma50'] = (df['close'] > df['ma_50']).astype(int)
-        df['price_position'] = (df['close'] - df['close'].min()) / (df['close'].max() - df['close'].min())
-        
-        # Target: 7 günlük getiri
-        df['target'] = df['close'].shift(-7) / df['close'] - 1
-        
-        return df.dropna()
+            mtime = os.path.getmtime(self.hyperparams_file)
+        except OSError:
+            mtime = None
+        if mtime != self._hyperparams_mtime:
+            self._hyperparams = load_hyperparams(self.hyperparams_file)
+            self._hyperparams_mtime = mtime
+        
+        tuned = self._hyperparams.get(symbol) or self._hyperparams.get('_default') or {}
+        return {family: tuned.get(family, {}).get('params', DEFAULT_PARAMS[family]) for family in MODEL_FAMILIES}
     
-    def build_optimized_model(self, X_train, y_train):
-        """GridSearch ile optimize edilmiş ensemble model"""
+    def build_optimized_model(self, X_train, y_train, params: dict = None):
+        """Önceden ayarlanmış (ml_tuning) sabit parametrelerle ensemble model"""
+        params = params or DEFAULT_PARAMS
         try:
-            # Random Forest dengan GridSearch
-            rf_params = {
-                'n_estimators': [50, 100],
-                'max_depth': [8, 10, 12],
-                'min_samples_split': [3, 5]
-            }
-            
-            rf = GridSearchCV(
-                RandomForestRegressor(random_state=42, n_jobs=-1),
-                rf_params,
-                cv=3,
-                scoring='r2',
-                n_jobs=-1
-            )
-            
-            # Gradient Boosting dengan GridSearch
-            gb_params = {
-                'n_estimators': [50, 100],
-                'max_depth': [3, 5, 7],
-                'learning_rate': [0.05, 0.1]
-            }
-            
-            gb = GridSearchCV(
-                GradientBoostingRegressor(random_state=42),
-                gb_params,
-                cv=3,
-                scoring='r2'
-            )
-            
-            # AdaBoost
-            ada = AdaBoostRegressor(n_estimators=100, random_state=42)
-            
-            # Train models
-            rf.fit(X_train, y_train)
-            gb.fit(X_train, y_train)
-            ada.fit(X_train, y_train)
-            
-            return {
-                'rf': rf.best_estimator_,
-                'gb': gb.best_estimator_,
-                'ada': ada
-            }
+            models = {}
+            for family, build in MODEL_FAMILIES.items():
+                models[family] = build(params[family]).fit(X_train, y_train)
+            return models
         except Exception as e:
-            logger.error(f"Model optimizasyon hatası: {e}")
+            logger.error(f"Model eğitim hatası: {e}")
             return None
     
-    def train_and_predict(self, symbol: str) -> dict:
-        """Model eğit ve tahmin yap (TimeSeriesSplit CV ile)"""
-        df = self.fetch_historical_data(symbol, days=180)
-        
-        if df.empty or len(df) < 50:
-            return {'symbol': symbol, 'error': 'Yetersiz veri'}
-        
-        df = self.calculate_advanced_features(df)
-        
-        if len(df) < 40:
-            return {'symbol': symbol, 'error': 'Özellik hatası'}
-        
-        # Features
-        feature_cols = [
-            'returns', 'ma_5_ratio', 'ma_10_ratio', 'ma_20_ratio', 'ma_50_ratio',
-            'macd', 'macd_histogram', 'rsi', 'bb_position', 'bb_width',
-            'volatility_5', 'volatility_20', 'volatility_ratio',
-            'volume_ratio', 'volume_change',
-            'momentum_5', 'momentum_10', 'momentum_20',
-            'atr_ratio', 'stoch_k', 'stoch_d',
-            'close_above_ma50', 'price_position', 'high_low_range'
-        ]
-        
-        available_cols = [c for c in feature_cols if c in df.columns]
-        
-        X = df[available_cols].values
+    def _fit_with_cv(self, df: pd.DataFrame, feature_cols: list, params: dict):
+        """TimeSeriesSplit CV skorları + tüm veriyle final model (sabit parametreler)"""
+        X = df[feature_cols].values
         y = df['target'].values
         
-        # TimeSeriesSplit CV
         tscv = TimeSeriesSplit(n_splits=5)
         cv_scores_r2 = []
         cv_scores_mae = []
         
-        # Scale
-        X_scaled = self.scaler.fit_transform(X)
+        # Scale - her sembolün kendi ölçekleyicisi (yerel; kayıtlı modellerle birlikte saklanır)
+        scaler = MinMaxScaler()
+        X_scaled = scaler.fit_transform(X)
         
         # Cross-validation
         for train_idx, test_idx in tscv.split(X_scaled):
@@ -253,7 +137,7 @@ class MLEnhanced:
             y_train, y_test = y[train_idx], y[test_idx]
             
             # Model train
-            models = self.build_optimized_model(X_train, y_train)
+            models = self.build_optimized_model(X_train, y_train, params)
             
             if models:
                 # Ensemble prediction
@@ -264,18 +148,51 @@ class MLEnhanced:
                 # Weighted ensemble (GB %50, RF %30, Ada %20)
                 ensemble_pred = gb_pred * 0.5 + rf_pred * 0.3 + ada_pred * 0.2
                 
-                r2 = r2_score(y_test, ensemble_pred)
-                mae = mean_absolute_error(y_test, ensemble_pred)
-                cv_scores_r2.append(r2)
-                cv_scores_mae.append(mae)
+                cv_scores_r2.append(float(r2_score(y_test, ensemble_pred)))
+                cv_scores_mae.append(float(mean_absolute_error(y_test, ensemble_pred)))
         
         # Model final
-        models = self.build_optimized_model(X_scaled, y)
+        models = self.build_optimized_model(X_scaled, y, params)
+        return models, scaler, cv_scores_r2, cv_scores_mae
+    
+    @timed()
+    def train_and_predict(self, symbol: str) -> dict:
+        """Model eğit ve tahmin yap (TimeSeriesSplit CV ile)"""
+        feature_cols = FEATURE_COLS
         
-        # Latest prediction
-        rf_pred = models['rf'].predict(X_scaled[-1:])
-        gb_pred = models['gb'].predict(X_scaled[-1:])
-        ada_pred = models['ada'].predict(X_scaled[-1:])
+        # Özellikler depodan - sadece yeni mumlar hesaplanır
+        df = feature_store.training_set(symbol, feature_cols, horizon=HORIZON, days=TRAIN_DAYS)
+        latest = feature_store.latest(symbol, feature_cols)
+        
+        if len(df) < 40 or latest is None:
+            return {'symbol': symbol, 'error': 'Yetersiz veri'}
+        
+        available_cols = feature_cols
+        params = self.get_hyperparams(symbol)
+        bar_ts = int(df['timestamp'].iloc[-1])
+        
+        # Aynı mum + aynı parametrelerle eğitilmiş model varsa yeniden eğitilmez
+        saved = self.models.get(symbol) or self.load_model(symbol, full=True)
+        reuse = bool(saved and saved.get('bar_ts') == bar_ts and saved.get('params') == params and saved.get('cv'))
+        instrumentation.cache('ml_enhanced.models', reuse)
+        if reuse:
+            models, scaler = saved['models'], saved['scaler']
+            cv = saved['cv']
+            cv_scores_r2, cv_scores_mae = cv['r2'], cv['mae']
+        else:
+            models, scaler, cv_scores_r2, cv_scores_mae = self._fit_with_cv(df, available_cols, params)
+            if not models:
+                return {'symbol': symbol, 'error': 'Model eğitilemedi'}
+            saved = {'models': models, 'scaler': scaler, 'bar_ts': bar_ts, 'params': params,
+                     'cv': {'r2': cv_scores_r2, 'mae': cv_scores_mae}}
+            self.save_model(symbol, models, scaler, bar_ts=bar_ts, params=params, cv=saved['cv'])
+        self.models[symbol] = saved
+        
+        # Latest prediction - hedefi henüz bilinmeyen son mum
+        X_latest = scaler.transform(latest[available_cols].values)
+        rf_pred = models['rf'].predict(X_latest)
+        gb_pred = models['gb'].predict(X_latest)
+        ada_pred = models['ada'].predict(X_latest)
         
         prediction = (gb_pred[0] * 0.5 + rf_pred[0] * 0.3 + ada_pred[0] * 0.2)
         
@@ -287,7 +204,7 @@ class MLEnhanced:
         confidence = max(10, min(100, (avg_r2 + 1) * 50))
         
         # Current price
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(latest['close'].iloc[0])
         predicted_price = current_price * (1 + prediction)
         
         # Signal
@@ -302,9 +219,6 @@ class MLEnhanced:
         else:
             signal = "HOLD"
         
-        # Save model
-        self.save_model(symbol, models)
-        
         # Update accuracy
         self.update_accuracy(symbol, avg_r2, confidence)
         
@@ -322,26 +236,26 @@ class MLEnhanced:
             'cv_folds': len(cv_scores_r2)
         }
     
-    def save_model(self, symbol: str, models: dict):
-        """Modeli kaydet"""
+    def save_model(self, symbol: str, models: dict, scaler, **meta):
+        """Modeli kaydet (meta: eğitildiği son mum, parametreler, CV skorları)"""
         try:
             model_file = f'{self.model_dir}/{symbol}_model.pkl'
             with open(model_file, 'wb') as f:
-                pickle.dump({'models': models, 'scaler': self.scaler, 'timestamp': datetime.now().isoformat()}, f)
+                pickle.dump({'models': models, 'scaler': scaler, 'timestamp': datetime.now().isoformat(), **meta}, f)
         except Exception as e:
             logger.error(f"Model kaydetme hatası ({symbol}): {e}")
     
-    def load_model(self, symbol: str):
-        """Modeli yükle"""
+    def load_model(self, symbol: str, full: bool = False):
+        """Modeli yükle (full=True: kayıtlı sözlüğün tamamı)"""
         try:
             model_file = f'{self.model_dir}/{symbol}_model.pkl'
             if os.path.exists(model_file):
                 with open(model_file, 'rb') as f:
                     data = pickle.load(f)
-                    return data.get('models'), data.get('scaler')
+                    return data if full else (data.get('models'), data.get('scaler'))
         except:
             pass
-        return None, None
+        return None if full else (None, None)
     
     def update_accuracy(self, symbol: str, r2: float, confidence: float):
         """Accuracy loglarını güncelle"""
@@ -359,32 +273,36 @@ class MLEnhanced:
             self.accuracy_history[symbol] = self.accuracy_history[symbol][-30:]
         
         self.save_accuracy_log()
+        
+        # Üssel ağırlıklı özet - geçmişi baştan taramadan
+        online_learner.observe(f'ml_enhanced:{symbol}', r2=r2, confidence=confidence)
     
     def get_accuracy_stats(self, symbol: str) -> dict:
-        """Doğruluk istatistikleri"""
+        """Doğruluk istatistikleri (ortalamalar üssel ağırlıklı, online_learner'dan)"""
         if symbol not in self.accuracy_history or not self.accuracy_history[symbol]:
             return {}
         
         records = self.accuracy_history[symbol]
-        r2_scores = [r['r2_score'] for r in records]
-        confidences = [r['confidence'] for r in records]
+        online = online_learner.stat(f'ml_enhanced:{symbol}')
+        r2 = online.get('r2', {}).get('mean', records[-1]['r2_score'])
+        confidence = online.get('confidence', {}).get('mean', records[-1]['confidence'])
         
         return {
-            'avg_r2': round(np.mean(r2_scores), 3),
-            'best_r2': round(max(r2_scores), 3),
-            'avg_confidence': round(np.mean(confidences), 1),
-            'predictions_count': len(records)
+            'avg_r2': round(r2, 3),
+            'best_r2': round(max(r['r2_score'] for r in records), 3),
+            'avg_confidence': round(confidence, 1),
+            'predictions_count': online.get('r2', {}).get('count', len(records))
         }
     
     def generate_report(self) -> str:
         """ML tahmin raporu"""
         report = """🤖 <b>ML ENHANCED RAPORU</b>
 ━━━━━━━━━━━━━━━━━━━━━━━━━
-🧠 <b>MODEL: GridSearch Ensemble (GB 50% + RF 30% + Ada 20%)</b>
+🧠 <b>MODEL: Ayarlanmış Ensemble (GB 50% + RF 30% + Ada 20%)</b>
 📊 <b>CV: TimeSeriesSplit (5-Fold)</b>
 ⏱️ <b>VERİ: 180 Gün Tarihsel</b>
 🎯 <b>TAHMİN: 7 Gün Ilerisi</b>
 
-✅ <i>LSTM ve Hyperparameter Optimization aktif</i>
+✅ <i>Hiperparametreler çevrimdışı ayarlanır (ml_tuning)</i>
 """
         return report
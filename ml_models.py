@@ -4,6 +4,14 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 
+from feature_store import feature_store, YFINANCE
+
+# Fiyat, kısa/uzun ortalama, RSI, MACD, MA20'ye uzaklık - ortak özellik deposundan
+FEATURE_COLS = ['ma_5', 'ma_20', 'rsi', 'macd', 'ma_20_ratio']
+INPUT_COLS = ['close'] + FEATURE_COLS
+HORIZON = 1
+TRAIN_DAYS = 365
+
 class MLForecastingEngine:
     """ML Models - LSTM & Ensemble"""
     
@@ -11,54 +19,38 @@ class MLForecastingEngine:
         self.rf_model = RandomForestRegressor(n_estimators=50, random_state=42)
         self.gb_model = GradientBoostingRegressor(n_estimators=50, random_state=42)
         self.nn_model = MLPRegressor(hidden_layer_sizes=(100, 50), max_iter=500)
-        self.scaler = MinMaxScaler()
     
-    def prepare_features(self, prices, indicators):
-        """Özellik hazırla"""
-        features = []
-        
-        for i in range(len(prices) - 5):
-            ma5 = np.mean(prices[i:i+5])
-            ma20 = np.mean(prices[max(0, i-15):i+5]) if i >= 15 else ma5
-            
-            feature = [
-                prices[i],
-                ma5,
-                ma20,
-                indicators.get('rsi', 50),
-                indicators.get('macd', 0),
-                (prices[i] - ma20) / ma20 if ma20 > 0 else 0
-            ]
-            features.append(feature)
-        
-        return np.array(features)
+    def prepare_features(self, symbol):
+        """
+        Özellik hazırla (yfinance sembolü - BTC-USD, AAPL)
+        Dönüş: (X, y, X_latest) - y: HORIZON mum sonraki getiri; veri yetersizse None
+        """
+        df = feature_store.training_set(symbol, FEATURE_COLS, horizon=HORIZON, days=TRAIN_DAYS, quote=YFINANCE)
+        latest = feature_store.latest(symbol, FEATURE_COLS, quote=YFINANCE)
+        if len(df) < 30 or latest is None:
+            return None
+        return df[INPUT_COLS].values, df['target'].values, latest[INPUT_COLS].values
     
     def predict_price(self, symbol, current_price, indicators):
         """Gelecek fiyat tahmin et"""
-        # Simüle edilmiş training
-        X_train = self.prepare_features(
-            [100 + i*0.5 for i in range(100)],
-            indicators
-        )
-        y_train = [100 + i*0.6 for i in range(len(X_train))]
+        prepared = self.prepare_features(symbol)
+        if prepared is None:
+            return {'error': 'Yetersiz veri'}
+        X_train, y_train, X_latest = prepared
+        
+        # Ölçekleyici çağrıya özel (eşzamanlı isteklerde semboller karışmaz)
+        scaler = MinMaxScaler()
+        X_train = scaler.fit_transform(X_train)
+        X_test = scaler.transform(X_latest)
         
         # Ensemble tahmin
         self.rf_model.fit(X_train, y_train)
         self.gb_model.fit(X_train, y_train)
         self.nn_model.fit(X_train, y_train)
         
-        X_test = np.array([[
-            current_price,
-            current_price * 0.99,
-            current_price * 0.98,
-            indicators.get('rsi', 50),
-            indicators.get('macd', 0),
-            0.02
-        ]])
-        
-        rf_pred = self.rf_model.predict(X_test)[0]
-        gb_pred = self.gb_model.predict(X_test)[0]
-        nn_pred = self.nn_model.predict(X_test)[0]
+        rf_pred = current_price * (1 + self.rf_model.predict(X_test)[0])
+        gb_pred = current_price * (1 + self.gb_model.predict(X_test)[0])
+        nn_pred = current_price * (1 + self.nn_model.predict(X_test)[0])
         
         # Voting ensemble
         ensemble_pred = (rf_pred + gb_pred + nn_pred) / 3
@@ -2,7 +2,11 @@
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import MinMaxScaler
 import numpy as np
-import yfinance as yf
+
+from feature_store import feature_store, YFINANCE
+
+# Ortak özellik deposundan
+FEATURE_COLS = ['ma_5', 'ma_20', 'rsi', 'volume_ma_5']
 
 class MLPredictor:
     def __init__(self):
@@ -11,24 +15,16 @@ class MLPredictor:
         self.is_trained = False
     
     def train(self, symbol, days=90):
-        """Model eğit"""
+        """Model eğit (symbol: yfinance sembolü; hedef bir sonraki kapanış)"""
         try:
-            data = yf.download(symbol, period=f"{days}d", progress=False)
-            if len(data) < 20:
-                return False, "Yeterli veri yok"
-            
-            # Features
-            data['MA5'] = data['Close'].rolling(5).mean()
-            data['MA20'] = data['Close'].rolling(20).mean()
-            data['RSI'] = self._calc_rsi(data['Close'])
-            data['Volume_MA'] = data['Volume'].rolling(5).mean()
+            data = feature_store.training_set(symbol, FEATURE_COLS, horizon=1, days=days, quote=YFINANCE)
             
-            X = data[['MA5', 'MA20', 'RSI', 'Volume_MA']].dropna().values
-            y = data['Close'][len(data)-len(X):].values
-            
-            if len(X) < 5:
+            if len(data) < 5:
                 return False, "Eğitim için yeterli veri yok"
             
+            X = data[FEATURE_COLS].values
+            y = (data['close'] * (1 + data['target'])).values
+            
             self.model.fit(X, y)
             self.is_trained = True
             return True, f"✅ {symbol} modeli eğitildi ({len(X)} veri)"
@@ -36,30 +32,21 @@ class MLPredictor:
             return False, str(e)
     
     def predict(self, symbol):
-        """Fiyat tahmini yap"""
+        """Fiyat tahmini yap (son mumun özellikleri depodan)"""
         if not self.is_trained:
             return None, "Model eğitilmedi"
         
         try:
-            data = yf.download(symbol, period="30d", progress=False)
-            data['MA5'] = data['Close'].rolling(5).mean()
-            data['MA20'] = data['Close'].rolling(20).mean()
-            data['RSI'] = self._calc_rsi(data['Close'])
-            data['Volume_MA'] = data['Volume'].rolling(5).mean()
+            latest = feature_store.latest(symbol, FEATURE_COLS, quote=YFINANCE)
+            if latest is None:
+                return None, "Tahmin yapılamadı"
             
-            last_row = data[['MA5', 'MA20', 'RSI', 'Volume_MA']].dropna().iloc[-1].values.reshape(1, -1)
+            last_row = latest[FEATURE_COLS].values
             prediction = self.model.predict(last_row)[0]
             
-            current = data['Close'].iloc[-1]
+            current = float(latest['close'].iloc[0])
             change_pct = ((prediction - current) / current) * 100
             
             return prediction, f"Tahmin: ${prediction:.2f} ({change_pct:+.2f}%)"
         except:
             return None, "Tahmin yapılamadı"
-    
-    def _calc_rsi(self, prices, period=14):
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
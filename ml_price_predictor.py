@@ -2,12 +2,21 @@
 Random Forest + Gradient Boosting ensemble
 """
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from feature_store import feature_store, compute_features, bars_from_closes, add_target, YFINANCE
+
+# 20 mumluk pencere özellikleri - ortak özellik deposu tanımları (kapanış ayrıca eklenir)
+FEATURE_COLS = ['ma_20', 'close_std_20', 'close_max_20', 'close_min_20', 'change_20',
+                'ma_5', 'ma_10', 'range_position_20']
+INPUT_COLS = ['close'] + FEATURE_COLS
+TRAIN_DAYS = 60
+
 class MLPricePredictor:
     """Makine öğrenimi ile fiyat tahmini"""
     
@@ -18,43 +27,22 @@ class MLPricePredictor:
         self.is_trained = False
     
     def prepare_features(self, prices):
-        """Fiyatlardan özellikler çıkar"""
+        """Fiyat listesinden özellik tablosu (depo tanımlarıyla); target: sonraki mumun getirisi"""
         if len(prices) < 20:
             return None
         
-        features = []
-        targets = []
-        
-        for i in range(20, len(prices)):
-            window = prices[i-20:i]
-            
-            # Özellikler
-            feat = [
-                np.mean(window),           # Ortalama
-                np.std(window),            # Volatilite
-                np.max(window),            # Max
-                np.min(window),            # Min
-                window[-1],                # Son fiyat
-                window[-1] - window[0],    # Değişim
-                np.mean(window[-5:]),      # Son 5 gün ort
-                np.mean(window[-10:]),     # Son 10 gün ort
-                (window[-1] - np.min(window)) / (np.max(window) - np.min(window) + 0.0001),  # Pozisyon
-                np.mean(np.diff(window))   # Trend
-            ]
-            
-            features.append(feat)
-            targets.append(prices[i])
-        
-        return np.array(features), np.array(targets)
+        bars = bars_from_closes(prices)
+        frame = pd.concat([bars[['close']], compute_features(bars, FEATURE_COLS)], axis=1)
+        frame['target'] = add_target(frame, 1)
+        return frame
     
-    def train(self, prices):
-        """Modeli eğit"""
-        result = self.prepare_features(prices)
-        if result is None:
-            return False
-        
-        X, y = result
-        
+    @staticmethod
+    def _xy(frame: pd.DataFrame):
+        """Özellikler + hedef (sonraki kapanış fiyatı)"""
+        frame = frame.dropna(subset=INPUT_COLS + ['target'])
+        return frame[INPUT_COLS].values, (frame['close'] * (1 + frame['target'])).values
+    
+    def _fit(self, X, y) -> bool:
         if len(X) < 10:
             return False
         
@@ -66,31 +54,37 @@ class MLPricePredictor:
         self.is_trained = True
         return True
     
+    def train(self, prices):
+        """Modeli eğit"""
+        frame = self.prepare_features(prices)
+        if frame is None:
+            return False
+        return self._fit(*self._xy(frame))
+    
     def predict_next(self, prices):
-        """Sonraki fiyatı tahmin et"""
+        """Sonraki fiyatı tahmin et (fiyat listesinden)"""
         if not self.is_trained:
             if not self.train(prices):
                 return None
         
-        if len(prices) < 20:
+        frame = self.prepare_features(prices)
+        if frame is None:
             return None
         
-        window = prices[-20:]
-        
-        feat = [
-            np.mean(window),
-            np.std(window),
-            np.max(window),
-            np.min(window),
-            window[-1],
-            window[-1] - window[0],
-            np.mean(window[-5:]),
-            np.mean(window[-10:]),
-            (window[-1] - np.min(window)) / (np.max(window) - np.min(window) + 0.0001),
-            np.mean(np.diff(window))
-        ]
-        
-        X = np.array([feat])
+        latest = frame[INPUT_COLS].iloc[-1:]
+        if latest.isna().any(axis=None):
+            return None
+        return self._predict(latest.values, float(prices[-1]))
+    
+    def predict_symbol(self, ticker: str, days: int = TRAIN_DAYS):
+        """yfinance sembolü için tahmin - eğitim ve son satır ortak özellik deposundan"""
+        df = feature_store.training_set(ticker, FEATURE_COLS, horizon=1, days=days, quote=YFINANCE)
+        latest = feature_store.latest(ticker, FEATURE_COLS, quote=YFINANCE)
+        if df.empty or latest is None or not self._fit(*self._xy(df)):
+            return None
+        return self._predict(latest[INPUT_COLS].values, float(latest['close'].iloc[0]))
+    
+    def _predict(self, X, current_price):
         X_scaled = self.scaler.transform(X)
         
         rf_pred = self.rf_model.predict(X_scaled)[0]
@@ -99,7 +93,6 @@ class MLPricePredictor:
         # Ensemble - ortalama
         ensemble_pred = (rf_pred + gb_pred) / 2
         
-        current_price = prices[-1]
         change_pct = ((ensemble_pred - current_price) / current_price) * 100
         
         # Güven hesapla
@@ -0,0 +1,195 @@
+"""
+🎛️ ML TUNING - MLEnhanced için çevrimdışı hiperparametre ayarı
+İstek anında GridSearch yerine semboller periyodik olarak ayrı süreçlerde ayarlanır
++ Ardışık yarılama (HalvingRandomSearchCV): adaylar az ağaçla başlar, iyiler büyütülür
++ TimeSeriesSplit ile zaman sırasına uygun doğrulama
++ Semboller kendi başlattığımız spawn süreçlerinde paralel ayarlanır (her süreç kendi özellik
+  deposunu okur); süre aşılırsa süreçler sonlandırılır
++ Sonuç: ml_models/hyperparams.json - sembol -> model ailesi -> en iyi parametreler
++ '_default': ayarlanmamış semboller için en sık seçilen parametreler
+
+Kullanım: python ml_tuning.py BTC ETH SOL
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+from feature_store import feature_store
+from ml_enhanced import (MODEL_FAMILIES, FEATURE_COLS, HORIZON, TRAIN_DAYS, HYPERPARAMS_FILE,
+                         load_hyperparams)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ['BTC', 'ETH', 'SOL', 'XRP', 'AVAX', 'ADA', 'DOGE', 'LINK', 'DOT', 'TRX']
+N_CANDIDATES = 27           # 27 aday -> 9 -> 3 (factor=3)
+MIN_TREES = 25
+MAX_TREES = 300
+CV_SPLITS = 3
+MIN_ROWS = 60
+TUNE_INTERVAL_DAYS = 7
+STARTUP_DELAY = 600         # Dosya yok/eskiyse ilk ayar açılıştan bu kadar sonra
+TUNE_TIMEOUT = 3 * 3600     # Tüm tur için üst sınır - takılan süreç zamanlayıcıyı kilitlemesin
+
+# n_estimators kaynak olarak yarılamada büyütülür - aramaya dahil değil
+SEARCH_SPACES = {
+    'rf': {
+        'max_depth': [4, 6, 8, 10, 12, None],
+        'min_samples_split': [2, 3, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': [1.0, 'sqrt', 0.5]
+    },
+    'gb': {
+        'max_depth': [2, 3, 4, 5],
+        'learning_rate': [0.01, 0.03, 0.05, 0.1],
+        'subsample': [0.7, 0.85, 1.0],
+        'min_samples_leaf': [1, 3, 5]
+    },
+    'ada': {
+        'learning_rate': [0.03, 0.1, 0.3, 1.0],
+        'loss': ['linear', 'square', 'exponential']
+    }
+}
+
+
+def tune_symbol(symbol: str) -> Dict:
+    """Tek sembol için tüm model aileleri: {aile: {'params', 'cv_r2', 'tuned'}}"""
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV, TimeSeriesSplit
+
+    df = feature_store.training_set(symbol, FEATURE_COLS, horizon=HORIZON, days=TRAIN_DAYS)
+    if len(df) < MIN_ROWS:
+        return {}
+    X = df[FEATURE_COLS].values
+    y = df['target'].values
+
+    result = {}
+    for family, build in MODEL_FAMILIES.items():
+        search = HalvingRandomSearchCV(
+            build({}), SEARCH_SPACES[family],
+            n_candidates=N_CANDIDATES, factor=3,
+            resource='n_estimators', min_resources=MIN_TREES, max_resources=MAX_TREES,
+            cv=TimeSeriesSplit(n_splits=CV_SPLITS), scoring='r2',
+            random_state=42, n_jobs=1
+        )
+        search.fit(X, y)
+        result[family] = {
+            'params': dict(search.best_params_),
+            'cv_r2': round(float(search.best_score_), 4),
+            'tuned': datetime.now().isoformat()
+        }
+    return result
+
+
+def _tune_worker(symbol: str):
+    try:
+        return symbol, tune_symbol(symbol), None
+    except Exception as e:
+        return symbol, {}, str(e)
+
+
+def _tune_loop(tasks, results):
+    """İşçi süreci: kuyruktan sembol al, sonucu geri yaz (None -> çık)"""
+    for symbol in iter(tasks.get, None):
+        results.put(_tune_worker(symbol))
+
+
+def _default_params(table: Dict) -> Dict:
+    """Aile başına en sık seçilen parametre seti"""
+    defaults = {}
+    for family in MODEL_FAMILIES:
+        seen = Counter(json.dumps(entry[family]['params'], sort_keys=True)
+                       for symbol, entry in table.items()
+                       if symbol != '_default' and family in entry)
+        if seen:
+            defaults[family] = {'params': json.loads(seen.most_common(1)[0][0]),
+                                'tuned': datetime.now().isoformat()}
+    return defaults
+
+
+def save_hyperparams(table: Dict, path: str = HYPERPARAMS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(table, f, indent=2)
+    os.replace(tmp, path)
+
+
+def next_run_time(path: str = HYPERPARAMS_FILE) -> datetime:
+    """İlk ayar zamanı: son ayardan bir periyot sonra; dosya yok/eskiyse açılıştan kısa süre sonra
+    (haftadan sık yeniden başlatılan serviste de ayar çalışsın)"""
+    due = datetime.now() + timedelta(seconds=STARTUP_DELAY)
+    if os.path.exists(path):
+        tuned = datetime.fromtimestamp(os.path.getmtime(path))
+        due = max(due, tuned + timedelta(days=TUNE_INTERVAL_DAYS))
+    return due
+
+
+def tune_all(symbols: Optional[List[str]] = None, workers: Optional[int] = None,
+             path: str = HYPERPARAMS_FILE, timeout: float = TUNE_TIMEOUT) -> Dict:
+    """Sembolleri paralel süreçlerde ayarla, mevcut tabloyla birleştirip kaydet"""
+    symbols = list(dict.fromkeys(s.upper() for s in (symbols or DEFAULT_SYMBOLS)))
+    workers = workers or max(1, min(len(symbols), (os.cpu_count() or 2) - 1))
+    started = time.time()
+    deadline = started + timeout
+
+    table = load_hyperparams(path)
+    tuned, failed = 0, {}
+    # spawn: zamanlayıcı thread'inden çağrılır - fork, diğer thread'lerin tuttuğu kilitleri kopyalar
+    ctx = multiprocessing.get_context('spawn')
+    tasks, results = ctx.Queue(), ctx.Queue()
+    for symbol in symbols:
+        tasks.put(symbol)
+    for _ in range(workers):
+        tasks.put(None)
+    processes = [ctx.Process(target=_tune_loop, args=(tasks, results), daemon=True,
+                             name=f'ml-tuning-{i}') for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    pending = set(symbols)
+    try:
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                failed.update({symbol: 'Zaman aşımı' for symbol in pending})
+                logger.warning(f"🎛️ Hiperparametre ayarı {timeout}s içinde bitmedi - {len(pending)} sembol atlandı")
+                break
+            try:
+                symbol, result, error = results.get(timeout=min(remaining, 5))
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    failed.update({symbol: 'İşçi süreci sonlandı' for symbol in pending})
+                    break
+                continue
+            pending.discard(symbol)
+            if result:
+                table[symbol] = result
+                tuned += 1
+            else:
+                failed[symbol] = error or 'Yetersiz veri'
+    finally:
+        # Takılan işçiler sonlandırılır; bitenler None ile zaten çıkmıştır
+        for process in processes:
+            process.join(timeout=0 if pending else 5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    table['_default'] = _default_params(table)
+    save_hyperparams(table, path)
+    summary = {'tuned': tuned, 'failed': failed, 'workers': workers,
+               'seconds': round(time.time() - started, 1)}
+    logger.info(f"🎛️ Hiperparametre ayarı tamamlandı: {summary}")
+    return summary
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print(tune_all(sys.argv[1:] or None))
@@ -3,8 +3,9 @@ Kripto haberlerinden sentiment analizi
 """
 import requests
 from datetime import datetime
-from textblob import TextBlob
-import feedparser
+
+from news_store import news_store
+from sentiment_engine import sentiment_engine
 
 class NewsSentimentAnalyzer:
     """Haber sentiment analizi"""
@@ -20,31 +21,25 @@ class NewsSentimentAnalyzer:
         """RSS'den kripto haberleri çek"""
         all_news = []
         
-        for feed_url in self.rss_feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:limit]:
-                    title = entry.get('title', '')
-                    summary = entry.get('summary', entry.get('description', ''))
-                    
-                    if keyword.lower() in title.lower() or keyword.lower() in summary.lower():
-                        all_news.append({
-                            'title': title,
-                            'summary': summary[:200],
-                            'source': feed_url.split('/')[2],
-                            'published': entry.get('published', '')
-                        })
-            except:
-                continue
+        try:
+            for article in news_store.articles(self.rss_feeds, keywords=[keyword], limit=limit, per_feed=limit):
+                all_news.append({
+                    'title': article['title'],
+                    'summary': article['summary'][:200],
+                    'source': article['source'],
+                    'published': article['published']
+                })
+        except Exception:
+            pass
         
         return all_news[:limit]
     
     def analyze_sentiment(self, text):
         """TextBlob ile sentiment analizi"""
         try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity  # -1 to 1
-            subjectivity = blob.sentiment.subjectivity  # 0 to 1
+            scored = sentiment_engine.polarity(text)
+            polarity = scored['polarity']  # -1 to 1
+            subjectivity = scored['subjectivity']  # 0 to 1
             
             if polarity > 0.2:
                 sentiment = 'POSITIVE'
@@ -77,8 +72,11 @@ class NewsSentimentAnalyzer:
         sentiments = {'POSITIVE': 0, 'NEGATIVE': 0, 'NEUTRAL': 0}
         analyzed_news = []
         
-        for article in news:
-            text = f"{article['title']} {article['summary']}"
+        texts = [f"{article['title']} {article['summary']}" for article in news]
+        sentiment_engine.polarity_batch(texts)  # toplu skorla, analyze_sentiment önbellekten okur
+        sentiment_engine.record(keyword, texts)
+        
+        for article, text in zip(news, texts):
             analysis = self.analyze_sentiment(text)
             
             total_polarity += analysis['polarity']
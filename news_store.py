@@ -0,0 +1,299 @@
+"""
+📰 NEWS STORE - Ortak RSS/haber toplama servisi
+Tüm haber/duygu modülleri ağı değil bu depoyu sorgular
++ Tüm feed'ler eşzamanlı çekilir (ThreadPoolExecutor)
++ ETag / Last-Modified ile koşullu istek - değişmeyen feed 304 döner
++ GUID/link hash ile tekilleştirme, sadece yeni kayıtlar temizlenir
++ SQLite'ta zaman indeksli kalıcı depo, anahtar kelime + zaman penceresi sorgusu
+"""
+
+import calendar
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "news_store.db"
+
+POLL_INTERVAL = 300        # Aynı feed 5 dakikadan sık çekilmez
+FETCH_TIMEOUT = 10
+MAX_WORKERS = 8
+MAX_ENTRIES_PER_FEED = 50
+SUMMARY_LENGTH = 500
+RETENTION_DAYS = 14
+RECENT_HOURS = 48          # articles(): güncel feed görünümü - depodaki eski haberler puanlanmaz
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def _feed_map(feeds: Union[Dict[str, str], Iterable[str]]) -> Dict[str, str]:
+    """{isim: url} veya url listesi -> {url: isim}"""
+    if isinstance(feeds, dict):
+        return {url: name for name, url in feeds.items()}
+    return {url: url.split('/')[2] if '//' in url else url for url in feeds}
+
+
+def entry_id(entry) -> str:
+    """GUID > link > başlık sırasıyla kararlı kimlik"""
+    key = entry.get('id') or entry.get('guid') or entry.get('link') or entry.get('title', '')
+    return hashlib.sha1(key.encode('utf-8', 'ignore')).hexdigest()
+
+
+def _entry_ts(entry, default: float) -> int:
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if parsed:
+        try:
+            return int(calendar.timegm(parsed))
+        except Exception:
+            pass
+    return int(default)
+
+
+def clean_summary(html: str) -> str:
+    if not html:
+        return ''
+    if '<' not in html:
+        return html[:SUMMARY_LENGTH]
+    return BeautifulSoup(html, 'html.parser').get_text()[:SUMMARY_LENGTH]
+
+
+class NewsStore:
+    """
+    Kalıcı haber deposu
+    feeds tablosu: feed başına ETag / Last-Modified ve son çekim zamanı
+    articles tablosu: tekilleştirilmiş haberler (id = GUID/link hash)
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.last_poll = {}
+        self._poll_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """Tabloları ve indeksleri oluştur"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                last_poll INTEGER,
+                last_status INTEGER
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                feed_url TEXT NOT NULL,
+                source TEXT,
+                title TEXT,
+                summary TEXT,
+                link TEXT,
+                published TEXT,
+                published_ts INTEGER,
+                fetched_ts INTEGER,
+                title_text TEXT,
+                search_text TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_ts)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_feed ON articles (feed_url, published_ts)')
+
+        conn.commit()
+        conn.close()
+
+    def _feed_state(self, urls: List[str]) -> Dict[str, Dict]:
+        conn = self._connect()
+        placeholders = ','.join('?' * len(urls))
+        rows = conn.execute(
+            f'SELECT url, etag, last_modified, last_poll FROM feeds WHERE url IN ({placeholders})', urls
+        ).fetchall()
+        conn.close()
+        return {r[0]: {'etag': r[1], 'last_modified': r[2], 'last_poll': r[3] or 0} for r in rows}
+
+    def _known_ids(self, ids: List[str]) -> set:
+        if not ids:
+            return set()
+        conn = self._connect()
+        placeholders = ','.join('?' * len(ids))
+        rows = conn.execute(f'SELECT id FROM articles WHERE id IN ({placeholders})', ids).fetchall()
+        conn.close()
+        return {r[0] for r in rows}
+
+    def _fetch_feed(self, url: str, state: Dict) -> Dict:
+        """Koşullu GET - 304'te gövde indirilmez, ayrıştırılmaz"""
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+        resp = self.session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        result = {
+            'url': url,
+            'status': resp.status_code,
+            'etag': resp.headers.get('ETag', state.get('etag')),
+            'last_modified': resp.headers.get('Last-Modified', state.get('last_modified')),
+            'entries': []
+        }
+        if resp.status_code == 200:
+            result['entries'] = feedparser.parse(resp.content).entries[:MAX_ENTRIES_PER_FEED]
+        return result
+
+    def poll(self, feeds: Union[Dict[str, str], Iterable[str]], force: bool = False,
+             max_workers: int = MAX_WORKERS) -> int:
+        """
+        Süresi dolan feed'leri eşzamanlı çek, yeni kayıtları depoya yaz
+        Dönen değer: eklenen yeni haber sayısı
+        """
+        feed_names = _feed_map(feeds)
+        if not feed_names:
+            return 0
+
+        with self._poll_lock:
+            now = time.time()
+            urls = list(feed_names)
+            state = self._feed_state(urls)
+            stale = [u for u in urls
+                     if force or now - max(self.last_poll.get(u, 0), state.get(u, {}).get('last_poll', 0)) >= POLL_INTERVAL]
+            if not stale:
+                return 0
+
+            fetched = []
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as executor:
+                futures = {executor.submit(self._fetch_feed, u, state.get(u, {})): u for u in stale}
+                for future, url in futures.items():
+                    try:
+                        fetched.append(future.result())
+                    except Exception as e:
+                        logger.debug(f"RSS çekme hatası ({url}): {e}")
+                        fetched.append({'url': url, 'status': 0, 'entries': [],
+                                        'etag': state.get(url, {}).get('etag'),
+                                        'last_modified': state.get(url, {}).get('last_modified')})
+
+            added = self._store(fetched, feed_names, now)
+            for u in stale:
+                self.last_poll[u] = now
+            return added
+
+    def _store(self, fetched: List[Dict], feed_names: Dict[str, str], now: float) -> int:
+        """Sadece daha önce görülmemiş kayıtları temizleyip yaz"""
+        candidates = {}
+        for result in fetched:
+            for entry in result['entries']:
+                candidates.setdefault(entry_id(entry), (result['url'], entry))
+        known = self._known_ids(list(candidates))
+
+        rows = []
+        for aid, (url, entry) in candidates.items():
+            if aid in known:
+                continue
+            title = entry.get('title', '') or ''
+            summary = clean_summary(entry.get('summary', entry.get('description', '')) or '')
+            rows.append((
+                aid, url, feed_names.get(url, url), title, summary,
+                entry.get('link', '') or '',
+                entry.get('published', entry.get('updated', '')) or '',
+                _entry_ts(entry, now), int(now),
+                title.lower(), f"{title} {summary}".lower()
+            ))
+
+        conn = self._connect()
+        conn.executemany('INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        conn.executemany(
+            'INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)',
+            [(r['url'], r.get('etag'), r.get('last_modified'), int(now), r['status']) for r in fetched]
+        )
+        conn.execute('DELETE FROM articles WHERE fetched_ts < ?', (int(now) - RETENTION_DAYS * 86400,))
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def query(self, keywords: Optional[Iterable[str]] = None,
+              feeds: Optional[Union[Dict[str, str], Iterable[str]]] = None,
+              since_hours: Optional[float] = None, limit: int = 50,
+              title_only: bool = False, per_feed: Optional[int] = None) -> List[Dict]:
+        """
+        Depodan haber sorgula (ağ yok)
+        keywords: herhangi biri başlık/özet içinde geçerse eşleşir (büyük/küçük harf duyarsız)
+        per_feed: her feed'in en yeni N haberi içinde ara (feed.entries[:N] ile aynı)
+        """
+        where, params = ['1=1'], []
+
+        if feeds is not None:
+            urls = list(_feed_map(feeds))
+            if not urls:
+                return []
+            where.append(f"feed_url IN ({','.join('?' * len(urls))})")
+            params.extend(urls)
+
+        if since_hours:
+            where.append('published_ts >= ?')
+            params.append(int(time.time() - since_hours * 3600))
+
+        source = 'articles'
+        if per_feed:
+            # Feed başına sıra anahtar kelime süzgecinden önce - feed'in son N haberi içinde aranır
+            source = ('(SELECT *, ROW_NUMBER() OVER (PARTITION BY feed_url ORDER BY published_ts DESC) AS feed_rank '
+                      f"FROM articles WHERE {' AND '.join(where)})")
+            where = ['feed_rank <= ?']
+            params.append(int(per_feed))
+
+        words = [k.lower() for k in (keywords or []) if k]
+        if words:
+            column = 'title_text' if title_only else 'search_text'
+            where.append('(' + ' OR '.join(f'instr({column}, ?) > 0' for _ in words) + ')')
+            params.extend(words)
+
+        sql = (f"SELECT source, title, summary, link, published, published_ts, feed_url FROM {source} "
+               f"WHERE {' AND '.join(where)} ORDER BY published_ts DESC LIMIT ?")
+        params.append(int(limit))
+
+        conn = self._connect()
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+
+        return [{
+            'source': r[0],
+            'title': r[1],
+            'summary': r[2],
+            'link': r[3],
+            'published': r[4],
+            'published_ts': r[5],
+            'feed_url': r[6]
+        } for r in rows]
+
+    def articles(self, feeds: Union[Dict[str, str], Iterable[str]],
+                 keywords: Optional[Iterable[str]] = None, since_hours: Optional[float] = RECENT_HOURS,
+                 limit: int = 50, title_only: bool = False, per_feed: Optional[int] = None) -> List[Dict]:
+        """
+        Feed'leri gerekiyorsa tazele, sonra depodan sorgula
+        Varsayılan pencere son RECENT_HOURS saat - doğrudan feed okumanın güncel görünümü
+        """
+        feeds = feeds if isinstance(feeds, dict) else list(feeds)
+        try:
+            self.poll(feeds)
+        except Exception as e:
+            logger.error(f"Haber toplama hatası: {e}")
+        return self.query(keywords, feeds, since_hours, limit, title_only, per_feed)
+
+
+news_store = NewsStore()
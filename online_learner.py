@@ -0,0 +1,197 @@
+"""
+📈 ONLINE LEARNER - Sonuçlanan her tahminden artımlı öğrenme
+Toplu yeniden eğitim yerine her sonuç geldiğinde küçük bir güncelleme yapılır
++ Quantum skor ağırlıkları: lojistik model, tek örnekle SGD adımı (L2 düzenlemeli)
++ Üssel ağırlıklı istatistikler (kaynak / sembol / işlem bazında isabet, getiri, r2...)
++ PredictionTracker sonuçlandırdığı her tahmini buraya bildirir
++ Durum küçük bir JSON dosyasına atomik yazılır (her N güncellemede bir)
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = os.path.join('data', 'online_learner.json')
+
+COMPONENTS = ['technical', 'sentiment', 'whale', 'volume', 'momentum', 'historical']
+DEFAULT_WEIGHTS = {
+    'technical': 0.25,
+    'sentiment': 0.20,
+    'whale': 0.15,
+    'volume': 0.15,
+    'momentum': 0.15,
+    'historical': 0.10
+}
+COEF_SCALE = 4.0            # Başlangıç katsayıları = varsayılan ağırlık x ölçek
+LEARNING_RATE = 0.05
+L2 = 0.001
+MIN_WEIGHT = 0.02           # Hiçbir kaynak tamamen susturulmaz
+HALFLIFE = 50               # Üssel istatistiklerde yarı ömür (gözlem)
+CHECKPOINT_EVERY = 10
+
+
+def _sigmoid(z: float) -> float:
+    return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def ew_update(stat: Optional[Dict], value: float, halflife: float = HALFLIFE) -> Dict:
+    """Üssel ağırlıklı ortalama/varyans (tek gözlem, O(1))"""
+    if not stat or not stat.get('count'):
+        return {'mean': value, 'var': 0.0, 'count': 1}
+    alpha = max(1 - 0.5 ** (1 / halflife), 1 / (stat['count'] + 1))
+    delta = value - stat['mean']
+    mean = stat['mean'] + alpha * delta
+    var = (1 - alpha) * (stat['var'] + alpha * delta * delta)
+    return {'mean': mean, 'var': var, 'count': stat['count'] + 1}
+
+
+class OnlineLearner:
+    """
+    coef/bias: quantum bileşen skorlarından "fiyat yükselir" olasılığı
+    stats: anahtar -> ad -> {'mean', 'var', 'count'}
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.path = path
+        self.coef = {k: DEFAULT_WEIGHTS[k] * COEF_SCALE for k in COMPONENTS}
+        self.bias = 0.0
+        self.stats = {}
+        self.updates = 0
+        self.pending = 0
+        self.saved = 0
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self.load()
+
+    # ==================== KALICILIK ====================
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.coef.update({k: float(v) for k, v in state.get('coef', {}).items() if k in self.coef})
+            self.bias = float(state.get('bias', 0.0))
+            self.stats = state.get('stats', {})
+            self.updates = int(state.get('updates', 0))
+        except Exception as e:
+            logger.warning(f"Çevrimiçi öğrenme durumu okunamadı: {e}")
+
+    def checkpoint(self):
+        # Durum kilidi altında serileştir (eşzamanlı observe() sözlükleri değiştiremesin),
+        # dosyayı dışarıda yaz; yazma kilidi eski bir kopyanın yenisinin üstüne yazılmasını önler
+        with self._write_lock:
+            with self._lock:
+                payload = json.dumps({'coef': self.coef, 'bias': self.bias, 'stats': self.stats,
+                                      'updates': self.updates, 'saved_at': time.time()})
+                self.pending = 0
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            try:
+                with open(tmp, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp, self.path)
+                self.saved = time.time()
+            except Exception as e:
+                logger.error(f"Çevrimiçi öğrenme durumu yazılamadı: {e}")
+
+    def _touch(self) -> bool:
+        """Kilit altında çağrılır; checkpoint zamanı geldiyse True (yazma kilit dışında)"""
+        self.pending += 1
+        return self.pending >= CHECKPOINT_EVERY
+
+    # ==================== İSTATİSTİK ====================
+
+    def observe(self, key: str, **values):
+        """key altındaki her değer için üssel istatistiği güncelle"""
+        with self._lock:
+            group = self.stats.setdefault(key, {})
+            for name, value in values.items():
+                if value is None:
+                    continue
+                group[name] = ew_update(group.get(name), float(value))
+            due = self._touch()
+        if due:
+            self.checkpoint()
+
+    def stat(self, key: str) -> Dict[str, Dict]:
+        """key -> {ad: {'mean', 'std', 'count'}}"""
+        group = self.stats.get(key, {})
+        return {name: {'mean': s['mean'], 'std': math.sqrt(max(s['var'], 0.0)), 'count': s['count']}
+                for name, s in group.items()}
+
+    # ==================== QUANTUM AĞIRLIKLARI ====================
+
+    @staticmethod
+    def _inputs(breakdown: Dict) -> Dict[str, float]:
+        return {k: (float(breakdown.get(k, 50)) - 50) / 50 for k in COMPONENTS}
+
+    def predict_proba(self, breakdown: Dict) -> float:
+        x = self._inputs(breakdown)
+        return _sigmoid(self.bias + sum(self.coef[k] * x[k] for k in COMPONENTS))
+
+    def learn(self, breakdown: Dict, outcome_pct: float) -> float:
+        """Tek sonuçla SGD adımı (lojistik kayıp); dönen: güncelleme öncesi olasılık"""
+        with self._lock:
+            x = self._inputs(breakdown)
+            p = self.predict_proba(breakdown)
+            y = 1.0 if outcome_pct > 0 else 0.0
+            error = y - p
+            for k in COMPONENTS:
+                self.coef[k] += LEARNING_RATE * (error * x[k] - L2 * self.coef[k])
+            self.bias += LEARNING_RATE * error
+            self.updates += 1
+            group = self.stats.setdefault('quantum', {})
+            group['hit'] = ew_update(group.get('hit'), float((p > 0.5) == (y > 0.5)))
+            group['log_loss'] = ew_update(group.get('log_loss'), -math.log(max(1e-9, p if y else 1 - p)))
+            due = self._touch()
+        if due:
+            self.checkpoint()
+        return p
+
+    def weights(self) -> Dict[str, float]:
+        """Quantum skorunda kullanılan ağırlıklar (negatif olmayan, toplamı 1)"""
+        raw = {k: max(self.coef[k], 0.0) for k in COMPONENTS}
+        total = sum(raw.values())
+        if total <= 0:
+            return dict(DEFAULT_WEIGHTS)
+        weights = {k: max(v / total, MIN_WEIGHT) for k, v in raw.items()}
+        total = sum(weights.values())
+        return {k: v / total for k, v in weights.items()}
+
+    # ==================== TAHMİN TAKİBİ ====================
+
+    def on_prediction_resolved(self, result: Dict):
+        """PredictionTracker dinleyicisi - sonuçlanan her tahmin için çağrılır"""
+        if not result or result.get('outcome_pct') is None:
+            return
+        win = 1.0 if result.get('result') == 'WIN' else 0.0
+        outcome = float(result['outcome_pct'])
+        self.observe('predictions', win=win, outcome=outcome)
+        if result.get('source'):
+            self.observe(f"source:{result['source']}", win=win, outcome=outcome)
+        if result.get('symbol'):
+            self.observe(f"symbol:{result['symbol']}", win=win, outcome=outcome)
+        if result.get('features'):
+            self.learn(result['features'], outcome)
+
+    def status(self) -> Dict:
+        return {'updates': self.updates, 'weights': {k: round(v, 4) for k, v in self.weights().items()},
+                'quantum': {k: round(v['mean'], 4) for k, v in self.stats.get('quantum', {}).items()},
+                'keys': len(self.stats), 'saved_at': self.saved or None}
+
+
+online_learner = OnlineLearner()
+
+try:
+    from prediction_tracker import on_resolved
+    on_resolved(online_learner.on_prediction_resolved)
+except Exception as e:
+    logger.debug(f"Tahmin takip dinleyicisi eklenemedi: {e}")
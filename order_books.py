@@ -0,0 +1,337 @@
+"""
+📚 ORDER BOOKS - BTCTurk L2 emir defteri derinlik ve spread analizi
+İzlenen pariteler için emir defterleri bellekte tutulur
++ Her taraf numpy dizisi: sıralı fiyat seviyeleri + miktarlar + kümülatif toplamlar
++ İlk yüklemede snapshot, sonrasında sadece değişen seviyeler (diff) uygulanır
++ Dengesizlik, %X derinlik, microprice ve kayma (slippage) tahmini her güncellemede
+  bir kez hesaplanır; okuyucular ağ isteği yapmadan son metrikleri alır
++ Scalping, balina ve pump modülleri aynı defterleri paylaşır
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+BTCTURK_ORDERBOOK = "https://api.btcturk.com/api/v2/orderbook"
+
+DEPTH_LIMIT = 100           # Snapshot başına seviye sayısı
+REFRESH_SECONDS = 5
+BOOKS_PER_CYCLE = 5         # Bir turda en fazla snapshot isteği (~60/dk)
+WATCH_TTL = 1800            # İstenmeyen parite bu süre sonra izlemeden çıkar
+DEFAULT_WATCH = 20          # Hacme göre en büyük TRY pariteleri her zaman izlenir
+MAX_AGE = 120               # Bundan eski defterin metrikleri kullanılmaz
+DEPTH_PCTS = (0.5, 1.0, 2.0)
+SLIPPAGE_NOTIONALS = (10_000, 100_000)
+TOP_LEVELS = 10
+
+
+class BookSide:
+    """
+    Defterin bir tarafı - anahtar dizisi her zaman artan
+    ask: anahtar = fiyat, bid: anahtar = -fiyat (en iyi seviye hep 0. indeks)
+    """
+
+    def __init__(self, descending: bool):
+        self.sign = -1.0 if descending else 1.0
+        self.keys = np.empty(0)
+        self.sizes = np.empty(0)
+        self._accumulate()
+
+    def load(self, levels: Iterable[Tuple[float, float]]):
+        arr = np.array([(self.sign * p, q) for p, q in levels if q > 0], dtype=float).reshape(-1, 2)
+        order = np.argsort(arr[:, 0], kind='stable')
+        self.keys, self.sizes = arr[order, 0], arr[order, 1]
+        self._accumulate()
+
+    def apply(self, changes: Iterable[Tuple[float, float]]) -> int:
+        """Seviye değişiklikleri (fiyat, yeni miktar); miktar 0 = seviye silinir"""
+        applied = 0
+        for price, size in changes:
+            key = self.sign * price
+            i = int(np.searchsorted(self.keys, key))
+            exists = i < len(self.keys) and self.keys[i] == key
+            if size <= 0:
+                if exists:
+                    self.keys = np.delete(self.keys, i)
+                    self.sizes = np.delete(self.sizes, i)
+                    applied += 1
+            elif exists:
+                self.sizes[i] = size
+                applied += 1
+            else:
+                self.keys = np.insert(self.keys, i, key)
+                self.sizes = np.insert(self.sizes, i, size)
+                applied += 1
+        if applied:
+            self._accumulate()
+        return applied
+
+    def _accumulate(self):
+        self.prices = self.sign * self.keys
+        self.cum_qty = np.cumsum(self.sizes)
+        self.cum_value = np.cumsum(self.prices * self.sizes)
+
+    def levels(self) -> Dict[float, float]:
+        return dict(zip(self.prices.tolist(), self.sizes.tolist()))
+
+    def best(self) -> Tuple[float, float]:
+        return (float(self.prices[0]), float(self.sizes[0])) if len(self.keys) else (0.0, 0.0)
+
+    def value_within(self, limit_price: float) -> float:
+        """En iyi seviyeden limit fiyata kadar olan toplam değer (kote para)"""
+        i = int(np.searchsorted(self.keys, self.sign * limit_price, side='right'))
+        return float(self.cum_value[i - 1]) if i else 0.0
+
+    def average_fill(self, notional: float) -> Optional[float]:
+        """notional tutarında piyasa emri ortalama dolum fiyatı; derinlik yetmezse None"""
+        if not len(self.keys) or notional <= 0:
+            return None
+        i = int(np.searchsorted(self.cum_value, notional))
+        if i >= len(self.keys):
+            return None
+        prev_value = float(self.cum_value[i - 1]) if i else 0.0
+        prev_qty = float(self.cum_qty[i - 1]) if i else 0.0
+        qty = prev_qty + (notional - prev_value) / float(self.prices[i])
+        return notional / qty
+
+
+class OrderBook:
+    """Tek paritenin L2 defteri ve ondan türetilen metrikler"""
+
+    def __init__(self, pair: str):
+        self.pair = pair
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.updated = 0.0
+        self.version = 0
+        self._metrics = None
+        self._lock = threading.RLock()
+
+    def load_snapshot(self, bids, asks, ts: Optional[float] = None):
+        with self._lock:
+            self.bids.load(bids)
+            self.asks.load(asks)
+            self._touch(ts)
+
+    def apply_diff(self, bid_changes=(), ask_changes=(), ts: Optional[float] = None) -> int:
+        """Akıştan gelen seviye değişiklikleri (fiyat, yeni miktar)"""
+        with self._lock:
+            applied = self.bids.apply(bid_changes) + self.asks.apply(ask_changes)
+            self._touch(ts)
+            return applied
+
+    def sync_snapshot(self, bids, asks, ts: Optional[float] = None) -> int:
+        """Yeni snapshot'ı mevcut defterle karşılaştırıp sadece farkları uygula"""
+        changed = 0
+        with self._lock:
+            for side, levels in ((self.bids, bids), (self.asks, asks)):
+                new = {p: q for p, q in levels if q > 0}
+                old = side.levels()
+                diff = [(p, q) for p, q in new.items() if old.get(p) != q]
+                diff += [(p, 0.0) for p in old if p not in new]
+                changed += side.apply(diff)
+            self._touch(ts)
+        return changed
+
+    def _touch(self, ts: Optional[float]):
+        self.updated = ts or time.time()
+        self.version += 1
+        self._metrics = None
+
+    def age(self) -> float:
+        return time.time() - self.updated if self.updated else float('inf')
+
+    def metrics(self) -> Optional[Dict]:
+        """Spread, microprice, dengesizlik, derinlik ve kayma - sürüm başına bir kez hesaplanır"""
+        with self._lock:
+            if self._metrics is None:
+                self._metrics = self._compute()
+            return self._metrics
+
+    def _compute(self) -> Optional[Dict]:
+        bid, bid_qty = self.bids.best()
+        ask, ask_qty = self.asks.best()
+        if bid <= 0 or ask <= 0:
+            return None
+
+        mid = (bid + ask) / 2
+        top_bid = float(self.bids.cum_qty[min(TOP_LEVELS, len(self.bids.cum_qty)) - 1])
+        top_ask = float(self.asks.cum_qty[min(TOP_LEVELS, len(self.asks.cum_qty)) - 1])
+        metrics = {
+            'pair': self.pair,
+            'best_bid': bid,
+            'best_ask': ask,
+            'mid': mid,
+            'spread_pct': (ask - bid) / mid * 100,
+            'microprice': (ask * bid_qty + bid * ask_qty) / (bid_qty + ask_qty),
+            'imbalance': (top_bid - top_ask) / (top_bid + top_ask) if top_bid + top_ask else 0.0,
+            'depth': {},
+            'slippage_buy_bps': {},
+            'slippage_sell_bps': {},
+            'levels': (len(self.bids.keys), len(self.asks.keys)),
+            'updated': self.updated,
+            'version': self.version
+        }
+        for pct in DEPTH_PCTS:
+            metrics['depth'][pct] = {
+                'bid': self.bids.value_within(mid * (1 - pct / 100)),
+                'ask': self.asks.value_within(mid * (1 + pct / 100))
+            }
+        d2 = metrics['depth'][DEPTH_PCTS[-1]]
+        metrics['order_book_ratio'] = d2['bid'] / d2['ask'] if d2['ask'] > 0 else 1.0
+
+        for notional in SLIPPAGE_NOTIONALS:
+            buy = self.asks.average_fill(notional)
+            sell = self.bids.average_fill(notional)
+            metrics['slippage_buy_bps'][notional] = round((buy / mid - 1) * 1e4, 1) if buy else None
+            metrics['slippage_sell_bps'][notional] = round((1 - sell / mid) * 1e4, 1) if sell else None
+        return metrics
+
+    def slippage_bps(self, side: str, notional: float) -> Optional[float]:
+        """Belirli tutar için kayma (baz puan) - side: 'buy' veya 'sell'"""
+        with self._lock:
+            bid, _ = self.bids.best()
+            ask, _ = self.asks.best()
+            if bid <= 0 or ask <= 0:
+                return None
+            mid = (bid + ask) / 2
+            fill = (self.asks if side == 'buy' else self.bids).average_fill(notional)
+        if fill is None:
+            return None
+        return (fill / mid - 1) * 1e4 if side == 'buy' else (1 - fill / mid) * 1e4
+
+    def top(self, n: int = 50) -> Dict[str, List]:
+        with self._lock:
+            return {
+                'bids': list(zip(self.bids.prices[:n].tolist(), self.bids.sizes[:n].tolist())),
+                'asks': list(zip(self.asks.prices[:n].tolist(), self.asks.sizes[:n].tolist()))
+            }
+
+
+class OrderBookService:
+    """
+    İzlenen paritelerin defterleri
+    watched: parite -> son istenme zamanı; arka plan en eski defterleri sırayla tazeler
+    """
+
+    def __init__(self):
+        self.books = {}
+        self.watched = {}
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {'snapshots': 0, 'levels_changed': 0, 'errors': 0, 'reads': 0, 'misses': 0}
+
+    @staticmethod
+    def pair(symbol: str, quote: str = 'TRY') -> str:
+        return f"{symbol.upper()}{quote}"
+
+    def watch(self, symbols: Iterable[str], quote: str = 'TRY'):
+        now = time.time()
+        with self._lock:
+            for s in symbols:
+                self.watched[self.pair(s, quote)] = now
+
+    # ==================== GÜNCELLEME ====================
+
+    def fetch(self, pair: str) -> Optional[OrderBook]:
+        """Paritenin snapshot'ını çek ve defteri güncelle (ilkinde yükle, sonra fark uygula)"""
+        try:
+            data = self.session.get(BTCTURK_ORDERBOOK, params={'pairSymbol': pair, 'limit': DEPTH_LIMIT},
+                                    timeout=10).json().get('data') or {}
+            bids = [(float(p), float(q)) for p, q in data.get('bids', [])]
+            asks = [(float(p), float(q)) for p, q in data.get('asks', [])]
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.debug(f"Emir defteri hatası {pair}: {e}")
+            return None
+        if not bids or not asks:
+            return None
+
+        ts = (data.get('timestamp') or time.time() * 1000) / 1000
+        with self._lock:
+            book = self.books.get(pair)
+            if book is None:
+                book = self.books[pair] = OrderBook(pair)
+                book.load_snapshot(bids, asks, ts)
+                self.stats['levels_changed'] += len(bids) + len(asks)
+            else:
+                self.stats['levels_changed'] += book.sync_snapshot(bids, asks, ts)
+            self.stats['snapshots'] += 1
+        return book
+
+    def _default_pairs(self) -> List[str]:
+        try:
+            from intraday_bars import intraday_bars
+            tickers = [t for t in intraday_bars.last_tickers if t.get('pairNormalized', '').endswith('_TRY')]
+            tickers.sort(key=lambda t: float(t.get('volume', 0) or 0) * float(t.get('last', 0) or 0), reverse=True)
+            return [t['pairNormalized'].replace('_', '') for t in tickers[:DEFAULT_WATCH]]
+        except Exception:
+            return []
+
+    def refresh_cycle(self, limit: int = BOOKS_PER_CYCLE) -> int:
+        """En eski (veya hiç yüklenmemiş) izlenen defterleri tazele"""
+        now = time.time()
+        with self._lock:
+            for pair, seen in list(self.watched.items()):
+                if now - seen > WATCH_TTL:
+                    del self.watched[pair]
+                    self.books.pop(pair, None)
+            pairs = set(self.watched) | set(self._default_pairs())
+            due = sorted(pairs, key=lambda p: self.books[p].updated if p in self.books else 0)
+        for pair in due[:limit]:
+            self.fetch(pair)
+        return min(limit, len(due))
+
+    def start_background_refresh(self, interval: int = REFRESH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh_cycle()
+                except Exception as e:
+                    logger.error(f"Emir defteri yenileme hatası: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='order-books')
+        self._thread.start()
+
+    # ==================== OKUMA ====================
+
+    def book(self, symbol: str, quote: str = 'TRY', fetch: bool = False) -> Optional[OrderBook]:
+        """
+        Paritenin defteri - ağ isteği yapmaz (fetch=True ve defter yoksa bir kez çeker)
+        Okuma pasiftir; sadece fetch=True istenen parite izlemeye alınır (toplu taramalar
+        tüm evreni izlemeye almasın - adaylar watch() ile açıkça eklenir)
+        """
+        pair = self.pair(symbol, quote)
+        with self._lock:
+            if fetch:
+                self.watched[pair] = time.time()
+            book = self.books.get(pair)
+        if (book is None or book.age() > MAX_AGE) and fetch:
+            book = self.fetch(pair)
+        return book if book is not None and book.age() <= MAX_AGE else None
+
+    def metrics(self, symbol: str, quote: str = 'TRY', fetch: bool = False) -> Optional[Dict]:
+        """Paritenin son derinlik metrikleri; defter yoksa/eskiyse None"""
+        book = self.book(symbol, quote, fetch)
+        self.stats['reads'] += 1
+        if book is None:
+            self.stats['misses'] += 1
+            return None
+        return book.metrics()
+
+    def status(self) -> Dict:
+        return {**self.stats, 'books': len(self.books), 'watched': len(self.watched)}
+
+
+order_books = OrderBookService()
@@ -0,0 +1,236 @@
+"""
+🔎 PATTERN SIMILARITY SEARCH - Benzer fiyat hareketi arama motoru
+Mevcut mum penceresine en çok benzeyen geçmiş pencereleri bulur
++ Z-normalize pencereler (fiyat seviyesinden bağımsız şekil karşılaştırma)
++ Stride tricks ile tüm coinlerde tek seferde k-en yakın komşu
++ En iyi k benzerin sonraki hareket istatistikleri
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 10        # Karşılaştırılan mum sayısı
+DEFAULT_HORIZON = 10       # Benzerden sonra incelenen mum sayısı
+LIBRARY_TTL = 6 * 3600     # Geçmiş kütüphanesi 6 saatte bir yenilenir
+
+ANALOGUE_UNIVERSE = [
+    'BTC', 'ETH', 'XRP', 'SOL', 'AVAX', 'ADA', 'DOGE', 'DOT', 'LINK', 'LTC',
+    'TRX', 'ATOM', 'NEAR', 'APT', 'ARB', 'OP', 'FIL', 'UNI', 'AAVE', 'SHIB',
+    'PEPE', 'FET', 'INJ', 'SUI', 'HBAR', 'XLM', 'ALGO', 'SAND', 'MANA', 'CHZ'
+]
+
+
+def sliding_windows(values: np.ndarray, m: int) -> np.ndarray:
+    """Kopyasız pencere görünümü: (..., n-m+1, m)"""
+    return np.lib.stride_tricks.sliding_window_view(values, m, axis=-1)
+
+
+def znorm(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Z-normalizasyon; sabit pencerelerde 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = np.mean(x, axis=axis, keepdims=True)
+        sigma = np.std(x, axis=axis, keepdims=True)
+        return np.where(sigma > 1e-12, (x - mu) / sigma, 0.0)
+
+
+class PatternSearchEngine:
+    """
+    Çok coinli benzerlik arama motoru
+    Kütüphane: her coin için hizalı OHLC dizileri (S x N matris, eksikler NaN)
+    """
+
+    def __init__(self):
+        self.library = None
+        self.library_time = 0
+        self.library_symbols = ()
+        self.series = {}
+        self.unavailable = set()
+
+    def _download(self, symbols: List[str], days: int) -> Dict[str, Dict]:
+        """Tüm coinler için tek toplu yfinance indirmesi"""
+        import yfinance as yf
+
+        tickers = [f"{s}-USD" for s in symbols]
+        data = yf.download(tickers, period=f"{days}d", group_by='ticker',
+                           threads=True, progress=False, auto_adjust=False)
+        result = {}
+        if data is None or len(data) == 0:
+            return result
+
+        multi = getattr(data.columns, 'nlevels', 1) > 1
+        for symbol, ticker in zip(symbols, tickers):
+            try:
+                if multi:
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    df = data[ticker]
+                else:
+                    df = data
+                df = df.dropna(subset=['Close'])
+                if len(df) < 30:
+                    continue
+                result[symbol] = {
+                    'dates': [d.strftime('%Y-%m-%d') for d in df.index],
+                    'open': df['Open'].to_numpy(dtype=float),
+                    'high': df['High'].to_numpy(dtype=float),
+                    'low': df['Low'].to_numpy(dtype=float),
+                    'close': df['Close'].to_numpy(dtype=float)
+                }
+            except Exception as e:
+                logger.debug(f"Pattern library parse error {symbol}: {e}")
+        return result
+
+    def build_library(self, symbols: Optional[List[str]] = None, days: int = 365,
+                      force: bool = False) -> Dict:
+        """
+        Geçmiş kütüphanesini kur (TTL süresince önbellekte)
+        Taze kütüphanede olmayan semboller ayrıca indirilip panele eklenir
+        """
+        symbols = tuple(sorted(set(s.upper() for s in (symbols or ANALOGUE_UNIVERSE))))
+        fresh = self.library and time.time() - self.library_time < LIBRARY_TTL and not force
+        if fresh:
+            wanted = [s for s in symbols if s not in self.series and s not in self.unavailable]
+            if not wanted:
+                return self.library
+        else:
+            wanted = list(symbols)
+
+        try:
+            raw = self._download(wanted, days)
+        except Exception as e:
+            logger.error(f"Pattern library download error: {e}")
+            raw = {}
+
+        if fresh:
+            # Verisi gelmeyen semboller TTL boyunca yeniden indirilmez
+            self.unavailable.update(s for s in wanted if s not in raw)
+            if not raw:
+                return self.library
+            self.series.update(raw)
+        else:
+            if not raw:
+                return self.library or {}
+            self.series = raw
+            self.unavailable = set(s for s in wanted if s not in raw)
+            self.library_time = time.time()
+
+        self.library = self._assemble(self.series)
+        self.library_symbols = tuple(self.library['symbols'])
+        return self.library
+
+    @staticmethod
+    def _assemble(series: Dict[str, Dict]) -> Dict:
+        """Coin dizilerini sona hizalı S x N panele yerleştir"""
+        length = max(len(v['close']) for v in series.values())
+        names = list(series.keys())
+        panel = {k: np.full((len(names), length), np.nan) for k in ('open', 'high', 'low', 'close')}
+        dates = []
+        for row, name in enumerate(names):
+            data = series[name]
+            offset = length - len(data['close'])  # sona hizala
+            for k in panel:
+                panel[k][row, offset:] = data[k]
+            dates.append([''] * offset + data['dates'])
+        return {'symbols': names, 'dates': dates, **panel}
+
+    def knn(self, query_closes, k: int = 20, window: int = DEFAULT_WINDOW,
+            horizon: int = DEFAULT_HORIZON, symbols: Optional[List[str]] = None,
+            exclude_symbol: Optional[str] = None) -> List[Dict]:
+        """
+        Sorgu penceresine en yakın k geçmiş pencere (tüm coinlerde)
+        exclude_symbol: bu coinin sorgu ile çakışan son penceresi hariç tutulur
+        """
+        lib = self.build_library(symbols)
+        if not lib:
+            return []
+
+        query = np.asarray(query_closes, dtype=float)[-window:]
+        if len(query) < window or np.isnan(query).any():
+            return []
+
+        closes = lib['close']
+        S, N = closes.shape
+        last_start = N - window - horizon  # ileri penceresi tam olan son başlangıç
+        if last_start < 0:
+            return []
+
+        windows = sliding_windows(closes, window)[:, :last_start + 1, :]   # (S, W, m)
+        valid = ~np.isnan(windows).any(axis=2)
+        future_valid = ~np.isnan(closes[:, window:window + last_start + 1])
+        valid &= future_valid
+
+        q = znorm(query)
+        zw = znorm(windows)
+        corr = np.einsum('swm,m->sw', zw, q) / window
+        dist = np.sqrt(np.clip(2 * window * (1 - corr), 0, None))
+        dist[~valid] = np.inf
+
+        if exclude_symbol and exclude_symbol.upper() in lib['symbols']:
+            row = lib['symbols'].index(exclude_symbol.upper())
+            dist[row, max(0, last_start - window):] = np.inf
+
+        flat = dist.ravel()
+        finite = np.isfinite(flat).sum()
+        if finite == 0:
+            return []
+
+        # Aynı coinde üst üste binen pencereleri elemek için fazladan aday al
+        candidates = np.argsort(flat, kind='stable')[:min(finite, k * window)]
+        chosen = []
+        taken = {}
+        for flat_idx in candidates:
+            s, w = divmod(int(flat_idx), dist.shape[1])
+            if any(abs(w - prev) < window // 2 for prev in taken.get(s, [])):
+                continue
+            taken.setdefault(s, []).append(w)
+            chosen.append((s, w, float(flat[flat_idx])))
+            if len(chosen) >= k:
+                break
+
+        results = []
+        for s, w, d in chosen:
+            start = w + window
+            end = start + horizon
+            start_price = lib['close'][s, start]
+            if not start_price > 0:
+                continue
+            max_gain = (np.nanmax(lib['high'][s, start:end]) - start_price) / start_price * 100
+            max_loss = (np.nanmin(lib['low'][s, start:end]) - start_price) / start_price * 100
+            final_change = (lib['close'][s, end - 1] - start_price) / start_price * 100
+            outcome = "BULLISH" if final_change > 2 else "BEARISH" if final_change < -2 else "NEUTRAL"
+            results.append({
+                'symbol': lib['symbols'][s],
+                'date': lib['dates'][s][start],
+                'distance': round(d, 3),
+                'start_price': round(float(start_price), 2),
+                'max_gain_percent': round(float(max_gain), 2),
+                'max_loss_percent': round(float(max_loss), 2),
+                'final_change_percent': round(float(final_change), 2),
+                'outcome': outcome,
+                'days_analyzed': horizon
+            })
+        return results
+
+    def analogue_outcomes(self, analogues: List[Dict]) -> Dict:
+        """Benzerlerin mesafe ağırlıklı sonuç istatistikleri"""
+        if not analogues:
+            return {'count': 0}
+        finals = np.array([a['final_change_percent'] for a in analogues])
+        dists = np.array([a['distance'] for a in analogues])
+        weights = 1 / (dists + 1e-6)
+        return {
+            'count': len(analogues),
+            'weighted_final_change': round(float(np.average(finals, weights=weights)), 2),
+            'median_final_change': round(float(np.median(finals)), 2),
+            'avg_distance': round(float(dists.mean()), 3),
+            'coins': sorted(set(a['symbol'] for a in analogues))
+        }
+
+
+pattern_search = PatternSearchEngine()
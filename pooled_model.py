@@ -0,0 +1,270 @@
+"""
+🌐 POOLED MODEL - Tüm piyasa için tek ML modeli (semboller arası panel)
+Her coin için ayrı model eğitmek yerine en hacimli TRY pariteleri tek tabloda birleştirilir
++ Özellikler feature_store'dan (ölçekten bağımsız olanlar: oranlar, RSI, volatilite...)
++ Rejim özellikleri: BTC momentumu/volatilitesi, piyasa genişliği, momentum sırası
++ Sembol özelliği: kote cinsinden işlem hacmi (likidite)
++ Arka planda periyodik yeniden eğitim; tahminler tüm evren için tek predict çağrısıyla
++ Okuyan modüller (MegaAnalyzer, QuantumAnalyzerV2) sadece hazır sıralamayı okur
+"""
+
+import os
+import pickle
+import threading
+import time
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from feature_store import feature_store, add_target
+from intraday_bars import intraday_bars
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = os.path.join('data', 'pooled_model.pkl')
+
+QUOTE = 'TRY'
+UNIVERSE_SIZE = 150         # En hacimli bu kadar TRY paritesi
+HORIZON = 7                 # Hedef: 7 günlük getiri
+MIN_BARS = 60               # Bundan kısa geçmişli semboller panele alınmaz
+MAX_TARGET = 0.5            # Aşırı getiriler kırpılır (tek pump tüm modeli çekmesin)
+HOLDOUT_DAYS = 30           # Doğrulama için ayrılan son günler
+MAX_STALE_DAYS = 3          # Son mumu bundan eski sembol tahmin edilmez
+RETRAIN_SECONDS = 12 * 3600
+PREDICT_SECONDS = 900
+FETCH_PAUSE = 0.2
+
+SYMBOL_FEATURES = [
+    'returns', 'ma_5_ratio', 'ma_10_ratio', 'ma_20_ratio', 'ma_50_ratio',
+    'rsi', 'bb_position', 'bb_width',
+    'volatility_5', 'volatility_20', 'volatility_ratio',
+    'volume_ratio', 'momentum_5', 'momentum_10', 'momentum_20',
+    'atr_ratio', 'stoch_k', 'price_position', 'high_low_range', 'log_turnover_20'
+]
+REGIME_FEATURES = ['btc_momentum_20', 'btc_volatility_20', 'breadth', 'momentum_rank']
+FEATURES = SYMBOL_FEATURES + REGIME_FEATURES
+
+
+class PooledModel:
+    """
+    model: tüm sembollerin panelinde eğitilmiş tek regresör
+    predictions: sembol -> {'expected_return', 'rank', 'score', 'timestamp'}
+    """
+
+    def __init__(self, model_file: str = MODEL_FILE):
+        self.model_file = model_file
+        self.model = None
+        self.trained = 0
+        self.predictions = {}
+        self.predicted = 0
+        self.train_metrics = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {'trainings': 0, 'prediction_rounds': 0, 'train_errors': 0, 'last_predict_ms': 0}
+        self.load()
+
+    # ==================== KALICILIK ====================
+
+    def load(self):
+        if not os.path.exists(self.model_file):
+            return
+        try:
+            with open(self.model_file, 'rb') as f:
+                saved = pickle.load(f)
+            if saved.get('features') != FEATURES:
+                logger.info("Havuz modeli özellik listesi değişmiş - yeniden eğitilecek")
+                return
+            self.model = saved['model']
+            self.trained = saved.get('trained', 0)
+            self.train_metrics = saved.get('metrics', {})
+        except Exception as e:
+            logger.warning(f"Havuz modeli yüklenemedi: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.model_file) or '.', exist_ok=True)
+        tmp = self.model_file + '.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump({'model': self.model, 'features': FEATURES, 'trained': self.trained,
+                             'metrics': self.train_metrics}, f)
+            os.replace(tmp, self.model_file)
+        except Exception as e:
+            logger.error(f"Havuz modeli kaydedilemedi: {e}")
+
+    # ==================== PANEL ====================
+
+    def universe(self, limit: int = UNIVERSE_SIZE) -> List[str]:
+        """En hacimli TRY pariteleri (paylaşılan ticker listesinden)"""
+        tickers = [t for t in intraday_bars.tickers() if t.get('pairNormalized', '').endswith(f'_{QUOTE}')]
+        tickers.sort(key=lambda t: float(t.get('volume', 0) or 0) * float(t.get('last', 0) or 0), reverse=True)
+        symbols = [t['pairNormalized'][:-len(QUOTE) - 1] for t in tickers[:limit]]
+        if 'BTC' not in symbols:
+            symbols.append('BTC')
+        return symbols
+
+    def panel(self, symbols: List[str], pause: float = 0) -> pd.DataFrame:
+        """Sembol x gün tablosu: özellikler + rejim özellikleri + hedef"""
+        frames = []
+        btc = None
+        for symbol in symbols:
+            try:
+                frame = feature_store.frame(symbol, QUOTE)
+            except Exception as e:
+                logger.debug(f"Havuz modeli özellik hatası {symbol}: {e}")
+                continue
+            if symbol == 'BTC':
+                btc = frame
+            if len(frame) < MIN_BARS:
+                continue
+            data = frame[['timestamp', 'close'] + SYMBOL_FEATURES].copy()
+            data['symbol'] = symbol
+            data['target'] = add_target(frame, HORIZON).clip(-MAX_TARGET, MAX_TARGET)
+            frames.append(data)
+            if pause:
+                time.sleep(pause)
+        if not frames:
+            return pd.DataFrame()
+
+        panel = pd.concat(frames, ignore_index=True)
+        if btc is not None and not btc.empty:
+            regime = btc[['timestamp', 'momentum_20', 'volatility_20']].rename(
+                columns={'momentum_20': 'btc_momentum_20', 'volatility_20': 'btc_volatility_20'})
+            panel = panel.merge(regime, on='timestamp', how='left')
+        else:
+            panel['btc_momentum_20'] = np.nan
+            panel['btc_volatility_20'] = np.nan
+        by_day = panel.groupby('timestamp')
+        panel['breadth'] = by_day['returns'].transform(lambda r: (r > 0).mean())
+        panel['momentum_rank'] = by_day['momentum_20'].rank(pct=True)
+        return panel
+
+    # ==================== EĞİTİM ====================
+
+    @staticmethod
+    def _build_model():
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        # NaN'ları kendisi işler - ısınma satırları atılmadan kullanılabilir
+        return HistGradientBoostingRegressor(max_iter=300, learning_rate=0.05, max_leaf_nodes=31,
+                                             min_samples_leaf=40, l2_regularization=1.0, random_state=42)
+
+    @staticmethod
+    def _rank_ic(frame: pd.DataFrame) -> float:
+        """Gün başına tahmin/gerçek sıra korelasyonu ortalaması"""
+        ics = []
+        for _, day in frame.groupby('timestamp'):
+            if len(day) >= 5:
+                ics.append(day['pred'].rank().corr(day['target'].rank()))
+        ics = [x for x in ics if not np.isnan(x)]
+        return float(np.mean(ics)) if ics else 0.0
+
+    @timed()
+    def train(self, panel: Optional[pd.DataFrame] = None) -> Dict:
+        """Paneli kur, son günlerde doğrula, tüm veriyle yeniden eğit"""
+        started = time.time()
+        if panel is None:
+            panel = self.panel(self.universe(), pause=FETCH_PAUSE)
+        labelled = panel.dropna(subset=['target']) if not panel.empty else panel
+        if len(labelled) < 500:
+            return {'error': 'Yetersiz veri', 'rows': len(labelled)}
+
+        cutoff = labelled['timestamp'].max() - HOLDOUT_DAYS * 86400
+        # Ambargo: hedefi (HORIZON gün ileri) doğrulama penceresine taşan satırlar eğitime alınmaz
+        fit = labelled[labelled['timestamp'] <= cutoff - HORIZON * 86400]
+        holdout = labelled[labelled['timestamp'] > cutoff]
+        metrics = {'rows': len(labelled), 'symbols': int(labelled['symbol'].nunique())}
+        if len(fit) >= 500 and len(holdout) >= 50:
+            model = self._build_model()
+            model.fit(fit[FEATURES].to_numpy(dtype=float), fit['target'].to_numpy())
+            holdout = holdout.assign(pred=model.predict(holdout[FEATURES].to_numpy(dtype=float)))
+            metrics['holdout_rank_ic'] = round(self._rank_ic(holdout), 4)
+            metrics['holdout_mae'] = round(float((holdout['pred'] - holdout['target']).abs().mean()), 4)
+
+        model = self._build_model()
+        model.fit(labelled[FEATURES].to_numpy(dtype=float), labelled['target'].to_numpy())
+        metrics['seconds'] = round(time.time() - started, 1)
+
+        with self._lock:
+            self.model = model
+            self.trained = time.time()
+            self.train_metrics = metrics
+        self.save()
+        self.stats['trainings'] += 1
+        logger.info(f"🌐 Havuz modeli eğitildi: {metrics}")
+        self.predict_all(panel)
+        return metrics
+
+    # ==================== TAHMİN ====================
+
+    @timed()
+    def predict_all(self, panel: Optional[pd.DataFrame] = None) -> Dict[str, Dict]:
+        """Tüm evren için tek predict çağrısı (her sembolün son mumu)"""
+        if self.model is None:
+            return {}
+        if panel is None:
+            panel = self.panel(self.universe())
+        if panel.empty:
+            return {}
+
+        started = time.perf_counter()
+        latest = panel.sort_values('timestamp').groupby('symbol').tail(1)
+        latest = latest[latest['timestamp'] >= time.time() - MAX_STALE_DAYS * 86400]
+        if latest.empty:
+            return {}
+        expected = self.model.predict(latest[FEATURES].to_numpy(dtype=float))
+        ranks = pd.Series(expected).rank(pct=True).to_numpy()
+
+        predictions = {}
+        for symbol, ts, value, rank in zip(latest['symbol'], latest['timestamp'], expected, ranks):
+            predictions[symbol] = {
+                'symbol': symbol,
+                'expected_return': round(float(value) * 100, 2),
+                'rank': round(float(rank), 3),
+                'score': round(float(rank) * 100, 1),
+                'timestamp': int(ts)
+            }
+        with self._lock:
+            self.predictions = predictions
+            self.predicted = time.time()
+        self.stats['prediction_rounds'] += 1
+        self.stats['last_predict_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return predictions
+
+    def prediction(self, symbol: str) -> Optional[Dict]:
+        """Hazır tahmin (ağ/model çağrısı yok)"""
+        return self.predictions.get(symbol.upper())
+
+    def ranking(self, limit: Optional[int] = None) -> List[Dict]:
+        ranked = sorted(self.predictions.values(), key=lambda p: p['expected_return'], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def start_background_refresh(self, retrain_interval: int = RETRAIN_SECONDS,
+                                 predict_interval: int = PREDICT_SECONDS):
+        """Daemon thread: model eskiyse yeniden eğit, yoksa sadece tahminleri tazele"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    if self.model is None or time.time() - self.trained >= retrain_interval:
+                        self.train()
+                    else:
+                        self.predict_all()
+                except Exception as e:
+                    self.stats['train_errors'] += 1
+                    logger.error(f"Havuz modeli hatası: {e}")
+                time.sleep(predict_interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='pooled-model')
+        self._thread.start()
+
+    def status(self) -> Dict:
+        return {**self.stats, 'trained': self.trained or None, 'metrics': self.train_metrics,
+                'predictions': len(self.predictions),
+                'age': round(time.time() - self.predicted, 1) if self.predicted else None}
+
+
+pooled_model = PooledModel()
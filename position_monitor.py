@@ -0,0 +1,295 @@
+"""
+🛰️ POSITION MONITOR - Mum içi yüksek/düşük duyarlı pozisyon izleme
+Scalping ve sinyal takipçisinin açık pozisyonları tek serviste izlenir
++ Fiyat akışı (ticker) dakikalık OHLC mumlarına katlanır; boşluklar 1 dk klines ile doldurulur
++ Hedef/stop son fiyatla değil mumun high/low değeriyle kontrol edilir - arada
+  dokunulup geri dönülen seviyeler kaçmaz, ilk dokunuş zamanı kaydedilir
++ Tüm takipçilerin tüm pozisyonları her güncellemede tek numpy geçişiyle değerlendirilir
++ Sonuçlar takipçi başına toplu yazılır (close_positions)
+
+Takipçi arayüzü:
+    open_positions() -> [{'key', 'symbol', 'entry', 'target', 'stop', 'opened', 'deadline'}]
+    close_positions([{'key', 'result': TARGET|STOP|TIMEOUT, 'price', 'ts', ...}])
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+BTCTURK_TICKER = "https://api.btcturk.com/api/v2/ticker"
+BTCTURK_KLINES = "https://graph-api.btcturk.com/v1/klines/history"
+
+BAR_SECONDS = 60
+POLL_SECONDS = 15           # Açık pozisyon varken ticker yoklama aralığı
+GAP_SECONDS = 120           # Bundan uzun veri boşluğu klines ile doldurulur
+BACKFILL_MAX = 24 * 3600    # En fazla bu kadar geriye mum çekilir
+MAX_BARS = 1440             # Sembol başına tutulan en fazla mum
+
+TARGET = "TARGET"
+STOP = "STOP"
+TIMEOUT = "TIMEOUT"
+
+
+def _minute(ts: float) -> int:
+    return int(ts) - int(ts) % BAR_SECONDS
+
+
+def first_touches(positions: List[Dict], bars: Dict[str, List], now: float) -> List[Dict]:
+    """
+    Pozisyonları mumlara karşı değerlendir (tek vektörel geçiş)
+    bars: sembol -> [(ts, open, high, low, close)] artan
+    Aynı mumda hem hedef hem stop görülürse açılış fiyatı hedefin üstünde değilse
+    stop sayılır (mum içi sıra bilinmiyor - kötümser varsayım)
+    """
+    if not positions:
+        return []
+
+    symbols = sorted({p['symbol'] for p in positions})
+    index = {s: i for i, s in enumerate(symbols)}
+    width = max([len(bars.get(s, [])) for s in symbols] + [1])
+
+    ts = np.full((len(symbols), width), np.inf)
+    ohlc = np.full((4, len(symbols), width), np.nan)
+    for i, s in enumerate(symbols):
+        series = bars.get(s, [])
+        if series:
+            arr = np.asarray(series, dtype=float)
+            ts[i, :len(arr)] = arr[:, 0]
+            ohlc[:, i, :len(arr)] = arr[:, 1:].T
+
+    row = np.array([index[p['symbol']] for p in positions])
+    target = np.array([float(p['target']) for p in positions])[:, None]
+    stop = np.array([float(p['stop']) for p in positions])[:, None]
+    opened = np.array([_minute(p['opened']) for p in positions])[:, None]
+    deadline = np.array([p.get('deadline') or np.inf for p in positions], dtype=float)[:, None]
+
+    bar_ts = ts[row]
+    opens, highs, lows, closes = (a[row] for a in ohlc)
+    valid = (bar_ts >= opened) & (bar_ts < deadline)
+    with np.errstate(invalid='ignore'):
+        hit_t = valid & (highs >= target)
+        hit_s = valid & (lows <= stop)
+
+    never = width
+    first_t = np.where(hit_t.any(1), hit_t.argmax(1), never)
+    first_s = np.where(hit_s.any(1), hit_s.argmax(1), never)
+    last_valid = np.where(valid.any(1), width - 1 - valid[:, ::-1].argmax(1), -1)
+
+    rows = np.arange(len(positions))
+    at_t = np.minimum(first_t, width - 1)
+    at_s = np.minimum(first_s, width - 1)
+    open_t = opens[rows, at_t]
+    open_s = opens[rows, at_s]
+    target_first = (first_t < first_s) | ((first_t == first_s) & (first_t < never) & (open_t >= target[:, 0]))
+    stop_first = (first_s < never) & ~target_first
+
+    results = []
+    for k, p in enumerate(positions):
+        if target_first[k]:
+            # Mum seviyenin üstünde açıldıysa dolum açılış fiyatından
+            price = max(float(target[k, 0]), float(open_t[k])) if not np.isnan(open_t[k]) else float(target[k, 0])
+            results.append({**p, 'result': TARGET, 'price': price, 'ts': float(bar_ts[k, at_t[k]])})
+        elif stop_first[k]:
+            price = min(float(stop[k, 0]), float(open_s[k])) if not np.isnan(open_s[k]) else float(stop[k, 0])
+            results.append({**p, 'result': STOP, 'price': price, 'ts': float(bar_ts[k, at_s[k]])})
+        elif now >= deadline[k, 0]:
+            j = last_valid[k]
+            price = float(closes[k, j]) if j >= 0 else None
+            results.append({**p, 'result': TIMEOUT, 'price': price, 'ts': float(deadline[k, 0])})
+    return results
+
+
+class PositionMonitor:
+    """
+    Takipçi kayıt defteri + dakikalık mum deposu
+    bars: sembol -> {mum_ts: [open, high, low, close]}
+    """
+
+    def __init__(self):
+        self.books = OrderedDict()
+        self.bars = {}
+        self.synced = {}        # sembol -> son fiyat güncellemesi (epoch)
+        self.last_prices = {}
+        self.session = requests.Session()
+        self._lock = threading.RLock()
+        self._thread = None
+        self.stats = {'updates': 0, 'evaluated': 0, 'closed': 0, 'backfills': 0}
+
+    def register(self, name: str, book):
+        """open_positions/close_positions sağlayan takipçiyi ekle"""
+        self.books[name] = book
+
+    # ==================== FİYAT GİRİŞİ ====================
+
+    def on_prices(self, prices: Dict[str, float], ts: Optional[float] = None):
+        """Anlık fiyatları (sembol -> fiyat) o dakikanın mumuna katla"""
+        ts = ts or time.time()
+        minute = _minute(ts)
+        with self._lock:
+            for symbol, price in prices.items():
+                if not price or price <= 0:
+                    continue
+                series = self.bars.setdefault(symbol, {})
+                bar = series.get(minute)
+                if bar is None:
+                    series[minute] = [price, price, price, price]
+                else:
+                    bar[1] = max(bar[1], price)
+                    bar[2] = min(bar[2], price)
+                    bar[3] = price
+                self.last_prices[symbol] = price
+                self.synced[symbol] = ts
+
+    def on_bars(self, symbol: str, bars: Dict):
+        """Hazır mumları ekle (timestamps/open/high/low/close listeleri)"""
+        with self._lock:
+            series = self.bars.setdefault(symbol, {})
+            for t, o, h, l, c in zip(bars['timestamps'], bars['open'], bars['high'], bars['low'], bars['close']):
+                current = series.get(_minute(t))
+                if current:
+                    current[1], current[2] = max(current[1], h), min(current[2], l)
+                else:
+                    series[_minute(t)] = [o, h, l, c]
+            if bars['timestamps']:
+                self.synced[symbol] = max(self.synced.get(symbol, 0), bars['timestamps'][-1] + BAR_SECONDS)
+                self.last_prices.setdefault(symbol, bars['close'][-1])
+
+    def fetch_prices(self) -> Dict[str, float]:
+        """Tek ticker isteğiyle tüm TRY pariteleri"""
+        try:
+            data = self.session.get(BTCTURK_TICKER, timeout=10).json().get('data', []) or []
+        except Exception as e:
+            logger.error(f"Pozisyon izleme ticker hatası: {e}")
+            return {}
+        prices = {}
+        for t in data:
+            pair = t.get('pairNormalized', '')
+            if pair.endswith('_TRY'):
+                prices[pair[:-4]] = float(t.get('last', 0) or 0)
+        return prices
+
+    def fetch_klines(self, symbol: str, start_ts: int, end_ts: int) -> Optional[Dict]:
+        """BTCTurk 1 dakikalık mumlar"""
+        try:
+            data = self.session.get(BTCTURK_KLINES, params={
+                'symbol': f"{symbol}TRY", 'resolution': 1, 'from': start_ts, 'to': end_ts
+            }, timeout=15).json()
+            if data.get('c'):
+                return {
+                    'timestamps': [int(x) for x in data.get('t', [])],
+                    'open': [float(x) for x in data.get('o', [])],
+                    'high': [float(x) for x in data.get('h', [])],
+                    'low': [float(x) for x in data.get('l', [])],
+                    'close': [float(x) for x in data.get('c', [])]
+                }
+        except Exception as e:
+            logger.debug(f"Pozisyon izleme klines hatası {symbol}: {e}")
+        return None
+
+    def _backfill(self, positions: List[Dict], now: float):
+        """Fiyat akışının görmediği aralıkları (yeniden başlatma, yeni pozisyon) doldur"""
+        since = {}
+        for p in positions:
+            since[p['symbol']] = min(since.get(p['symbol'], now), p['opened'])
+        for symbol, opened in since.items():
+            synced = self.synced.get(symbol)
+            if synced and now - synced <= GAP_SECONDS:
+                continue
+            start = int(max(synced or opened, opened, now - BACKFILL_MAX))
+            klines = self.fetch_klines(symbol, start - BAR_SECONDS, int(now))
+            if klines:
+                self.on_bars(symbol, klines)
+                self.stats['backfills'] += 1
+
+    def _trim(self, positions: List[Dict]):
+        oldest = {}
+        for p in positions:
+            oldest[p['symbol']] = min(oldest.get(p['symbol'], p['opened']), _minute(p['opened']))
+        for symbol in list(self.bars):
+            if symbol not in oldest:
+                del self.bars[symbol]
+                continue
+            series = self.bars[symbol]
+            keep = sorted(t for t in series if t >= oldest[symbol])[-MAX_BARS:]
+            if len(keep) != len(series):
+                self.bars[symbol] = {t: series[t] for t in keep}
+
+    # ==================== DEĞERLENDİRME ====================
+
+    def update(self, prices: Optional[Dict[str, float]] = None, fetch: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Bir güncelleme turu: fiyat al, boşlukları doldur, tüm pozisyonları değerlendir,
+        kapananları takipçilere toplu yaz. Dönen: takipçi -> kapanan sonuçlar
+        """
+        with self._lock:
+            positions = []
+            for name, book in self.books.items():
+                try:
+                    positions.extend({**p, 'book': name} for p in book.open_positions())
+                except Exception as e:
+                    logger.error(f"Pozisyon okuma hatası ({name}): {e}")
+            if not positions:
+                return {}
+
+            now = time.time()
+            # Önce boşluklar: akışın görmediği aralık, yeni fiyatla kapanmış sayılmasın
+            if fetch:
+                self._backfill(positions, now)
+            if prices is None and fetch:
+                prices = self.fetch_prices()
+            if prices:
+                symbols = {p['symbol'] for p in positions}
+                self.on_prices({s: v for s, v in prices.items() if s in symbols}, now)
+            self._trim(positions)
+
+            bars = {s: [(t, *bar) for t, bar in sorted(series.items())] for s, series in self.bars.items()}
+            results = first_touches(positions, bars, now)
+            for r in results:
+                if r['price'] is None:
+                    r['price'] = self.last_prices.get(r['symbol'], r['entry'])
+
+            grouped = {}
+            for r in results:
+                grouped.setdefault(r['book'], []).append(r)
+            for name, closed in grouped.items():
+                try:
+                    self.books[name].close_positions(closed)
+                except Exception as e:
+                    logger.error(f"Pozisyon yazma hatası ({name}): {e}")
+
+            self.stats['updates'] += 1
+            self.stats['evaluated'] += len(positions)
+            self.stats['closed'] += len(results)
+            return grouped
+
+    def last_price(self, symbol: str) -> float:
+        return self.last_prices.get(symbol, 0)
+
+    def start(self, interval: int = POLL_SECONDS):
+        """Arka plan izleme - açık pozisyon yokken ağ isteği yapılmaz"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.update()
+                except Exception as e:
+                    logger.error(f"Pozisyon izleme hatası: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='position-monitor')
+        self._thread.start()
+
+    def metrics(self) -> Dict:
+        return {**self.stats, 'books': list(self.books), 'symbols': len(self.bars)}
+
+
+position_monitor = PositionMonitor()
@@ -9,9 +9,21 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import requests
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = "prediction_tracker.db"
 
+# Sonuçlanan her tahmin için çağrılır (örn. online_learner)
+_resolution_listeners = []
+
+
+def on_resolved(callback):
+    """Tahmin sonuçlandığında çağrılacak fonksiyonu ekle: callback(sonuç_sözlüğü)"""
+    if callback not in _resolution_listeners:
+        _resolution_listeners.append(callback)
+
 class PredictionTracker:
     def __init__(self):
         self.db_path = DB_PATH
@@ -42,6 +54,11 @@ class PredictionTracker:
             )
         ''')
         
+        # Tahmin anındaki skor bileşenleri (JSON) - çevrimiçi öğrenme için
+        cursor.execute("PRAGMA table_info(predictions)")
+        if 'features' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN features TEXT")
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS accuracy_stats (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -67,8 +84,13 @@ class PredictionTracker:
                        target_percent: Optional[float] = None,
                        source: str = "QUANTUM_SYSTEM",
                        reasoning: str = "",
-                       evaluation_days: int = 10) -> int:
-        """Yeni tahmin ekle"""
+                       evaluation_days: int = 10,
+                       features: Optional[Dict] = None,
+                       skip_if_pending: bool = False) -> int:
+        """
+        Yeni tahmin ekle
+        skip_if_pending: aynı sembol + kaynak için bekleyen tahmin varsa ekleme (0 döner)
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -86,15 +108,29 @@ class PredictionTracker:
             else:
                 target_price = entry_price * (1 - target_percent / 100)
         
-        cursor.execute('''
-            INSERT INTO predictions 
-            (symbol, direction, entry_price, target_price, target_percent, 
-             source, reasoning, created_at, evaluation_at, result)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING')
-        ''', (symbol.upper(), direction.upper(), entry_price, target_price, 
-              target_percent, source, reasoning, created_at, evaluation_at))
-        
-        prediction_id = cursor.lastrowid or 0
+        values = (symbol.upper(), direction.upper(), entry_price, target_price,
+                  target_percent, source, reasoning, created_at, evaluation_at,
+                  json.dumps(features) if features else None)
+        if skip_if_pending:
+            # Kontrol + ekleme tek ifadede - eşzamanlı isteklerde de tek kayıt
+            cursor.execute('''
+                INSERT INTO predictions 
+                (symbol, direction, entry_price, target_price, target_percent, 
+                 source, reasoning, created_at, evaluation_at, result, features)
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM predictions WHERE symbol = ? AND source = ? AND result = 'PENDING'
+                )
+            ''', values + (symbol.upper(), source))
+        else:
+            cursor.execute('''
+                INSERT INTO predictions 
+                (symbol, direction, entry_price, target_price, target_percent, 
+                 source, reasoning, created_at, evaluation_at, result, features)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?)
+            ''', values)
+        
+        prediction_id = cursor.lastrowid if cursor.rowcount > 0 else 0
         conn.commit()
         conn.close()
         
@@ -173,7 +209,7 @@ class PredictionTracker:
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT symbol, direction, entry_price, target_price
+            SELECT symbol, direction, entry_price, target_price, source, features
             FROM predictions WHERE id = ?
         ''', (prediction_id,))
         
@@ -182,7 +218,7 @@ class PredictionTracker:
             conn.close()
             return {'error': 'Prediction not found'}
         
-        symbol, direction, entry_price, target_price = row
+        symbol, direction, entry_price, target_price, source, features = row
         
         outcome_pct = ((exit_price - entry_price) / entry_price) * 100
         
@@ -202,14 +238,24 @@ class PredictionTracker:
         conn.commit()
         conn.close()
         
-        return {
+        resolved = {
+            'id': prediction_id,
             'symbol': symbol,
             'direction': direction,
             'entry_price': entry_price,
             'exit_price': exit_price,
             'outcome_pct': outcome_pct,
-            'result': result
+            'result': result,
+            'source': source
         }
+        
+        for callback in _resolution_listeners:
+            try:
+                callback({**resolved, 'features': json.loads(features) if features else None})
+            except Exception as e:
+                logger.error(f"Tahmin sonuç dinleyicisi hatası: {e}")
+        
+        return resolved
     
     def evaluate_due_predictions(self) -> List[Dict]:
         """Zamanı gelen tahminleri BTCTurk fiyatlarıyla değerlendir"""
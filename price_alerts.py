@@ -10,6 +10,9 @@ import threading
 import time
 from datetime import datetime
 
+from telegram_outbox import telegram_outbox
+from alert_engine import AlertEngine, TARGET_HIT, prices_from_tickers
+
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 ALERTS_FILE = "active_alerts.json"
@@ -19,6 +22,9 @@ class PriceAlertSystem:
         self.alerts = self.load_alerts()
         self.running = False
         self.check_interval = 60  # 1 dakikada bir kontrol
+        self._lock = threading.RLock()
+        self.engine = AlertEngine()
+        self.engine.rebuild(self.get_active_alerts())
         
     def load_alerts(self):
         """Kayıtlı alarmları yükle"""
@@ -37,9 +43,8 @@ class PriceAlertSystem:
     
     def add_alert(self, symbol: str, target_price: float, stop_loss: float, 
                   entry_price: float, alert_type: str = "both"):
-        """Yeni alarm ekle"""
+        """Yeni alarm ekle (id kilit altında - eşzamanlı eklemeler aynı id'yi alamaz)"""
         alert = {
-            "id": len(self.alerts["price_alerts"]) + 1,
             "symbol": symbol.upper(),
             "entry_price": entry_price,
             "target_price": target_price,
@@ -48,76 +53,80 @@ class PriceAlertSystem:
             "created_at": datetime.now().isoformat(),
             "status": "active"
         }
-        self.alerts["price_alerts"].append(alert)
-        self.save_alerts()
+        with self._lock:
+            ids = [a.get("id", 0) for a in self.alerts["price_alerts"] + self.alerts.get("triggered_alerts", [])]
+            alert = {"id": max(ids, default=0) + 1, **alert}
+            self.alerts["price_alerts"].append(alert)
+            self.engine.add(alert)
+            self.save_alerts()
         return alert
     
     def remove_alert(self, alert_id: int):
         """Alarm sil"""
-        self.alerts["price_alerts"] = [
-            a for a in self.alerts["price_alerts"] 
-            if a.get("id") != alert_id
-        ]
-        self.save_alerts()
+        with self._lock:
+            self.alerts["price_alerts"] = [
+                a for a in self.alerts["price_alerts"] 
+                if a.get("id") != alert_id
+            ]
+            self.engine.remove(alert_id)
+            self.save_alerts()
     
     def get_active_alerts(self):
         """Aktif alarmları getir"""
         return [a for a in self.alerts["price_alerts"] if a.get("status") == "active"]
     
-    def get_current_price(self, symbol: str) -> float:
-        """BTCTurk'ten güncel fiyat al"""
+    def fetch_tickers(self) -> list:
+        """BTCTurk ticker listesi (tek istek)"""
         try:
             resp = requests.get("https://api.btcturk.com/api/v2/ticker", timeout=10)
-            data = resp.json().get('data', [])
-            
-            for ticker in data:
-                pair = ticker.get('pairNormalized', '')
-                if pair == f"{symbol}_USDT":
-                    return float(ticker.get('last', 0))
-            return 0
+            return resp.json().get('data', []) or []
         except:
-            return 0
+            return []
     
-    def check_alerts(self):
-        """Tüm alarmları kontrol et"""
-        active_alerts = self.get_active_alerts()
-        triggered = []
-        
-        for alert in active_alerts:
-            symbol = alert["symbol"]
-            current_price = self.get_current_price(symbol)
-            
-            if current_price <= 0:
-                continue
-            
-            target = alert["target_price"]
-            stop = alert["stop_loss"]
-            entry = alert["entry_price"]
+    def get_current_price(self, symbol: str) -> float:
+        """BTCTurk'ten güncel fiyat al"""
+        return prices_from_tickers(self.fetch_tickers()).get(symbol.upper(), 0)
+    
+    def check_alerts(self, tickers: list = None):
+        """
+        Tüm alarmları kontrol et
+        tickers verilirse (ör. piyasa özeti) ağ isteği yapılmaz; yoksa tek
+        ticker indirmesiyle tüm alarmlar tetik defterlerinde değerlendirilir
+        """
+        with self._lock:
+            if not len(self.engine):
+                return []
+            prices = prices_from_tickers(tickers if tickers is not None else self.fetch_tickers())
+            return self.check_prices(prices)
+    
+    def check_prices(self, prices: dict):
+        """{sembol: USDT fiyatı} görüntüsünü uygula, tetiklenen alarmları döndür"""
+        with self._lock:
+            hits = self.engine.evaluate(prices)
+            if not hits:
+                return []
             
-            # HEDEF FİYAT KONTROLÜ
-            if current_price >= target:
-                profit_pct = ((current_price - entry) / entry) * 100
-                self.trigger_alert(alert, "TARGET_HIT", current_price, profit_pct)
+            by_id = {a.get("id"): a for a in self.get_active_alerts()}
+            triggered = []
+            for alert_id, alert_type, current_price in hits:
+                alert = by_id.get(alert_id)
+                if not alert:
+                    continue
+                entry = alert["entry_price"]
+                pnl_pct = ((current_price - entry) / entry) * 100 if entry else 0
+                self.trigger_alert(alert, alert_type, current_price, pnl_pct)
                 alert["status"] = "triggered"
                 triggered.append(alert)
             
-            # STOP LOSS KONTROLÜ
-            elif current_price <= stop:
-                loss_pct = ((current_price - entry) / entry) * 100
-                self.trigger_alert(alert, "STOP_LOSS", current_price, loss_pct)
-                alert["status"] = "triggered"
-                triggered.append(alert)
-        
-        if triggered:
-            self.save_alerts()
-        
-        return triggered
+            if triggered:
+                self.save_alerts()
+            return triggered
     
     def trigger_alert(self, alert: dict, alert_type: str, current_price: float, pnl_pct: float):
         """Alarm tetikle ve Telegram'a gönder"""
         symbol = alert["symbol"]
         
-        if alert_type == "TARGET_HIT":
+        if alert_type == TARGET_HIT:
             emoji = "🎯✅"
             title = "HEDEF FİYAT ULAŞILDI!"
             color = "🟢"
@@ -160,18 +169,7 @@ class PriceAlertSystem:
     
     def send_telegram(self, message: str):
         """Telegram'a mesaj gönder"""
-        try:
-            requests.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-                json={
-                    'chat_id': TELEGRAM_CHAT_ID,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
-        except Exception as e:
-            print(f"Telegram hatası: {e}")
+        telegram_outbox.send(message, TELEGRAM_CHAT_ID, token=TELEGRAM_TOKEN)
     
     def start_monitoring(self):
         """Arka planda alarm izleme başlat"""
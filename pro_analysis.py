@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
 
+from order_books import order_books
+from instrumentation import timed
+
 class ProAnalysis:
     """
     PRO Analiz Sistemi - 8 Gelişmiş Modül:
@@ -525,6 +528,7 @@ class ProAnalysis:
     
     # ==================== ANA ANALİZ FONKSİYONU ====================
     
+    @timed()
     def full_pro_analysis(self, symbol: str) -> Dict:
         """
         Tam PRO analiz - 8 modülün hepsini çalıştır
@@ -573,7 +577,10 @@ class ProAnalysis:
             btc_prices = [price] * 20
             correlation = self.calculate_btc_correlation(prices, btc_prices)
             
-            whale = self.analyze_whale_activity(volume, avg_volume, change)
+            # Tek coin komutu - defter izlenmiyorsa bir kez çekilir, sonra paylaşılır
+            book = order_books.metrics(symbol, fetch=True)
+            whale = self.analyze_whale_activity(volume, avg_volume, change,
+                                                book['order_book_ratio'] if book else 1.0)
             
             social = self.analyze_social_sentiment(symbol)
             
@@ -10,6 +10,12 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+from coin_markets import coin_markets
+from order_books import order_books
+from surge_index import compute_surge_table
+from instrumentation import timed
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +37,24 @@ class PumpValidator:
         except:
             return []
     
+    @staticmethod
+    def _empty_ohlcv() -> Dict:
+        return {'opens': [], 'highs': [], 'lows': [], 'closes': [], 'volumes': []}
+    
+    @staticmethod
+    def _frame_to_ohlcv(hist) -> Dict:
+        """yfinance DataFrame'ini liste sözlüğüne çevir"""
+        hist = hist.dropna(subset=['Close'])
+        if len(hist) == 0:
+            return PumpValidator._empty_ohlcv()
+        return {
+            'opens': hist['Open'].tolist(),
+            'highs': hist['High'].tolist(),
+            'lows': hist['Low'].tolist(),
+            'closes': hist['Close'].tolist(),
+            'volumes': hist['Volume'].fillna(0).tolist()
+        }
+    
     def get_ohlcv_data(self, symbol: str, days: int = 30) -> Dict:
         """OHLCV verilerini al"""
         try:
@@ -38,16 +62,44 @@ class PumpValidator:
             ticker = yf.Ticker(f"{symbol}-USD")
             hist = ticker.history(period=f"{days}d")
             if len(hist) > 0:
-                return {
-                    'opens': hist['Open'].tolist(),
-                    'highs': hist['High'].tolist(),
-                    'lows': hist['Low'].tolist(),
-                    'closes': hist['Close'].tolist(),
-                    'volumes': hist['Volume'].tolist()
-                }
+                return self._frame_to_ohlcv(hist)
         except:
             pass
-        return {'opens': [], 'highs': [], 'lows': [], 'closes': [], 'volumes': []}
+        return self._empty_ohlcv()
+    
+    def get_ohlcv_batch(self, symbols: List[str], days: int = 60) -> Dict[str, Dict]:
+        """
+        Toplu OHLCV ön yüklemesi
+        Tüm adaylar için tek bir yf.download çağrısı yapar
+        """
+        result = {s: self._empty_ohlcv() for s in symbols}
+        if not symbols:
+            return result
+        
+        tickers = [f"{s}-USD" for s in symbols]
+        try:
+            import yfinance as yf
+            data = yf.download(tickers, period=f"{days}d", group_by='ticker',
+                               threads=True, progress=False, auto_adjust=False)
+            if data is None or len(data) == 0:
+                return result
+            
+            multi = getattr(data.columns, 'nlevels', 1) > 1
+            for symbol, ticker in zip(symbols, tickers):
+                try:
+                    if multi:
+                        if ticker not in data.columns.get_level_values(0):
+                            continue
+                        hist = data[ticker]
+                    else:
+                        hist = data
+                    result[symbol] = self._frame_to_ohlcv(hist)
+                except Exception as e:
+                    logger.debug(f"Batch OHLCV parse error {symbol}: {e}")
+        except Exception as e:
+            logger.warning(f"Batch OHLCV error: {e}")
+        
+        return result
     
     def analyze_candle_structure(self, opens: List[float], highs: List[float], 
                                    lows: List[float], closes: List[float]) -> Dict:
@@ -207,21 +259,19 @@ class PumpValidator:
         
         pump_events = []
         
-        for i in range(7, len(closes)):
-            daily_change = (closes[i] - closes[i-1]) / closes[i-1] * 100 if closes[i-1] > 0 else 0
+        table = compute_surge_table(closes, volumes, min_surge=15)
+        for j, i in enumerate(table['idx']):
+            daily_change = table['daily_pct'][j]
+            after_pump_change = table['ret_3d'][j]
+            if i < 7 or not daily_change > 15 or np.isnan(after_pump_change):
+                continue
             
-            if daily_change > 15:
-                next_3_days = closes[i+1:i+4] if i+4 <= len(closes) else closes[i+1:]
-                
-                if len(next_3_days) >= 2:
-                    after_pump_change = (next_3_days[-1] - closes[i]) / closes[i] * 100 if closes[i] > 0 else 0
-                    
-                    pump_events.append({
-                        'date_index': i,
-                        'pump_percent': round(daily_change, 1),
-                        'after_3_days': round(after_pump_change, 1),
-                        'was_fake': after_pump_change < -10
-                    })
+            pump_events.append({
+                'date_index': int(i),
+                'pump_percent': round(float(daily_change), 1),
+                'after_3_days': round(float(after_pump_change), 1),
+                'was_fake': bool(after_pump_change < -10)
+            })
         
         fake_pump_count = sum(1 for p in pump_events if p['was_fake'])
         total_pumps = len(pump_events)
@@ -259,14 +309,10 @@ class PumpValidator:
         Düşük market cap = kolay manipülasyon
         """
         try:
-            resp = requests.get(
-                f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}",
-                timeout=10
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                market_cap = data.get('market_data', {}).get('market_cap', {}).get('usd', 0)
-                total_volume = data.get('market_data', {}).get('total_volume', {}).get('usd', 0)
+            market = coin_markets.get(symbol)
+            if market:
+                market_cap = market['market_cap']
+                total_volume = market['volume_24h']
                 
                 if market_cap > 0:
                     volume_to_mcap = total_volume / market_cap * 100
@@ -380,12 +426,50 @@ class PumpValidator:
             'signals': signals
         }
     
-    def calculate_pump_reliability_score(self, symbol: str) -> Dict:
+    def analyze_order_book(self, symbol: str) -> Dict:
+        """
+        Emir defteri - sığ defter ve satış duvarı pump tuzağı işaretidir
+        Sadece izlenen defterden okunur (ağ isteği yok); defter yoksa nötr
+        """
+        book = order_books.metrics(symbol)
+        if not book:
+            return {'available': False, 'signal': 'VERI_YOK', 'signals': []}
+        
+        signals = []
+        slippage = book['slippage_buy_bps'].get(10_000)
+        depth = book['depth'][1.0]
+        
+        if slippage is None or slippage > 100:
+            signal = 'SIG_DEFTER'
+            signals.append("💧 Defter çok sığ - küçük emirle fiyat oynatılabilir")
+        elif book['imbalance'] < -0.4:
+            signal = 'SATIS_DUVARI'
+            signals.append(f"📕 Satış duvarı (dengesizlik {book['imbalance']:+.2f})")
+        elif book['imbalance'] > 0.4:
+            signal = 'ALIM_DESTEGI'
+            signals.append(f"📗 Güçlü alım desteği (dengesizlik {book['imbalance']:+.2f})")
+        else:
+            signal = 'NORMAL'
+        
+        return {
+            'available': True,
+            'signal': signal,
+            'spread_pct': round(book['spread_pct'], 3),
+            'imbalance': round(book['imbalance'], 3),
+            'depth_1pct_bid': depth['bid'],
+            'depth_1pct_ask': depth['ask'],
+            'slippage_10k_bps': slippage,
+            'signals': signals
+        }
+    
+    def calculate_pump_reliability_score(self, symbol: str, ohlcv: Optional[Dict] = None) -> Dict:
         """
         Pump güvenilirlik skoru hesapla
         Tüm analizleri birleştirerek final skor ver
+        ohlcv verilirse (toplu ön yükleme) tekrar indirilmez
         """
-        ohlcv = self.get_ohlcv_data(symbol, 60)
+        if ohlcv is None:
+            ohlcv = self.get_ohlcv_data(symbol, 60)
         
         if not ohlcv['closes']:
             return {
@@ -409,6 +493,8 @@ class PumpValidator:
         
         whale = self.detect_whale_activity(ohlcv['volumes'], ohlcv['closes'])
         
+        order_book = self.analyze_order_book(symbol)
+        
         final_score = 50
         
         if candle['signal'] == 'TUZAK_RISKI_YUKSEK':
@@ -442,6 +528,13 @@ class PumpValidator:
         elif whale['whale_type'] == 'ALIM_AKTIVITESI':
             final_score += 15
         
+        if order_book['signal'] == 'SIG_DEFTER':
+            final_score -= 15
+        elif order_book['signal'] == 'SATIS_DUVARI':
+            final_score -= 10
+        elif order_book['signal'] == 'ALIM_DESTEGI':
+            final_score += 5
+        
         final_score = max(0, min(100, final_score))
         
         if final_score >= 70:
@@ -467,6 +560,7 @@ class PumpValidator:
         all_warnings.append(historical.get('warning', ''))
         all_warnings.extend(market_cap.get('signals', []))
         all_warnings.extend(whale.get('signals', []))
+        all_warnings.extend(order_book.get('signals', []))
         all_warnings = [w for w in all_warnings if w]
         
         return {
@@ -480,12 +574,58 @@ class PumpValidator:
                 'volume': volume,
                 'historical': historical,
                 'market_cap': market_cap,
-                'whale': whale
+                'whale': whale,
+                'order_book': order_book
             },
             'warnings': all_warnings[:10],
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M")
         }
     
+    @timed()
+    def validate_pump(self, symbol: str, ohlcv: Optional[Dict] = None) -> Dict:
+        """Pump taraması için kısa doğrulama sonucu"""
+        analysis = self.calculate_pump_reliability_score(symbol, ohlcv)
+        analysis['total_score'] = analysis.get('reliability_score', 0)
+        return analysis
+    
+    def validate_candidates(self, symbols: List[str], deadline: float = 120,
+                            max_workers: int = 8, days: int = 60):
+        """
+        Pump adaylarını eşzamanlı doğrula
+        - Tek toplu OHLCV ön yüklemesi
+        - Thread havuzunda paralel skor
+        - Her sonuç hazır olur olmaz (symbol, sonuç) olarak döner
+        - deadline saniyesi dolunca kalan adaylar atlanır
+        """
+        if not symbols:
+            return
+        
+        started = time.time()
+        ohlcv_map = self.get_ohlcv_batch(symbols, days)
+        # Piyasa değeri / hacim tüm adaylar için tek toplu istekle
+        coin_markets.get_many(symbols)
+        # Adayların emir defterleri arka planda izlenmeye başlar
+        order_books.watch(symbols)
+        remaining = max(1.0, deadline - (time.time() - started))
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(symbols)))
+        futures = {
+            executor.submit(self.validate_pump, s, ohlcv_map.get(s)): s
+            for s in symbols
+        }
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                symbol = futures[future]
+                try:
+                    yield symbol, future.result()
+                except Exception as e:
+                    logger.debug(f"Pump validation error {symbol}: {e}")
+        except FuturesTimeout:
+            skipped = [s for f, s in futures.items() if not f.done()]
+            logger.warning(f"Pump doğrulama süresi doldu, atlanan: {', '.join(skipped)}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def format_pump_analysis_message(self, analysis: Dict) -> str:
         """Telegram için pump analiz mesajı oluştur"""
         symbol = analysis['symbol']
@@ -9,13 +9,17 @@ Quantum Analyzer V2 - Gelişmiş Analiz Sistemi
 
 import os
 import sys
-import requests
 from datetime import datetime
 import pytz
 import logging
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from market_overview import market_overview
+from pooled_model import pooled_model
+from telegram_outbox import telegram_outbox
+from instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
@@ -37,6 +41,7 @@ class QuantumAnalyzerV2:
         self.tracker = PredictionTracker()
         self.pattern = PatternDetector()
     
+    @timed()
     def analyze_coin(self, symbol):
         """Tek coin için tam analiz"""
         pair = f"{symbol}TRY"
@@ -62,7 +67,7 @@ class QuantumAnalyzerV2:
         # Hiç veri yoksa basit analiz yap
         if not multi_tf:
             # Ticker'dan basit analiz
-            return self._simple_analysis(symbol, ticker)
+            return self._apply_ml(self._simple_analysis(symbol, ticker))
         
         # Composite analiz
         result = self.engine.analyze_multi_timeframe(multi_tf)
@@ -88,8 +93,42 @@ class QuantumAnalyzerV2:
         result['high'] = ticker['high']
         result['low'] = ticker['low']
         
+        return self._apply_ml(result)
+    
+    def _apply_ml(self, result):
+        """
+        Havuz ML modelinin piyasa sırasını skora ekle (±10 puan)
+        Sinyal/etiket yeni skordan yeniden üretilir; ML skorun yönüne ters düşerse güven bir kademe düşer
+        """
+        ml = pooled_model.prediction(result['symbol'])
+        if not ml:
+            return result
+        result['ml'] = ml
+        result['score'] = max(0, min(100, result['score'] + round((ml['rank'] - 0.5) * 20)))
+        if ml['rank'] >= 0.8 or ml['rank'] <= 0.2:
+            result.setdefault('signals', []).append(
+                f"🤖 ML 7g: %{ml['expected_return']:+.1f} (sıra %{ml['rank'] * 100:.0f})")
+        
+        if result.get('data_source') == 'ticker_only':
+            result['signal'], result['prediction'] = self._simple_label(result['score'])
+        else:
+            result['signal'], result['prediction'] = self.engine.label(result['score'], result.get('alignment', 'NONE'))
+        bullish = result['signal'] in ('STRONG_BUY', 'BUY', 'WATCH')
+        bearish = result['signal'] in ('AVOID', 'SELL')
+        if (bullish and ml['expected_return'] < 0) or (bearish and ml['expected_return'] > 0):
+            result['confidence'] = {'HIGH': 'MEDIUM', 'MEDIUM': 'LOW'}.get(result.get('confidence'), 'LOW')
         return result
     
+    @staticmethod
+    def _simple_label(score):
+        """Sadece ticker verisiyle analiz edilen coinlerin skor -> (sinyal, etiket) eşlemesi"""
+        if score >= 60:
+            return 'WATCH', '🟡 İZLE'
+        elif score >= 45:
+            return 'NEUTRAL', '⚪ NÖTR'
+        else:
+            return 'AVOID', '🔴 UZAK DUR'
+    
     def _simple_analysis(self, symbol, ticker):
         """OHLCV olmayan coinler için basit analiz"""
         score = 50
@@ -127,16 +166,7 @@ class QuantumAnalyzerV2:
                 signals.append(f"Günlük dibe yakın (%{position:.0f})")
         
         score = max(0, min(100, score))
-        
-        if score >= 60:
-            signal = 'WATCH'
-            prediction = '🟡 İZLE'
-        elif score >= 45:
-            signal = 'NEUTRAL'
-            prediction = '⚪ NÖTR'
-        else:
-            signal = 'AVOID'
-            prediction = '🔴 UZAK DUR'
+        signal, prediction = self._simple_label(score)
         
         return {
             'symbol': symbol,
@@ -214,14 +244,15 @@ class QuantumAnalyzerV2:
         
         logger.info("🔬 Quantum MAX analiz başlıyor...")
         
-        # Market sentiment al
+        # Market sentiment al (F&G paylaşılan piyasa özetinden)
         try:
-            from src.analysis.market_data import MarketDataProvider
-            market = MarketDataProvider()
-            fng = market.get_fear_greed_index()
-            funding = market.get_funding_rates()
+            fng = market_overview.get()['fear_greed']
         except:
             fng = {'value': 50, 'classification': 'Neutral'}
+        try:
+            from src.analysis.market_data import MarketDataProvider
+            funding = MarketDataProvider().get_funding_rates()
+        except:
             funding = {}
         
         # Tüm coinleri tara (dengeli eşik: 60)
@@ -368,18 +399,7 @@ Güvenilirlik: {conf_text}
         if not BOT_TOKEN or not CHAT_ID:
             logger.warning("Telegram credentials missing")
             return False
-        try:
-            url = f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage'
-            resp = requests.post(url, json={
-                'chat_id': CHAT_ID,
-                'text': message,
-                'parse_mode': 'HTML',
-                'disable_web_page_preview': True
-            }, timeout=15)
-            return resp.status_code == 200
-        except Exception as e:
-            logger.error(f"Telegram error: {e}")
-            return False
+        return telegram_outbox.send(message, CHAT_ID, disable_preview=True, token=BOT_TOKEN)
 
 
 quantum_v2 = QuantumAnalyzerV2()
@@ -23,6 +23,9 @@ try:
 except:
     prediction_tracker = None
 
+from online_learner import online_learner
+from instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 class ModuleHealthMonitor:
@@ -134,17 +137,10 @@ class ModuleHealthMonitor:
 class QuantumAnalyzer:
     """Quantum Analiz Motoru - Tüm verileri birleştirir"""
     
-    def __init__(self):
-        self.weights = {
-            'technical': 0.25,
-            'sentiment': 0.20,
-            'whale': 0.15,
-            'volume': 0.15,
-            'momentum': 0.15,
-            'historical': 0.10
-        }
-        self.learning_data = []
-        self.accuracy_history = []
+    @property
+    def weights(self):
+        """Sonuçlanan tahminlerden artımlı öğrenilen ağırlıklar (online_learner)"""
+        return online_learner.weights()
     
     def quantum_score(self, data):
         """Tüm verileri birleştirip quantum skor üret"""
@@ -196,7 +192,8 @@ class QuantumAnalyzer:
         else:
             scores['historical'] = 50
         
-        quantum = sum(scores[k] * self.weights[k] for k in self.weights)
+        weights = self.weights
+        quantum = sum(scores[k] * weights[k] for k in weights)
         
         if quantum >= 75:
             signal = "🟢 QUANTUM AL"
@@ -219,36 +216,12 @@ class QuantumAnalyzer:
             'timestamp': datetime.now().isoformat()
         }
     
-    def learn_from_outcome(self, prediction, actual_outcome):
-        """Sonuçtan öğren ve ağırlıkları güncelle"""
-        self.learning_data.append({
-            'prediction': prediction,
-            'outcome': actual_outcome,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        if len(self.learning_data) >= 20:
-            correct = sum(1 for d in self.learning_data[-20:] 
-                         if (d['prediction'] > 60 and d['outcome'] > 0) or 
-                            (d['prediction'] < 40 and d['outcome'] < 0))
-            accuracy = correct / 20 * 100
-            self.accuracy_history.append(accuracy)
-            
-            if accuracy < 50 and len(self.accuracy_history) >= 3:
-                self._adjust_weights()
-    
-    def _adjust_weights(self):
-        """Ağırlıkları otomatik ayarla"""
-        adjustment = 0.02
-        
-        self.weights['technical'] += adjustment
-        self.weights['sentiment'] -= adjustment / 2
-        self.weights['historical'] -= adjustment / 2
-        
-        total = sum(self.weights.values())
-        self.weights = {k: v/total for k, v in self.weights.items()}
-        
-        logger.info(f"Quantum ağırlıklar güncellendi: {self.weights}")
+    def learn_from_outcome(self, prediction, actual_outcome, breakdown=None):
+        """Tek sonuçtan öğren: isabet istatistiği + (bileşenler varsa) ağırlıklarda SGD adımı"""
+        hit = (prediction > 60 and actual_outcome > 0) or (prediction < 40 and actual_outcome < 0)
+        online_learner.observe('quantum_score', hit=float(hit), outcome=actual_outcome)
+        if breakdown:
+            online_learner.learn(breakdown, actual_outcome)
 
 
 class AutoMaintenance:
@@ -421,14 +394,17 @@ class QuantumSystem:
         
         return self.health_monitor.get_health_report()
     
+    @timed()
     def run_quantum_analysis(self, symbol, data):
         """Quantum analiz çalıştır"""
         result = self.quantum_analyzer.quantum_score(data)
         self.stats['analyses'] += 1
         return result
     
-    def save_prediction(self, symbol, direction, entry_price, target_percent=None, reasoning=""):
-        """Tahmini kaydet ve takip et"""
+    def save_prediction(self, symbol, direction, entry_price, target_percent=None, reasoning="", features=None,
+                        skip_if_pending=False):
+        """Tahmini kaydet ve takip et (features: quantum skor bileşenleri - öğrenme için)
+        skip_if_pending: sembolün bekleyen tahmini varsa yenisi eklenmez (aynı gözlem bir kez öğrenilir)"""
         if prediction_tracker:
             try:
                 pred_id = prediction_tracker.add_prediction(
@@ -438,9 +414,12 @@ class QuantumSystem:
                     target_percent=target_percent,
                     source="QUANTUM_SYSTEM",
                     reasoning=reasoning,
-                    evaluation_days=10
+                    evaluation_days=10,
+                    features=features,
+                    skip_if_pending=skip_if_pending
                 )
-                self.stats['predictions'] += 1
+                if pred_id:
+                    self.stats['predictions'] += 1
                 return pred_id
             except Exception as e:
                 logger.error(f"Tahmin kaydetme hatası: {e}")
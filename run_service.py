@@ -0,0 +1,12 @@
+"""
+🚀 RUN SERVICE - Servisin giriş noktası (python run_service.py)
+main_service modül olarak yüklenip main() çağrılır
++ spawn ile başlayan süreç havuzu işçileri (grafik analizi, hiperparametre ayarı) ana betiği
+  __mp_main__ olarak yeniden çalıştırır; ana betik bu küçük dosya olduğundan işçiler
+  main_service'in üst düzey kodunu (analizör kurulumları, arka plan thread'leri) tekrar çalıştırmaz
++ Servis içeriği burada değil - import yalnızca __main__ altında
+"""
+
+if __name__ == '__main__':
+    from main_service import main
+    main()
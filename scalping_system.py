@@ -8,11 +8,18 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
+import threading
 import time
 import os
 import json
 import pytz
 
+from telegram_outbox import telegram_outbox
+from position_monitor import position_monitor, TARGET, STOP
+from intraday_bars import intraday_bars
+from order_books import order_books
+from instrumentation import timed
+
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
 def get_turkey_time():
@@ -39,6 +46,8 @@ class ScalpingSystem:
         self.completed_scalps = []
         self.last_scan_time = None
         self.last_check_time = None
+        # Bot thread'i ekler, pozisyon izleyici thread'i kapatır - liste tek kilitle değişir
+        self._positions_lock = threading.RLock()
         self.load_positions()
     
     def save_positions(self):
@@ -68,10 +77,9 @@ class ScalpingSystem:
             logger.error(f"Pozisyon yükleme hatası: {e}")
     
     def get_btcturk_data(self) -> List[Dict]:
-        """BTCTurk verilerini al"""
+        """BTCTurk verilerini al (gün içi mum önbelleğinin son ticker listesi)"""
         try:
-            resp = requests.get("https://api.btcturk.com/api/v2/ticker", timeout=15)
-            return resp.json().get('data', [])
+            return intraday_bars.tickers()
         except Exception as e:
             logger.error(f"BTCTurk API error: {e}")
             return []
@@ -140,28 +148,16 @@ class ScalpingSystem:
         }
     
     def get_short_term_prices(self, symbol: str) -> List[float]:
-        """YFinance'dan kısa vadeli fiyat verisi al"""
-        try:
-            import yfinance as yf
-            ticker = yf.Ticker(f"{symbol}-USD")
-            hist = ticker.history(period="5d", interval="1h")
-            if len(hist) > 0:
-                return hist['Close'].tolist()
-        except:
-            pass
-        return []
+        """Kısa vadeli fiyat verisi - 5 günlük saatlik kapanışlar (gün içi mum önbelleği)"""
+        return intraday_bars.closes(symbol, '1h')
     
     def get_btc_trend(self) -> Dict:
         """BTC trend analizi - piyasa yönü"""
         try:
-            import yfinance as yf
-            ticker = yf.Ticker("BTC-USD")
-            hist = ticker.history(period="2d", interval="1h")
-            if len(hist) >= 4:
-                last_4h = hist['Close'].iloc[-4:]
-                change_4h = ((last_4h.iloc[-1] - last_4h.iloc[0]) / last_4h.iloc[0]) * 100
-                last_24h = hist['Close']
-                change_24h = ((last_24h.iloc[-1] - last_24h.iloc[0]) / last_24h.iloc[0]) * 100
+            closes = intraday_bars.closes('BTC', '1h', limit=48)
+            if len(closes) >= 4:
+                change_4h = ((closes[-1] - closes[-4]) / closes[-4]) * 100
+                change_24h = ((closes[-1] - closes[0]) / closes[0]) * 100
                 
                 if change_4h < -2 or change_24h < -5:
                     return {'trend': 'BEARISH', 'change_4h': change_4h, 'change_24h': change_24h, 'allow_scalp': False}
@@ -200,7 +196,12 @@ class ScalpingSystem:
         if btc_trend and not btc_trend.get('allow_scalp', True):
             return None
         
-        spread = ((ask - bid) / price * 100) if price > 0 else 0
+        # Emir defteri izleniyorsa gerçek spread ve derinlik, yoksa ticker bid/ask
+        book = order_books.metrics(symbol)
+        if book:
+            spread = book['spread_pct']
+        else:
+            spread = ((ask - bid) / price * 100) if price > 0 else 0
         if spread > 0.8:  # Daha sıkı spread
             return None
         
@@ -213,6 +214,18 @@ class ScalpingSystem:
         signals = []
         warnings = []
         
+        if book:
+            if book['imbalance'] > 0.3:
+                scalp_score += 10
+                signals.append(f"📗 Alım baskısı: {book['imbalance']:+.2f}")
+            elif book['imbalance'] < -0.3:
+                scalp_score -= 10
+                warnings.append(f"📕 Satış baskısı: {book['imbalance']:+.2f}")
+            slippage = book['slippage_buy_bps'].get(10_000)
+            if slippage is None or slippage > 50:
+                scalp_score -= 10
+                warnings.append("💧 Sığ defter - yüksek kayma")
+        
         prices = self.get_short_term_prices(symbol)
         
         short_rsi = 50
@@ -325,9 +338,11 @@ class ScalpingSystem:
             'signals': signals,
             'warnings': warnings,
             'entry_time': get_turkey_time().strftime("%H:%M:%S"),
+            'entry_ts': time.time(),
             'max_hold_time': 30
         }
     
+    @timed()
     def scan_scalp_opportunities(self) -> List[Dict]:
         """Tüm coinleri tara ve scalp fırsatlarını bul - V2 BTC TREND KONTROLÜ"""
         # Önce BTC trendini kontrol et
@@ -347,6 +362,8 @@ class ScalpingSystem:
                 opportunities.append(opp)
         
         opportunities.sort(key=lambda x: x['scalp_score'], reverse=True)
+        # Adayların defterleri arka planda tutulur - sonraki tarama derinliği görür
+        order_books.watch(o['symbol'] for o in opportunities[:10])
         
         self.last_scan_time = get_turkey_time()
         
@@ -354,101 +371,127 @@ class ScalpingSystem:
     
     def add_to_active(self, opportunity: Dict):
         """Fırsatı aktif pozisyonlara ekle"""
-        if not any(s['symbol'] == opportunity['symbol'] for s in self.active_scalps):
-            opportunity['entry_price'] = opportunity['price']
-            self.active_scalps.append(opportunity)
-            self.save_positions()
+        with self._positions_lock:
+            if not any(s['symbol'] == opportunity['symbol'] for s in self.active_scalps):
+                opportunity['entry_price'] = opportunity['price']
+                self.active_scalps.append(opportunity)
+                self.save_positions()
+    
+    def _entry_ts(self, scalp: Dict) -> float:
+        """Giriş zamanı (epoch) - eski kayıtlarda sadece saat var, bugüne yerleştirilir"""
+        if scalp.get('entry_ts'):
+            return scalp['entry_ts']
+        try:
+            now = get_turkey_time()
+            entry_time = datetime.strptime(scalp['entry_time'], "%H:%M:%S")
+            entry_datetime = TURKEY_TZ.localize(datetime.combine(now.date(), entry_time.time()))
+            return min(entry_datetime.timestamp(), time.time())
+        except Exception as e:
+            logger.error(f"Zaman hesaplama hatası: {e}")
+            return time.time()
+    
+    def open_positions(self) -> List[Dict]:
+        """Pozisyon izleyici için açık pozisyonlar"""
+        positions = []
+        with self._positions_lock:
+            scalps = list(self.active_scalps)
+        for scalp in scalps:
+            opened = self._entry_ts(scalp)
+            positions.append({
+                'key': scalp['symbol'],
+                'symbol': scalp['symbol'],
+                'entry': scalp.get('entry_price', scalp['price']),
+                'target': scalp['target_price'],
+                'stop': scalp['stop_price'],
+                'opened': opened,
+                'deadline': opened + scalp.get('max_hold_time', 30) * 60
+            })
+        return positions
+    
+    def close_positions(self, results: List[Dict]) -> List[Dict]:
+        """İzleyicinin bulduğu ilk dokunuşları toplu kapat (tek kayıt, tek bildirim)"""
+        by_key = {r['key']: r for r in results}
+        completed = []
+        still_active = []
+        
+        with self._positions_lock:
+            for scalp in self.active_scalps:
+                r = by_key.get(scalp['symbol'])
+                if not r:
+                    still_active.append(scalp)
+                    continue
+                
+                entry_price = scalp.get('entry_price', scalp['price'])
+                change_pct = ((r['price'] - entry_price) / entry_price) * 100
+                touched = datetime.fromtimestamp(r['ts'], TURKEY_TZ)
+                
+                if r['result'] == TARGET:
+                    result, exit_reason = 'WIN', f"🎯 HEDEF! +{change_pct:.2f}% ({touched.strftime('%H:%M')})"
+                elif r['result'] == STOP:
+                    result, exit_reason = 'LOSS', f"🛑 STOP! {change_pct:.2f}% ({touched.strftime('%H:%M')})"
+                else:
+                    result, exit_reason = 'TIMEOUT', f"⏰ 30 dk doldu: {change_pct:.2f}%"
+                
+                scalp['result'] = result
+                scalp['exit_price'] = r['price']
+                scalp['profit_pct'] = round(change_pct, 2)
+                scalp['exit_time'] = touched.strftime("%H:%M:%S")
+                scalp['exit_ts'] = r['ts']
+                scalp['exit_reason'] = exit_reason
+                scalp['minutes_held'] = round(max(0, (r['ts'] - r['opened']) / 60), 1)
+                completed.append(scalp)
+        
+            if completed:
+                self.active_scalps = still_active
+                self.completed_scalps.extend(completed)
+                self.save_positions()
+        
+        if completed:
+            self.send_position_alert([f"{c['symbol']}: {c['exit_reason']}" for c in completed],
+                                     completed, still_active)
+        return completed
     
     def check_active_positions(self) -> Dict:
         """
-        5 DAKİKADA BİR - Aktif pozisyonları kontrol et
-        Hedef/Stop/Timeout kontrolü
+        Aktif pozisyonları kontrol et
+        Hedef/Stop/Timeout pozisyon izleyicide dakikalık high/low ile bulunur;
+        burada kalan pozisyonların durumu güncellenir
         """
         if not self.active_scalps:
             return {'checked': 0, 'completed': [], 'active': []}
         
-        tickers = self.get_btcturk_data()
-        ticker_map = {}
-        for t in tickers:
-            pair = t.get('pairNormalized', '')
-            if '_TRY' in pair:
-                symbol = pair.split('_')[0]
-                ticker_map[symbol] = {
-                    'price': float(t.get('last', 0)),
-                    'change': float(t.get('dailyPercent', 0))
-                }
+        checked = len(self.active_scalps)
+        closed = position_monitor.update().get('scalp', [])
+        completed = self.completed_scalps[-len(closed):] if closed else []
         
-        completed = []
-        still_active = []
         alerts = []
-        
         now = get_turkey_time()
         
         for scalp in self.active_scalps:
-            symbol = scalp['symbol']
-            current_data = ticker_map.get(symbol, {})
-            current_price = current_data.get('price', 0)
-            
+            current_price = position_monitor.last_price(scalp['symbol'])
+            minutes_held = max(0, (time.time() - self._entry_ts(scalp)) / 60)
+            scalp['minutes_held'] = round(minutes_held, 1)
             if current_price == 0:
-                still_active.append(scalp)
                 continue
             
             entry_price = scalp.get('entry_price', scalp['price'])
             change_pct = ((current_price - entry_price) / entry_price) * 100
+            scalp['current_price'] = current_price
+            scalp['current_change'] = round(change_pct, 2)
             
-            try:
-                entry_time = datetime.strptime(scalp['entry_time'], "%H:%M:%S")
-                entry_datetime = TURKEY_TZ.localize(datetime.combine(now.date(), entry_time.time()))
-                minutes_held = (now - entry_datetime).total_seconds() / 60
-                if minutes_held < 0:
-                    minutes_held = 0
-            except Exception as e:
-                logger.error(f"Zaman hesaplama hatası: {e}")
-                minutes_held = 0
-            
-            result = None
-            exit_reason = ""
-            
-            if current_price >= scalp['target_price']:
-                result = 'WIN'
-                exit_reason = f"🎯 HEDEF! +{change_pct:.2f}%"
-            elif current_price <= scalp['stop_price']:
-                result = 'LOSS'
-                exit_reason = f"🛑 STOP! {change_pct:.2f}%"
-            elif minutes_held >= scalp.get('max_hold_time', 30):
-                result = 'TIMEOUT'
-                exit_reason = f"⏰ 30 dk doldu: {change_pct:.2f}%"
-            
-            if result:
-                scalp['result'] = result
-                scalp['exit_price'] = current_price
-                scalp['profit_pct'] = round(change_pct, 2)
-                scalp['exit_time'] = now.strftime("%H:%M:%S")
-                scalp['exit_reason'] = exit_reason
-                scalp['minutes_held'] = round(minutes_held, 1)
-                completed.append(scalp)
-                self.completed_scalps.append(scalp)
-                alerts.append(f"{symbol}: {exit_reason}")
-            else:
-                scalp['current_price'] = current_price
-                scalp['current_change'] = round(change_pct, 2)
-                scalp['minutes_held'] = round(minutes_held, 1)
-                still_active.append(scalp)
-                
-                if minutes_held >= 20 and change_pct < 0:
-                    alerts.append(f"⚠️ {symbol}: {minutes_held:.0f} dk, {change_pct:.1f}% - Çıkış düşün")
+            if minutes_held >= 20 and change_pct < 0:
+                alerts.append(f"⚠️ {scalp['symbol']}: {minutes_held:.0f} dk, {change_pct:.1f}% - Çıkış düşün")
         
-        self.active_scalps = still_active
         self.last_check_time = now
         self.save_positions()
         
         if alerts:
-            self.send_position_alert(alerts, completed, still_active)
+            self.send_position_alert(alerts, [], self.active_scalps)
         
         return {
-            'checked': len(self.active_scalps) + len(completed),
+            'checked': checked,
             'completed': completed,
-            'active': still_active,
+            'active': self.active_scalps,
             'alerts': alerts
         }
     
@@ -482,14 +525,7 @@ class ScalpingSystem:
             for alert in alerts:
                 msg += f"• {alert}\n"
         
-        try:
-            requests.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-                json={'chat_id': TELEGRAM_CHAT_ID, 'text': msg, 'parse_mode': 'HTML'},
-                timeout=10
-            )
-        except:
-            pass
+        telegram_outbox.send(msg, TELEGRAM_CHAT_ID, token=TELEGRAM_TOKEN)
     
     def format_scalp_message(self, opportunities: List[Dict]) -> str:
         """Telegram için scalp mesajı oluştur"""
@@ -572,30 +608,15 @@ V2 Kriterleri (Sıkılaştırılmış):
         
         msg = self.format_scalp_message(opportunities)
         
-        try:
-            resp = requests.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-                json={
-                    'chat_id': TELEGRAM_CHAT_ID,
-                    'text': msg,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
-            if resp.status_code == 200:
-                logger.info(f"✅ Scalp sinyali gönderildi: {len(opportunities)} fırsat")
-                
-                for opp in opportunities:
-                    if opp['action'] in ['HIZLI_AL', 'AL']:
-                        self.add_to_active(opp)
-                
-                return True
-            else:
-                logger.error(f"Telegram error: {resp.text}")
-                return False
-        except Exception as e:
-            logger.error(f"Telegram error: {e}")
+        if not telegram_outbox.send(msg, TELEGRAM_CHAT_ID, token=TELEGRAM_TOKEN):
+            logger.error("Telegram bilgileri eksik - scalp sinyali gönderilemedi")
             return False
+        
+        logger.info(f"✅ Scalp sinyali kuyruğa alındı: {len(opportunities)} fırsat")
+        for opp in opportunities:
+            if opp['action'] in ['HIZLI_AL', 'AL']:
+                self.add_to_active(opp)
+        return True
     
     def run_scalp_scan(self):
         """15 DAKİKADA BİR - Scalp taraması çalıştır"""
@@ -679,3 +700,4 @@ Sistem sinyal üretiyor, bekleyin..."""
 
 
 scalping_system = ScalpingSystem()
+position_monitor.register('scalp', scalping_system)
@@ -0,0 +1,280 @@
+"""
+🧠 SENTIMENT ENGINE - Toplu duygu skorlama motoru
++ TextBlob skorları metin hash'ine göre kalıcı önbellekte (aynı başlık bir kez skorlanır)
++ Türkçe / İngilizce boğa-ayı sözlükleri tek regex otomatına derlenir
++ Metinler toplu skorlanır, önbellek tek sorguyla okunur / yazılır
++ Sembol bazlı kayan pencere duygu özetleri - analizörler sadece sayıları okur
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+
+from textblob import TextBlob
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "sentiment_cache.db"
+
+MEMORY_CACHE_SIZE = 20000
+OBSERVATION_RETENTION_DAYS = 30
+
+# Sözlükler - kategori adı: kelimeler (alt dizi eşleşmesi, küçük harf)
+LEXICONS = {
+    'en_bullish': ['bull', 'surge', 'rally', 'moon', 'breakout', 'soar', 'pump', 'buy'],
+    'en_bearish': ['bear', 'crash', 'dump', 'plunge', 'sell', 'drop', 'fall', 'fear'],
+    'tr_positive': [
+        'artış', 'yükseliş', 'rekor', 'kar', 'kazanç', 'büyüme', 'pozitif',
+        'olumlu', 'talep', 'güçlü', 'başarı', 'ihracat', 'yatırım', 'ivme',
+        'toparlanma', 'beklentinin üzerinde', 'hedef yükseldi', 'al tavsiyesi'
+    ],
+    'tr_negative': [
+        'düşüş', 'kayıp', 'zarar', 'kriz', 'risk', 'negatif', 'olumsuz',
+        'daralma', 'gerileme', 'satış baskısı', 'endişe', 'belirsizlik',
+        'beklentinin altında', 'hedef düşürüldü', 'sat tavsiyesi', 'iflas'
+    ],
+    'rec_buy': ['buy', 'bullish', 'target', 'increase', 'outperform', 'accumulate'],
+    'rec_sell': ['sell', 'bearish', 'decline', 'reduce', 'underperform', 'dump'],
+    'rec_hold': ['hold', 'neutral', 'equal', 'maintain'],
+}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8', 'ignore')).hexdigest()
+
+
+class LexiconMatcher:
+    """
+    Tüm sözlükler için tek geçişli regex otomatı
+    Alternatifler uzundan kısaya sıralı olduğundan her konumda en uzun kelime eşleşir;
+    o konumda eşleşen daha kısa kelimeler (en uzunun önekleri) önceden hesaplanmış
+    önek kümesinden eklenir. Sonuç, her kelime için ayrı `w in text` taramasıyla aynıdır.
+    """
+
+    def __init__(self, lexicons: Dict[str, List[str]]):
+        self.lexicons = {cat: list(dict.fromkeys(w.lower() for w in words)) for cat, words in lexicons.items()}
+        self.categories = {}
+        for cat, words in self.lexicons.items():
+            for word in words:
+                self.categories.setdefault(word, set()).add(cat)
+
+        vocabulary = sorted(self.categories, key=len, reverse=True)
+        self.prefixes = {w: frozenset(v for v in vocabulary if w.startswith(v)) for w in vocabulary}
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(w) for w in vocabulary) + '))')
+
+    def words(self, text: str) -> set:
+        """Metinde geçen tüm sözlük kelimeleri"""
+        found = set()
+        for match in self.pattern.finditer(text.lower()):
+            found |= self.prefixes[match.group(1)]
+        return found
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Kategori başına metinde geçen farklı kelime sayısı"""
+        result = dict.fromkeys(self.lexicons, 0)
+        for word in self.words(text):
+            for cat in self.categories[word]:
+                result[cat] += 1
+        return result
+
+
+class SentimentEngine:
+    """
+    Kalıcı önbellekli toplu duygu skorlayıcı
+    scores tablosu: metin hash'i -> polarity / subjectivity
+    observations tablosu: sembol başına skorlanmış metinler (kayan pencere özetleri için)
+    """
+
+    def __init__(self, db_path: str = DB_PATH, lexicons: Optional[Dict[str, List[str]]] = None):
+        self.db_path = db_path
+        self.matcher = LexiconMatcher(lexicons or LEXICONS)
+        self.memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'computed': 0}
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """Tabloları ve indeksleri oluştur"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scores (
+                hash TEXT PRIMARY KEY,
+                polarity REAL,
+                subjectivity REAL,
+                created_ts INTEGER
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS observations (
+                symbol TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                polarity REAL,
+                lexicon_score REAL,
+                ts INTEGER,
+                PRIMARY KEY (symbol, hash)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_observations_symbol_ts ON observations (symbol, ts)')
+
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key: str, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > MEMORY_CACHE_SIZE:
+            self.memory.popitem(last=False)
+
+    def polarity_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        TextBlob polarity/subjectivity - toplu
+        Sıra: bellek -> SQLite (tek sorgu) -> TextBlob (sadece yeni metinler, tek yazım)
+        """
+        keys = [text_hash(t or '') for t in texts]
+        result = {}
+        missing = []
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self.memory:
+                    result[key] = self.memory[key]
+                    self.memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                else:
+                    missing.append(key)
+
+        if missing:
+            try:
+                conn = self._connect()
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT hash, polarity, subjectivity FROM scores WHERE hash IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for h, pol, subj in rows:
+                        result[h] = {'polarity': pol, 'subjectivity': subj}
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Duygu önbellek okuma hatası: {e}")
+            self.stats['db_hits'] += sum(1 for k in missing if k in result)
+
+            new_rows = []
+            texts_by_key = dict(zip(keys, texts))
+            for key in missing:
+                if key in result:
+                    continue
+                try:
+                    sentiment = TextBlob(texts_by_key[key] or '').sentiment
+                    scored = {'polarity': float(sentiment.polarity), 'subjectivity': float(sentiment.subjectivity)}
+                except Exception:
+                    scored = {'polarity': 0.0, 'subjectivity': 0.0}
+                result[key] = scored
+                new_rows.append((key, scored['polarity'], scored['subjectivity'], int(time.time())))
+            self.stats['computed'] += len(new_rows)
+
+            if new_rows:
+                try:
+                    conn = self._connect()
+                    conn.executemany('INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)', new_rows)
+                    conn.commit()
+                    conn.close()
+                except Exception as e:
+                    logger.debug(f"Duygu önbellek yazma hatası: {e}")
+
+            with self._lock:
+                for key in missing:
+                    self._remember(key, result[key])
+
+        return [dict(result[k]) for k in keys]
+
+    def polarity(self, text: str) -> Dict:
+        return self.polarity_batch([text])[0]
+
+    def score_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Polarity + sözlük sayımları
+        lexicon_score: (boğa - ayı) / toplam, -1..1 (TR ve EN sözlükleri birlikte)
+        """
+        polarities = self.polarity_batch(texts)
+        results = []
+        for text, pol in zip(texts, polarities):
+            counts = self.matcher.counts(text or '')
+            bull = counts.get('en_bullish', 0) + counts.get('tr_positive', 0)
+            bear = counts.get('en_bearish', 0) + counts.get('tr_negative', 0)
+            results.append({
+                **pol,
+                'counts': counts,
+                'lexicon_score': (bull - bear) / max(bull + bear, 1)
+            })
+        return results
+
+    def score(self, text: str) -> Dict:
+        return self.score_batch([text])[0]
+
+    def record(self, symbol: str, texts: List[str], scores: Optional[List[Dict]] = None,
+               timestamps: Optional[List[float]] = None):
+        """Skorlanmış metinleri sembolün kayan penceresine ekle (aynı metin bir kez)"""
+        if not texts:
+            return
+        scores = scores or self.score_batch(texts)
+        now = time.time()
+        rows = []
+        for i, (text, sc) in enumerate(zip(texts, scores)):
+            ts = timestamps[i] if timestamps and timestamps[i] else now
+            rows.append((symbol.upper(), text_hash(text or ''), sc['polarity'], sc.get('lexicon_score', 0), int(ts)))
+        try:
+            conn = self._connect()
+            conn.executemany('INSERT OR IGNORE INTO observations VALUES (?, ?, ?, ?, ?)', rows)
+            conn.execute('DELETE FROM observations WHERE ts < ?', (int(now) - OBSERVATION_RETENTION_DAYS * 86400,))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Duygu gözlem yazma hatası: {e}")
+
+    def symbol_sentiment(self, symbol: str, hours: float = 24) -> Dict:
+        """Sembol için kayan pencere özeti (ağ ve TextBlob yok)"""
+        since = int(time.time() - hours * 3600)
+        try:
+            conn = self._connect()
+            row = conn.execute('''
+                SELECT COUNT(*), AVG(polarity), AVG(lexicon_score),
+                       SUM(CASE WHEN polarity > 0.1 THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN polarity < -0.1 THEN 1 ELSE 0 END)
+                FROM observations WHERE symbol = ? AND ts >= ?
+            ''', (symbol.upper(), since)).fetchone()
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Duygu özet hatası: {e}")
+            row = (0, None, None, 0, 0)
+
+        count = row[0] or 0
+        if not count:
+            return {'symbol': symbol.upper(), 'count': 0, 'avg_polarity': 0.0, 'avg_lexicon': 0.0,
+                    'positive': 0, 'negative': 0, 'neutral': 0, 'hours': hours}
+        positive = row[3] or 0
+        negative = row[4] or 0
+        return {
+            'symbol': symbol.upper(),
+            'count': count,
+            'avg_polarity': round(row[1] or 0, 3),
+            'avg_lexicon': round(row[2] or 0, 3),
+            'positive': positive,
+            'negative': negative,
+            'neutral': count - positive - negative,
+            'hours': hours
+        }
+
+
+sentiment_engine = SentimentEngine()
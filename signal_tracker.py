@@ -7,7 +7,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import requests
 
+from position_monitor import position_monitor, TARGET, STOP
+
 SIGNALS_FILE = "signals_history.json"
+SIGNAL_LIFETIME = timedelta(days=7)
+
 
 class SignalTracker:
     def __init__(self):
@@ -61,44 +65,59 @@ class SignalTracker:
             pass
         return None
     
-    def check_signals(self) -> List[Dict]:
-        """Aktif sinyalleri kontrol et ve sonuçları güncelle"""
-        updated = []
+    def open_positions(self) -> List[Dict]:
+        """Pozisyon izleyici için aktif sinyaller"""
+        positions = []
         for signal in self.signals:
             if signal["status"] != "ACTIVE":
                 continue
-            
-            current_price = self.get_current_price(signal["symbol"])
-            if not current_price:
+            opened = datetime.strptime(signal["timestamp"], "%Y-%m-%d %H:%M").timestamp()
+            positions.append({
+                "key": signal["id"],
+                "symbol": signal["symbol"],
+                "entry": signal["entry_price"],
+                "target": signal["target_price"],
+                "stop": signal["stop_price"],
+                "opened": opened,
+                "deadline": opened + SIGNAL_LIFETIME.total_seconds()
+            })
+        return positions
+    
+    def close_positions(self, results: List[Dict]) -> List[Dict]:
+        """İzleyicinin bulduğu ilk dokunuşları toplu yaz"""
+        by_key = {r["key"]: r for r in results}
+        updated = []
+        for signal in self.signals:
+            r = by_key.get(signal["id"])
+            if not r or signal["status"] != "ACTIVE":
                 continue
             
             entry_price = signal["entry_price"]
-            change_percent = ((current_price - entry_price) / entry_price) * 100
-            
-            if change_percent >= signal["target_percent"]:
-                signal["status"] = "WIN"
-                signal["result"] = "HEDEF"
-                signal["result_percent"] = round(change_percent, 2)
-                signal["closed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                updated.append(signal)
-            elif change_percent <= signal["stop_percent"]:
-                signal["status"] = "LOSS"
-                signal["result"] = "STOP"
-                signal["result_percent"] = round(change_percent, 2)
-                signal["closed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                updated.append(signal)
-            
-            signal_time = datetime.strptime(signal["timestamp"], "%Y-%m-%d %H:%M")
-            if datetime.now() - signal_time > timedelta(days=7):
-                signal["status"] = "EXPIRED"
-                signal["result"] = "SÜRE DOLDU"
-                signal["result_percent"] = round(change_percent, 2)
-                signal["closed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                updated.append(signal)
+            change_percent = ((r["price"] - entry_price) / entry_price) * 100
+            if r["result"] == TARGET:
+                signal["status"], signal["result"] = "WIN", "HEDEF"
+            elif r["result"] == STOP:
+                signal["status"], signal["result"] = "LOSS", "STOP"
+            else:
+                signal["status"], signal["result"] = "EXPIRED", "SÜRE DOLDU"
+            signal["result_percent"] = round(change_percent, 2)
+            signal["exit_price"] = r["price"]
+            signal["closed_at"] = datetime.fromtimestamp(r["ts"]).strftime("%Y-%m-%d %H:%M")
+            updated.append(signal)
         
-        self._save_signals()
+        if updated:
+            self._save_signals()
         return updated
     
+    def check_signals(self) -> List[Dict]:
+        """
+        Aktif sinyalleri kontrol et ve sonuçları güncelle
+        Hedef/stop dakikalık high/low ile pozisyon izleyicide bulunur (ilk dokunuş)
+        """
+        closed = position_monitor.update().get("signals", [])
+        keys = {r["key"] for r in closed}
+        return [s for s in self.signals if s["id"] in keys]
+    
     def get_performance_stats(self) -> Dict:
         """Performans istatistiklerini hesapla"""
         total = len(self.signals)
@@ -140,9 +159,10 @@ class SignalTracker:
     def get_active_signals(self) -> List[Dict]:
         """Aktif sinyalleri getir"""
         active = []
+        prices = position_monitor.fetch_prices() if any(s["status"] == "ACTIVE" for s in self.signals) else {}
         for signal in self.signals:
             if signal["status"] == "ACTIVE":
-                current_price = self.get_current_price(signal["symbol"])
+                current_price = prices.get(signal["symbol"])
                 if current_price:
                     change = ((current_price - signal["entry_price"]) / signal["entry_price"]) * 100
                     signal["current_price"] = current_price
@@ -263,3 +283,4 @@ class SignalTracker:
                 existing_symbols.append(symbol)
 
 signal_tracker = SignalTracker()
+position_monitor.register("signals", signal_tracker)
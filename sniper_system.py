@@ -13,6 +13,8 @@ from typing import Dict, List, Optional
 import time
 import logging
 
+from intraday_bars import intraday_bars
+
 logger = logging.getLogger(__name__)
 
 class SniperSystem:
@@ -25,8 +27,7 @@ class SniperSystem:
     def get_btcturk_data(self) -> List[Dict]:
         """BTCTurk'ten tüm kripto verileri"""
         try:
-            resp = requests.get('https://api.btcturk.com/api/v2/ticker', timeout=10)
-            return [t for t in resp.json().get('data', []) if '_TRY' in t.get('pairNormalized', '')]
+            return [t for t in intraday_bars.tickers() if '_TRY' in t.get('pairNormalized', '')]
         except:
             return []
     
@@ -226,6 +226,21 @@ class CompositeSignalEngine:
             'signals': signals
         }
     
+    def label(self, score, alignment='NONE'):
+        """Skor -> (sinyal, etiket) - skor sonradan değişirse (pattern, ML) yeniden çağrılır"""
+        if score >= self.thresholds['STRONG_BUY'] and alignment == 'BULLISH':
+            return 'STRONG_BUY', '🟢🟢 GÜÇLÜ AL'
+        elif score >= self.thresholds['BUY']:
+            return 'BUY', '🟢 AL'
+        elif score >= self.thresholds['WATCH']:
+            return 'WATCH', '🟡 İZLE'
+        elif score >= self.thresholds['NEUTRAL']:
+            return 'NEUTRAL', '⚪ NÖTR'
+        elif score >= self.thresholds['AVOID']:
+            return 'AVOID', '🔴 UZAK DUR'
+        else:
+            return 'SELL', '🔴🔴 SAT'
+    
     def analyze_multi_timeframe(self, multi_tf_data):
         """
         Multi-timeframe analiz
@@ -288,24 +303,7 @@ class CompositeSignalEngine:
         final_score = max(0, min(100, weighted_score))
         
         # Sinyal üret
-        if final_score >= self.thresholds['STRONG_BUY'] and alignment == 'BULLISH':
-            signal = 'STRONG_BUY'
-            prediction = '🟢🟢 GÜÇLÜ AL'
-        elif final_score >= self.thresholds['BUY']:
-            signal = 'BUY'
-            prediction = '🟢 AL'
-        elif final_score >= self.thresholds['WATCH']:
-            signal = 'WATCH'
-            prediction = '🟡 İZLE'
-        elif final_score >= self.thresholds['NEUTRAL']:
-            signal = 'NEUTRAL'
-            prediction = '⚪ NÖTR'
-        elif final_score >= self.thresholds['AVOID']:
-            signal = 'AVOID'
-            prediction = '🔴 UZAK DUR'
-        else:
-            signal = 'SELL'
-            prediction = '🔴🔴 SAT'
+        signal, prediction = self.label(final_score, alignment)
         
         return {
             'score': final_score,
@@ -1,6 +1,7 @@
 """Telegram gönderici"""
 import os
-import requests
+
+from telegram_outbox import telegram_outbox
 
 def send_to_telegram(message):
     """Telegram'a gönder"""
@@ -8,13 +9,5 @@ def send_to_telegram(message):
     if not token:
         return False
     
-    try:
-        resp = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json={'chat_id': 8391537149, 'text': message, 'parse_mode': 'Markdown'},
-            timeout=10
-        )
-        return resp.status_code == 200
-    except:
-        return False
+    return telegram_outbox.send(message, 8391537149, parse_mode='Markdown', token=token)
 
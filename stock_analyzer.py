@@ -4,7 +4,6 @@ Kripto analiziyle aynı sistem, hisse kodları için uyarlanmış
 """
 
 import requests
-import feedparser
 import numpy as np
 import pandas as pd
 import yfinance as yf
@@ -16,8 +15,43 @@ import time
 import os
 import logging
 
+from news_store import news_store
+
 logger = logging.getLogger(__name__)
 
+HISTORY_PERIOD = "1y"
+HISTORY_CACHE_SECONDS = 300
+EMPTY_HISTORY_CACHE_SECONDS = 30   # Başarısız/boş indirme kısa süre tutulur (tarama içinde tekrar denenmez)
+NEWS_CACHE_SECONDS = 600
+
+# BIST 100 (XU100) evreni - toplu taramada varsayılan liste
+XU100_CODES = [
+    'AEFES', 'AGHOL', 'AKBNK', 'AKSA', 'AKSEN', 'ALARK', 'ALFAS', 'ARCLK', 'ASELS', 'ASTOR',
+    'BERA', 'BIMAS', 'BRSAN', 'BRYAT', 'BUCIM', 'CANTE', 'CCOLA', 'CIMSA', 'CWENE', 'DOAS',
+    'DOHOL', 'ECILC', 'EGEEN', 'EKGYO', 'ENJSA', 'ENKAI', 'EREGL', 'EUPWR', 'FROTO', 'GARAN',
+    'GESAN', 'GUBRF', 'GWIND', 'HALKB', 'HEKTS', 'IPEKE', 'ISCTR', 'ISGYO', 'ISMEN', 'KCAER',
+    'KCHOL', 'KONTR', 'KONYA', 'KOZAA', 'KOZAL', 'KRDMD', 'MAVI', 'MGROS', 'MIATK', 'ODAS',
+    'OTKAR', 'OYAKC', 'PETKM', 'PGSUS', 'QUAGR', 'REEDR', 'SAHOL', 'SASA', 'SDTTR', 'SISE',
+    'SKBNK', 'SMRTG', 'SOKM', 'TABGD', 'TAVHL', 'TCELL', 'THYAO', 'TKFEN', 'TMSN', 'TOASO',
+    'TSKB', 'TTKOM', 'TTRAK', 'TUKAS', 'TUPRS', 'TURSG', 'ULKER', 'VAKBN', 'VESBE', 'VESTL',
+    'YEOTK', 'YKBNK', 'YYLGD', 'ZOREN', 'AHGAZ', 'AKFYE', 'ALTNY', 'BINHO', 'BTCIM', 'CLEBI',
+    'DSTKF', 'ENERY', 'GRSEL', 'KTLEV', 'LMKDC', 'OBAMS', 'PASEU', 'RALYH', 'TRMET', 'EFORC'
+]
+
+
+def _frame_for_ticker(data, ticker: str):
+    """yf.download çıktısından tek hissenin çerçevesini ayıkla (tekli/çoklu kolon)"""
+    if data is None or len(data) == 0:
+        return None
+    if getattr(data.columns, 'nlevels', 1) > 1:
+        if ticker not in data.columns.get_level_values(0):
+            return None
+        frame = data[ticker]
+    else:
+        frame = data
+    return frame.dropna(subset=['Close'])
+
+
 class StockAnalyzer:
     def __init__(self):
         self.cache = {}
@@ -52,12 +86,56 @@ class StockAnalyzer:
         self.cache[key] = {'data': data, 'time': now}
         return data
     
-    def get_stock_price(self, symbol: str) -> Dict:
+    def load_histories(self, symbols: List[str], period: str = HISTORY_PERIOD) -> Dict[str, pd.DataFrame]:
+        """
+        📦 Toplu BİST veri yükleyici
+        Önbellekte olmayan tüm .IS hisseleri tek yf.download çağrısıyla çekilir,
+        fiyat / teknik / tahmin adımları aynı çerçeveyi paylaşır
+        """
+        now = time.time()
+        symbols = [s.upper() for s in symbols]
+        result = {}
+        missing = []
+        for symbol in symbols:
+            entry = self.cache.get(f"hist_{symbol}_{period}")
+            if entry and now - entry['time'] < entry.get('ttl', HISTORY_CACHE_SECONDS):
+                result[symbol] = entry['data']
+            else:
+                missing.append(symbol)
+
+        if missing:
+            tickers = [f"{s}.IS" for s in missing]  # Borsa İstanbul suffix
+            try:
+                data = yf.download(tickers, period=period, group_by='ticker', threads=True,
+                                   progress=False, auto_adjust=True)
+            except Exception as e:
+                logger.error(f"Toplu BİST veri hatası: {e}")
+                data = None
+
+            for symbol, ticker in zip(missing, tickers):
+                try:
+                    frame = _frame_for_ticker(data, ticker)
+                except Exception as e:
+                    logger.debug(f"{symbol} çerçeve ayrıştırma hatası: {e}")
+                    frame = None
+                if frame is None:
+                    frame = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+                ttl = EMPTY_HISTORY_CACHE_SECONDS if frame.empty else HISTORY_CACHE_SECONDS
+                self.cache[f"hist_{symbol}_{period}"] = {'data': frame, 'time': now, 'ttl': ttl}
+                result[symbol] = frame
+
+        return result
+
+    def get_history(self, symbol: str, period: str = HISTORY_PERIOD) -> pd.DataFrame:
+        """Tek hisse geçmişi (toplu yükleyici önbelleğinden)"""
+        symbol = symbol.upper()
+        return self.load_histories([symbol], period)[symbol]
+
+    def get_stock_price(self, symbol: str, hist: Optional[pd.DataFrame] = None) -> Dict:
         """YFinance ile hisse fiyatı al"""
         try:
-            ticker = f"{symbol}.IS"  # Borsa İstanbul suffix
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1y")
+            if hist is None:
+                hist = self.get_history(symbol)
             if len(hist) == 0:
                 return {'current': 0, 'change': 0}
             
@@ -76,11 +154,11 @@ class StockAnalyzer:
             logger.error(f"Fiyat alma hatası ({symbol}): {e}")
             return {'current': 0, 'change': 0}
     
-    def calculate_technical_indicators(self, symbol: str) -> Dict:
+    def calculate_technical_indicators(self, symbol: str, hist: Optional[pd.DataFrame] = None) -> Dict:
         """Teknik İndikatörler: RSI, MACD, Moving Averages"""
         try:
-            ticker = f"{symbol}.IS"
-            hist = yf.Ticker(ticker).history(period="1y")
+            if hist is None:
+                hist = self.get_history(symbol)
             if len(hist) < 20:
                 return {}
             
@@ -165,20 +243,28 @@ class StockAnalyzer:
             'no_data': True
         }
     
+    def _fetch_news_texts(self) -> List[str]:
+        """RSS başlıkları ortak haber deposundan - tüm hisseler aynı listeyi tarar"""
+        texts = []
+        news_store.poll(self.rss_feeds)
+        for feed_name, feed_url in self.rss_feeds.items():
+            try:
+                for entry in news_store.query(feeds={feed_name: feed_url}, limit=5):
+                    texts.append((entry['title'] + ' ' + entry['summary']).lower())
+            except:
+                pass
+        return texts
+
     def get_news_sentiment(self, symbol: str) -> Dict:
         """Haber tabanlı duygu analizi"""
         sentiment_scores = []
         try:
-            for feed_name, feed_url in self.rss_feeds.items():
-                try:
-                    feed = feedparser.parse(feed_url)
-                    for entry in feed.entries[:5]:
-                        text = (entry.get('title', '') + ' ' + entry.get('summary', '')).lower()
-                        if symbol.lower() in text or self.bist_codes.get(symbol, '').lower() in text:
-                            blob = TextBlob(text)
-                            sentiment_scores.append(blob.sentiment.polarity)
-                except:
-                    pass
+            texts = self.get_cached('news_texts', self._fetch_news_texts, NEWS_CACHE_SECONDS)
+            company = self.bist_codes.get(symbol, '').lower()
+            for text in texts:
+                if symbol.lower() in text or (company and company in text):
+                    blob = TextBlob(text)
+                    sentiment_scores.append(blob.sentiment.polarity)
         except Exception as e:
             logger.error(f"Haber duygusu hatası ({symbol}): {e}")
         
@@ -192,11 +278,12 @@ class StockAnalyzer:
         
         return {'sentiment': 'NÖTR', 'score': 0, 'articles_analyzed': 0}
     
-    def predict_stock_price(self, symbol: str) -> Dict:
+    def predict_stock_price(self, symbol: str, hist: Optional[pd.DataFrame] = None) -> Dict:
         """Gelişmiş ML tahmini - 7 gün ve 30 gün hedefler"""
         try:
             ticker = f"{symbol}.IS"
-            hist = yf.Ticker(ticker).history(period="1y")
+            if hist is None:
+                hist = self.get_history(symbol)
             
             # Fallback için minimum veri - her zaman no_data olarak işaretle
             if len(hist) < 10:
@@ -347,16 +434,19 @@ class StockAnalyzer:
                 pass
             return self._get_default_prediction(0, no_data=True)
     
-    def ultimate_analyze(self, symbol: str) -> Dict:
+    def ultimate_analyze(self, symbol: str, hist: Optional[pd.DataFrame] = None) -> Dict:
         """Kripto kalitesinde detaylı hisse analizi:
         Teknik %30 + ML %25 + Haber %15 + Volatilite %15 + Trend %10 + Volume %5
+        hist verilirse (toplu yükleyiciden) tekrar indirme yapılmaz
         """
         try:
             symbol = symbol.upper()
             company_name = self.bist_codes.get(symbol, symbol)
+            if hist is None:
+                hist = self.get_history(symbol)
             
             # Fiyat verisi
-            price_data = self.get_stock_price(symbol)
+            price_data = self.get_stock_price(symbol, hist)
             if price_data['current'] == 0:
                 return {}
             
@@ -371,7 +461,7 @@ class StockAnalyzer:
             position_52w = ((current_price - low_52w) / range_52w * 100) if range_52w > 0 else 50
             
             # Teknik İndikatörler
-            tech = self.calculate_technical_indicators(symbol)
+            tech = self.calculate_technical_indicators(symbol, hist)
             rsi = tech.get('rsi', 50) if tech else 50
             sma20 = tech.get('sma20', current_price) if tech else current_price
             sma50 = tech.get('sma50', current_price) if tech else current_price
@@ -392,7 +482,7 @@ class StockAnalyzer:
                 tech_score -= 1.5  # Düşüş trendi
             
             # ML Tahmini (7 gün ve 30 gün)
-            ml_pred = self.predict_stock_price(symbol)
+            ml_pred = self.predict_stock_price(symbol, hist)
             
             # ml_pred her zaman bir değer döndürür (fallback ile)
             pred_7d = ml_pred.get('prediction_7d', self._get_default_prediction(current_price).get('prediction_7d'))
@@ -530,21 +620,25 @@ class StockAnalyzer:
             logger.error(f"Ultimate analiz hatası ({symbol}): {e}")
             return {}
     
-    def scan_all_stocks(self) -> List[Dict]:
-        """En popüler 15 Borsa İstanbul hissesini tara"""
-        # Top hisseler (en likit + güvenli veri)
-        top_stocks = ['GARAN', 'ASELS', 'AKBNK', 'ISCTR', 'KCHOL', 'TUPRS', 
-                      'ARCLK', 'HALKB', 'THYAO', 'PETKM', 'SISE', 'AEFES', 'ZOREN', 'DOHOL', 'ENKAI']
+    def scan_all_stocks(self, symbols: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Borsa İstanbul taraması (varsayılan: XU100)
+        Tüm geçmişler tek toplu indirmeyle alınır, analizler paylaşılan çerçeveyi kullanır
+        """
+        universe = [s.upper() for s in (symbols or XU100_CODES)]
+        histories = self.load_histories(universe)
         
         results = []
-        for symbol in top_stocks:
+        for symbol in universe:
             try:
-                analysis = self.ultimate_analyze(symbol)
+                hist = histories.get(symbol)
+                if hist is None or len(hist) == 0:
+                    continue
+                analysis = self.ultimate_analyze(symbol, hist)
                 if analysis.get('final_score'):
                     results.append(analysis)
             except Exception as e:
                 logger.debug(f"{symbol} analizi başarısız: {e}")
-            time.sleep(0.3)
         
         # Skora göre sırala
         return sorted(results, key=lambda x: x.get('final_score', 0), reverse=True)
@@ -6,13 +6,14 @@ Dolar/TL, Euro/TL, Altın, Faiz, Enflasyon, BIST Endeksleri
 
 import requests
 from bs4 import BeautifulSoup
-import yfinance as yf
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import time
 import logging
 import re
 
+from market_snapshot import market_snapshot
+
 logger = logging.getLogger(__name__)
 
 class StockMacroData:
@@ -35,14 +36,10 @@ class StockMacroData:
         """Döviz kurları - USD/TRY, EUR/TRY"""
         def fetch():
             try:
-                # YFinance ile
-                usd_try = yf.Ticker("USDTRY=X")
-                eur_try = yf.Ticker("EURTRY=X")
-                gbp_try = yf.Ticker("GBPTRY=X")
-                
-                usd_hist = usd_try.history(period="5d")
-                eur_hist = eur_try.history(period="5d")
-                gbp_hist = gbp_try.history(period="5d")
+                # Paylaşılan piyasa görüntüsünden
+                usd_hist = market_snapshot.history("USDTRY=X", 5)
+                eur_hist = market_snapshot.history("EURTRY=X", 5)
+                gbp_hist = market_snapshot.history("GBPTRY=X", 5)
                 
                 usd_rate = float(usd_hist['Close'].iloc[-1]) if len(usd_hist) > 0 else 0
                 eur_rate = float(eur_hist['Close'].iloc[-1]) if len(eur_hist) > 0 else 0
@@ -88,8 +85,7 @@ class StockMacroData:
         def fetch():
             try:
                 # Ons altın (USD)
-                gold_usd = yf.Ticker("GC=F")
-                gold_hist = gold_usd.history(period="5d")
+                gold_hist = market_snapshot.history("GC=F", 5)
                 
                 ons_usd = float(gold_hist['Close'].iloc[-1]) if len(gold_hist) > 0 else 0
                 ons_prev = float(gold_hist['Close'].iloc[-2]) if len(gold_hist) > 1 else ons_usd
@@ -132,8 +128,7 @@ class StockMacroData:
                 
                 for name, ticker in indices.items():
                     try:
-                        idx = yf.Ticker(ticker)
-                        hist = idx.history(period="5d")
+                        hist = market_snapshot.history(ticker, 5)
                         
                         if len(hist) > 0:
                             current = float(hist['Close'].iloc[-1])
@@ -162,8 +157,7 @@ class StockMacroData:
         def fetch():
             try:
                 # US Treasury 10Y yield (global referans)
-                tnx = yf.Ticker("^TNX")
-                tnx_hist = tnx.history(period="5d")
+                tnx_hist = market_snapshot.history("^TNX", 5)
                 us_10y = float(tnx_hist['Close'].iloc[-1]) if len(tnx_hist) > 0 else 0
                 
                 # Türkiye 10Y bond yield (yaklaşık - USD bazlı)
@@ -4,16 +4,16 @@ BigPara, BloombergHT, Mynet Finans, Dünya Gazetesi RSS
 Ücretsiz haber kaynakları + Duygu Analizi
 """
 
-import feedparser
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from textblob import TextBlob
 from typing import Dict, List, Optional
 import time
 import logging
 import re
 
+from news_store import news_store
+from sentiment_engine import LexiconMatcher, sentiment_engine
+
 logger = logging.getLogger(__name__)
 
 class StockNewsCollector:
@@ -62,6 +62,7 @@ class StockNewsCollector:
             'daralma', 'gerileme', 'satış baskısı', 'endişe', 'belirsizlik',
             'beklentinin altında', 'hedef düşürüldü', 'sat tavsiyesi', 'iflas'
         ]
+        self.lexicon = LexiconMatcher({'positive': self.positive_words, 'negative': self.negative_words})
     
     def get_cached(self, key: str, fetch_func, duration: int = None):
         """Cache mekanizması"""
@@ -75,26 +76,17 @@ class StockNewsCollector:
         return data
     
     def fetch_rss_news(self, feed_name: str, feed_url: str) -> List[Dict]:
-        """RSS'den haber çek"""
+        """RSS haberleri (ortak haber deposundan, gerekirse feed tazelenir)"""
         try:
-            feed = feedparser.parse(feed_url)
             news_list = []
             
-            for entry in feed.entries[:20]:
-                title = entry.get('title', '') or ''
-                summary = entry.get('summary', entry.get('description', '')) or ''
-                link = entry.get('link', '') or ''
-                published = entry.get('published', entry.get('updated', '')) or ''
-                
-                # Temizle
-                summary = BeautifulSoup(summary, 'html.parser').get_text()[:500]
-                
+            for article in news_store.articles({feed_name: feed_url}, limit=20):
                 news_list.append({
                     'source': feed_name,
-                    'title': title,
-                    'summary': summary,
-                    'link': link,
-                    'published': published,
+                    'title': article['title'],
+                    'summary': article['summary'],
+                    'link': article['link'],
+                    'published': article['published'],
                     'timestamp': datetime.now().isoformat()
                 })
             
@@ -105,15 +97,13 @@ class StockNewsCollector:
     
     def analyze_turkish_sentiment(self, text: str) -> Dict:
         """Türkçe duygu analizi"""
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in self.positive_words if word in text_lower)
-        negative_count = sum(1 for word in self.negative_words if word in text_lower)
+        counts = self.lexicon.counts(text)
+        positive_count = counts['positive']
+        negative_count = counts['negative']
         
-        # TextBlob (İngilizce ama genel ton için)
+        # TextBlob (İngilizce ama genel ton için) - önbellekli
         try:
-            blob = TextBlob(text)
-            textblob_score = blob.sentiment.polarity
+            textblob_score = sentiment_engine.polarity(text)['polarity']
         except:
             textblob_score = 0
         
@@ -144,6 +134,7 @@ class StockNewsCollector:
         
         def fetch():
             all_news = []
+            news_store.poll(self.rss_feeds)  # tüm feed'ler eşzamanlı
             
             for feed_name, feed_url in self.rss_feeds.items():
                 try:
@@ -156,13 +147,14 @@ class StockNewsCollector:
             relevant_news = []
             for news in all_news:
                 text = (news['title'] + ' ' + news['summary']).lower()
-                
-                for keyword in keywords:
-                    if keyword.lower() in text:
-                        sentiment = self.analyze_turkish_sentiment(news['title'] + ' ' + news['summary'])
-                        news['sentiment'] = sentiment
-                        relevant_news.append(news)
-                        break
+                if any(keyword.lower() in text for keyword in keywords):
+                    relevant_news.append(news)
+            
+            texts = [n['title'] + ' ' + n['summary'] for n in relevant_news]
+            sentiment_engine.polarity_batch(texts)  # toplu skorla
+            for news, text in zip(relevant_news, texts):
+                news['sentiment'] = self.analyze_turkish_sentiment(text)
+            sentiment_engine.record(symbol, texts)
             
             return relevant_news[:10]
         
@@ -172,6 +164,7 @@ class StockNewsCollector:
         """Genel piyasa haberleri"""
         def fetch():
             all_news = []
+            news_store.poll(self.rss_feeds)  # tüm feed'ler eşzamanlı
             
             for feed_name, feed_url in self.rss_feeds.items():
                 try:
@@ -12,6 +12,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import numpy as np
 
+from coin_markets import coin_markets
+from symbol_universe import symbol_universe
+
 logger = logging.getLogger(__name__)
 
 class SuperAnalyzer:
@@ -140,100 +143,34 @@ class SuperAnalyzer:
         return {}
     
     def symbol_to_coingecko_id(self, symbol: str) -> str:
-        """Symbol'u CoinGecko ID'ye çevir - Dinamik arama ile"""
-        mapping = {
-            'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana', 'AVAX': 'avalanche-2',
-            'XRP': 'ripple', 'DOGE': 'dogecoin', 'ADA': 'cardano', 'DOT': 'polkadot',
-            'MATIC': 'polygon', 'LINK': 'chainlink', 'UNI': 'uniswap', 'ATOM': 'cosmos',
-            'LTC': 'litecoin', 'BCH': 'bitcoin-cash', 'SHIB': 'shiba-inu', 'TRX': 'tron',
-            'NEAR': 'near', 'APT': 'aptos', 'ARB': 'arbitrum', 'OP': 'optimism',
-            'FIL': 'filecoin', 'ICP': 'internet-computer', 'HBAR': 'hedera-hashgraph',
-            'VET': 'vechain', 'ALGO': 'algorand', 'FTM': 'fantom', 'SAND': 'the-sandbox',
-            'MANA': 'decentraland', 'GALA': 'gala', 'APE': 'apecoin', 'CRO': 'crypto-com-chain',
-            'EGLD': 'elrond-erd-2', 'THETA': 'theta-token', 'AAVE': 'aave', 'MKR': 'maker',
-            'GRT': 'the-graph', 'SNX': 'synthetix-network-token', 'LDO': 'lido-dao',
-            'RNDR': 'render-token', 'INJ': 'injective-protocol', 'SUI': 'sui', 'SEI': 'sei-network',
-            'PEPE': 'pepe', 'WIF': 'dogwifcoin', 'BONK': 'bonk', 'FLOKI': 'floki',
-            'XLM': 'stellar', 'EOS': 'eos', 'XMR': 'monero', 'ETC': 'ethereum-classic',
-            'RUNE': 'thorchain', 'IMX': 'immutable-x', 'FLOW': 'flow', 'KAVA': 'kava',
-            'CAKE': 'pancakeswap-token', '1INCH': '1inch', 'CRV': 'curve-dao-token',
-            'COMP': 'compound-governance-token', 'YFI': 'yearn-finance', 'BAT': 'basic-attention-token',
-            'ZIL': 'zilliqa', 'ENJ': 'enjincoin', 'CHZ': 'chiliz', 'HOT': 'holotoken',
-            'IOTA': 'iota', 'ZEC': 'zcash', 'DASH': 'dash', 'NEO': 'neo', 'WAVES': 'waves',
-            'KSM': 'kusama', 'CELO': 'celo', 'ANKR': 'ankr', 'SKL': 'skale',
-            'STORJ': 'storj', 'OCEAN': 'ocean-protocol', 'AUDIO': 'audius', 'RAY': 'raydium',
-            'ROSE': 'oasis-network', 'ONE': 'harmony', 'ZRX': '0x', 'BAL': 'balancer',
-            'SUSHI': 'sushi', 'DYDX': 'dydx', 'GMX': 'gmx', 'ENS': 'ethereum-name-service',
-            'RPL': 'rocket-pool', 'SSV': 'ssv-network', 'BLUR': 'blur', 'MAGIC': 'magic',
-            'CFX': 'conflux-token', 'AGIX': 'singularitynet', 'FET': 'fetch-ai', 'RNDR': 'render-token',
-            'WLD': 'worldcoin-wld', 'ARK': 'ark', 'JASMY': 'jasmy', 'MASK': 'mask-network',
-            'CELR': 'celer-network', 'BAND': 'band-protocol', 'API3': 'api3', 'TWT': 'trust-wallet-token',
-            'STX': 'blockstack', 'MINA': 'mina-protocol', 'QTUM': 'qtum', 'OMG': 'omisego',
-            'ICX': 'icon', 'KLAY': 'klay-token', 'LUNC': 'terra-luna', 'LUNA': 'terra-luna-2',
-            'USTC': 'terrausd', 'BSV': 'bitcoin-cash-sv', 'BTT': 'bittorrent', 'WIN': 'wink',
-            'SXP': 'swipe', 'RSR': 'reserve-rights-token', 'RVN': 'ravencoin', 'SC': 'siacoin',
-            'HIVE': 'hive', 'STEEM': 'steem', 'DGB': 'digibyte', 'XEM': 'nem', 'XTZ': 'tezos'
-        }
-        
-        if symbol.upper() in mapping:
-            return mapping[symbol.upper()]
-        
+        """Symbol'u CoinGecko ID'ye çevir - sembol evreni indeksinden (ağ yok)"""
         return self.search_coingecko_id(symbol)
     
     def search_coingecko_id(self, symbol: str) -> str:
-        """CoinGecko'da symbol ara ve ID bul"""
-        cache_key = f"cg_id_{symbol.upper()}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]['data']
-        
-        try:
-            resp = requests.get(
-                f"https://api.coingecko.com/api/v3/search?query={symbol}",
-                timeout=10
-            )
-            if resp.status_code == 200:
-                coins = resp.json().get('coins', [])
-                for coin in coins:
-                    if coin.get('symbol', '').upper() == symbol.upper():
-                        coin_id = coin.get('id', symbol.lower())
-                        self.cache[cache_key] = {'data': coin_id, 'time': time.time()}
-                        return coin_id
-        except:
-            pass
-        
-        return symbol.lower()
+        """İndekste yoksa küçük harf sembol (CoinGecko ID'lerinin çoğu ile aynı)"""
+        return symbol_universe.coingecko_id(symbol, symbol.lower())
     
     def get_coingecko_coin_data(self, symbol: str) -> Dict:
-        """CoinGecko tek coin detayı"""
+        """CoinGecko tek coin detayı (paylaşılan coin piyasa tablosundan)"""
         try:
             coin_id = self.symbol_to_coingecko_id(symbol)
-            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
-            params = {
-                'localization': 'false',
-                'tickers': 'false',
-                'market_data': 'true',
-                'community_data': 'true',
-                'developer_data': 'true'
-            }
-            resp = requests.get(url, params=params, timeout=15)
-            if resp.status_code == 200:
-                data = resp.json()
-                market = data.get('market_data', {})
-                community = data.get('community_data', {})
+            market = coin_markets.get(coin_id)
+            if market:
+                community = coin_markets.get_community(coin_id)
                 
                 return {
-                    'price_usd': market.get('current_price', {}).get('usd', 0),
-                    'price_change_24h': market.get('price_change_percentage_24h', 0),
-                    'price_change_7d': market.get('price_change_percentage_7d', 0),
-                    'price_change_30d': market.get('price_change_percentage_30d', 0),
-                    'market_cap': market.get('market_cap', {}).get('usd', 0),
-                    'volume_24h': market.get('total_volume', {}).get('usd', 0),
-                    'ath': market.get('ath', {}).get('usd', 0),
-                    'ath_change': market.get('ath_change_percentage', {}).get('usd', 0),
+                    'price_usd': market['price_usd'],
+                    'price_change_24h': market['change_24h'],
+                    'price_change_7d': market['change_7d'],
+                    'price_change_30d': market['change_30d'],
+                    'market_cap': market['market_cap'],
+                    'volume_24h': market['volume_24h'],
+                    'ath': market['ath'],
+                    'ath_change': market['ath_change_pct'],
                     'twitter_followers': community.get('twitter_followers', 0),
                     'reddit_subscribers': community.get('reddit_subscribers', 0),
-                    'sentiment_up': data.get('sentiment_votes_up_percentage', 50),
-                    'sentiment_down': data.get('sentiment_votes_down_percentage', 50)
+                    'sentiment_up': community.get('sentiment_up', 50),
+                    'sentiment_down': community.get('sentiment_down', 50)
                 }
         except Exception as e:
             logger.error(f"CoinGecko coin hatası: {e}")
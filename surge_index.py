@@ -0,0 +1,391 @@
+"""
+📈 SURGE EVENT INDEX - Tarihsel pump/yükseliş olay indeksi
+Her coin için geçmişteki tüm yükselişleri ve sonrasını önceden hesaplar
++ NumPy ile vektörel olay tespiti (Python döngüsü yok)
++ SQLite'ta kalıcı tablo, (symbol, surge_pct) indeksli sorgu
++ Yeni mumlar geldikçe artımlı güncelleme
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "surge_index.db"
+
+INDEX_MIN_SURGE = 3.0      # Bu eşiğin altındaki hareketler indekslenmez
+FORWARD_BARS = 7           # En uzun ileri getiri ufku (1 hafta)
+RSI_PERIOD = 14
+BACKFILL_DAYS = 365
+REFRESH_SECONDS = 3600     # Aynı coin saatte bir defadan sık güncellenmez
+
+
+def rolling_rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """
+    rsi[j] = closes[:j+1] için RSI (basit ortalama, HistoricalPatternAnalyzer.calculate_rsi ile aynı)
+    Yetersiz veri olan indekslerde 50
+    """
+    closes = np.asarray(closes, dtype=float)
+    n = len(closes)
+    rsi = np.full(n, 50.0)
+    if n <= period:
+        return rsi
+
+    diff = np.diff(closes)
+    cum_gain = np.concatenate(([0.0], np.cumsum(np.clip(diff, 0, None))))
+    cum_loss = np.concatenate(([0.0], np.cumsum(np.clip(-diff, 0, None))))
+
+    sum_gain = cum_gain[period:] - cum_gain[:-period]
+    sum_loss = cum_loss[period:] - cum_loss[:-period]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = sum_gain / sum_loss
+        rsi[period:] = np.where(sum_loss <= 0, 100.0, 100 - (100 / (1 + rs)))
+    return rsi
+
+
+def _forward_extreme(closes: np.ndarray, horizon: int, fn) -> np.ndarray:
+    """closes[i+1:i+1+horizon] üzerinde max/min; pencere tamamlanmamışsa NaN"""
+    n = len(closes)
+    out = np.full(n, np.nan)
+    if n > horizon:
+        windows = np.lib.stride_tricks.sliding_window_view(closes[1:], horizon)
+        out[:len(windows)] = fn(windows, axis=1)
+    return out
+
+
+def compute_surge_table(closes, volumes, min_surge: float = INDEX_MIN_SURGE) -> Dict[str, np.ndarray]:
+    """
+    Vektörel yükseliş olayı tablosu
+    İki tanımı birlikte hesaplar:
+    - surge_pct: önceki 3 mumun ortalamasına göre (HistoricalPatternAnalyzer)
+    - daily_pct: bir önceki kapanışa göre (PumpValidator)
+    Herhangi biri min_surge üzerindeyse satır olay kabul edilir
+    """
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    n = len(closes)
+    empty = {k: np.array([]) for k in (
+        'idx', 'close', 'surge_pct', 'daily_pct', 'vol_spike', 'rsi_before',
+        'max_gain_3d', 'max_loss_3d', 'ret_3d', 'week_change')}
+    if n < 4:
+        return empty
+
+    idx = np.arange(n)
+
+    cum_close = np.concatenate(([0.0], np.cumsum(closes)))
+    base = np.full(n, np.nan)
+    base[3:] = (cum_close[3:n] - cum_close[0:n - 3]) / 3
+
+    prev = np.concatenate(([np.nan], closes[:-1]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        surge_pct = np.where(base > 0, (closes - base) / base * 100, np.nan)
+        daily_pct = np.where(prev > 0, (closes - prev) / prev * 100, np.nan)
+
+    # 7 mumluk ortalama hacim (ilk 7 mumda mevcut kısmın ortalaması)
+    cum_vol = np.concatenate(([0.0], np.cumsum(volumes)))
+    lo = np.maximum(idx - 7, 0)
+    vol_sum = cum_vol[idx] - cum_vol[lo]
+    vol_div = np.where(idx >= 7, 7, np.maximum(idx, 1))
+    avg_vol = vol_sum / vol_div
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vol_spike = np.where(avg_vol > 0, volumes / avg_vol, 1.0)
+
+    rsi = rolling_rsi(closes)
+    rsi_before = np.concatenate(([50.0], rsi[:-1]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_gain_3d = (_forward_extreme(closes, 3, np.max) - closes) / closes * 100
+        max_loss_3d = (_forward_extreme(closes, 3, np.min) - closes) / closes * 100
+
+        # PumpValidator tanımı: en fazla 3 gün sonrası, en az 2 mum gerekli
+        ret_3d_at = np.minimum(idx + 3, n - 1)
+        ret_3d = np.where(idx + 2 <= n - 1, (closes[ret_3d_at] - closes) / closes * 100, np.nan)
+
+        week_at = np.minimum(idx + FORWARD_BARS, n - 1)
+        week_change = np.where(idx + FORWARD_BARS < n, (closes[week_at] - closes) / closes * 100, np.nan)
+
+    mask = (np.nan_to_num(surge_pct, nan=-np.inf) >= min_surge) | \
+           (np.nan_to_num(daily_pct, nan=-np.inf) >= min_surge)
+
+    return {
+        'idx': idx[mask],
+        'close': closes[mask],
+        'surge_pct': surge_pct[mask],
+        'daily_pct': daily_pct[mask],
+        'vol_spike': vol_spike[mask],
+        'rsi_before': rsi_before[mask],
+        'max_gain_3d': max_gain_3d[mask],
+        'max_loss_3d': max_loss_3d[mask],
+        'ret_3d': ret_3d[mask],
+        'week_change': week_change[mask]
+    }
+
+
+def classify_surge(surge_pct: float, vol_spike: float, rsi_before: float) -> str:
+    """Olay tipi (find_surge_events ile aynı kurallar)"""
+    if surge_pct > 30:
+        return "PARABOLIC"
+    if vol_spike > 2 and surge_pct > 15:
+        return "VOLUME_BREAKOUT"
+    if rsi_before < 30:
+        return "OVERSOLD_BOUNCE"
+    if surge_pct > 15:
+        return "STRONG_SURGE"
+    return "MODERATE_SURGE"
+
+
+def _none_if_nan(value, digits: int = 1):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return round(float(value), digits)
+
+
+class SurgeEventIndex:
+    """
+    Kalıcı yükseliş olay indeksi
+    bars tablosu: günlük OHLCV geçmişi
+    surge_events tablosu: her yükseliş + ileri getirileri
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.last_refresh = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """Tabloları ve indeksleri oluştur"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, ts)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS surge_events (
+                symbol TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                close REAL,
+                surge_pct REAL,
+                daily_pct REAL,
+                vol_spike REAL,
+                rsi_before REAL,
+                pattern TEXT,
+                max_gain_3d REAL,
+                max_loss_3d REAL,
+                ret_3d REAL,
+                week_change REAL,
+                PRIMARY KEY (symbol, ts)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_surge_symbol_pct ON surge_events (symbol, surge_pct)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_surge_symbol_daily ON surge_events (symbol, daily_pct)')
+
+        conn.commit()
+        conn.close()
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            if symbol not in self._locks:
+                self._locks[symbol] = threading.Lock()
+            return self._locks[symbol]
+
+    def fetch_klines(self, symbol: str, start_ts: int, end_ts: int) -> Optional[Dict]:
+        """BTCTurk günlük mumları"""
+        try:
+            resp = requests.get(
+                "https://graph-api.btcturk.com/v1/klines/history",
+                params={
+                    "symbol": f"{symbol}TRY",
+                    "resolution": "D",
+                    "from": start_ts,
+                    "to": end_ts
+                },
+                timeout=15
+            )
+            data = resp.json()
+            if 'c' in data and data['c']:
+                return {
+                    'timestamps': [int(x) for x in data.get('t', [])],
+                    'open': [float(x) for x in data.get('o', [])],
+                    'high': [float(x) for x in data.get('h', [])],
+                    'low': [float(x) for x in data.get('l', [])],
+                    'close': [float(x) for x in data.get('c', [])],
+                    'volume': [float(x) for x in data.get('v', [])]
+                }
+        except Exception as e:
+            logger.error(f"Surge index klines error {symbol}: {e}")
+        return None
+
+    def get_last_ts(self, symbol: str) -> Optional[int]:
+        conn = self._connect()
+        row = conn.execute('SELECT MAX(ts) FROM bars WHERE symbol = ?', (symbol,)).fetchone()
+        conn.close()
+        return row[0] if row and row[0] is not None else None
+
+    def update(self, symbol: str, force: bool = False) -> int:
+        """
+        Artımlı güncelleme
+        Sadece son kayıtlı mumdan sonrasını indirir, ileri getirisi
+        henüz tamamlanmamış kuyruk olaylarını yeniden hesaplar
+        Dönen değer: eklenen yeni mum sayısı
+        """
+        symbol = symbol.upper()
+        now = time.time()
+        if not force and now - self.last_refresh.get(symbol, 0) < REFRESH_SECONDS:
+            return 0
+
+        with self._symbol_lock(symbol):
+            if not force and now - self.last_refresh.get(symbol, 0) < REFRESH_SECONDS:
+                return 0
+
+            last_ts = self.get_last_ts(symbol)
+            end_ts = int(datetime.now().timestamp())
+            if last_ts is None:
+                start_ts = int((datetime.now() - timedelta(days=BACKFILL_DAYS)).timestamp())
+            else:
+                # Son mum günlük olarak kapanmamış olabilir, onu da yenile
+                start_ts = last_ts
+
+            data = self.fetch_klines(symbol, start_ts, end_ts)
+            self.last_refresh[symbol] = now
+            if not data:
+                return 0
+
+            rows = list(zip([symbol] * len(data['close']), data['timestamps'], data['open'],
+                            data['high'], data['low'], data['close'], data['volume']))
+            conn = self._connect()
+            conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.commit()
+            conn.close()
+
+            new_bars = sum(1 for ts in data['timestamps'] if last_ts is None or ts > last_ts)
+            self._reindex_tail(symbol, since_ts=last_ts)
+            return new_bars
+
+    def _reindex_tail(self, symbol: str, since_ts: Optional[int] = None):
+        """
+        Olay tablosunu güncelle
+        since_ts verilirse sadece ileri penceresi bu mumdan sonra değişen
+        olaylar (son FORWARD_BARS mum + yeni mumlar) yeniden yazılır
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            'SELECT ts, close, volume FROM bars WHERE symbol = ? ORDER BY ts', (symbol,)).fetchall()
+        if not rows:
+            conn.close()
+            return
+
+        ts = np.array([r[0] for r in rows], dtype=np.int64)
+        cutoff_ts = None
+        if since_ts is not None:
+            pos = int(np.searchsorted(ts, since_ts))
+            cutoff_ts = int(ts[max(0, pos - FORWARD_BARS)])
+
+        table = compute_surge_table([r[1] for r in rows], [r[2] for r in rows])
+
+        records = []
+        for j, i in enumerate(table['idx']):
+            event_ts = int(ts[i])
+            if cutoff_ts is not None and event_ts < cutoff_ts:
+                continue
+            surge = _none_if_nan(float(table['surge_pct'][j]), 4)
+            vol_spike = float(table['vol_spike'][j])
+            rsi_before = float(table['rsi_before'][j])
+            records.append((
+                symbol, event_ts, float(table['close'][j]),
+                surge, _none_if_nan(float(table['daily_pct'][j]), 4),
+                vol_spike, rsi_before,
+                classify_surge(surge if surge is not None else 0, vol_spike, rsi_before),
+                _none_if_nan(float(table['max_gain_3d'][j]), 4),
+                _none_if_nan(float(table['max_loss_3d'][j]), 4),
+                _none_if_nan(float(table['ret_3d'][j]), 4),
+                _none_if_nan(float(table['week_change'][j]), 4)
+            ))
+
+        if cutoff_ts is None:
+            conn.execute('DELETE FROM surge_events WHERE symbol = ?', (symbol,))
+        else:
+            conn.execute('DELETE FROM surge_events WHERE symbol = ? AND ts >= ?', (symbol, cutoff_ts))
+
+        conn.executemany('INSERT OR REPLACE INTO surge_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', records)
+        conn.commit()
+        conn.close()
+
+    def query(self, symbol: str, min_surge: float = 10, max_surge: Optional[float] = None,
+              by: str = 'surge_pct', min_vol_spike: Optional[float] = None,
+              max_rsi: Optional[float] = None, min_rsi: Optional[float] = None,
+              pattern: Optional[str] = None, since_days: Optional[int] = None,
+              completed: bool = False) -> List[Dict]:
+        """
+        İndeksli olay sorgusu
+        by='surge_pct' (3 mum ortalamasına göre) veya 'daily_pct' (önceki kapanışa göre)
+        completed=True: sadece 3 günlük sonucu belli olmuş olaylar
+        """
+        column = 'daily_pct' if by == 'daily_pct' else 'surge_pct'
+        sql = f'SELECT ts, surge_pct, daily_pct, vol_spike, rsi_before, pattern, max_gain_3d, max_loss_3d, ret_3d, week_change ' \
+              f'FROM surge_events WHERE symbol = ? AND {column} >= ?'
+        params = [symbol.upper(), min_surge]
+
+        if max_surge is not None:
+            sql += f' AND {column} <= ?'
+            params.append(max_surge)
+        if min_vol_spike is not None:
+            sql += ' AND vol_spike >= ?'
+            params.append(min_vol_spike)
+        if max_rsi is not None:
+            sql += ' AND rsi_before <= ?'
+            params.append(max_rsi)
+        if min_rsi is not None:
+            sql += ' AND rsi_before >= ?'
+            params.append(min_rsi)
+        if pattern:
+            sql += ' AND pattern = ?'
+            params.append(pattern)
+        if since_days:
+            sql += ' AND ts >= ?'
+            params.append(int((datetime.now() - timedelta(days=since_days)).timestamp()))
+        if completed:
+            sql += ' AND max_gain_3d IS NOT NULL'
+        sql += ' ORDER BY ts'
+
+        conn = self._connect()
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+
+        return [{
+            'timestamp': r[0],
+            'surge_pct': _none_if_nan(r[1]),
+            'daily_pct': _none_if_nan(r[2]),
+            'rsi_before': _none_if_nan(r[4]),
+            'vol_spike': _none_if_nan(r[3], 2),
+            'pattern': r[5],
+            'outcome': {
+                'max_gain_3d': _none_if_nan(r[6]) or 0,
+                'max_loss_3d': _none_if_nan(r[7]) or 0,
+                'after_3_days': _none_if_nan(r[8]),
+                'week_change': _none_if_nan(r[9])
+            }
+        } for r in rows]
+
+
+surge_index = SurgeEventIndex()
@@ -0,0 +1,309 @@
+"""
+🗂️ SYMBOL UNIVERSE - Sembol evreni ve coin ID çözümleme indeksi
+Her BTCTurk paritesi için CoinGecko ID, yfinance ticker, Binance sembolü,
+ondalık hassasiyetleri ve listeleme durumu
++ Başlangıçta diskten bir kez yüklenir (symbol_universe.json)
++ Arka planda periyodik yenilenir (BTCTurk exchangeinfo, CoinGecko coins/list, Binance exchangeInfo)
++ Sıcak yolda çözümleme sadece bellekten - ağ çağrısı yok
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_FILE = "symbol_universe.json"
+REFRESH_SECONDS = 6 * 3600
+
+BTCTURK_EXCHANGE_INFO = "https://api.btcturk.com/api/v2/server/exchangeinfo"
+COINGECKO_LIST = "https://api.coingecko.com/api/v3/coins/list"
+COINGECKO_MARKETS = "https://api.coingecko.com/api/v3/coins/markets"
+BINANCE_EXCHANGE_INFO = "https://api.binance.com/api/v3/exchangeInfo"
+
+# Elle doğrulanmış ID'ler - aynı sembolü paylaşan coinlerde önceliklidir
+SEED_COINGECKO_IDS = {
+    '1INCH': '1inch', 'AAVE': 'aave', 'ACM': 'ac-milan-fan-token', 'ADA': 'cardano',
+    'AGIX': 'singularitynet', 'ALGO': 'algorand', 'ANKR': 'ankr', 'APE': 'apecoin', 'API3': 'api3',
+    'APT': 'aptos', 'ARB': 'arbitrum', 'ARK': 'ark', 'ASR': 'as-roma-fan-token',
+    'ATM': 'atletico-madrid', 'ATOM': 'cosmos', 'AUDIO': 'audius', 'AVAX': 'avalanche-2',
+    'BAL': 'balancer', 'BAND': 'band-protocol', 'BAR': 'fc-barcelona-fan-token',
+    'BAT': 'basic-attention-token', 'BCH': 'bitcoin-cash', 'BLUR': 'blur', 'BONK': 'bonk',
+    'BSV': 'bitcoin-cash-sv', 'BTC': 'bitcoin', 'BTT': 'bittorrent', 'CAKE': 'pancakeswap-token',
+    'CELO': 'celo', 'CELR': 'celer-network', 'CFX': 'conflux-token', 'CHZ': 'chiliz',
+    'CITY': 'manchester-city-fan-token', 'COMP': 'compound-governance-token',
+    'CRO': 'crypto-com-chain', 'CRV': 'curve-dao-token', 'DASH': 'dash', 'DGB': 'digibyte',
+    'DOGE': 'dogecoin', 'DOT': 'polkadot', 'DYDX': 'dydx', 'EGLD': 'elrond-erd-2',
+    'ENJ': 'enjincoin', 'ENS': 'ethereum-name-service', 'EOS': 'eos', 'ETC': 'ethereum-classic',
+    'ETH': 'ethereum', 'FET': 'fetch-ai', 'FIL': 'filecoin', 'FLOKI': 'floki', 'FLOW': 'flow',
+    'FTM': 'fantom', 'GAL': 'galatasaray-fan-token', 'GALA': 'gala', 'GMX': 'gmx',
+    'GRT': 'the-graph', 'HBAR': 'hedera-hashgraph', 'HIVE': 'hive', 'HOT': 'holotoken',
+    'ICP': 'internet-computer', 'ICX': 'icon', 'IMX': 'immutable-x', 'INJ': 'injective-protocol',
+    'INTER': 'inter-milan-fan-token', 'IOTA': 'iota', 'JASMY': 'jasmy',
+    'JUV': 'juventus-fan-token', 'KAVA': 'kava', 'KLAY': 'klay-token', 'KSM': 'kusama',
+    'LAZIO': 'lazio-fan-token', 'LDO': 'lido-dao', 'LINK': 'chainlink', 'LTC': 'litecoin',
+    'LUNA': 'terra-luna-2', 'LUNC': 'terra-luna', 'MAGIC': 'magic', 'MANA': 'decentraland',
+    'MASK': 'mask-network', 'MATIC': 'matic-network', 'MINA': 'mina-protocol', 'MKR': 'maker',
+    'NAP': 'napoli-fan-token', 'NEAR': 'near', 'NEO': 'neo', 'OCEAN': 'ocean-protocol',
+    'OMG': 'omisego', 'ONE': 'harmony', 'OP': 'optimism', 'PEPE': 'pepe', 'PORTO': 'fc-porto',
+    'PSG': 'paris-saint-germain-fan-token', 'QTUM': 'qtum', 'RAY': 'raydium',
+    'RNDR': 'render-token', 'ROSE': 'oasis-network', 'RPL': 'rocket-pool',
+    'RSR': 'reserve-rights-token', 'RUNE': 'thorchain', 'RVN': 'ravencoin', 'SAND': 'the-sandbox',
+    'SANTOS': 'santos-fc-fan-token', 'SC': 'siacoin', 'SEI': 'sei-network', 'SHIB': 'shiba-inu',
+    'SKL': 'skale', 'SNX': 'synthetix-network-token', 'SOL': 'solana', 'SSV': 'ssv-network',
+    'STEEM': 'steem', 'STORJ': 'storj', 'STX': 'blockstack', 'SUI': 'sui', 'SUSHI': 'sushi',
+    'SXP': 'swipe', 'THETA': 'theta-token', 'TRX': 'tron', 'TWT': 'trust-wallet-token',
+    'UNI': 'uniswap', 'USTC': 'terrausd', 'VET': 'vechain', 'WAVES': 'waves', 'WIF': 'dogwifcoin',
+    'WIN': 'wink', 'WLD': 'worldcoin-wld', 'XEM': 'nem', 'XLM': 'stellar', 'XMR': 'monero',
+    'XRP': 'ripple', 'XTZ': 'tezos', 'YFI': 'yearn-finance', 'ZEC': 'zcash', 'ZIL': 'zilliqa',
+    'ZRX': '0x'
+}
+
+QUOTE_ASSETS = ('USDT', 'TRY', 'USD')
+
+
+def symbol_candidates(symbol: str) -> List[str]:
+    """
+    BTCTRY / BTC_USDT / btc -> ['BTC...', 'BTC']
+    Önce tam sembol denenir (BUSD, TUSD gibi kotasyon ekiyle biten coinler için)
+    """
+    symbol = (symbol or '').upper().replace('_', '').replace('-', '').replace('/', '')
+    candidates = [symbol]
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            candidates.append(symbol[:-len(quote)])
+    return candidates
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Kotasyon eki atılmış taban sembol (indekste yoksa)"""
+    return symbol_candidates(symbol)[-1]
+
+
+class SymbolUniverse:
+    """
+    Bellekteki sembol indeksi
+    entries: {BASE: {'symbol', 'pairs', 'coingecko_id', 'yf_ticker', 'binance_symbol',
+                     'price_decimals', 'amount_decimals', 'status', 'listed'}}
+    """
+
+    def __init__(self, path: str = UNIVERSE_FILE):
+        self.path = path
+        self.entries = {}
+        self.updated = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.load()
+
+    # ==================== KALICI DEPO ====================
+
+    def load(self):
+        """Diskteki indeksi yükle; yoksa sadece tohum ID'lerle başla"""
+        entries = {}
+        for base, cg_id in SEED_COINGECKO_IDS.items():
+            entries[base] = self._default_entry(base, cg_id)
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                entries.update(data.get('entries', {}))
+                self.updated = data.get('updated')
+        except Exception as e:
+            logger.error(f"Sembol evreni yükleme hatası: {e}")
+        self.entries = entries
+
+    def save(self):
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'updated': self.updated, 'entries': self.entries}, f, indent=1, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.error(f"Sembol evreni kaydetme hatası: {e}")
+
+    @staticmethod
+    def _default_entry(base: str, cg_id: Optional[str] = None) -> Dict:
+        return {
+            'symbol': base,
+            'pairs': [],
+            'coingecko_id': cg_id,
+            'yf_ticker': f"{base}-USD",
+            'binance_symbol': None,
+            'price_decimals': None,
+            'amount_decimals': None,
+            'status': None,
+            'listed': False
+        }
+
+    # ==================== YENİLEME ====================
+
+    def _fetch_btcturk(self) -> Dict[str, Dict]:
+        resp = requests.get(BTCTURK_EXCHANGE_INFO, timeout=15)
+        resp.raise_for_status()
+        result = {}
+        for item in resp.json().get('data', {}).get('symbols', []):
+            base = (item.get('numerator') or '').upper()
+            quote = (item.get('denominator') or '').upper()
+            if not base:
+                continue
+            entry = result.setdefault(base, {'pairs': [], 'status': None,
+                                             'price_decimals': None, 'amount_decimals': None})
+            entry['pairs'].append(item.get('name') or f"{base}{quote}")
+            # TRY paritesinin hassasiyeti/durumu önceliklidir
+            if quote == 'TRY' or entry['status'] is None:
+                entry['status'] = item.get('status')
+                entry['price_decimals'] = item.get('denominatorScale')
+                entry['amount_decimals'] = item.get('numeratorScale')
+        return result
+
+    def _fetch_binance(self) -> set:
+        resp = requests.get(BINANCE_EXCHANGE_INFO, timeout=15)
+        resp.raise_for_status()
+        return {
+            s['symbol'] for s in resp.json().get('symbols', [])
+            if s.get('quoteAsset') == 'USDT' and s.get('status') == 'TRADING'
+        }
+
+    def _fetch_coingecko_candidates(self, bases: List[str]) -> Dict[str, List[str]]:
+        resp = requests.get(COINGECKO_LIST, timeout=20)
+        resp.raise_for_status()
+        wanted = set(bases)
+        candidates = {}
+        for coin in resp.json():
+            sym = (coin.get('symbol') or '').upper()
+            if sym in wanted:
+                candidates.setdefault(sym, []).append(coin['id'])
+        return candidates
+
+    def _rank_by_market_cap(self, ids: List[str]) -> Dict[str, int]:
+        """Belirsiz adaylar: piyasa değeri sırası (250'lik toplu istek)"""
+        ranks = {}
+        for start in range(0, len(ids), 250):
+            chunk = ids[start:start + 250]
+            resp = requests.get(COINGECKO_MARKETS, params={
+                'vs_currency': 'usd', 'ids': ','.join(chunk), 'per_page': 250
+            }, timeout=20)
+            if resp.status_code != 200:
+                continue
+            for coin in resp.json():
+                ranks[coin['id']] = coin.get('market_cap_rank') or 10 ** 6
+        return ranks
+
+    def _resolve_coingecko(self, bases: List[str]) -> Dict[str, str]:
+        resolved = {b: SEED_COINGECKO_IDS[b] for b in bases if b in SEED_COINGECKO_IDS}
+        missing = [b for b in bases if b not in resolved]
+        if not missing:
+            return resolved
+        try:
+            candidates = self._fetch_coingecko_candidates(missing)
+        except Exception as e:
+            logger.warning(f"CoinGecko liste hatası: {e}")
+            return resolved
+
+        ambiguous = [cid for ids in candidates.values() if len(ids) > 1 for cid in ids]
+        ranks = {}
+        if ambiguous:
+            try:
+                ranks = self._rank_by_market_cap(ambiguous)
+            except Exception as e:
+                logger.debug(f"CoinGecko sıralama hatası: {e}")
+
+        for base, ids in candidates.items():
+            resolved[base] = min(ids, key=lambda cid: ranks.get(cid, 10 ** 7)) if len(ids) > 1 else ids[0]
+        return resolved
+
+    def refresh(self) -> int:
+        """Tüm kaynaklardan indeksi yeniden kur, diske yaz"""
+        try:
+            listed = self._fetch_btcturk()
+        except Exception as e:
+            logger.error(f"BTCTurk exchangeinfo hatası: {e}")
+            return 0
+
+        try:
+            binance = self._fetch_binance()
+        except Exception as e:
+            logger.warning(f"Binance exchangeInfo hatası: {e}")
+            binance = None
+
+        cg_ids = self._resolve_coingecko(sorted(listed))
+
+        with self._lock:
+            entries = dict(self.entries)
+            for base in entries:
+                entries[base] = {**entries[base], 'listed': False}
+            for base, info in listed.items():
+                old = entries.get(base) or self._default_entry(base)
+                entry = {**old, **info, 'listed': True}
+                entry['coingecko_id'] = cg_ids.get(base) or old.get('coingecko_id')
+                if binance is not None:
+                    entry['binance_symbol'] = f"{base}USDT" if f"{base}USDT" in binance else None
+                entries[base] = entry
+            self.entries = entries
+            self.updated = datetime.now().isoformat()
+
+        self.save()
+        logger.info(f"🗂️ Sembol evreni yenilendi: {len(listed)} BTCTurk varlığı")
+        return len(listed)
+
+    def start_background_refresh(self, interval: int = REFRESH_SECONDS):
+        """Daemon thread: ilk yenileme hemen (indeks eskiyse), sonra interval'da bir"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    stale = True
+                    if self.updated:
+                        age = (datetime.now() - datetime.fromisoformat(self.updated)).total_seconds()
+                        stale = age >= interval
+                    if stale:
+                        self.refresh()
+                except Exception as e:
+                    logger.error(f"Sembol evreni yenileme hatası: {e}")
+                time.sleep(min(interval, 3600))
+
+        self._thread = threading.Thread(target=loop, daemon=True, name='symbol-universe')
+        self._thread.start()
+
+    # ==================== ÇÖZÜMLEME (ağ yok) ====================
+
+    def resolve(self, symbol: str) -> Optional[Dict]:
+        for candidate in symbol_candidates(symbol):
+            entry = self.entries.get(candidate)
+            if entry:
+                return entry
+        return None
+
+    def coingecko_id(self, symbol: str, default: Optional[str] = None) -> Optional[str]:
+        entry = self.resolve(symbol)
+        if entry and entry.get('coingecko_id'):
+            return entry['coingecko_id']
+        return default
+
+    def yf_ticker(self, symbol: str) -> str:
+        entry = self.resolve(symbol)
+        return entry['yf_ticker'] if entry else f"{normalize_symbol(symbol)}-USD"
+
+    def binance_symbol(self, symbol: str) -> Optional[str]:
+        entry = self.resolve(symbol)
+        return entry.get('binance_symbol') if entry else None
+
+    def coingecko_map(self) -> Dict[str, str]:
+        return {base: e['coingecko_id'] for base, e in self.entries.items() if e.get('coingecko_id')}
+
+    def listed_symbols(self, status: Optional[str] = 'TRADING') -> List[str]:
+        return sorted(
+            base for base, e in self.entries.items()
+            if e.get('listed') and (status is None or e.get('status') == status)
+        )
+
+
+symbol_universe = SymbolUniverse()
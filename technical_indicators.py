@@ -4,6 +4,8 @@ RSI, MACD, Bollinger Bands, Moving Averages
 import numpy as np
 from datetime import datetime
 
+from instrumentation import timed
+
 class TechnicalIndicators:
     """Gerçek teknik gösterge hesaplamaları"""
     
@@ -135,6 +137,7 @@ class TechnicalIndicators:
         return result
     
     @staticmethod
+    @timed()
     def get_full_analysis(prices):
         """Tüm teknik analizi birleştir"""
         if not prices or len(prices) < 14:
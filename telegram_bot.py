@@ -177,7 +177,6 @@ Her 2 saatte bir analiz raporu gelir.
         
         try:
             from ml_price_predictor import MLPricePredictor
-            import yfinance as yf
             
             ticker_map = {
                 'BTC': 'BTC-USD',
@@ -187,19 +186,12 @@ Her 2 saatte bir analiz raporu gelir.
             
             yf_symbol = ticker_map.get(symbol, f'{symbol}-USD')
             
-            ticker = yf.Ticker(yf_symbol)
-            hist = ticker.history(period='60d')
-            
-            if len(hist) < 30:
-                return f"⚠️ {symbol} için yeterli veri yok"
-            
-            prices = hist['Close'].tolist()
-            
+            # Özellikler ortak depodan (yfinance mumları, sadece yeni mumlar hesaplanır)
             predictor = MLPricePredictor()
-            result = predictor.predict_next(prices)
+            result = predictor.predict_symbol(yf_symbol)
             
             if not result:
-                return "❌ Tahmin yapılamadı"
+                return f"⚠️ {symbol} için yeterli veri yok veya tahmin yapılamadı"
             
             msg = f"""🤖 <b>{symbol} ML TAHMİNİ</b>
 
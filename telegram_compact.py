@@ -6,10 +6,11 @@ Kompakt Telegram Mesaj Sistemi
 """
 
 import os
-import requests
 from datetime import datetime
 import pytz
 
+from telegram_outbox import telegram_outbox
+
 BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
 
@@ -25,14 +26,7 @@ def send_compact(message):
     """Kısa mesaj gönder"""
     if not BOT_TOKEN or not CHAT_ID:
         return False
-    url = f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage'
-    resp = requests.post(url, json={
-        'chat_id': CHAT_ID, 
-        'text': message, 
-        'parse_mode': 'HTML',
-        'disable_web_page_preview': True
-    }, timeout=15)
-    return resp.status_code == 200
+    return telegram_outbox.send(message, CHAT_ID, disable_preview=True, token=BOT_TOKEN)
 
 def signal_alert(symbol, action, price, target=None, stop=None, reason=""):
     """
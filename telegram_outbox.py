@@ -0,0 +1,295 @@
+"""
+📤 TELEGRAM OUTBOX - Ortak giden mesaj kuyruğu
+Analiz işleri Bot API'yi beklemez, mesajı kuyruğa bırakıp devam eder
++ Tek arka plan gönderici thread
++ Aynı sohbete biriken mesajlar tek mesajda birleştirilir (4096 sınırına kadar)
++ 4096 karakterden uzun mesajlar satır sınırlarından bölünür
++ Sohbet başına ve global token bucket (Telegram: ~1 msg/s sohbet, 30 msg/s toplam)
++ 429'da retry_after kadar beklenip yeniden denenir, mesaj düşürülmez
++ Kuyruk gecikmesi / gönderim metrikleri
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+MAX_MESSAGE_LENGTH = 4096
+GLOBAL_RATE = 30.0          # mesaj / saniye (tüm sohbetler)
+GLOBAL_BURST = 30
+CHAT_RATE = 1.0             # mesaj / saniye (sohbet başına)
+CHAT_BURST = 3
+MAX_ATTEMPTS = 5
+SEND_TIMEOUT = 15
+LATENCY_WINDOW = 500
+
+
+class TokenBucket:
+    """Basit token bucket - rate token/saniye, en fazla burst token"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _fill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Bir token için beklenecek süre (0 = hemen)"""
+        now = time.monotonic()
+        self._fill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._fill(time.monotonic())
+        self.tokens -= 1
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Uzun mesajı limit altındaki parçalara böl
+    Önce paragraf, sonra satır sınırı; hiçbiri yoksa sert kesim
+    """
+    text = text or ''
+    if len(text) <= limit:
+        return [text]
+
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n\n', 0, limit)
+        if cut <= 0:
+            cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip('\n')
+    if text.strip():
+        parts.append(text)
+    return parts
+
+
+class TelegramOutbox:
+    """
+    Giden mesaj kuyruğu
+    Sohbet başına FIFO kuyruk; gönderici token'ı olan ilk sohbetin
+    bekleyen mesajlarını birleştirip gönderir
+    """
+
+    def __init__(self, token: Optional[str] = None, default_chat_id: Optional[str] = None):
+        self.token = token or os.getenv("TELEGRAM_BOT_TOKEN", "")
+        self.default_chat_id = default_chat_id or os.getenv("TELEGRAM_CHAT_ID", "")
+        self.queues = {}            # chat_id -> deque of message dicts
+        self.chat_buckets = {}
+        self.blocked_until = {}     # chat_id -> monotonic (429 retry_after)
+        self.global_bucket = TokenBucket(GLOBAL_RATE, GLOBAL_BURST)
+        self.session = requests.Session()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._inflight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'enqueued': 0, 'sent': 0, 'coalesced': 0, 'split': 0,
+                      'rate_limited': 0, 'retried': 0, 'failed': 0}
+
+    # ==================== KUYRUĞA EKLEME ====================
+
+    def send(self, text: str, chat_id=None, parse_mode: Optional[str] = 'HTML',
+             disable_preview: bool = False, token: Optional[str] = None) -> bool:
+        """
+        Mesajı kuyruğa bırak (ağ beklemez)
+        Dönen değer: kuyruğa alındı mı
+        """
+        token = token or self.token
+        chat_id = chat_id or self.default_chat_id
+        if not token or not chat_id or not text:
+            return False
+
+        chunks = split_message(text)
+        now = time.monotonic()
+        with self._cond:
+            queue = self.queues.setdefault(str(chat_id), deque())
+            for chunk in chunks:
+                queue.append({
+                    'chat_id': chat_id,
+                    'text': chunk,
+                    'parse_mode': parse_mode,
+                    'disable_preview': disable_preview,
+                    'token': token,
+                    'enqueued': now,
+                    'attempts': 0
+                })
+            self.stats['enqueued'] += 1
+            self.stats['split'] += len(chunks) - 1
+            self._ensure_thread()
+            self._cond.notify_all()
+        return True
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name='telegram-outbox')
+        self._thread.start()
+
+    # ==================== GÖNDERİCİ ====================
+
+    def _coalesce(self, queue: deque) -> Dict:
+        """Kuyruğun başındaki uyumlu mesajları tek mesajda birleştir"""
+        first = queue.popleft()
+        merged = [first]
+        length = len(first['text'])
+        while queue:
+            nxt = queue[0]
+            if (nxt['parse_mode'] != first['parse_mode'] or nxt['token'] != first['token']
+                    or nxt['disable_preview'] != first['disable_preview'] or nxt['attempts']):
+                break
+            if length + 2 + len(nxt['text']) > MAX_MESSAGE_LENGTH:
+                break
+            merged.append(queue.popleft())
+            length += 2 + len(nxt['text'])
+
+        if len(merged) == 1:
+            return first
+        self.stats['coalesced'] += len(merged) - 1
+        return dict(first,
+                    text='\n\n'.join(m['text'] for m in merged),
+                    enqueued=min(m['enqueued'] for m in merged))
+
+    def _next_ready(self):
+        """Gönderilebilecek (chat, mesaj) veya en kısa bekleme süresi"""
+        now = time.monotonic()
+        wait = None
+        global_wait = self.global_bucket.wait_time()
+        for chat, queue in self.queues.items():
+            if not queue:
+                continue
+            bucket = self.chat_buckets.setdefault(chat, TokenBucket(CHAT_RATE, CHAT_BURST))
+            chat_wait = max(self.blocked_until.get(chat, 0) - now, bucket.wait_time(), global_wait)
+            if chat_wait <= 0:
+                bucket.take()
+                self.global_bucket.take()
+                return chat, self._coalesce(queue), 0
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+        return None, None, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                chat, message, wait = self._next_ready()
+                while message is None:
+                    self._cond.wait(timeout=wait)
+                    chat, message, wait = self._next_ready()
+                self._inflight += 1
+            try:
+                self._deliver(chat, message)
+            except Exception as e:
+                logger.error(f"Telegram gönderici hatası: {e}")
+            finally:
+                with self._cond:
+                    self._inflight -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, chat: str, message: Dict):
+        payload = {'chat_id': message['chat_id'], 'text': message['text']}
+        if message['parse_mode']:
+            payload['parse_mode'] = message['parse_mode']
+        if message['disable_preview']:
+            payload['disable_web_page_preview'] = True
+
+        message['attempts'] += 1
+        try:
+            resp = self.session.post(API_URL.format(token=message['token']), json=payload, timeout=SEND_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Telegram ağ hatası ({chat}): {e}")
+            self._retry(chat, message, delay=min(2 ** message['attempts'], 30))
+            return
+
+        if resp.status_code == 200:
+            self.stats['sent'] += 1
+            self.latencies.append(time.monotonic() - message['enqueued'])
+            return
+
+        if resp.status_code == 429:
+            try:
+                retry_after = float(resp.json().get('parameters', {}).get('retry_after', 1))
+            except Exception:
+                retry_after = 1.0
+            self.stats['rate_limited'] += 1
+            logger.warning(f"Telegram 429 ({chat}) - {retry_after:.0f}s sonra tekrar")
+            self._retry(chat, message, delay=retry_after, count_attempt=False)
+            return
+
+        if resp.status_code == 400 and message['parse_mode'] and "parse entities" in resp.text:
+            # Bölme sırasında kırılan HTML/Markdown etiketi - düz metin olarak gönder
+            message['parse_mode'] = None
+            self._retry(chat, message, delay=0)
+            return
+
+        if resp.status_code >= 500:
+            self._retry(chat, message, delay=min(2 ** message['attempts'], 30))
+            return
+
+        self.stats['failed'] += 1
+        logger.warning(f"Telegram gönderme hatası ({chat}): {resp.status_code} {resp.text[:200]}")
+
+    def _retry(self, chat: str, message: Dict, delay: float, count_attempt: bool = True):
+        if count_attempt and message['attempts'] >= MAX_ATTEMPTS:
+            self.stats['failed'] += 1
+            logger.error(f"Telegram mesajı {MAX_ATTEMPTS} denemede gönderilemedi ({chat})")
+            return
+        if not count_attempt:
+            message['attempts'] -= 1
+        with self._cond:
+            self.stats['retried'] += 1
+            until = time.monotonic() + delay
+            self.blocked_until[chat] = max(self.blocked_until.get(chat, 0), until)
+            self.queues.setdefault(chat, deque()).appendleft(message)
+            self._cond.notify_all()
+
+    # ==================== DURUM ====================
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self.queues.values()) + self._inflight
+
+    def flush(self, timeout: float = 10) -> bool:
+        """Kuyruk boşalana kadar bekle (betik çıkışı için)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while sum(len(q) for q in self.queues.values()) + self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+        return True
+
+    def metrics(self) -> Dict:
+        """Kuyruk derinliği, gönderim sayaçları ve gecikme (saniye)"""
+        latencies = sorted(self.latencies)
+        with self._cond:
+            oldest = min((q[0]['enqueued'] for q in self.queues.values() if q), default=None)
+            depth = sum(len(q) for q in self.queues.values())
+        return {
+            **self.stats,
+            'queue_depth': depth,
+            'oldest_wait': round(time.monotonic() - oldest, 2) if oldest else 0.0,
+            'latency_avg': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'latency_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else 0.0,
+            'latency_max': round(latencies[-1], 3) if latencies else 0.0
+        }
+
+
+telegram_outbox = TelegramOutbox()
+
+# Tek seferlik betikler çıkmadan önce bekleyen mesajları göndersin
+atexit.register(telegram_outbox.flush, 10)
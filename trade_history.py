@@ -9,6 +9,8 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from online_learner import online_learner
+
 TRADE_HISTORY_FILE = "trade_history.json"
 
 class TradeHistory:
@@ -90,6 +92,11 @@ class TradeHistory:
             stats['best_trade'] = trade['profit_loss']
         if trade['profit_loss'] < stats['worst_trade']:
             stats['worst_trade'] = trade['profit_loss']
+        
+        # AutoLearner için artımlı kazanma oranları
+        win = 1.0 if trade['profit_loss'] > 0 else 0.0
+        online_learner.observe('trades', win=win, pnl_pct=trade['profit_loss_pct'])
+        online_learner.observe(f"trade:{trade['symbol'].upper()}", win=win, pnl_pct=trade['profit_loss_pct'])
     
     def close_trade(self, user_id: str, trade_id: int, exit_price: float) -> Optional[Dict]:
         """İşlemi kapat"""
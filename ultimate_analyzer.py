@@ -4,17 +4,21 @@ ML + Whale + Sosyal + Teknik + Haber + Pattern = %100 Kapsam
 """
 
 import requests
-import feedparser
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from textblob import TextBlob
 from typing import Dict, List, Optional
 import json
 import time
 import os
 import logging
 
+from feature_store import feature_store
+from news_store import news_store
+from sentiment_engine import sentiment_engine
+from symbol_universe import symbol_universe
+from instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 class UltimateAnalyzer:
@@ -35,27 +39,8 @@ class UltimateAnalyzer:
         self.coingecko_map = self._load_coingecko_map()
         
     def _load_coingecko_map(self) -> Dict:
-        return {
-            'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana', 'XRP': 'ripple',
-            'DOGE': 'dogecoin', 'ADA': 'cardano', 'AVAX': 'avalanche-2', 'DOT': 'polkadot',
-            'LINK': 'chainlink', 'MATIC': 'polygon', 'UNI': 'uniswap', 'ATOM': 'cosmos',
-            'LTC': 'litecoin', 'BCH': 'bitcoin-cash', 'SHIB': 'shiba-inu', 'TRX': 'tron',
-            'NEAR': 'near', 'APT': 'aptos', 'ARB': 'arbitrum', 'OP': 'optimism',
-            'FIL': 'filecoin', 'HBAR': 'hedera-hashgraph', 'VET': 'vechain', 'ALGO': 'algorand',
-            'FTM': 'fantom', 'SAND': 'the-sandbox', 'MANA': 'decentraland', 'GALA': 'gala',
-            'APE': 'apecoin', 'AAVE': 'aave', 'MKR': 'maker', 'GRT': 'the-graph',
-            'RNDR': 'render-token', 'INJ': 'injective-protocol', 'SUI': 'sui', 'SEI': 'sei-network',
-            'PEPE': 'pepe', 'WIF': 'dogwifcoin', 'BONK': 'bonk', 'FLOKI': 'floki',
-            'XLM': 'stellar', 'EOS': 'eos', 'XMR': 'monero', 'ETC': 'ethereum-classic',
-            'IMX': 'immutable-x', 'FLOW': 'flow', 'KAVA': 'kava', 'CAKE': 'pancakeswap-token',
-            'CRV': 'curve-dao-token', 'YFI': 'yearn-finance', 'BAT': 'basic-attention-token',
-            'CHZ': 'chiliz', 'ENJ': 'enjincoin', 'ZIL': 'zilliqa', 'IOTA': 'iota',
-            'ZEC': 'zcash', 'DASH': 'dash', 'NEO': 'neo', 'WAVES': 'waves',
-            'KSM': 'kusama', 'CELO': 'celo', 'ANKR': 'ankr', 'STORJ': 'storj',
-            'OCEAN': 'ocean-protocol', 'FET': 'fetch-ai', 'AGIX': 'singularitynet',
-            'WLD': 'worldcoin-wld', 'STX': 'blockstack', 'MINA': 'mina-protocol',
-            'XTZ': 'tezos', 'THETA': 'theta-token', 'EGLD': 'elrond-erd-2',
-        }
+        """Sembol evreni indeksinden (başlangıçta diskten yüklenir)"""
+        return symbol_universe.coingecko_map()
     
     def get_cached(self, key: str, fetch_func, duration: int = None):
         duration = duration or self.cache_duration
@@ -68,24 +53,11 @@ class UltimateAnalyzer:
         return data
     
     def symbol_to_cg(self, symbol: str) -> str:
+        cg_id = symbol_universe.coingecko_id(symbol)
+        if cg_id:
+            return cg_id
         symbol = symbol.upper().replace('TRY', '').replace('USDT', '')
-        if symbol in self.coingecko_map:
-            return self.coingecko_map[symbol]
-        return self._search_coingecko(symbol)
-    
-    def _search_coingecko(self, symbol: str) -> str:
-        try:
-            resp = requests.get(f"https://api.coingecko.com/api/v3/search?query={symbol}", timeout=10)
-            if resp.status_code == 200:
-                coins = resp.json().get('coins', [])
-                for coin in coins:
-                    if coin.get('symbol', '').upper() == symbol.upper():
-                        cg_id = coin.get('id')
-                        self.coingecko_map[symbol] = cg_id
-                        return cg_id
-        except:
-            pass
-        return symbol.lower()
+        return self.coingecko_map.get(symbol, symbol.lower())
     
     def get_fear_greed(self) -> Dict:
         def fetch():
@@ -143,33 +115,34 @@ class UltimateAnalyzer:
             articles = []
             scores = []
             
-            for source, url in self.rss_feeds.items():
+            try:
+                matches = news_store.articles(self.rss_feeds, keywords=[keyword], limit=15 * len(self.rss_feeds),
+                                               per_feed=15)
+            except Exception:
+                matches = []
+            
+            texts = [f"{entry['title']} {entry['summary'][:200]}" for entry in matches]
+            scored = sentiment_engine.score_batch(texts)
+            sentiment_engine.record(keyword, texts, scored, [e.get('published_ts') for e in matches])
+            
+            for entry, result in zip(matches, scored):
                 try:
-                    feed = feedparser.parse(url)
-                    for entry in feed.entries[:15]:
-                        title = entry.get('title', '')
-                        summary = entry.get('summary', '')[:200]
-                        
-                        if keyword.lower() in (title + summary).lower():
-                            text = f"{title} {summary}"
-                            blob = TextBlob(text)
-                            score = blob.sentiment.polarity
-                            
-                            bullish_words = ['bull', 'surge', 'rally', 'moon', 'breakout', 'soar', 'pump', 'buy']
-                            bearish_words = ['bear', 'crash', 'dump', 'plunge', 'sell', 'drop', 'fall', 'fear']
-                            
-                            b_count = sum(1 for w in bullish_words if w in text.lower())
-                            s_count = sum(1 for w in bearish_words if w in text.lower())
-                            keyword_score = (b_count - s_count) * 0.1
-                            final_score = score * 0.7 + keyword_score * 0.3
-                            
-                            articles.append({
-                                'source': source,
-                                'title': title[:60],
-                                'score': round(final_score, 2),
-                                'sentiment': 'BULLISH' if final_score > 0.1 else 'BEARISH' if final_score < -0.1 else 'NEUTRAL'
-                            })
-                            scores.append(final_score)
+                    source = entry['source']
+                    title = entry['title']
+                    score = result['polarity']
+                    
+                    b_count = result['counts']['en_bullish']
+                    s_count = result['counts']['en_bearish']
+                    keyword_score = (b_count - s_count) * 0.1
+                    final_score = score * 0.7 + keyword_score * 0.3
+                    
+                    articles.append({
+                        'source': source,
+                        'title': title[:60],
+                        'score': round(final_score, 2),
+                        'sentiment': 'BULLISH' if final_score > 0.1 else 'BEARISH' if final_score < -0.1 else 'NEUTRAL'
+                    })
+                    scores.append(final_score)
                 except:
                     continue
             
@@ -180,9 +153,11 @@ class UltimateAnalyzer:
                     'avg_score': round(avg, 3),
                     'sentiment': 'BULLISH' if avg > 0.1 else 'BEARISH' if avg < -0.1 else 'NEUTRAL',
                     'signal': 'BUY' if avg > 0.15 else 'SELL' if avg < -0.15 else 'HOLD',
-                    'articles': articles[:5]
+                    'articles': articles[:5],
+                    'rolling_24h': sentiment_engine.symbol_sentiment(keyword, 24)
                 }
-            return {'count': 0, 'sentiment': 'NEUTRAL', 'signal': 'HOLD', 'articles': []}
+            return {'count': 0, 'sentiment': 'NEUTRAL', 'signal': 'HOLD', 'articles': [],
+                    'rolling_24h': sentiment_engine.symbol_sentiment(keyword, 24)}
         
         return self.get_cached(f'news_{keyword}', fetch, 600)
     
@@ -195,17 +170,12 @@ class UltimateAnalyzer:
                 
                 if resp.status_code == 200:
                     posts = resp.json().get('data', {}).get('children', [])
-                    scores = []
                     hot_topics = []
+                    titles = [post.get('data', {}).get('title', '') for post in posts]
+                    scores = [r['polarity'] for r in sentiment_engine.polarity_batch(titles)]
                     
-                    for post in posts:
-                        data = post.get('data', {})
-                        title = data.get('title', '')
-                        ups = data.get('ups', 0)
-                        
-                        blob = TextBlob(title)
-                        score = blob.sentiment.polarity
-                        scores.append(score)
+                    for post, title in zip(posts, titles):
+                        ups = post.get('data', {}).get('ups', 0)
                         
                         if ups > 100:
                             hot_topics.append(title[:50])
@@ -491,62 +461,32 @@ class UltimateAnalyzer:
             from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
             from sklearn.preprocessing import MinMaxScaler
             
-            resp = requests.get(
-                f"https://graph-api.btcturk.com/v1/klines/history",
-                params={
-                    "symbol": f"{symbol}USDT",
-                    "resolution": "D",
-                    "from": int((datetime.now() - timedelta(days=90)).timestamp()),
-                    "to": int(datetime.now().timestamp())
-                },
-                timeout=15
-            )
-            
-            if resp.status_code != 200:
-                return {'prediction': 'N/A'}
-            
-            data = resp.json()
-            if 'c' not in data or len(data['c']) < 30:
-                return {'prediction': 'N/A'}
-            
-            closes = [float(x) for x in data['c']]
-            volumes = [float(x) for x in data.get('v', [0]*len(closes))]
-            
-            df = pd.DataFrame({'close': closes, 'volume': volumes})
-            
-            df['returns'] = df['close'].pct_change()
-            df['ma_5'] = df['close'].rolling(5).mean()
-            df['ma_10'] = df['close'].rolling(10).mean()
-            df['volatility'] = df['returns'].rolling(10).std()
-            df['momentum'] = df['close'] / df['close'].shift(5) - 1
-            df['target'] = df['close'].shift(-7) / df['close'] - 1
+            # Özellikler ortak depodan (ML modülleriyle aynı tanımlar)
+            features = ['returns', 'ma_5', 'ma_10', 'volatility_10', 'momentum_5']
+            df = feature_store.training_set(symbol, features, horizon=7, days=90)
+            last = feature_store.latest(symbol, features)
             
-            df = df.dropna()
-            
-            if len(df) < 20:
+            if len(df) < 20 or last is None:
                 return {'prediction': 'N/A'}
             
-            features = ['returns', 'ma_5', 'ma_10', 'volatility', 'momentum']
             X = df[features].values
             y = df['target'].values
             
-            X_train, y_train = X[:-7], y[:-7]
-            
             scaler = MinMaxScaler()
-            X_scaled = scaler.fit_transform(X_train)
+            X_scaled = scaler.fit_transform(X)
             
             rf = RandomForestRegressor(n_estimators=50, max_depth=8, random_state=42)
             gb = GradientBoostingRegressor(n_estimators=50, max_depth=5, random_state=42)
             
-            rf.fit(X_scaled, y_train)
-            gb.fit(X_scaled, y_train)
+            rf.fit(X_scaled, y)
+            gb.fit(X_scaled, y)
             
-            latest = scaler.transform(X[-1:])
+            latest = scaler.transform(last[features].values)
             pred_rf = rf.predict(latest)[0]
             pred_gb = gb.predict(latest)[0]
             prediction = (pred_rf + pred_gb) / 2
             
-            current_price = closes[-1]
+            current_price = float(last['close'].iloc[0])
             predicted_price = current_price * (1 + prediction)
             
             confidence = min(85, max(40, 60 + prediction * 100))
@@ -621,6 +561,7 @@ class UltimateAnalyzer:
         except:
             return {'accuracy': 0, 'status': 'ERROR'}
     
+    @timed()
     def ultimate_analyze(self, symbol: str) -> Dict:
         symbol = symbol.upper().replace('TRY', '').replace('USDT', '')
         
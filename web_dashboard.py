@@ -11,6 +11,8 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+from live_feed import live_feed
+
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
@@ -47,6 +49,33 @@ def get_market_data():
     except:
         return []
 
+def get_market_rows():
+    """Canlı akış için piyasa satırları (parite -> sade satır)"""
+    return {
+        d['pairNormalized']: {k: d.get(k) for k in ('pairNormalized', 'last', 'dailyPercent', 'volume')}
+        for d in get_market_data()
+    }
+
+def get_signals_payload():
+    """Sinyal istatistikleri + son sinyaller"""
+    from real_trader import SignalTracker
+    tracker = SignalTracker()
+    return {
+        'success': True,
+        'stats': tracker.get_stats(),
+        'recent': tracker.signals.get('signals', [])[-20:]
+    }
+
+def get_portfolio_payload():
+    """Bakiye + işlem istatistikleri"""
+    from real_trader import BTCTurkTrader
+    trader = BTCTurkTrader()
+    return {
+        'success': True,
+        'balances': trader.get_balance(),
+        'stats': trader.get_trade_stats()
+    }
+
 def get_strategies():
     """Stratejiler"""
     try:
@@ -89,15 +118,7 @@ def api_status():
 def api_portfolio():
     """Portföy API"""
     try:
-        from real_trader import BTCTurkTrader
-        trader = BTCTurkTrader()
-        balances = trader.get_balance()
-        stats = trader.get_trade_stats()
-        return jsonify({
-            'success': True,
-            'balances': balances,
-            'stats': stats
-        })
+        return jsonify(get_portfolio_payload())
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -114,6 +135,12 @@ def api_market():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/stream')
+def api_stream():
+    """Canlı akış (SSE) - ?topics=market,signals ile konu seçilebilir"""
+    topics = [t for t in request.args.get('topics', '').split(',') if t] or None
+    return live_feed.response(topics)
+
 @app.route('/api/ticker/<symbol>')
 def api_ticker(symbol):
     """Tek coin fiyat API"""
@@ -135,13 +162,7 @@ def api_ticker(symbol):
 def api_signals():
     """Sinyal istatistikleri API"""
     try:
-        from real_trader import SignalTracker
-        tracker = SignalTracker()
-        return jsonify({
-            'success': True,
-            'stats': tracker.get_stats(),
-            'recent': tracker.signals.get('signals', [])[-20:]
-        })
+        return jsonify(get_signals_payload())
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -529,7 +550,10 @@ def create_dashboard_template():
         }
         
         async function updatePortfolio() {
-            const data = await fetchData('/api/portfolio');
+            renderPortfolio(await fetchData('/api/portfolio'));
+        }
+        
+        function renderPortfolio(data) {
             const el = document.getElementById('portfolio-content');
             
             if (data.success && data.balances) {
@@ -559,7 +583,10 @@ def create_dashboard_template():
         }
         
         async function updateSignals() {
-            const data = await fetchData('/api/signals');
+            renderSignals(await fetchData('/api/signals'));
+        }
+        
+        function renderSignals(data) {
             const el = document.getElementById('signals-content');
             
             if (data.success && data.stats) {
@@ -602,7 +629,10 @@ def create_dashboard_template():
         }
         
         async function updateMarket() {
-            const data = await fetchData('/api/market');
+            renderMarket(await fetchData('/api/market'));
+        }
+        
+        function renderMarket(data) {
             const tbody = document.getElementById('market-body');
             
             if (data.success && data.data) {
@@ -680,9 +710,42 @@ def create_dashboard_template():
         updateStrategies();
         updateMarket();
         
-        // Otomatik güncelleme
-        setInterval(updateMarket, 30000);
-        setInterval(updateSignals, 60000);
+        // Canlı akış - sunucu değişiklikleri iter, sayfa yoklama yapmaz
+        const liveState = {};
+        const renderers = {
+            market: (rows) => renderMarket({
+                success: true,
+                data: Object.values(rows).sort((a, b) => parseFloat(b.volume) - parseFloat(a.volume))
+            }),
+            signals: renderSignals,
+            portfolio: renderPortfolio
+        };
+        
+        function applyTopic(topic) {
+            if (renderers[topic]) renderers[topic](liveState[topic]);
+        }
+        
+        if (window.EventSource) {
+            const stream = new EventSource('/api/stream');
+            stream.addEventListener('snapshot', (e) => {
+                const msg = JSON.parse(e.data);
+                for (const [topic, data] of Object.entries(msg.state)) {
+                    liveState[topic] = data;
+                    applyTopic(topic);
+                }
+            });
+            stream.addEventListener('diff', (e) => {
+                const msg = JSON.parse(e.data);
+                const current = Object.assign({}, liveState[msg.topic] || {}, msg.set);
+                for (const key of msg.unset) delete current[key];
+                liveState[msg.topic] = current;
+                applyTopic(msg.topic);
+            });
+        } else {
+            // Eski tarayıcılar için yoklama
+            setInterval(updateMarket, 30000);
+            setInterval(updateSignals, 60000);
+        }
     </script>
 </body>
 </html>'''
@@ -693,5 +756,18 @@ def create_dashboard_template():
 
 create_dashboard_template()
 
+# Canlı akış üreticileri - abone sayısından bağımsız, konu başına tek hesaplama
+def _safe_payload(builder):
+    def produce():
+        try:
+            return builder()
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    return produce
+
+live_feed.add_producer('market', get_market_rows, interval=1)
+live_feed.add_producer('signals', _safe_payload(get_signals_payload), interval=5)
+live_feed.add_producer('portfolio', _safe_payload(get_portfolio_payload), interval=30)
+
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5000, debug=False)